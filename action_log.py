@@ -0,0 +1,259 @@
+#!/usr/bin/env python3
+"""
+Action Log for James Bland: ACME Edition
+Append-only write-ahead log of each room's inputs with compact snapshots,
+so in-flight games survive a server crash or restart
+"""
+
+import json
+import os
+import time
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+WAL_SUFFIX = '.wal'
+SNAPSHOT_SUFFIX = '.snapshot.json'
+
+
+def _fsync_directory(directory: str):
+    """Make a rename durable (no-op where directories cannot be opened)"""
+    try:
+        fd = os.open(directory, os.O_RDONLY)
+    except OSError:
+        return
+    try:
+        os.fsync(fd)
+    except OSError:
+        pass
+    finally:
+        os.close(fd)
+
+
+class ActionLog:
+    """
+    One room's write-ahead log
+
+    Each input is appended as a JSON line and flushed to the OS immediately,
+    which survives a process crash. fsync() is left to JournalStore, which
+    batches it for every room so submitAction never waits on the disk.
+    A snapshot replaces the log: it is written atomically, then the records it
+    covers are dropped, so recovery replays at most the inputs since the last
+    snapshot. Rooms only queue snapshots; JournalStore writes them on its
+    flush pass, and until then the previous snapshot and the full log still
+    recover the room.
+    """
+
+    def __init__(self, directory: str, room_id: str, seq: int = 0):
+        self.room_id = room_id
+        self.wal_path = os.path.join(directory, room_id + WAL_SUFFIX)
+        self.snapshot_path = os.path.join(directory, room_id + SNAPSHOT_SUFFIX)
+        self.seq = seq
+        self.records_since_snapshot = 0
+        self.pending_snapshot = None  # (seq, log size, encoded snapshot) waiting for the flush pass
+        self.dirty = False
+        self.file = open(self.wal_path, 'a', encoding='utf-8')
+
+    def append(self, kind: str, sid: Optional[str] = None, data: Any = None) -> int:
+        """
+        Log one input before it is applied
+
+        Returns:
+            Sequence number of the record
+        """
+        self.seq += 1
+        record = {'seq': self.seq, 't': time.time(), 'type': kind}
+        if sid is not None:
+            record['sid'] = sid
+        if data is not None:
+            record['data'] = data
+
+        self.file.write(json.dumps(record, separators=(',', ':'), default=list) + '\n')
+        self.file.flush()
+        self.records_since_snapshot += 1
+        self.dirty = True
+        return self.seq
+
+    def sync(self) -> bool:
+        """fsync pending records; returns True if anything was written"""
+        if not self.dirty or self.file.closed:
+            return False
+        os.fsync(self.file.fileno())
+        self.dirty = False
+        return True
+
+    def queue_snapshot(self, state: Dict[str, Any]):
+        """
+        Snapshot `state` as of the last record, leaving the disk work to write_pending_snapshot()
+
+        Only the JSON encoding happens here, since `state` keeps changing after
+        this returns. A newer snapshot replaces one that has not been written yet.
+        """
+        snapshot = {'seq': self.seq, 't': time.time(), 'state': state}
+        # dumps() uses the C encoder; dump() streams through the pure-Python one
+        encoded = json.dumps(snapshot, separators=(',', ':'), default=list)
+        self.pending_snapshot = (self.seq, os.fstat(self.file.fileno()).st_size, encoded)
+        self.records_since_snapshot = 0
+
+    def write_pending_snapshot(self) -> bool:
+        """Atomically replace the snapshot with the queued one and drop the records it covers"""
+        if self.pending_snapshot is None or self.file.closed:
+            return False
+        _, covered_size, encoded = self.pending_snapshot
+        self.pending_snapshot = None
+
+        temp_path = self.snapshot_path + '.tmp'
+        with open(temp_path, 'w', encoding='utf-8') as f:
+            f.write(encoded)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(temp_path, self.snapshot_path)
+        _fsync_directory(os.path.dirname(self.snapshot_path) or '.')
+
+        # Keep the records logged since the snapshot was queued
+        with open(self.wal_path, 'rb') as f:
+            f.seek(covered_size)
+            tail = f.read()
+        self.file.close()
+        if tail:
+            # Replaced atomically: until the new log is durable, the old one still holds the tail
+            temp_path = self.wal_path + '.tmp'
+            with open(temp_path, 'wb') as f:
+                f.write(tail)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(temp_path, self.wal_path)
+        self.file = open(self.wal_path, 'a' if tail else 'w', encoding='utf-8')
+        self.dirty = False
+        return True
+
+    def write_snapshot(self, state: Dict[str, Any]):
+        """Snapshot `state` and write it now"""
+        self.queue_snapshot(state)
+        self.write_pending_snapshot()
+
+    def close(self):
+        """Write any queued snapshot, fsync and close the log"""
+        if not self.file.closed:
+            self.write_pending_snapshot()
+            self.sync()
+            self.file.close()
+
+    @staticmethod
+    def read(directory: str, room_id: str) -> Tuple[Optional[Dict[str, Any]], List[Dict[str, Any]], int]:
+        """
+        Read a room's snapshot and the records logged after it
+
+        A torn final line (crash mid-write) is ignored.
+
+        Returns:
+            Tuple of (snapshot state or None, records to replay, last sequence number)
+        """
+        snapshot_path = os.path.join(directory, room_id + SNAPSHOT_SUFFIX)
+        wal_path = os.path.join(directory, room_id + WAL_SUFFIX)
+
+        state = None
+        last_seq = 0
+        if os.path.exists(snapshot_path):
+            with open(snapshot_path, encoding='utf-8') as f:
+                snapshot = json.load(f)
+            state = snapshot['state']
+            last_seq = snapshot['seq']
+
+        records = []
+        if os.path.exists(wal_path):
+            with open(wal_path, encoding='utf-8') as f:
+                for line in f:
+                    try:
+                        record = json.loads(line)
+                    except json.JSONDecodeError:
+                        break
+                    # Records already folded into the snapshot (crash before truncation)
+                    if record['seq'] <= last_seq:
+                        continue
+                    records.append(record)
+                    last_seq = record['seq']
+
+        return state, records, last_seq
+
+
+class JournalStore:
+    """
+    Directory of room logs with one batched fsync loop for all of them
+
+    Group commit: appends only reach the OS page cache; run() fsyncs every
+    dirty log once per `fsync_interval` from a single green thread, and
+    writes the snapshots rooms have queued on the same pass.
+    """
+
+    def __init__(self, directory: str, fsync_interval: float = 0.05):
+        self.directory = directory
+        self.fsync_interval = fsync_interval
+        self.logs = {}  # room_id -> ActionLog
+        self.running = False
+
+        # Metrics
+        self.fsyncs = 0
+        self.fsync_seconds = 0.0  # includes snapshot writes
+        self.snapshots = 0
+
+        os.makedirs(directory, exist_ok=True)
+
+    def open(self, room_id: str, seq: int = 0) -> ActionLog:
+        """Open (or reopen) a room's log for appending"""
+        log = self.logs.get(room_id)
+        if log is None:
+            log = ActionLog(self.directory, room_id, seq)
+            self.logs[room_id] = log
+        return log
+
+    def room_ids(self) -> List[str]:
+        """Rooms that have a log or snapshot on disk"""
+        room_ids = set()
+        for name in os.listdir(self.directory):
+            for suffix in (WAL_SUFFIX, SNAPSHOT_SUFFIX):
+                if name.endswith(suffix):
+                    room_ids.add(name[:-len(suffix)])
+        return sorted(room_ids)
+
+    def load(self, room_id: str) -> Tuple[Optional[Dict[str, Any]], List[Dict[str, Any]], int]:
+        """Snapshot state, records to replay and last sequence number for a room"""
+        return ActionLog.read(self.directory, room_id)
+
+    def discard(self, room_id: str):
+        """Close a room's log and delete its files"""
+        log = self.logs.pop(room_id, None)
+        if log is not None:
+            log.file.close()
+        for suffix in (WAL_SUFFIX, SNAPSHOT_SUFFIX):
+            path = os.path.join(self.directory, room_id + suffix)
+            if os.path.exists(path):
+                os.remove(path)
+
+    def sync_all(self) -> int:
+        """Write queued snapshots and fsync every dirty log; returns how many logs were synced"""
+        start = time.perf_counter()
+        snapshots = synced = 0
+        for log in list(self.logs.values()):
+            snapshots += log.write_pending_snapshot()
+            synced += log.sync()
+        if snapshots or synced:
+            self.snapshots += snapshots
+            self.fsyncs += synced
+            self.fsync_seconds += time.perf_counter() - start
+        return synced
+
+    def run(self, sleep: Callable[[float], Any]):
+        """Group-commit loop for a background task (e.g. socketio.sleep)"""
+        self.running = True
+        while self.running:
+            self.sync_all()
+            sleep(self.fsync_interval)
+
+    def stop(self):
+        """Stop the run() loop after its current pass"""
+        self.running = False
+
+    def close(self):
+        """fsync and close every log"""
+        for log in self.logs.values():
+            log.close()
+        self.logs = {}
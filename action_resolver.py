@@ -3,108 +3,126 @@ James Bland: ACME Edition - Action Resolver
 Handles turn resolution, applying interaction matrix outcomes, and game state updates
 """
 
+import functools
 import random
-from interaction_matrix import get_interaction_outcome, STATUSES
+from interaction_matrix import outcome_for, describe_outcome, STATUSES, COMPILED_MATRIX
+from player_registry import PlayerRegistry, INACTIVE_STATUSES
+from player_state import PlayerStatus, as_status
+from intel_store import add_intel, as_intel_store, intel_count
+from turn_results import TurnResult, TurnResults
 
-def clamp_ip(ip_value, min_ip=-10, max_ip=50):
+# Strategic assets captured by network attacks (all uncontrolled at game start)
+STRATEGIC_ASSETS = ('central_server', 'comm_tower', 'data_vault', 'operations_center', 'safe_house_network')
+
+# IP range enforced after every change
+MIN_IP = -10
+MAX_IP = 50
+
+def clamp_ip(ip_value, min_ip=MIN_IP, max_ip=MAX_IP):
     """Clamp IP value to valid range"""
     return max(min_ip, min(max_ip, ip_value))
 
-def resolve_turn(users, submitted_actions, round_number, assets=None):
+def resolve_turn(users, submitted_actions, round_number, assets=None, rng=None, table=None, tracker=None):
     """
     Resolve a complete turn of actions
     
     Args:
-        users: Dictionary of user data {sid: {codename, status, ip, gadgets, intel, ...}}
+        users: PlayerRegistry or dictionary of user data {sid: {codename, status, ip, gadgets, intel, ...}};
+            a plain dict is indexed afresh on every call, so callers resolving many turns should
+            build one PlayerRegistry and pass it each time
         submitted_actions: Dictionary of submitted actions {sid: action_data}
         round_number: Current round number
         assets: Dictionary of strategic asset control (optional)
+        rng: random.Random for this game's draws (defaults to the global random module)
+        table: Compiled interaction matrix (defaults to COMPILED_MATRIX; see compile_matrix)
+        tracker: VictoryTracker over `users` and `assets` to keep current (optional)
     
     Returns:
-        list: Turn results for each player
+        TurnResults: Turn results for each player, indexed by player and action type
     """
-    results = []
+    results = TurnResults()
     if assets is None:
         assets = {}
+    if rng is None:
+        rng = random
+    if table is None:
+        table = COMPILED_MATRIX
+    
+    # Index players once so every lookup below is O(1)
+    users = PlayerRegistry.wrap(users)
+    # Intel goes through the tracker when there is one, so its counts stay current
+    gain_intel = tracker.gain_intel if tracker is not None else functools.partial(add_player_intel, users)
     
     # Convert SID-based actions to codename-based for easier processing
     actions_by_codename = {}
-    sid_to_codename = {}
     
     for sid, user in users.items():
-        sid_to_codename[sid] = user['codename']
         # Only process submitted actions, don't auto-submit for everyone
         if sid in submitted_actions:
             actions_by_codename[user['codename']] = submitted_actions[sid]
     
-    # Phase 1: Handle Banner Phase (Information Warfare)
-    banner_effects = handle_banner_phase(users, actions_by_codename, results)
+    # Stage 1: Index attacks by target once; every later stage reads this index
+    attacks_by_target = index_attacks_by_target(users, actions_by_codename)
+    
+    # Stage 2: Handle Banner Phase (Information Warfare)
+    banner_effects = handle_banner_phase(users, actions_by_codename, results, attacks_by_target)
     
-    # Phase 2: Process safe turns first (no offense)
+    # Stage 3: Process safe turns first (no offense)
     for codename, action in actions_by_codename.items():
-        if not action.get('offense') or action['offense'] == '':
+        if not action.get('offense'):
             # Safe turn - award +1 IP
-            user_sid = get_sid_by_codename(users, codename)
+            user_sid = users.sid_for(codename)
             if user_sid:
-                users[user_sid]['ip'] = clamp_ip(users[user_sid]['ip'] + 1)
-                results.append({
-                    'codename': codename,
-                    'action_type': 'safe_turn',
-                    'ip_delta': 1,
-                    'new_ip': users[user_sid]['ip'],
-                    'new_status': users[user_sid]['status'],
-                    'intel_gained': [],
-                    'description': 'Safe turn - gained 1 IP'
-                })
-    
-    # Phase 3: Group offensive actions by target
-    offensive_actions = {}
-    for codename, action in actions_by_codename.items():
-        if action.get('offense') and action['offense'] != '':
-            target = action.get('target')
-            if target and target in [u['codename'] for u in users.values()]:
-                if target not in offensive_actions:
-                    offensive_actions[target] = []
-                offensive_actions[target].append((codename, action))
+                user = users[user_sid]
+                user['ip'] = clamp_ip(user['ip'] + 1)
+                results.append(TurnResult.simple(
+                    codename, 'safe_turn',
+                    ip_delta=1,
+                    new_ip=user['ip'],
+                    new_status=user['status'],
+                    description='Safe turn - gained 1 IP'
+                ))
     
-    # Phase 4: Process offensive actions by target
-    for target_codename, attackers in offensive_actions.items():
+    # Stage 4: Process offensive actions by target. Asset captures happen inside
+    # this stage, in attack order, because each capture draws from `rng` between
+    # the banner draws and changes which assets the next capture can take.
+    for target_codename, attackers in attacks_by_target.items():
         # Sort attackers by IP spent (descending), then by codename (alphabetical)
         attackers.sort(key=lambda x: (-x[1].get('ip_spend', 0), x[0]))
         
-        target_sid = get_sid_by_codename(users, target_codename)
+        target_sid = users.sid_for(target_codename)
         target_action = actions_by_codename.get(target_codename, {})
         target_defense = target_action.get('defense', 'safe_house')
         
         if not target_sid:
             continue
+        target = users[target_sid]
             
         # Check if target can be attacked
-        target_status = users[target_sid]['status']
-        if target_status in ['captured', 'eliminated']:
+        target_status = users.status_of(target_sid)
+        if not target_status.can_be_targeted:
             # Target cannot be attacked
             for attacker_codename, _ in attackers:
-                results.append({
-                    'codename': attacker_codename,
-                    'action_type': 'failed_attack',
-                    'ip_delta': 0,
-                    'new_ip': users[get_sid_by_codename(users, attacker_codename)]['ip'],
-                    'new_status': users[get_sid_by_codename(users, attacker_codename)]['status'],
-                    'intel_gained': [],
-                    'description': f'Cannot attack {target_codename} - {target_status}'
-                })
+                attacker = users.get_by_codename(attacker_codename)
+                results.append(TurnResult.simple(
+                    attacker_codename, 'failed_attack',
+                    ip_delta=0,
+                    new_ip=attacker['ip'],
+                    new_status=attacker['status'],
+                    description=f'Cannot attack {target_codename} - {target_status}'
+                ))
             continue
         
         # Process each attack on this target
-        for attacker_codename, attack_action in attackers:
-            attacker_sid = get_sid_by_codename(users, attacker_codename)
+        for position, (attacker_codename, attack_action) in enumerate(attackers):
+            attacker_sid = users.sid_for(attacker_codename)
             if not attacker_sid:
                 continue
             
             # Check if attacker can attack
-            attacker_status = users[attacker_sid]['status']
-            if attacker_status in ['captured', 'eliminated']:
+            if users.is_out_of_play(attacker_sid):
                 continue
+            attacker = users[attacker_sid]
             
             # Apply banner effects if any
             banner_penalty = banner_effects.get(attacker_codename, 0)
@@ -114,126 +132,151 @@ def resolve_turn(users, submitted_actions, round_number, assets=None):
             defense = target_defense
             attacker_ip_spend = attack_action.get('ip_spend', 0)
             
-            outcome = get_interaction_outcome(offense, defense, attacker_ip_spend, 0)
+            # Compiled outcomes are shared records - IP spend is applied here, not copied in
+            outcome = outcome_for(offense, defense, table)
+            description = describe_outcome(outcome, attacker_ip_spend)
             
             # Apply banner penalty to success rate
-            if banner_penalty < 0 and outcome['offense_succeeds']:
+            if banner_penalty < 0 and outcome.offense_succeeds:
                 # 50% chance to fail due to banner distraction
-                if random.random() < 0.5:
-                    outcome = get_interaction_outcome(offense, 'default', 0, 0)
-                    outcome['description'] += " (Distracted by banner!)"
+                if rng.random() < 0.5:
+                    outcome = outcome_for(offense, 'default', table)
+                    attacker_ip_spend = 0
+                    description = outcome.description + " (Distracted by banner!)"
+            
+            ip_change_attacker = outcome.attacker_ip_change(attacker_ip_spend)
+            ip_change_defender = outcome.ip_change_defender
             
-            # Apply IP changes
-            old_attacker_ip = users[attacker_sid]['ip']
-            old_target_ip = users[target_sid]['ip']
+            # Apply IP changes (both read first: a spy can target themselves)
+            old_attacker_ip = attacker['ip']
+            old_target_ip = target['ip']
             
-            users[attacker_sid]['ip'] = clamp_ip(old_attacker_ip + outcome['ip_change_attacker'])
-            users[target_sid]['ip'] = clamp_ip(old_target_ip + outcome['ip_change_defender'])
+            attacker['ip'] = clamp_ip(old_attacker_ip + ip_change_attacker)
+            target['ip'] = clamp_ip(old_target_ip + ip_change_defender)
             
             # Apply status changes
-            if outcome['status_change_attacker']:
-                users[attacker_sid]['status'] = outcome['status_change_attacker']
+            if outcome.status_change_attacker:
+                users.set_status(attacker_sid, outcome.status_change_attacker)
             
-            if outcome['status_change_defender']:
-                users[target_sid]['status'] = outcome['status_change_defender']
+            if outcome.status_change_defender:
+                users.set_status(target_sid, outcome.status_change_defender)
             
             # Apply intel gains
-            attacker_intel = []
-            if outcome['intel_gained_attacker']:
-                users[attacker_sid]['intel'].extend(outcome['intel_gained_attacker'])
-                attacker_intel = outcome['intel_gained_attacker']
+            attacker_intel = outcome.intel_gained_attacker
+            gain_intel(attacker_sid, target_codename, attacker_intel, round_number)
             
-            target_intel = []
-            if outcome['intel_gained_defender']:
-                users[target_sid]['intel'].extend(outcome['intel_gained_defender'])
-                target_intel = outcome['intel_gained_defender']
+            target_intel = outcome.intel_gained_defender
+            gain_intel(target_sid, attacker_codename, target_intel, round_number)
             
             # Handle strategic asset captures
-            if offense == 'network_attack' and outcome['offense_succeeds']:
-                asset_captured = capture_strategic_asset(users, attacker_sid, assets, results)
+            if offense == 'network_attack' and outcome.offense_succeeds:
+                asset_captured = capture_strategic_asset(users, attacker_sid, assets, results, rng, tracker)
                 if asset_captured:
-                    outcome['description'] += f" Captured {asset_captured}!"
+                    description += f" Captured {asset_captured}!"
             
             # Record results
-            results.append({
-                'codename': attacker_codename,
-                'action_type': 'attack',
-                'target': target_codename,
-                'offense': offense,
-                'defense': defense,
-                'success': outcome['offense_succeeds'],
-                'ip_delta': outcome['ip_change_attacker'],
-                'new_ip': users[attacker_sid]['ip'],
-                'new_status': users[attacker_sid]['status'],
-                'intel_gained': attacker_intel,
-                'audio_effect': outcome.get('audio_effect'),
-                'description': outcome['description']
-            })
+            results.append(TurnResult.for_attack(
+                attacker_codename,
+                target_codename,
+                offense,
+                defense,
+                outcome.offense_succeeds,
+                ip_change_attacker,
+                attacker['ip'],
+                attacker['status'],
+                attacker_intel,
+                outcome.audio_effect,
+                description
+            ))
             
             # If this is the first attack on target, also record target result
-            if attackers.index((attacker_codename, attack_action)) == 0:
-                results.append({
-                    'codename': target_codename,
-                    'action_type': 'defense',
-                    'attacker': attacker_codename,
-                    'offense': offense,
-                    'defense': defense,
-                    'success': not outcome['offense_succeeds'],
-                    'ip_delta': outcome['ip_change_defender'],
-                    'new_ip': users[target_sid]['ip'],
-                    'new_status': users[target_sid]['status'],
-                    'intel_gained': target_intel,
-                    'description': f"Defended against {offense} with {defense}"
-                })
+            if position == 0:
+                results.append(TurnResult.for_defense(
+                    target_codename,
+                    attacker_codename,
+                    offense,
+                    defense,
+                    not outcome.offense_succeeds,
+                    ip_change_defender,
+                    target['ip'],
+                    target['status'],
+                    target_intel,
+                    f"Defended against {offense} with {defense}"
+                ))
     
     return results
 
-def handle_banner_phase(users, actions_by_codename, results):
+def index_attacks_by_target(users, actions_by_codename):
+    """
+    Group offensive actions by target in one pass
+    
+    Only actions with an offense and a registered target are kept. Targets
+    appear in the order they were first attacked, and each target's attackers
+    in action order.
+    
+    Returns:
+        dict: target codename -> [(attacker codename, action), ...]
+    """
+    attacks_by_target = {}
+    for codename, action in actions_by_codename.items():
+        if action.get('offense'):
+            target = action.get('target')
+            if target and users.has_codename(target):
+                attackers = attacks_by_target.get(target)
+                if attackers is None:
+                    attacks_by_target[target] = [(codename, action)]
+                else:
+                    attackers.append((codename, action))
+    return attacks_by_target
+
+def handle_banner_phase(users, actions_by_codename, results, attacks_by_target=None):
     """
     Handle information warfare banner phase
     
+    Args:
+        attacks_by_target: index_attacks_by_target() output (built if omitted)
+    
     Returns:
         dict: Banner effects by codename (penalties/bonuses)
     """
     banner_effects = {}
+    users = PlayerRegistry.wrap(users)
+    if attacks_by_target is None:
+        attacks_by_target = index_attacks_by_target(users, actions_by_codename)
     
     # Find all information warfare defenses
     for codename, action in actions_by_codename.items():
         if action.get('defense') == 'information_warfare':
             banner_message = action.get('banner_message', 'ACME RULES!')
             
-            # Find all players who targeted this broadcaster
-            affected_players = []
-            for other_codename, other_action in actions_by_codename.items():
-                if other_action.get('target') == codename and other_action.get('offense'):
-                    affected_players.append(other_codename)
+            # Players who targeted this broadcaster
+            affected_players = attacks_by_target.get(codename, ())
             
             # Apply banner effects
-            for affected in affected_players:
-                # In a full implementation, would wait for player responses
-                # For now, apply random effect based on banner message
-                if 'ACME' in banner_message.upper():
-                    banner_effects[affected] = -1  # Penalty for distraction
-                else:
-                    banner_effects[affected] = 0   # No effect
+            # In a full implementation, would wait for player responses
+            # For now, apply random effect based on banner message
+            effect = -1 if 'ACME' in banner_message.upper() else 0  # Penalty for distraction / no effect
+            for affected, _ in affected_players:
+                banner_effects[affected] = effect
             
             if affected_players:
-                results.append({
-                    'codename': codename,
-                    'action_type': 'banner',
-                    'ip_delta': 0,
-                    'new_ip': users[get_sid_by_codename(users, codename)]['ip'],
-                    'new_status': users[get_sid_by_codename(users, codename)]['status'],
-                    'intel_gained': [],
-                    'description': f'Banner displayed: "{banner_message}" - affected {len(affected_players)} attackers'
-                })
+                caster = users.get_by_codename(codename)
+                results.append(TurnResult.simple(
+                    codename, 'banner',
+                    ip_delta=0,
+                    new_ip=caster['ip'],
+                    new_status=caster['status'],
+                    description=f'Banner displayed: "{banner_message}" - affected {len(affected_players)} attackers'
+                ))
     
     return banner_effects
 
-def capture_strategic_asset(users, attacker_sid, assets, results):
+def capture_strategic_asset(users, attacker_sid, assets, results, rng=random, tracker=None):
     """
     Handle strategic asset capture for network attacks
     
+    The capture goes through `tracker` when given, so its asset counts stay current
+    
     Returns:
         str or None: Name of captured asset, or None if none available
     """
@@ -241,9 +284,12 @@ def capture_strategic_asset(users, attacker_sid, assets, results):
     
     if available_assets:
         # Capture a random available asset
-        captured_asset = random.choice(available_assets)
+        captured_asset = rng.choice(available_assets)
         attacker_codename = users[attacker_sid]['codename']
-        assets[captured_asset] = attacker_codename
+        if tracker is not None:
+            tracker.capture(captured_asset, attacker_codename)
+        else:
+            assets[captured_asset] = attacker_codename
         
         # Award bonus IP for capture
         users[attacker_sid]['ip'] = clamp_ip(users[attacker_sid]['ip'] + 3)
@@ -252,8 +298,17 @@ def capture_strategic_asset(users, attacker_sid, assets, results):
     
     return None
 
+def add_player_intel(users, sid, subject, sources, round_number=None):
+    """Add intel about `subject` to a player's store (VictoryTracker.gain_intel without the counts)"""
+    if sources:
+        player = users[sid]
+        player['intel'] = intel = as_intel_store(player.get('intel'))
+        add_intel(intel, subject, sources, round_number)
+
 def get_sid_by_codename(users, codename):
-    """Get session ID by codename"""
+    """Get session ID by codename (O(1) for a PlayerRegistry, linear scan for a plain dict)"""
+    if isinstance(users, PlayerRegistry):
+        return users.sid_for(codename)
     for sid, user in users.items():
         if user['codename'] == codename:
             return sid
@@ -263,6 +318,9 @@ def check_victory_conditions(users, assets):
     """
     Check all victory conditions and return winner(s) if any
     
+    Full O(N^2) scan of the current state. Rounds in a GameRoom use a
+    VictoryTracker instead, which must agree with this function.
+    
     Args:
         users: Dictionary of user data
         assets: Dictionary of strategic asset control
@@ -272,7 +330,7 @@ def check_victory_conditions(users, assets):
     """
     active_players = []
     for user in users.values():
-        if user['status'] not in ['captured', 'eliminated']:
+        if user['status'] not in INACTIVE_STATUSES:
             active_players.append(user)
     
     # Last Spy Standing
@@ -312,7 +370,7 @@ def check_victory_conditions(users, assets):
         if len(other_active) > 0:
             # Check if this player has intel about all other active players
             # This is a simplified version - in full game would check specific intel types
-            if len(user.get('intel', [])) >= len(other_active) * 3:
+            if intel_count(user.get('intel')) >= len(other_active) * 3:
                 return {
                     'winners': [user['codename']],
                     'condition': 'Intelligence Supremacy',
@@ -323,19 +381,24 @@ def check_victory_conditions(users, assets):
     
     return None
 
-def apply_round_end_effects(users, assets):
+def apply_round_end_effects(users, assets, rng=None):
     """
     Apply end-of-round effects like asset yields, gadget upkeep, etc.
     
     Args:
-        users: Dictionary of user data
+        users: PlayerRegistry or dictionary of user data
         assets: Dictionary of strategic asset control
+        rng: random.Random for this game's draws (defaults to the global random module)
     """
+    users = PlayerRegistry.wrap(users)
+    if rng is None:
+        rng = random
+    
     # Award asset yields (2 IP per controlled asset)
     for asset, controller in assets.items():
         if controller:
-            controller_sid = get_sid_by_codename(users, controller)
-            if controller_sid and users[controller_sid]['status'] not in ['captured', 'eliminated']:
+            controller_sid = users.sid_for(controller)
+            if controller_sid and not users.is_out_of_play(controller_sid):
                 users[controller_sid]['ip'] = clamp_ip(users[controller_sid]['ip'] + 2)
     
     # Apply gadget upkeep (1 IP per gadget) - DEDUCT costs
@@ -352,32 +415,33 @@ def apply_round_end_effects(users, assets):
                 user['ip'] = 0  # Spent all IP on upkeep
     
     # Handle status transitions
-    for user in users.values():
+    for sid, user in users.items():
+        status = as_status(user['status'])
         # Convert captured players who have been captured for a full round to burned
-        if user['status'] == 'captured':
+        if status is PlayerStatus.CAPTURED:
             # Track rounds captured (simplified - use random chance for now)
-            if random.random() < 0.4:  # 40% chance per round
-                user['status'] = 'burned'
+            if rng.random() < 0.4:  # 40% chance per round
+                users.set_status(sid, PlayerStatus.BURNED)
         
         # Burned players have a chance to become compromised
-        elif user['status'] == 'burned':
-            if random.random() < 0.3:  # 30% chance per round
-                user['status'] = 'compromised'
+        elif status is PlayerStatus.BURNED:
+            if rng.random() < 0.3:  # 30% chance per round
+                users.set_status(sid, PlayerStatus.COMPROMISED)
         
         # Compromised players can recover to active with high IP
-        elif user['status'] == 'compromised':
+        elif status is PlayerStatus.COMPROMISED:
             if user['ip'] >= 15:  # High IP threshold
-                user['status'] = 'active'
+                users.set_status(sid, PlayerStatus.ACTIVE)
     
     # Decrement alliance timers (simplified - would track Non-Aggression Pacts)
     for user in users.values():
         alliances = user.get('alliances', [])
         # Remove expired alliances (simplified)
-        user['alliances'] = [a for a in alliances if random.random() > 0.1]  # 10% chance to expire
+        user['alliances'] = [a for a in alliances if rng.random() > 0.1]  # 10% chance to expire
     
     # Award bonus IP for surviving players (encourages longer games)
-    active_count = len([u for u in users.values() if u['status'] not in ['captured', 'eliminated']])
+    active_count = len(users) - users.count_with_status(*INACTIVE_STATUSES)
     if active_count <= 2:  # Late game bonus - changed from 3 to 2
         for user in users.values():
-            if user['status'] not in ['captured', 'eliminated']:
+            if user['status'] not in INACTIVE_STATUSES:
                 user['ip'] = clamp_ip(user['ip'] + 1) 
\ No newline at end of file
@@ -8,6 +8,8 @@ import random
 import time
 from typing import Dict, List, Optional, Any, Tuple
 
+from player_registry import PlayerRegistry, ACTIVE_STATUSES
+
 class Alliance:
     """Represents an alliance between two players"""
     
@@ -44,6 +46,27 @@ class Alliance:
         """Reduce alliance duration by 1 round"""
         self.duration = max(0, self.duration - 1)
 
+    def to_dict(self) -> Dict[str, Any]:
+        """JSON-safe copy of this alliance (for snapshots)"""
+        return {
+            'player1': self.player1,
+            'player2': self.player2,
+            'alliance_type': self.alliance_type,
+            'duration': self.duration,
+            'created_round': self.created_round,
+            'shared_objectives': list(self.shared_objectives),
+            'betrayed': self.betrayed
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> 'Alliance':
+        """Rebuild an alliance from to_dict() output"""
+        alliance = cls(data['player1'], data['player2'], data['alliance_type'], data['duration'])
+        alliance.created_round = data.get('created_round', 0)
+        alliance.shared_objectives = list(data.get('shared_objectives', []))
+        alliance.betrayed = data.get('betrayed', False)
+        return alliance
+
 class AllianceManager:
     """Manages all alliances and alliance victory conditions"""
     
@@ -55,6 +78,33 @@ class AllianceManager:
         self.showdown_participants = []
         self.showdown_actions = {}
         
+    def to_dict(self) -> Dict[str, Any]:
+        """JSON-safe copy of alliances and Final Showdown state (for snapshots)"""
+        return {
+            'alliances': {alliance_id: alliance.to_dict()
+                          for alliance_id, alliance in self.alliances.items()},
+            'player_alliances': {codename: list(ids)
+                                 for codename, ids in self.player_alliances.items()},
+            'alliance_counter': self.alliance_counter,
+            'final_showdown_active': self.final_showdown_active,
+            'showdown_participants': list(self.showdown_participants),
+            'showdown_actions': dict(self.showdown_actions)
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> 'AllianceManager':
+        """Rebuild a manager from to_dict() output"""
+        manager = cls()
+        manager.alliances = {alliance_id: Alliance.from_dict(alliance)
+                             for alliance_id, alliance in data.get('alliances', {}).items()}
+        manager.player_alliances = {codename: list(ids)
+                                    for codename, ids in data.get('player_alliances', {}).items()}
+        manager.alliance_counter = data.get('alliance_counter', 0)
+        manager.final_showdown_active = data.get('final_showdown_active', False)
+        manager.showdown_participants = list(data.get('showdown_participants', []))
+        manager.showdown_actions = dict(data.get('showdown_actions', {}))
+        return manager
+
     def create_alliance(self, player1: str, player2: str, alliance_type: str, 
                        round_number: int) -> str:
         """
@@ -159,7 +209,7 @@ class AllianceManager:
         Check if any alliance has achieved victory conditions
         
         Args:
-            users: All player data
+            users: PlayerRegistry, or player data keyed by codename
             assets: Strategic asset control data
             
         Returns:
@@ -184,11 +234,15 @@ class AllianceManager:
         members = alliance.get_members()
         
         # Count active non-allied players
-        active_opponents = []
-        for codename, user_data in users.items():
-            if (codename not in members and 
-                user_data.get('status') in ['active', 'compromised', 'burned']):
-                active_opponents.append(codename)
+        if isinstance(users, PlayerRegistry):
+            active_opponents = [codename for codename in users.codenames_with_status(*ACTIVE_STATUSES)
+                                if codename not in members]
+        else:
+            active_opponents = []
+            for codename, user_data in users.items():
+                if (codename not in members and 
+                    user_data.get('status') in ACTIVE_STATUSES):
+                    active_opponents.append(codename)
         
         # Victory if all opponents are eliminated/captured
         if len(active_opponents) == 0:
@@ -278,12 +332,14 @@ class AllianceManager:
         
         return True
     
-    def resolve_final_showdown(self, users: Dict[str, Any]) -> Dict[str, Any]:
+    def resolve_final_showdown(self, users: Dict[str, Any],
+                               rng: Optional[random.Random] = None) -> Dict[str, Any]:
         """
         Resolve Final Showdown and determine winner
         
         Args:
-            users: Player data for participants
+            users: PlayerRegistry, or player data keyed by codename
+            rng: The game's random stream (defaults to the global random module)
             
         Returns:
             Showdown resolution results
@@ -292,6 +348,8 @@ class AllianceManager:
             raise ValueError("Cannot resolve showdown - invalid state")
         
         participants = self.showdown_participants
+        if rng is None:
+            rng = random
         
         # Auto-submit if missing actions
         for participant in participants:
@@ -308,17 +366,22 @@ class AllianceManager:
             action = action_data['action']
             
             # Base roll (1-10)
-            roll = random.randint(1, 10)
+            roll = rng.randint(1, 10)
             
             # Assassination gets slight bonus
             if action == 'assassination':
                 roll += 1
             
+            if isinstance(users, PlayerRegistry):
+                player = users.get_by_codename(codename) or {}
+            else:
+                player = users[codename]
+            
             results[codename] = {
                 'action': action,
                 'roll': roll,
                 'final_score': roll,
-                'ip': users[codename].get('ip', 0)
+                'ip': player.get('ip', 0)
             }
         
         # Determine winner
@@ -342,7 +405,7 @@ class AllianceManager:
                 runner_up = participant1
             else:
                 # Still tied - random
-                winner = random.choice(participants)
+                winner = rng.choice(participants)
                 runner_up = participant2 if winner == participant1 else participant1
         
         # Clean up
@@ -0,0 +1,433 @@
+#!/usr/bin/env python3
+"""
+Batch Resolver for James Bland: ACME Edition
+Struct-of-arrays game state resolved for thousands of games at once with NumPy,
+following the same rules as resolve_turn and apply_round_end_effects
+
+Requires NumPy (simulation only; the server never imports this module).
+"""
+
+from typing import Any, Dict, NamedTuple, Optional, Sequence, Tuple
+
+import numpy as np
+
+from interaction_matrix import (OFFENSES, DEFENSES, STATUSES, OFFENSE_IDS, DEFENSE_IDS, COMPILED_MATRIX,
+                                outcome_for, get_available_offenses, get_available_defenses)
+from action_resolver import STRATEGIC_ASSETS, MIN_IP, MAX_IP
+from player_registry import PlayerRegistry, ACTIVE_STATUSES, INACTIVE_STATUSES
+from intel_store import intel_count
+
+# Status codes ('exposed' is set by the matrix but is not one of STATUSES)
+STATUS_NAMES = tuple(STATUSES) + ('exposed',)
+STATUS_CODES = {status: code for code, status in enumerate(STATUS_NAMES)}
+ACTIVE_CODES = np.array([STATUS_CODES[s] for s in ACTIVE_STATUSES])
+INACTIVE_CODES = np.array([STATUS_CODES[s] for s in INACTIVE_STATUSES])
+
+# Offense codes besides OFFENSE_IDS
+SAFE_TURN = -1       # submitted with no offense
+NOT_SUBMITTED = -2   # no action this round
+
+NO_STATUS_CHANGE = -1
+NO_PLAYER = -1
+
+SAFE_HOUSE = DEFENSE_IDS['safe_house']
+INFORMATION_WARFARE = DEFENSE_IDS['information_warfare']
+NETWORK_ATTACK = OFFENSE_IDS['network_attack']
+
+# check_victory() condition codes
+VICTORY_CONDITIONS = (None, 'Last Spy Standing', 'Mutual Elimination', 'Network Control',
+                      'Intelligence Supremacy')
+NO_VICTORY, LAST_SPY_STANDING, MUTUAL_ELIMINATION, NETWORK_CONTROL, INTELLIGENCE_SUPREMACY = range(5)
+
+
+class MatrixTables(NamedTuple):
+    """A compiled interaction matrix as [offense, defense] lookup arrays"""
+    succeeds: np.ndarray
+    ip_attacker: np.ndarray
+    ip_defender: np.ndarray
+    status_attacker: np.ndarray
+    status_defender: np.ndarray
+    intel_attacker: np.ndarray   # number of intel cards gained
+    intel_defender: np.ndarray
+    spend_applies: np.ndarray
+    # Outcome of a banner-distracted attack, by offense (outcome_for(offense, 'default'))
+    default_succeeds: np.ndarray
+    default_ip_attacker: np.ndarray
+    default_ip_defender: np.ndarray
+    default_status_attacker: np.ndarray
+    default_status_defender: np.ndarray
+    default_intel_attacker: np.ndarray
+    default_intel_defender: np.ndarray
+
+
+def _status_code(status: Optional[str]) -> int:
+    return NO_STATUS_CHANGE if status is None else STATUS_CODES[status]
+
+
+def compile_tables(table=None) -> MatrixTables:
+    """
+    Lookup arrays for a compiled matrix
+
+    Args:
+        table: compile_matrix() output (defaults to COMPILED_MATRIX)
+    """
+    if table is None:
+        table = COMPILED_MATRIX
+    defaults = [outcome_for(offense, 'default') for offense in OFFENSES]
+
+    def grid(get, dtype):
+        return np.array([[get(table[o][d]) for d in range(len(DEFENSES))] for o in range(len(OFFENSES))],
+                        dtype=dtype)
+
+    def by_offense(get, dtype):
+        return np.array([get(outcome) for outcome in defaults], dtype=dtype)
+
+    return MatrixTables(
+        succeeds=grid(lambda r: r.offense_succeeds, bool),
+        ip_attacker=grid(lambda r: r.ip_change_attacker, np.int64),
+        ip_defender=grid(lambda r: r.ip_change_defender, np.int64),
+        status_attacker=grid(lambda r: _status_code(r.status_change_attacker), np.int8),
+        status_defender=grid(lambda r: _status_code(r.status_change_defender), np.int8),
+        intel_attacker=grid(lambda r: len(r.intel_gained_attacker), np.int64),
+        intel_defender=grid(lambda r: len(r.intel_gained_defender), np.int64),
+        spend_applies=grid(lambda r: r.ip_spend_applies, bool),
+        default_succeeds=by_offense(lambda r: r.offense_succeeds, bool),
+        default_ip_attacker=by_offense(lambda r: r.ip_change_attacker, np.int64),
+        default_ip_defender=by_offense(lambda r: r.ip_change_defender, np.int64),
+        default_status_attacker=by_offense(lambda r: _status_code(r.status_change_attacker), np.int8),
+        default_status_defender=by_offense(lambda r: _status_code(r.status_change_defender), np.int8),
+        default_intel_attacker=by_offense(lambda r: len(r.intel_gained_attacker), np.int64),
+        default_intel_defender=by_offense(lambda r: len(r.intel_gained_defender), np.int64),
+    )
+
+
+DEFAULT_TABLES = compile_tables()
+
+
+class BatchState:
+    """
+    Game state for N games of P players each, one array per field
+
+    Player p of game g is row g, column p of every per-player array. Intel and
+    gadgets are kept as counts, which is all resolution and victory use.
+    """
+
+    def __init__(self, ip: np.ndarray, status: np.ndarray, intel: np.ndarray,
+                 gadgets: np.ndarray, assets: np.ndarray, name_rank: np.ndarray):
+        self.ip = ip                # (N, P) IP
+        self.status = status        # (N, P) STATUS_CODES
+        self.intel = intel          # (N, P) intel card count
+        self.gadgets = gadgets      # (N, P) gadget count
+        self.assets = assets        # (N, len(STRATEGIC_ASSETS)) controlling player or NO_PLAYER
+        self.name_rank = name_rank  # (N, P) rank of each codename (attack order tiebreak)
+
+    @classmethod
+    def new(cls, games: int, players: int, starting_ip: int = 10) -> 'BatchState':
+        """Fresh games: everyone active with starting IP, no assets controlled"""
+        shape = (games, players)
+        return cls(
+            ip=np.full(shape, starting_ip, dtype=np.int64),
+            status=np.full(shape, STATUS_CODES['active'], dtype=np.int8),
+            intel=np.zeros(shape, dtype=np.int64),
+            gadgets=np.zeros(shape, dtype=np.int64),
+            assets=np.full((games, len(STRATEGIC_ASSETS)), NO_PLAYER, dtype=np.int64),
+            name_rank=np.broadcast_to(np.arange(players), shape).copy()
+        )
+
+    @classmethod
+    def from_games(cls, games: Sequence[Tuple[Any, Dict[str, Optional[str]]]]) -> 'BatchState':
+        """
+        Pack (users, assets) pairs as used by resolve_turn
+
+        Every game must have the same number of players; player order is the
+        users' iteration order.
+        """
+        players = [list(PlayerRegistry.wrap(users).values()) for users, _ in games]
+        codenames = [[p['codename'] for p in row] for row in players]
+        assets = [[row.index(controller) if controller in row else NO_PLAYER
+                   for controller in (game_assets.get(name) for name in STRATEGIC_ASSETS)]
+                  for row, (_, game_assets) in zip(codenames, games)]
+        return cls(
+            ip=np.array([[p['ip'] for p in row] for row in players], dtype=np.int64),
+            status=np.array([[STATUS_CODES[p['status']] for p in row] for row in players], dtype=np.int8),
+            intel=np.array([[intel_count(p.get('intel')) for p in row] for row in players], dtype=np.int64),
+            gadgets=np.array([[len(p.get('gadgets', [])) for p in row] for row in players], dtype=np.int64),
+            assets=np.array(assets, dtype=np.int64).reshape(len(games), len(STRATEGIC_ASSETS)),
+            name_rank=np.array([np.argsort(np.argsort(row, kind='stable'), kind='stable') for row in codenames],
+                               dtype=np.int64)
+        )
+
+    def select(self, games: np.ndarray) -> 'BatchState':
+        """State of a subset of games (index array or boolean mask)"""
+        return BatchState(self.ip[games], self.status[games], self.intel[games],
+                          self.gadgets[games], self.assets[games], self.name_rank[games])
+
+
+class BatchActions:
+    """One round of submitted actions for every player of every game"""
+
+    def __init__(self, offense: np.ndarray, defense: np.ndarray, target: np.ndarray,
+                 ip_spend: np.ndarray, acme_banner: np.ndarray):
+        self.offense = offense          # (N, P) OFFENSE_IDS, SAFE_TURN or NOT_SUBMITTED
+        self.defense = defense          # (N, P) DEFENSE_IDS
+        self.target = target            # (N, P) target player or NO_PLAYER
+        self.ip_spend = ip_spend        # (N, P)
+        self.acme_banner = acme_banner  # (N, P) banner message mentions ACME (distracts attackers)
+
+    @classmethod
+    def from_submitted(cls, games: Sequence[Tuple[Any, Dict[str, Dict[str, Any]]]]) -> 'BatchActions':
+        """Pack (users, submitted_actions) pairs as passed to resolve_turn"""
+        rows = []
+        for users, submitted in games:
+            users = PlayerRegistry.wrap(users)
+            codenames = [u['codename'] for u in users.values()]
+            row = []
+            for sid in users:
+                action = submitted.get(sid)
+                if action is None:
+                    row.append((NOT_SUBMITTED, SAFE_HOUSE, NO_PLAYER, 0, False))
+                    continue
+                offense = OFFENSE_IDS[action['offense']] if action.get('offense') else SAFE_TURN
+                target = action.get('target')
+                row.append((
+                    offense,
+                    DEFENSE_IDS[action.get('defense', 'safe_house')],
+                    codenames.index(target) if target in codenames else NO_PLAYER,
+                    action.get('ip_spend', 0),
+                    'ACME' in action.get('banner_message', 'ACME RULES!').upper()
+                ))
+            rows.append(row)
+
+        columns = np.array(rows, dtype=np.int64).reshape(len(games), -1, 5)
+        return cls(columns[..., 0], columns[..., 1], columns[..., 2], columns[..., 3],
+                   columns[..., 4].astype(bool))
+
+
+def _clamp(ip: np.ndarray) -> np.ndarray:
+    return np.clip(ip, MIN_IP, MAX_IP)
+
+
+def resolve_round(state: BatchState, actions: BatchActions, rng=None,
+                  tables: Optional[MatrixTables] = None):
+    """
+    Resolve one turn of every game in place, as resolve_turn would
+
+    Attacks are applied in resolve_turn's order (by target in order of first
+    attacker, then highest IP spend, then codename), one attack per game per
+    step, so each step is a few operations over all N games and the number
+    of steps is at most P.
+
+    Args:
+        state: BatchState to update
+        actions: This round's BatchActions
+        rng: NumPy Generator (anything with random(size)); banner distraction
+            and asset captures draw one uniform per game per attack step
+        tables: compile_tables() output (defaults to the standard matrix)
+    """
+    if rng is None:
+        rng = np.random.default_rng()
+    if tables is None:
+        tables = DEFAULT_TABLES
+
+    ip, status = state.ip, state.status
+    offense, target, spend = actions.offense, actions.target, actions.ip_spend
+    n, p = ip.shape
+    games = np.arange(n)
+
+    submitted = offense != NOT_SUBMITTED
+    attacking = offense >= 0
+    has_target = attacking & (target != NO_PLAYER)
+    target_index = np.where(has_target, target, 0)
+    # A target that did not submit defends with a safe house
+    defense = np.where(submitted, actions.defense, SAFE_HOUSE)
+
+    # Phase 1: banners distract anyone attacking an ACME information warfare broadcaster
+    broadcasting = submitted & (actions.defense == INFORMATION_WARFARE) & actions.acme_banner
+    distractible = has_target & broadcasting[games[:, None], target_index]
+
+    # Phase 2: safe turns
+    safe = offense == SAFE_TURN
+    ip[safe] = _clamp(ip[safe] + 1)
+
+    # Phase 3: order attacks by target group (first attacker's seat), spend, codename
+    group = np.full((n, p), p, dtype=np.int64)
+    seat = np.broadcast_to(np.arange(p), (n, p))
+    np.minimum.at(group, (np.broadcast_to(games[:, None], (n, p))[has_target], target_index[has_target]),
+                  seat[has_target])
+    attack_group = np.where(has_target, group[games[:, None], target_index], p)
+    order = np.lexsort((state.name_rank, -spend, attack_group), axis=-1)
+    attack_count = has_target.sum(axis=1)
+
+    # Phase 4: one attack per game per step
+    blocked = np.zeros(n, dtype=bool)
+    previous_target = np.full(n, NO_PLAYER)
+    for step in range(int(attack_count.max(initial=0))):
+        attacker = order[:, step]
+        live = step < attack_count
+        victim = target_index[games, attacker]
+
+        # Inactive targets are checked once, before their first attacker
+        first_in_group = live & (victim != previous_target)
+        blocked = np.where(first_in_group, np.isin(status[games, victim], INACTIVE_CODES), blocked)
+        previous_target = np.where(live, victim, previous_target)
+        go = live & ~blocked & ~np.isin(status[games, attacker], INACTIVE_CODES)
+
+        o = np.where(go, offense[games, attacker], 0)
+        d = defense[games, victim]
+        succeeds = tables.succeeds[o, d]
+        attack_spend = spend[games, attacker]
+
+        distracted = go & succeeds & distractible[games, attacker] & (rng.random(n) < 0.5)
+        pick = lambda field, default: np.where(distracted, default[o], field[o, d])
+        succeeds = pick(tables.succeeds, tables.default_succeeds)
+        ip_attacker = pick(tables.ip_attacker, tables.default_ip_attacker)
+        ip_defender = pick(tables.ip_defender, tables.default_ip_defender)
+        status_attacker = pick(tables.status_attacker, tables.default_status_attacker)
+        status_defender = pick(tables.status_defender, tables.default_status_defender)
+        intel_attacker = pick(tables.intel_attacker, tables.default_intel_attacker)
+        intel_defender = pick(tables.intel_defender, tables.default_intel_defender)
+        spend_applies = tables.spend_applies[o, d] & ~distracted & (attack_spend > 0)
+        ip_attacker = ip_attacker + np.where(spend_applies, attack_spend, 0)
+
+        # IP (both read before either is written, as in resolve_turn)
+        g, a, t = games[go], attacker[go], victim[go]
+        old_attacker_ip = ip[g, a]
+        old_victim_ip = ip[g, t]
+        ip[g, a] = _clamp(old_attacker_ip + ip_attacker[go])
+        ip[g, t] = _clamp(old_victim_ip + ip_defender[go])
+
+        # Status, attacker first
+        changed = go & (status_attacker != NO_STATUS_CHANGE)
+        status[games[changed], attacker[changed]] = status_attacker[changed]
+        changed = go & (status_defender != NO_STATUS_CHANGE)
+        status[games[changed], victim[changed]] = status_defender[changed]
+
+        # Intel
+        state.intel[g, a] += intel_attacker[go]
+        state.intel[g, t] += intel_defender[go]
+
+        # Successful network attacks capture a random uncontrolled asset (+3 IP)
+        available = state.assets == NO_PLAYER
+        available_count = available.sum(axis=1)
+        choice = (rng.random(n) * available_count).astype(np.int64)
+        captures = go & succeeds & (o == NETWORK_ATTACK) & (available_count > 0)
+        if captures.any():
+            asset = np.argmax(np.cumsum(available, axis=1) > choice[:, None], axis=1)
+            g, a = games[captures], attacker[captures]
+            state.assets[g, asset[captures]] = a
+            ip[g, a] = _clamp(ip[g, a] + 3)
+
+
+def round_end_effects(state: BatchState, rng=None):
+    """
+    Apply end-of-round effects to every game in place, as apply_round_end_effects would
+
+    Per-player alliance lists are not modelled (alliances live in the
+    AllianceManager, so they are always empty in simulated games).
+    """
+    if rng is None:
+        rng = np.random.default_rng()
+
+    ip, status = state.ip, state.status
+    n, p = ip.shape
+    out_of_play = np.isin(status, INACTIVE_CODES)
+
+    # Asset yields: 2 IP per controlled asset (equal to adding them one at a time)
+    controlled = np.zeros((n, p), dtype=np.int64)
+    owned = state.assets != NO_PLAYER
+    rows = np.broadcast_to(np.arange(n)[:, None], state.assets.shape)
+    np.add.at(controlled, (rows[owned], state.assets[owned]), 1)
+    earning = (controlled > 0) & ~out_of_play
+    ip[earning] = _clamp(ip[earning] + 2 * controlled[earning])
+
+    # Gadget upkeep: 1 IP per gadget, or keep only what can be afforded
+    gadgets = state.gadgets
+    upkeep = gadgets > 0
+    pays = upkeep & (ip >= gadgets)
+    ip[pays] = _clamp(ip[pays] - gadgets[pays])
+    short = upkeep & ~pays
+    # gadgets[:ip] keeps ip gadgets, or len + ip of them when ip is negative
+    gadgets[short] = np.where(ip[short] >= 0, ip[short], np.maximum(gadgets[short] + ip[short], 0))
+    ip[short] = 0
+
+    # Status transitions (one draw per player; used only by captured and burned players)
+    roll = rng.random((n, p))
+    before = status.copy()
+    status[(before == STATUS_CODES['captured']) & (roll < 0.4)] = STATUS_CODES['burned']
+    status[(before == STATUS_CODES['burned']) & (roll < 0.3)] = STATUS_CODES['compromised']
+    status[(before == STATUS_CODES['compromised']) & (ip >= 15)] = STATUS_CODES['active']
+
+    # Late game bonus when two or fewer players remain in play
+    in_play = ~np.isin(status, INACTIVE_CODES)
+    bonus = in_play & (in_play.sum(axis=1) <= 2)[:, None]
+    ip[bonus] = _clamp(ip[bonus] + 1)
+
+
+def check_victory(state: BatchState) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    check_victory_conditions for every game
+
+    Returns:
+        Tuple of (condition code per game, see VICTORY_CONDITIONS; winning
+        player per game or NO_PLAYER)
+    """
+    n, p = state.ip.shape
+    condition = np.full(n, NO_VICTORY, dtype=np.int64)
+    winner = np.full(n, NO_PLAYER, dtype=np.int64)
+
+    in_play = ~np.isin(state.status, INACTIVE_CODES)
+    remaining = in_play.sum(axis=1)
+
+    # Intelligence Supremacy: first player in play with 3+ intel per other player in play
+    supreme = in_play & (remaining > 1)[:, None] & (state.intel >= 3 * (remaining - 1)[:, None])
+    found = supreme.any(axis=1)
+    condition[found] = INTELLIGENCE_SUPREMACY
+    winner[found] = np.argmax(supreme, axis=1)[found]
+
+    # Network Control: 3+ assets (at most one player can hold them)
+    controlled = np.zeros((n, p), dtype=np.int64)
+    owned = state.assets != NO_PLAYER
+    rows = np.broadcast_to(np.arange(n)[:, None], state.assets.shape)
+    np.add.at(controlled, (rows[owned], state.assets[owned]), 1)
+    network = (controlled >= 3).any(axis=1)
+    condition[network] = NETWORK_CONTROL
+    winner[network] = np.argmax(controlled >= 3, axis=1)[network]
+
+    # Last Spy Standing / Mutual Elimination take precedence
+    last = remaining == 1
+    condition[last] = LAST_SPY_STANDING
+    winner[last] = np.argmax(in_play, axis=1)[last]
+    none_left = remaining == 0
+    condition[none_left] = MUTUAL_ELIMINATION
+    winner[none_left] = NO_PLAYER
+
+    return condition, winner
+
+
+def random_actions(state: BatchState, rng, safe_turn_chance: float = 0.15) -> BatchActions:
+    """
+    Vectorized equivalent of simulate.RandomPolicy (without alliances)
+
+    Players in an active status submit a random offense against a random
+    opponent still in an active status (or a safe turn), a random defense and
+    spend 0-2 IP they can afford.
+    """
+    n, p = state.ip.shape
+    offense_ids = np.array([OFFENSE_IDS[o] for o in get_available_offenses(p)])
+    defense_ids = np.array([DEFENSE_IDS[d] for d in get_available_defenses(p)])
+
+    acting = np.isin(state.status, ACTIVE_CODES)
+    targetable = acting[:, None, :] & ~np.eye(p, dtype=bool)[None, :, :]  # (N, attacker, target)
+    target_count = targetable.sum(axis=2)
+    choice = (rng.random((n, p)) * target_count).astype(np.int64)
+    target = np.argmax(np.cumsum(targetable, axis=2) > choice[..., None], axis=2)
+
+    attacks = (target_count > 0) & (rng.random((n, p)) >= safe_turn_chance)
+    offense = np.where(attacks, offense_ids[rng.integers(0, len(offense_ids), (n, p))], SAFE_TURN)
+    offense = np.where(acting, offense, NOT_SUBMITTED)
+    target = np.where(attacks & acting, target, NO_PLAYER)
+    defense = defense_ids[rng.integers(0, len(defense_ids), (n, p))]
+    max_spend = np.clip(state.ip, 0, 2)
+    ip_spend = (rng.random((n, p)) * (max_spend + 1)).astype(np.int64)
+
+    return BatchActions(offense, defense, target, ip_spend, np.zeros((n, p), dtype=bool))
@@ -0,0 +1,185 @@
+#!/usr/bin/env python3
+"""
+Broadcast Fan-out for James Bland: ACME Edition
+Serializes each outgoing event to Engine.IO packets once and writes the same
+packets to every socket that should receive it, including personalized events
+where many sockets share one view, in JSON or in MessagePack for clients that
+negotiated it, through bounded per-socket send queues
+"""
+
+from collections import deque
+from typing import Any, Callable, Dict, Hashable, Iterable, List, Optional, Tuple
+
+from engineio import packet as eio_packet
+from socketio import packet as sio_packet
+
+from send_queues import SendQueues, RESYNC_EVENT
+
+JSON = 'json'
+MSGPACK = 'msgpack'
+
+
+def group_by_view(sids: Iterable[str], view_of: Callable[[str], Hashable]) -> Dict[Hashable, List[str]]:
+    """Group sockets by the view they should see (view key -> sids, in first-seen order)"""
+    groups = {}
+    for sid in sids:
+        groups.setdefault(view_of(sid), []).append(sid)
+    return groups
+
+
+def msgpack_packet_class():
+    """python-socketio's MessagePack packet class, or None without the msgpack package"""
+    try:
+        from socketio.msgpack_packet import MsgPackPacket
+    except ImportError:
+        return None
+    return MsgPackPacket
+
+
+class Broadcaster:
+    """
+    Encode-once emitter over a python-socketio Server
+
+    Callable like socketio.emit(event, data, to=...), so it can be handed to
+    RoomManager as its emit function. Every call is serialized once, to a
+    Socket.IO packet and then to Engine.IO packets, and those packets are
+    written to each recipient's Engine.IO socket, so a room of N sockets costs
+    one encode rather than N. send_views() does the same for personalized
+    events: each distinct payload is encoded once for all the sockets that
+    share it. Emits that need per-recipient packets (acknowledgement
+    callbacks) go through the server's own emit.
+
+    Sockets that negotiated MessagePack are sent binary Engine.IO messages
+    (python-socketio's msgpack packet format); everyone else gets JSON text.
+    A payload is encoded at most once per serializer in use. Anything sent
+    outside the Broadcaster stays JSON, so negotiating clients must accept
+    both (static/js/socket_parser.js does).
+
+    With backpressure on, writes go through SendQueues, which holds
+    superseded progress updates for backed-up sockets and stops writing to
+    sockets over their limit until they resync.
+    """
+
+    def __init__(self, server, namespace: str = '/',
+                 send: Optional[Callable[[str, Any], Any]] = None, history: int = 1024,
+                 msgpack: bool = True, backpressure: bool = True):
+        self.server = server
+        self.namespace = namespace
+        # Writes one Engine.IO packet to one socket (eio sid, packet)
+        self.send = send or server.eio.send_packet
+        # None when MessagePack is turned off or the msgpack package is missing
+        self.msgpack_packet = msgpack_packet_class() if msgpack else None
+        self.serializers = {}  # sid -> MSGPACK for sockets that negotiated it
+        # None writes straight to Engine.IO
+        self.queues = SendQueues(self.send, self.backlog,
+                                 notify=lambda sid: self(RESYNC_EVENT, {}, to=sid),
+                                 disconnect=lambda sid: server.disconnect(sid, namespace=namespace)
+                                 ) if backpressure else None
+
+        # Metrics
+        self.broadcasts = 0
+        self.encodes = 0
+        self.encodes_by_serializer = {JSON: 0, MSGPACK: 0}
+        self.deliveries = 0
+        self.recent = deque(maxlen=history)  # (encodes, deliveries) per call
+
+    def __call__(self, event: str, data: Any = None, to: Optional[str] = None, **kwargs):
+        """Emit an event to a room or a single socket (drop-in for socketio.emit)"""
+        if kwargs.get('callback') is not None or to is None:
+            self.server.emit(event, data, to=to, namespace=kwargs.get('namespace', self.namespace),
+                             **{key: value for key, value in kwargs.items() if key != 'namespace'})
+            return
+        self.send_views(event, [(data, [to])], skip_sid=kwargs.get('skip_sid'))
+
+    def negotiate(self, sid: str, requested: Optional[str]) -> str:
+        """Choose a socket's serializer from what its client asked for; returns the choice"""
+        if requested == MSGPACK and self.msgpack_packet is not None:
+            self.serializers[sid] = MSGPACK
+            return MSGPACK
+        self.serializers.pop(sid, None)
+        return JSON
+
+    def forget(self, sid: str):
+        """Drop a disconnected socket's serializer and anything queued for it"""
+        self.serializers.pop(sid, None)
+        if self.queues is not None:
+            self.queues.forget(sid)
+
+    def backlog(self, eio_sid: str) -> int:
+        """Packets Engine.IO has queued for a socket but not yet written"""
+        socket = self.server.eio.sockets.get(eio_sid)
+        return socket.queue.qsize() if socket is not None else 0
+
+    def encode(self, event: str, data: Any, serializer: str = JSON) -> List[eio_packet.Packet]:
+        """Serialize an event once into the Engine.IO packets every recipient is sent"""
+        args = list(data) if isinstance(data, tuple) else ([] if data is None else [data])
+        packet_class = self.msgpack_packet if serializer == MSGPACK else sio_packet.Packet
+        encoded = packet_class(sio_packet.EVENT, namespace=self.namespace,
+                               data=[event] + args).encode()
+        if not isinstance(encoded, list):
+            encoded = [encoded]
+        packets = [eio_packet.Packet(eio_packet.MESSAGE, part) for part in encoded]
+        for packet in packets:
+            if not packet.binary:
+                # Fill the packet's encode cache so every transport reuses the same string
+                packet.encode()
+        self.encodes += 1
+        self.encodes_by_serializer[serializer] += 1
+        return packets
+
+    def send_views(self, event: str, views: Iterable[Tuple[Any, Iterable[str]]],
+                   skip_sid: Optional[str] = None) -> int:
+        """
+        Send personalized payloads, one encode per distinct view and serializer
+
+        Args:
+            event: Event name
+            views: (payload, targets) pairs; each target is a sid or a room
+            skip_sid: Socket that should not receive the event
+
+        Returns:
+            Number of sockets written to (not those held back or dropped by backpressure)
+        """
+        manager = self.server.manager
+        encodes_before = self.encodes
+        delivered = 0
+        # The manager has no rooms for a namespace until a socket connects to it
+        for payload, targets in (views if self.namespace in manager.rooms else ()):
+            packets = {}  # serializer -> packets, encoded on first use
+            for target in targets:
+                for sid, eio_sid in manager.get_participants(self.namespace, target):
+                    if sid == skip_sid:
+                        continue
+                    serializer = self.serializers.get(sid, JSON)
+                    if serializer not in packets:
+                        packets[serializer] = self.encode(event, payload, serializer)
+                    # A binary packet caches raw bytes or base64 depending on the transport that
+                    # encodes it first, so each socket gets its own wrapper around the shared bytes
+                    socket_packets = [eio_packet.Packet(eio_packet.MESSAGE, packet.data) if packet.binary
+                                      else packet for packet in packets[serializer]]
+                    if self.queues is None:
+                        for packet in socket_packets:
+                            self.send(eio_sid, packet)
+                    elif not self.queues.deliver(sid, eio_sid, event, socket_packets):
+                        continue
+                    delivered += 1
+
+        self.broadcasts += 1
+        self.deliveries += delivered
+        self.recent.append((self.encodes - encodes_before, delivered))
+        return delivered
+
+    def stats(self) -> Dict[str, Any]:
+        """Encode and delivery counters"""
+        recent_encodes = sum(encodes for encodes, _ in self.recent)
+        recent_deliveries = sum(deliveries for _, deliveries in self.recent)
+        return {
+            'broadcasts': self.broadcasts,
+            'encodes': self.encodes,
+            'encodesBySerializer': dict(self.encodes_by_serializer),
+            'msgpackSockets': len(self.serializers),
+            'deliveries': self.deliveries,
+            'encodesSaved': self.deliveries - self.encodes,
+            'encodesPerBroadcast': recent_encodes / len(self.recent) if self.recent else 0.0,
+            'recipientsPerEncode': recent_deliveries / recent_encodes if recent_encodes else 0.0
+        }
@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+"""
+Event Ring for James Bland: ACME Edition
+A bounded, sequenced history of a room's outbound game events, so a
+reconnecting client is sent only the events it missed
+"""
+
+import itertools
+from collections import deque
+from typing import Any, Dict, List, Optional
+
+# Events kept per room; a client offline for longer gets a full snapshot instead
+DEFAULT_CAPACITY = 256
+
+
+class SequencedEvent:
+    """One outbound event: a room-wide payload, or one payload per codename"""
+
+    __slots__ = ('seq', 'event', 'data', 'views')
+
+    def __init__(self, seq: int, event: str, data: Any = None,
+                 views: Optional[Dict[Optional[str], Any]] = None):
+        self.seq = seq
+        self.event = event
+        self.data = data
+        self.views = views  # codename -> payload for personalized events, else None
+
+    def payload_for(self, codename: Optional[str]) -> Any:
+        """What `codename` was sent, or None if the event did not go to them"""
+        if self.views is None:
+            return self.data
+        return self.views.get(codename)
+
+
+class EventRing:
+    """
+    Ring buffer of a room's sequenced broadcasts
+
+    Sequence numbers are contiguous, so finding where a client's gap starts
+    is arithmetic rather than a search, and since() costs only the events
+    actually missed. Once a gap is older than the ring holds, since() returns
+    None and the caller falls back to a state snapshot.
+    """
+
+    def __init__(self, capacity: int = DEFAULT_CAPACITY, seq: int = 0):
+        self.capacity = capacity
+        self.seq = seq  # Sequence number of the latest event
+        self.entries = deque(maxlen=capacity)
+
+        # Metrics
+        self.replays = 0
+        self.replayed_events = 0
+        self.evicted_gaps = 0
+
+    def append(self, event: str, data: Any = None,
+               views: Optional[Dict[Optional[str], Any]] = None) -> int:
+        """
+        Record an outbound event
+
+        Returns:
+            Its sequence number
+        """
+        self.seq += 1
+        self.entries.append(SequencedEvent(self.seq, event, data, views))
+        return self.seq
+
+    def oldest(self) -> Optional[int]:
+        """Sequence number of the oldest event still held"""
+        return self.entries[0].seq if self.entries else None
+
+    def since(self, seq: Any, codename: Optional[str] = None) -> Optional[List[Dict[str, Any]]]:
+        """
+        Events after `seq`, as `codename` received them
+
+        Returns:
+            [{seq, event, data}] oldest first (empty if the client is current),
+            or None if part of the gap has been evicted or `seq` was never issued
+        """
+        if not isinstance(seq, int) or isinstance(seq, bool) or seq < 0 or seq > self.seq:
+            return None
+        if seq == self.seq:
+            return []
+
+        oldest = self.oldest()
+        if oldest is None or seq + 1 < oldest:
+            self.evicted_gaps += 1
+            return None
+
+        missed = []
+        for entry in itertools.islice(self.entries, seq + 1 - oldest, None):
+            payload = entry.payload_for(codename)
+            if payload is not None:
+                missed.append({'seq': entry.seq, 'event': entry.event, 'data': payload})
+
+        self.replays += 1
+        self.replayed_events += len(missed)
+        return missed
+
+    def stats(self) -> Dict[str, Any]:
+        """Buffer occupancy and how reconnecting clients were caught up"""
+        return {
+            'seq': self.seq,
+            'held': len(self.entries),
+            'capacity': self.capacity,
+            'replays': self.replays,
+            'replayedEvents': self.replayed_events,
+            'evictedGaps': self.evicted_gaps
+        }
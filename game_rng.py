@@ -0,0 +1,40 @@
+#!/usr/bin/env python3
+"""
+Game RNG for James Bland: ACME Edition
+Per-game seeded random streams, so every game can be replayed exactly and
+games running side by side never share random state
+"""
+
+import hashlib
+import random
+import secrets
+from typing import Any, Optional
+
+
+def new_seed() -> int:
+    """Fresh 63-bit seed for a new game"""
+    return secrets.randbits(63)
+
+
+def derive_seed(seed: int, *key: Any) -> int:
+    """Stable sub-seed for (seed, *key), independent of PYTHONHASHSEED and platform"""
+    material = repr((seed,) + key).encode('utf-8')
+    return int.from_bytes(hashlib.blake2b(material, digest_size=8).digest(), 'big')
+
+
+class GameRNG:
+    """
+    One game's source of randomness
+
+    Every consumer draws from its own named stream, keyed by round where the
+    draws happen each round (e.g. stream('resolution', 7)). Streams are
+    derived from the game seed alone, so a round can be replayed or bisected
+    in isolation and adding a draw in one place never shifts another.
+    """
+
+    def __init__(self, seed: Optional[int] = None):
+        self.seed = seed if seed is not None else new_seed()
+
+    def stream(self, name: str, *key: Any) -> random.Random:
+        """A fresh random.Random for this named stream"""
+        return random.Random(derive_seed(self.seed, name, *key))
@@ -0,0 +1,1405 @@
+#!/usr/bin/env python3
+"""
+Game Rooms for James Bland: ACME Edition
+Each GameRoom owns one table's lobby, game state, Master Plans and alliances,
+so a single server process can host many concurrent games
+"""
+
+import functools
+import re
+import secrets
+import time
+from collections import deque
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+from interaction_matrix import get_available_offenses, get_available_defenses
+from action_resolver import resolve_turn, apply_round_end_effects, STRATEGIC_ASSETS
+from master_plans import MasterPlanManager, MASTER_PLAN_ACTIONS
+from alliance_victory import AllianceManager
+from player_registry import PlayerRegistry, ACTIVE_STATUSES
+from player_state import PlayerState
+from timer_wheel import TimerWheel
+from state_sync import StateSync, split_results
+from action_log import ActionLog
+from game_rng import GameRNG
+from resolution_pool import ResolutionPool
+from broadcast import group_by_view
+from event_ring import EventRing
+from victory_tracker import VictoryTracker
+from intel_store import copy_intel, intel_count
+from turn_results import TurnResults
+
+DEFAULT_ROOM_ID = 'main'
+MAX_PLAYERS = 6
+MIN_PLAYERS = 2
+DEADLINE_GRACE_SECONDS = 2  # allowance for network delay before the server auto-submits
+SNAPSHOT_EVERY_RECORDS = 200  # bounds how many logged inputs recovery has to replay
+COALESCE_SECONDS = 0.1  # lobby and submission progress broadcasts within this window are merged
+# Player fields owned by the connection, not by resolution; they are not versioned state either
+CONNECTION_FIELDS = ('disconnected', 'resume_token')
+# Logged inputs that only move a player between sockets, so leave the versioned state as it was
+CONNECTION_RECORDS = ('leave', 'resume')
+
+_ROOM_ID_PATTERN = re.compile(r'^[A-Za-z0-9_-]{1,32}$')
+
+
+def normalize_room_id(room_id: Optional[str]) -> Optional[str]:
+    """
+    Normalize a client-supplied room ID
+
+    Returns:
+        Lower-cased room ID, DEFAULT_ROOM_ID when none was given,
+        or None if the ID is not valid
+    """
+    if room_id is None:
+        return DEFAULT_ROOM_ID
+
+    room_id = str(room_id).strip().lower()
+    if not room_id:
+        return DEFAULT_ROOM_ID
+
+    if not _ROOM_ID_PATTERN.match(room_id):
+        return None
+
+    return room_id
+
+
+def new_resume_token() -> str:
+    """Unguessable token a player presents to take their seat back on a new socket"""
+    return secrets.token_urlsafe(18)
+
+
+def _discard_emit(event: str, data: Any = None, to: Optional[str] = None, **kwargs):
+    """Emitter used when a room is not attached to a Socket.IO server"""
+    return None
+
+
+def _deferred_while_resolving(method):
+    """Queue a room input that arrives while its round is resolving off the loop
+
+    The input runs once the resolution is applied, exactly as it would have
+    if resolution had blocked the loop, and is only logged when it runs.
+    """
+    @functools.wraps(method)
+    def wrapper(self, *args):
+        if self.resolving:
+            self.deferred.append((method, args))
+            return None
+        return method(self, *args)
+    return wrapper
+
+
+def _copy_player(player: PlayerState) -> PlayerState:
+    """Copy a player for resolve_job(): resolution replaces scalars and edits lists and intel in place"""
+    return PlayerState.from_dict({field: copy_intel(value) if field == 'intel'
+                                  else list(value) if isinstance(value, list) else value
+                                  for field, value in player.items()})
+
+
+def resolve_round(users: PlayerRegistry, submitted_actions: Dict[str, Dict[str, Any]], round_number: int,
+                  assets: Dict[str, Optional[str]], master_plan_manager: MasterPlanManager,
+                  alliance_manager: AllianceManager, rng: GameRNG) -> Dict[str, Any]:
+    """
+    Resolve one round in place
+
+    Runs turn resolution, Master Plan progress, round end effects, alliance
+    expiry and victory checks against the given players, assets and managers.
+    `submitted_actions` is keyed the same way as `users`.
+
+    Returns:
+        What happened: turn_results, expired_alliances, and at most one of
+        mission_completion, final_showdown or victory
+    """
+    outcome = {
+        'turn_results': TurnResults(),
+        'expired_alliances': [],
+        'mission_completion': None,
+        'final_showdown': None,
+        'victory': None
+    }
+
+    # Victory counts follow every status change, capture and intel gain from here on
+    tracker = VictoryTracker(users, assets)
+
+    # Resolve the turn using action resolver
+    turn_results = resolve_turn(users, submitted_actions, round_number, assets,
+                                rng=rng.stream('resolution', round_number), tracker=tracker)
+    outcome['turn_results'] = turn_results
+
+    # Update Master Plan progress based on turn results
+    for result in turn_results.of_type(*MASTER_PLAN_ACTIONS):
+        codename = result['codename']
+        master_plan_completion = master_plan_manager.update_progress(
+            codename,
+            result['action_type'],
+            result,
+            round_number,
+            users
+        )
+
+        # Handle Master Plan completion
+        if master_plan_completion:
+            if master_plan_completion['reward_type'] == 'instant_win':
+                outcome['mission_completion'] = master_plan_completion
+                return outcome
+            elif master_plan_completion['reward_type'] == 'ip_bonus':
+                # Award IP bonus
+                player = users.get_by_codename(codename)
+                if player:
+                    player['ip'] += master_plan_completion['reward_value']
+
+    # Apply round end effects
+    apply_round_end_effects(users, assets, rng=rng.stream('round_end', round_number))
+
+    # Process alliance round end effects
+    outcome['expired_alliances'] = alliance_manager.process_round_end()
+
+    # Check victory conditions
+    victory = tracker.check()
+
+    # Check alliance victory conditions
+    if not victory:
+        alliance_victory = alliance_manager.check_alliance_victory(users, assets)
+        if alliance_victory and alliance_victory.get('trigger_final_showdown'):
+            # Start Final Showdown
+            participants = alliance_victory['winners']
+            showdown_data = alliance_manager.start_final_showdown(participants)
+
+            # Award +3 IP to each participant
+            for participant in participants:
+                player = users.get_by_codename(participant)
+                if player:
+                    player['ip'] += 3
+
+            outcome['final_showdown'] = {
+                'alliance_victory': alliance_victory,
+                'showdown': showdown_data
+            }
+            return outcome
+
+    outcome['victory'] = victory
+    return outcome
+
+
+def resolve_job(job: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Resolve one round from a GameRoom.resolution_job() copy
+
+    It only touches `job`, so it can run in a worker thread or process while
+    the room keeps serving on the event loop.
+
+    Returns:
+        resolve_round()'s outcome plus the players (by codename), assets and
+        managers after the round, for GameRoom.adopt_resolution()
+    """
+    # Keyed by codename: resolution never needs session IDs
+    users = PlayerRegistry({player['codename']: player for player in job['players']})
+    master_plan_manager = MasterPlanManager.from_dict(job['master_plans'])
+    alliance_manager = AllianceManager.from_dict(job['alliances'])
+
+    outcome = resolve_round(users, job['submitted_actions'], job['round_number'], job['assets'],
+                            master_plan_manager, alliance_manager, GameRNG(job['seed']))
+    outcome.update({
+        'players': {codename: users[codename] for codename in users},
+        'assets': job['assets'],
+        'master_plans': master_plan_manager.to_dict(),
+        'alliances': alliance_manager.to_dict()
+    })
+    return outcome
+
+
+class GameRoom:
+    """A single game table: lobby, game state and per-game managers"""
+
+    def __init__(self, room_id: str, emit: Optional[Callable[..., Any]] = None,
+                 scheduler: Optional[TimerWheel] = None, journal: Optional[ActionLog] = None,
+                 seed: Optional[int] = None, resolver: Optional[ResolutionPool] = None):
+        self.room_id = room_id
+        self.emit = emit or _discard_emit
+        self.scheduler = scheduler
+        self.created_at = time.time()
+
+        # Write-ahead log of this room's inputs (None when not persisted)
+        self.journal = journal
+        # Every random draw in this game comes from streams derived from one seed
+        self.rng = GameRNG(seed)
+
+        # Server-authoritative planning deadline
+        self.planning_deadline = None  # Timer for the current planning phase
+        self.deadline_lateness = deque(maxlen=50)  # seconds late, per fired deadline
+
+        # Off-loop resolution (None resolves in place on the event loop)
+        self.resolver = resolver
+        self.resolving = False
+        self.deferred = deque()  # (method, args) received while resolving
+        # Called with the room ID when replayed inputs leave the room abandoned (set by RoomManager)
+        self.on_abandoned = None
+
+        # RoomActor serializing this room's inputs (None calls methods directly)
+        self.mailbox = None
+
+        # Latest lobbyUpdate / playerSubmitted waiting for the coalescing window to close
+        self.coalesced = {}       # event -> latest payload
+        self.coalesce_timer = None
+        self.last_coalesced = {}  # event -> payload clients last received
+        self.coalesce_requested = 0
+        self.coalesce_sent = 0
+
+        # Versioned state so clients only receive what changed. state_dirty is set by
+        # every input that may change the state, so reads between inputs reuse the
+        # committed version instead of rebuilding it.
+        self.sync = StateSync()
+        self.state_dirty = True
+        # Sequenced broadcasts, so a returning client is sent only what it missed
+        self.events = EventRing()
+        self.broadcast_version = 0  # Version every connected client got by broadcast
+
+        self.users = PlayerRegistry()  # sid -> PlayerState
+        self.lobby_state = {
+            'players': [],      # list of {sid, codename, ready}
+            'host_sid': None,
+            'game_started': False
+        }
+        self.game_state = {
+            'game_started': False,
+            'round_number': 0,
+            'phase': 'lobby',   # 'lobby', 'planning', 'banner', 'resolution', 'final_showdown', 'game_over'
+            'timer_start': None,
+            'timer_duration': 90,  # seconds
+            'submitted_actions': {},  # sid -> action data
+            'banner_responses': {},   # sid -> banner choice data
+            'assets': {},        # strategic assets control
+            'turn_results': []   # latest turn results
+        }
+
+        self.master_plan_manager = MasterPlanManager()
+        self.alliance_manager = AllianceManager()
+
+        self.record('created', data={'seed': self.seed, 'created_at': self.created_at})
+
+    @property
+    def seed(self) -> int:
+        """Seed of this game's random streams"""
+        return self.rng.seed
+
+    # Persistence
+
+    def record(self, kind: str, sid: Optional[str] = None, data: Any = None):
+        """Log an input to the write-ahead log before applying it"""
+        if kind not in CONNECTION_RECORDS:
+            self.state_dirty = True
+        if self.journal is None:
+            return
+        if self.journal.records_since_snapshot >= SNAPSHOT_EVERY_RECORDS:
+            self.checkpoint()
+        self.journal.append(kind, sid, data)
+
+    def checkpoint(self):
+        """
+        Queue a compact snapshot, which the journal's flush pass writes before truncating the log
+
+        Skipped while a round resolves off the loop: the room is mid-round then, in
+        the 'resolution' phase without its result. finish_resolution() checkpoints
+        once the result is applied, and record() retries after that.
+        """
+        if self.journal is not None and not self.resolving:
+            self.journal.queue_snapshot(self.to_snapshot())
+
+    def to_snapshot(self) -> Dict[str, Any]:
+        """Everything needed to rebuild this room (JSON-safe)"""
+        return {
+            'room_id': self.room_id,
+            'seed': self.seed,
+            'created_at': self.created_at,
+            'lobby_state': self.lobby_state,
+            'game_state': self.game_state,
+            'users': [[sid, player.to_dict()] for sid, player in self.users.items()],
+            'event_seq': self.events.seq,
+            'master_plans': self.master_plan_manager.to_dict(),
+            'alliances': self.alliance_manager.to_dict()
+        }
+
+    @classmethod
+    def from_snapshot(cls, snapshot: Dict[str, Any]) -> 'GameRoom':
+        """Rebuild a detached room from to_snapshot() output"""
+        room = cls(snapshot['room_id'], seed=snapshot['seed'])
+        room.created_at = snapshot['created_at']
+        room.lobby_state = snapshot['lobby_state']
+        room.game_state = snapshot['game_state']
+        room.users = PlayerRegistry({sid: PlayerState.from_dict(player) for sid, player in snapshot['users']})
+        room.events = EventRing(seq=snapshot.get('event_seq', 0))
+        room.master_plan_manager = MasterPlanManager.from_dict(snapshot['master_plans'])
+        room.alliance_manager = AllianceManager.from_dict(snapshot['alliances'])
+        return room
+
+    @classmethod
+    def restore(cls, room_id: str, snapshot: Optional[Dict[str, Any]],
+                records: List[Dict[str, Any]]) -> 'GameRoom':
+        """
+        Rebuild a room after a restart from its last snapshot plus the logged inputs since
+
+        Replay runs detached (no emits, timers or logging). Every socket died with
+        the old process, so all players come back disconnected and must rejoin.
+        """
+        room = cls.from_snapshot(snapshot) if snapshot else cls(room_id, seed=0)
+        for record in records:
+            room.apply_record(record)
+
+        for user in room.users.values():
+            user['disconnected'] = True
+        # Replayed broadcasts keep the sequence numbers moving, but they are not
+        # what clients were sent before the restart: catch everyone up by snapshot
+        room.events.entries.clear()
+        return room
+
+    def attach(self, emit: Optional[Callable[..., Any]] = None,
+               scheduler: Optional[TimerWheel] = None, journal: Optional[ActionLog] = None,
+               resolver: Optional[ResolutionPool] = None):
+        """Connect a restored room to the server and compact its log"""
+        self.emit = emit or _discard_emit
+        self.scheduler = scheduler
+        self.journal = journal
+        self.resolver = resolver
+
+        # The planning clock restarts now that players can reconnect
+        if self.game_state['phase'] == 'planning':
+            self.game_state['timer_start'] = time.time()
+            self.schedule_planning_deadline()
+
+        self.checkpoint()
+
+    def apply_record(self, record: Dict[str, Any]):
+        """Re-apply one logged input during recovery"""
+        kind = record['type']
+        sid = record.get('sid')
+        data = record.get('data') or {}
+
+        if kind == 'created':
+            self.rng = GameRNG(data['seed'])
+            # Rooms recovered before their first snapshot was written keep their age
+            self.created_at = data.get('created_at', self.created_at)
+        elif kind == 'join':
+            self.join(sid, data.get('codename'), data.get('token'))
+        elif kind == 'resume':
+            self.resume_session(sid, data.get('token'))
+        elif kind == 'leave':
+            self.leave(sid)
+        elif kind == 'startGame':
+            self.start_game(sid)
+        elif kind == 'submitAction':
+            self.submit_action(sid, data)
+        elif kind == 'planningDeadline':
+            self.on_planning_deadline(data['round'])
+        elif kind == 'bannerChoice':
+            self.banner_choice(sid, data)
+        elif kind == 'createAlliance':
+            self.create_alliance(sid, data)
+        elif kind == 'submitShowdownAction':
+            self.submit_showdown_action(sid, data)
+        else:
+            print(f"[{self.room_id}] Skipping unknown log record: {kind}")
+
+    # Messaging
+
+    def post(self, method: str, *args, reply: Optional[Callable[[Any], Any]] = None):
+        """
+        Deliver an input to this room: through its mailbox when it has one,
+        otherwise by calling the method right away
+
+        Socket handlers, deadline timers and resolution callbacks all come in
+        here, so with a mailbox only the room's actor ever touches its state.
+        """
+        if self.mailbox is not None:
+            self.mailbox.tell(method, *args, reply=reply)
+            return
+        result = getattr(self, method)(*args)
+        if reply is not None:
+            reply(result)
+
+    def broadcast(self, event: str, data: Dict[str, Any]):
+        """Send a sequenced event to every socket in this room"""
+        if self.coalesced:
+            self.flush_coalesced()
+        data = dict(data, seq=self.events.seq + 1)
+        self.events.append(event, data)
+        self.emit(event, data, to=self.room_id)
+
+    def broadcast_coalesced(self, event: str, data: Any):
+        """
+        Broadcast progress that only matters in its latest form
+
+        Calls within COALESCE_SECONDS are merged and only the latest payload
+        per event is sent, so a burst of joins or submissions costs one
+        broadcast rather than one per input. Pending payloads go out before any
+        other broadcast so clients see events in order. Without a scheduler the
+        payload is sent at once.
+        """
+        self.coalesce_requested += 1
+        if self.scheduler is None:
+            self.emit_coalesced(event, data)
+            return
+
+        self.coalesced[event] = data
+        if self.coalesce_timer is None:
+            self.coalesce_timer = self.scheduler.schedule(COALESCE_SECONDS, self.post, 'flush_coalesced')
+
+    def flush_coalesced(self):
+        """Send pending coalesced broadcasts now"""
+        if self.coalesce_timer is not None:
+            self.scheduler.cancel(self.coalesce_timer)
+            self.coalesce_timer = None
+
+        pending, self.coalesced = self.coalesced, {}
+        for event, data in pending.items():
+            self.emit_coalesced(event, data)
+
+    def emit_coalesced(self, event: str, data: Any):
+        """Broadcast a coalesced payload unless clients already have exactly this one"""
+        if self.last_coalesced.get(event) == data:
+            return
+        self.last_coalesced[event] = data
+        self.coalesce_sent += 1
+        self.emit(event, data, to=self.room_id)
+
+    def coalescing_stats(self) -> Dict[str, Any]:
+        """Coalesced broadcasts requested against sent"""
+        return {
+            'requested': self.coalesce_requested,
+            'sent': self.coalesce_sent,
+            'saved': self.coalesce_requested - self.coalesce_sent,
+            'pending': len(self.coalesced)
+        }
+
+    def send(self, sid: str, event: str, data: Any):
+        """Send an event to a single player's socket"""
+        self.emit(event, data, to=sid)
+
+    def send_views(self, event: str, views: Iterable[Tuple[Dict[str, Any], Iterable[str]]]):
+        """
+        Send a sequenced event as personalized payloads, given as (payload, sids) groups
+
+        With an encode-once emitter (broadcast.Broadcaster) each group is
+        serialized once however many sockets share it; any other emitter gets
+        one call per socket. The ring keeps each player's payload by codename,
+        since their sid changes when they reconnect.
+        """
+        if self.coalesced:
+            self.flush_coalesced()
+        seq = self.events.seq + 1
+        views = [(dict(payload, seq=seq), list(sids)) for payload, sids in views]
+        self.events.append(event, views={self.users.codename_of(sid): payload
+                                         for payload, sids in views for sid in sids})
+        send_views = getattr(self.emit, 'send_views', None)
+        if send_views is not None:
+            send_views(event, views)
+            return
+        for payload, sids in views:
+            for sid in sids:
+                self.emit(event, payload, to=sid)
+
+    def send_error(self, sid: str, message: str):
+        """Send an error message to a single player's socket"""
+        self.send(sid, 'error', {'message': message})
+
+    # Lobby
+
+    def is_empty(self) -> bool:
+        """Check if no players are left in the room"""
+        return not self.lobby_state['players']
+
+    def player_count(self) -> int:
+        """Number of players seated at this table"""
+        return len(self.lobby_state['players'])
+
+    def join(self, sid: str, codename: str, token: Optional[str] = None) -> bool:
+        """
+        Add a player to the lobby
+
+        Args:
+            sid: Socket.IO session ID of the joining player
+            codename: Requested codename
+            token: Resume token to issue (recovery replays the logged one)
+
+        Returns:
+            True if the player joined, False if the request was rejected
+        """
+        # Logged with the input so a recovered room honours the same token
+        token = token or new_resume_token()
+        self.record('join', sid, {'codename': codename, 'token': token})
+        codename = (codename or '').strip()
+
+        # Validate codename
+        if not codename or len(codename) > 16:
+            self.send_error(sid, 'Codename must be 1-16 characters')
+            return False
+
+        # Check if codename is already taken
+        if self.users.codename_taken(codename):
+            self.send_error(sid, 'Codename already taken')
+            return False
+
+        # Check if game already started
+        if self.game_state['game_started']:
+            self.send_error(sid, 'Game already in progress')
+            return False
+
+        # Check player limit
+        if len(self.lobby_state['players']) >= MAX_PLAYERS:
+            self.send_error(sid, f'Lobby is full ({MAX_PLAYERS} players max)')
+            return False
+
+        # Add player to lobby
+        self.lobby_state['players'].append({
+            'sid': sid,
+            'codename': codename,
+            'ready': False
+        })
+
+        # Set first player as host
+        if not self.lobby_state['host_sid']:
+            self.lobby_state['host_sid'] = sid
+
+        # Initialize user data
+        self.users.add(sid, PlayerState(codename, status='active', ip=10, resume_token=token))  # Starting IP
+
+        self.send(sid, 'lobbyJoined', {
+            'success': True,
+            'codename': codename,
+            'isHost': sid == self.lobby_state['host_sid'],
+            'room': self.room_id,
+            'resumeToken': token
+        })
+
+        self.broadcast_lobby()
+        return True
+
+    def resume_session(self, sid: str, token: Any, known_version: Optional[int] = None,
+                       last_seq: Optional[int] = None) -> Optional[str]:
+        """
+        Hand a player's seat to a new socket that presents their resume token
+
+        The token lookup is O(1) and the seat moves to the new sid in one step
+        on the room's actor, so nothing can act on the old sid halfway. The
+        client is then caught up from the last event and state version it saw.
+
+        Returns:
+            The sid the seat was taken from (the same sid for a repeated
+            resume), or None if the token is unknown
+        """
+        old_sid = self.users.sid_for_token(token) if isinstance(token, str) else None
+        if old_sid is None:
+            self.send(sid, 'sessionExpired', {'room': self.room_id})
+            return None
+
+        self.record('resume', sid, {'token': token})
+        if old_sid != sid:
+            self.rebind_sid(old_sid, sid)
+        self.users[sid]['disconnected'] = False
+
+        self.send(sid, 'lobbyJoined', {
+            'success': True,
+            'codename': self.users[sid]['codename'],
+            'isHost': sid == self.lobby_state['host_sid'],
+            'room': self.room_id,
+            'resumeToken': token,
+            'resumed': True
+        })
+        if self.game_state['game_started']:
+            self.catch_up(sid, known_version, last_seq)
+        else:
+            self.broadcast_lobby()
+        return old_sid
+
+    def catch_up(self, sid: str, known_version: Optional[int] = None, last_seq: Optional[int] = None):
+        """
+        Send a returning player the events they missed, then their state
+
+        While the ring still holds every event after `last_seq` they are replayed
+        in one missedEvents message, and the state that follows is a delta from
+        the version the replay leaves the client at. Otherwise the client gets a
+        state snapshot from `known_version`.
+        """
+        if sid not in self.users:
+            return
+        missed = self.events.since(last_seq, self.users.codename_of(sid)) if last_seq is not None else None
+        if missed:
+            self.send(sid, 'missedEvents', {'events': missed, 'seq': self.events.seq})
+            # Replayed broadcasts carry state deltas: the snapshot continues from the last one
+            versions = [entry['data']['version'] for entry in missed if 'version' in entry['data']]
+            if versions:
+                known_version = versions[-1]
+        self.send_game_state(sid, known_version)
+
+    def rebind_sid(self, old_sid: str, sid: str):
+        """Move a player and everything keyed by their session ID to a new sid"""
+        self.users.add(sid, self.users.remove(old_sid))
+
+        for player in self.lobby_state['players']:
+            if player['sid'] == old_sid:
+                player['sid'] = sid
+        if self.lobby_state['host_sid'] == old_sid:
+            self.lobby_state['host_sid'] = sid
+
+        for key in ('submitted_actions', 'banner_responses'):
+            if old_sid in self.game_state[key]:
+                self.game_state[key][sid] = self.game_state[key].pop(old_sid)
+
+        self.sync.forget(old_sid)
+
+    def broadcast_lobby(self):
+        """Broadcast the current lobby to the room (coalesced)"""
+        # Copies, so a payload waiting to be sent does not change under the last one sent
+        self.broadcast_coalesced('lobbyUpdate', {
+            'players': [dict(player) for player in self.lobby_state['players']],
+            'host': self.lobby_state['host_sid']
+        })
+
+    @_deferred_while_resolving
+    def leave(self, sid: str):
+        """Handle a player's socket disconnecting from this room"""
+        self.record('leave', sid)
+        # Handle lobby disconnection
+        if not self.game_state['game_started']:
+            # Remove from lobby
+            self.lobby_state['players'] = [p for p in self.lobby_state['players'] if p['sid'] != sid]
+            self.users.remove(sid)
+
+            # Transfer host if needed
+            if self.lobby_state['host_sid'] == sid:
+                if self.lobby_state['players']:
+                    self.lobby_state['host_sid'] = self.lobby_state['players'][0]['sid']
+                    self.broadcast('hostTransferred', {'newHost': self.lobby_state['host_sid']})
+                else:
+                    self.lobby_state['host_sid'] = None
+
+            self.broadcast_lobby()
+
+        # Handle in-game disconnection
+        elif sid in self.users:
+            # Mark as disconnected but keep in game. Their turn stays open until they
+            # resume or the planning deadline submits defaults for them.
+            self.users[sid]['disconnected'] = True
+            self.sync.forget(sid)
+
+    def is_abandoned(self) -> bool:
+        """Check if the room can be discarded (empty lobby or finished game with nobody connected)"""
+        if not self.game_state['game_started']:
+            return self.is_empty()
+
+        all_disconnected = all(u.get('disconnected') for u in self.users.values())
+        return all_disconnected and self.game_state['phase'] == 'game_over'
+
+    # Game flow
+
+    @_deferred_while_resolving
+    def start_game(self, sid: str) -> bool:
+        """Handle game start request (host only)"""
+        self.record('startGame', sid)
+        # Validate host
+        if sid != self.lobby_state['host_sid']:
+            self.send_error(sid, 'Only the host can start the game')
+            return False
+
+        # Validate minimum players
+        if len(self.lobby_state['players']) < MIN_PLAYERS:
+            self.send_error(sid, f'Need at least {MIN_PLAYERS} players to start')
+            return False
+
+        self.initialize_game()
+
+        self.broadcast_version = self.commit_state()
+        self.broadcast('gameStarted', {
+            'players': [{'codename': self.users[p['sid']]['codename'], 'sid': p['sid']}
+                        for p in self.lobby_state['players']],
+            'roundNumber': self.game_state['round_number'],
+            'timerDuration': self.game_state['timer_duration'],
+            'version': self.broadcast_version,
+            'state': self.sync.public_state()
+        })
+
+        # Start of the game is a natural recovery point
+        self.checkpoint()
+        return True
+
+    def initialize_game(self):
+        """Initialize game state for all players"""
+        self.lobby_state['game_started'] = True
+        self.game_state['game_started'] = True
+        self.game_state['phase'] = 'planning'
+        self.game_state['round_number'] = 1
+        self.game_state['timer_start'] = time.time()
+        self.game_state['submitted_actions'] = {}
+        self.game_state['banner_responses'] = {}
+
+        # Initialize strategic assets
+        self.game_state['assets'] = dict.fromkeys(STRATEGIC_ASSETS)
+
+        # Assign Master Plans to all players
+        player_codenames = [self.users[p['sid']]['codename'] for p in self.lobby_state['players']]
+        player_count = len(player_codenames)
+
+        master_plan_assignments = self.master_plan_manager.assign_master_plans(
+            player_codenames, player_count, rng=self.rng.stream('master_plans'))
+
+        # Update user data with Master Plan assignments
+        for player_data in self.lobby_state['players']:
+            codename = self.users[player_data['sid']]['codename']
+            if codename in master_plan_assignments:
+                self.users[player_data['sid']]['master_plan'] = master_plan_assignments[codename]
+
+        print(f"[{self.room_id}] Game started with {len(self.lobby_state['players'])} players")
+        print(f"[{self.room_id}] Master Plans assigned: {master_plan_assignments}")
+        print(f"[{self.room_id}] Game seed: {self.seed}")
+
+        self.schedule_planning_deadline()
+
+    def schedule_planning_deadline(self):
+        """Arm the server-side deadline for the current planning phase"""
+        if self.scheduler is None:
+            return
+
+        self.scheduler.cancel(self.planning_deadline)
+        self.planning_deadline = self.scheduler.schedule(
+            self.game_state['timer_duration'] + DEADLINE_GRACE_SECONDS,
+            self.post,
+            'on_planning_deadline',
+            self.game_state['round_number']
+        )
+
+    def cancel_planning_deadline(self):
+        """Disarm the planning deadline (everyone submitted or the game ended)"""
+        if self.scheduler is not None:
+            self.scheduler.cancel(self.planning_deadline)
+        self.planning_deadline = None
+
+    @_deferred_while_resolving
+    def on_planning_deadline(self, round_number: int):
+        """Planning time ran out: submit defaults for everyone missing and resolve"""
+        timer = self.planning_deadline
+        self.planning_deadline = None
+
+        # Stale deadline from a round that already resolved
+        if self.game_state['phase'] != 'planning' or self.game_state['round_number'] != round_number:
+            return
+
+        self.record('planningDeadline', data={'round': round_number})
+
+        if timer is not None and timer.lateness is not None:
+            self.deadline_lateness.append(timer.lateness)
+
+        auto_submitted = []
+        for sid in self.users.sids_with_status(*ACTIVE_STATUSES):
+            if sid not in self.game_state['submitted_actions']:
+                self.auto_submit_defaults(sid)
+                auto_submitted.append(self.users[sid]['codename'])
+
+        self.broadcast('planningDeadline', {
+            'roundNumber': round_number,
+            'autoSubmitted': sorted(auto_submitted)
+        })
+
+        self.start_resolution_phase()
+
+    def time_remaining(self) -> float:
+        """Seconds left in the current planning phase"""
+        if self.game_state['phase'] != 'planning' or self.game_state['timer_start'] is None:
+            return 0.0
+        elapsed = time.time() - self.game_state['timer_start']
+        return max(0.0, self.game_state['timer_duration'] - elapsed)
+
+    def active_player_count(self) -> int:
+        """Number of players who still have to submit an action each round"""
+        return self.users.count_with_status(*ACTIVE_STATUSES)
+
+    @_deferred_while_resolving
+    def submit_action(self, sid: str, data: Dict[str, Any]) -> bool:
+        """Handle player action submission during planning phase"""
+        self.record('submitAction', sid, data)
+        # Validate game state
+        if self.game_state['phase'] != 'planning':
+            self.send_error(sid, 'Not in planning phase')
+            return False
+
+        # Validate player
+        if sid not in self.users or not self.users[sid].can_act:
+            self.send_error(sid, 'Cannot submit action in current status')
+            return False
+
+        # Validate and store action
+        action = {
+            'offense': data.get('offense'),
+            'defense': data.get('defense'),
+            'target': data.get('target'),
+            'ip_spend': max(0, min(data.get('ip_spend', 0), self.users[sid]['ip'])),
+            'banner_message': data.get('banner_message', '').strip()[:50] if data.get('banner_message') else ''
+        }
+
+        resubmission = sid in self.game_state['submitted_actions']
+        self.game_state['submitted_actions'][sid] = action
+
+        self.send(sid, 'actionSubmitted', {'success': True})
+
+        # Broadcast submission status (without revealing actions); changing an
+        # already submitted action does not change it
+        submitted_count = len(self.game_state['submitted_actions'])
+        total_active = self.active_player_count()
+
+        if not resubmission:
+            self.broadcast_coalesced('playerSubmitted', {
+                'round': self.game_state['round_number'],
+                'submitted': submitted_count,
+                'total': total_active
+            })
+
+        # Check if all players submitted
+        if submitted_count >= total_active:
+            self.start_resolution_phase()
+
+        return True
+
+    def auto_submit_defaults(self, sid: str):
+        """Auto-submit default actions for disconnected/timed-out players"""
+        if sid not in self.game_state['submitted_actions']:
+            self.game_state['submitted_actions'][sid] = {
+                'offense': 'surveillance',  # Safe default
+                'defense': 'safe_house',    # Defensive default
+                'target': None,
+                'ip_spend': 0,
+                'banner_message': ''
+            }
+
+    def start_resolution_phase(self):
+        """Start the resolution phase after all actions submitted"""
+        self.begin_resolution()
+
+        # Small rooms resolve in place; handing them off costs more than it saves
+        if self.resolver is None or not self.resolver.should_offload(len(self.users)):
+            game_state = self.game_state
+            try:
+                outcome = resolve_round(self.users, game_state['submitted_actions'],
+                                        game_state['round_number'], game_state['assets'],
+                                        self.master_plan_manager, self.alliance_manager, self.rng)
+            except Exception as e:
+                self.finish_resolution(None, e)
+                return
+            self.finish_resolution(outcome)
+            return
+
+        # Resolve a copy of the state off the event loop; inputs for this room wait until it is applied
+        self.resolving = True
+        self.resolver.submit(resolve_job, self.resolution_job(), functools.partial(self.post, 'on_resolved'))
+
+    def on_resolved(self, result: Optional[Dict[str, Any]], error: Optional[BaseException]):
+        """Apply an offloaded resolution back on the event loop, then run inputs that arrived meanwhile"""
+        self.resolving = False
+        if error is None:
+            self.adopt_resolution(result)
+        self.finish_resolution(result, error)
+        self.run_deferred()
+        # A deferred leave may have been the last player out of a finished game; the
+        # server's release() already ran when that leave was queued, so check again now
+        if self.on_abandoned is not None and self.is_abandoned():
+            self.on_abandoned(self.room_id)
+
+    def run_deferred(self):
+        """Replay inputs that arrived while a resolution was running off the loop, in order"""
+        while self.deferred and not self.resolving:
+            method, args = self.deferred.popleft()
+            method(self, *args)
+
+    def begin_resolution(self):
+        """Close the planning phase, submitting defaults for anyone who has not acted"""
+        game_state = self.game_state
+        game_state['phase'] = 'resolution'
+        self.cancel_planning_deadline()
+
+        # Auto-submit defaults for any missing players
+        for sid in self.users.sids_with_status(*ACTIVE_STATUSES):
+            if sid not in game_state['submitted_actions']:
+                self.auto_submit_defaults(sid)
+
+    def resolution_job(self) -> Dict[str, Any]:
+        """
+        Copy out what resolution needs
+
+        Returns:
+            resolve_job() input: plain data with no references into the room,
+            safe to hand to another thread or process
+        """
+        game_state = self.game_state
+        users = self.users
+        return {
+            'seed': self.seed,
+            'round_number': game_state['round_number'],
+            'players': [_copy_player(player) for player in users.values()],
+            'submitted_actions': {users[sid]['codename']: dict(action)
+                                  for sid, action in game_state['submitted_actions'].items() if sid in users},
+            'assets': dict(game_state['assets']),
+            'master_plans': self.master_plan_manager.to_dict(),
+            'alliances': self.alliance_manager.to_dict()
+        }
+
+    def adopt_resolution(self, result: Dict[str, Any]):
+        """Take players, assets and managers from resolve_job() output"""
+        users = self.users
+
+        # Players are matched by codename: a sid may have been rebound meanwhile
+        for codename, resolved in result['players'].items():
+            sid = users.sid_for(codename)
+            if sid is None:
+                continue
+            player = users[sid]
+            for field, value in resolved.items():
+                if field not in CONNECTION_FIELDS and field != 'status':
+                    player[field] = value
+            users.set_status(sid, resolved['status'])
+        self.game_state['assets'] = result['assets']
+        self.master_plan_manager = MasterPlanManager.from_dict(result['master_plans'])
+        self.alliance_manager = AllianceManager.from_dict(result['alliances'])
+
+    def finish_resolution(self, outcome: Optional[Dict[str, Any]], error: Optional[BaseException] = None):
+        """Announce a resolution outcome, then snapshot"""
+        # Resolution is derived from logged inputs rather than logged itself
+        self.state_dirty = True
+        self.apply_resolution(outcome, error)
+
+        # Snapshot once per round so recovery replays at most one round of inputs
+        self.checkpoint()
+
+    def apply_resolution(self, result: Optional[Dict[str, Any]], error: Optional[BaseException] = None):
+        """Tell the room what happened in a resolved round and move the game on"""
+        game_state = self.game_state
+
+        if error is not None:
+            print(f"[{self.room_id}] Error resolving turn: {error}")
+            self.broadcast('error', {'message': 'Turn resolution failed'})
+            self.advance_to_next_round()
+            return
+
+        # Results are serialized once, here: finalResults, the public summary and
+        # each player's own results all share these dicts
+        game_state['turn_results'] = turn_results = result['turn_results'].wire()
+
+        completion = result['mission_completion']
+        if completion:
+            # Immediate victory
+            game_state['phase'] = 'game_over'
+            self.broadcast('gameOver', {
+                'winners': [completion['codename']],
+                'condition': 'Mission Completion',
+                'description': f"{completion['codename']} completed {completion['plan_name']}!",
+                'masterPlan': completion,
+                'finalResults': turn_results,
+                'assets': game_state['assets']
+            })
+            return
+
+        if result['final_showdown']:
+            # Notify clients of Final Showdown
+            self.broadcast('finalShowdownStarted', result['final_showdown'])
+            game_state['phase'] = 'final_showdown'
+            return
+
+        victory = result['victory']
+        if victory:
+            # Game over!
+            game_state['phase'] = 'game_over'
+            self.broadcast('gameOver', {
+                'winners': victory['winners'],
+                'condition': victory['condition'],
+                'description': victory['description'],
+                'finalResults': turn_results,
+                'assets': game_state['assets']
+            })
+            return
+
+        # Everyone gets a public summary and the state that changed; each player's
+        # full results (defenses, intel, IP) only go to their own socket
+        public_results, private_results = split_results(turn_results)
+        turn_result = {
+            'round': game_state['round_number'],
+            'results': public_results,
+            'expired_alliances': result['expired_alliances'],
+            **self.public_sync_payload()
+        }
+        # Players with no results of their own this round share one view. Disconnected
+        # players are included: nothing reaches them now, but the event ring keeps
+        # their view for when they resume.
+        groups = group_by_view(self.users, lambda sid: self.users[sid]['codename']
+                               if self.users[sid]['codename'] in private_results else None)
+        self.send_views('turnResult', [(dict(turn_result, yourResults=private_results.get(codename, [])), sids)
+                                       for codename, sids in groups.items()])
+
+        # Advance to next round after a delay
+        self.advance_to_next_round()
+
+    def state_view(self) -> Dict[str, Any]:
+        """Current versioned state: public summaries plus each player's private data"""
+        return {
+            'round': self.game_state['round_number'],
+            'assets': dict(self.game_state['assets']),
+            'players': {summary['codename']: summary for summary in self.get_player_summaries()},
+            # Connection fields churn as phones drop and resume (and the resume token is a
+            # credential), so they stay out of the version history
+            'private': {user['codename']: {field: value for field, value in user.items()
+                                           if field not in CONNECTION_FIELDS}
+                        for user in self.users.values()}
+        }
+
+    def commit_state(self) -> int:
+        """Record the current state as a new version if an input may have changed it"""
+        if self.state_dirty:
+            self.state_dirty = False
+            self.sync.commit(self.state_view())
+        return self.sync.version
+
+    def public_sync_payload(self) -> Dict[str, Any]:
+        """Broadcast fields bringing clients from the last broadcast version to now"""
+        base_version = self.broadcast_version
+        self.broadcast_version = self.commit_state()
+
+        delta = self.sync.public_delta(base_version)
+        if delta is None:
+            return {'version': self.broadcast_version, 'full': True, 'state': self.sync.public_state()}
+        return {'version': self.broadcast_version, 'baseVersion': base_version,
+                'full': False, 'delta': delta}
+
+    def acknowledge_state(self, sid: str, version: Any):
+        """Record the state version a client has applied"""
+        if sid in self.users:
+            self.sync.acknowledge(sid, version)
+
+    def get_player_summaries(self) -> List[Dict[str, Any]]:
+        """Get summary data for all players"""
+        summaries = []
+        for sid, user in self.users.items():
+            summaries.append({
+                'codename': user['codename'],
+                'status': user['status'],
+                'ip': user['ip'],
+                'gadgets': user['gadgets'],
+                'intel_count': intel_count(user.get('intel'))
+            })
+        return summaries
+
+    def advance_to_next_round(self):
+        """Advance to the next planning round"""
+        self.state_dirty = True
+        self.game_state['round_number'] += 1
+        self.game_state['phase'] = 'planning'
+        self.game_state['timer_start'] = time.time()
+        self.game_state['submitted_actions'] = {}
+        self.game_state['banner_responses'] = {}
+
+        self.schedule_planning_deadline()
+
+        self.broadcast('nextRound', {
+            'roundNumber': self.game_state['round_number'],
+            'timerDuration': self.game_state['timer_duration']
+        })
+
+    # Per-player requests
+
+    @_deferred_while_resolving
+    def send_game_state(self, sid: str, known_version: Optional[int] = None):
+        """
+        Send a state snapshot to a player
+
+        Carries only what changed since the version the client reports (or last
+        acknowledged); a full snapshot only when that version is too old.
+        """
+        if sid not in self.users:
+            return
+
+        self.users[sid]['disconnected'] = False
+        self.commit_state()
+
+        self.send(sid, 'gameStateSnapshot', {
+            'room': self.room_id,
+            'gameStarted': self.game_state['game_started'],
+            'phase': self.game_state['phase'],
+            'roundNumber': self.game_state['round_number'],
+            'timeRemaining': int(self.time_remaining()),
+            **self.sync.sync_payload(sid, self.users[sid]['codename'], known_version)
+        })
+
+    def send_game_options(self, sid: str):
+        """Send available offenses and defenses based on player count"""
+        player_count = len(self.lobby_state['players'])
+
+        self.send(sid, 'gameOptions', {
+            'offenses': get_available_offenses(player_count),
+            'defenses': get_available_defenses(player_count),
+            'targets': [p['codename'] for p in self.lobby_state['players']
+                        if p['sid'] != sid]
+        })
+
+    @_deferred_while_resolving
+    def banner_choice(self, sid: str, data: Dict[str, Any]):
+        """Handle banner choice during information warfare"""
+        self.record('bannerChoice', sid, data)
+        if sid not in self.users:
+            return
+
+        self.game_state['banner_responses'][sid] = {
+            'choice': data.get('choice'),  # 'believe' or 'ignore'
+            'caster': data.get('caster'),
+            'timestamp': time.time()
+        }
+
+        # Check if all banner responses collected
+        # This is a simplified version - full implementation would track who needs to respond
+        self.send(sid, 'bannerResponseRecorded', {'success': True})
+
+    @_deferred_while_resolving
+    def submit_showdown_action(self, sid: str, data: Dict[str, Any]):
+        """Handle Final Showdown action submission"""
+        self.record('submitShowdownAction', sid, data)
+        # Validate game state
+        if self.game_state['phase'] != 'final_showdown':
+            self.send_error(sid, 'Not in Final Showdown phase')
+            return
+
+        # Validate player
+        if sid not in self.users:
+            self.send_error(sid, 'Player not found')
+            return
+
+        codename = self.users[sid]['codename']
+        success = self.alliance_manager.submit_showdown_action(codename, data.get('action'))
+
+        if not success:
+            self.send_error(sid, 'Failed to submit showdown action')
+            return
+
+        self.send(sid, 'showdownActionSubmitted', {'success': True})
+
+        # Check if both participants have submitted
+        if len(self.alliance_manager.showdown_actions) >= 2:
+            # Resolve Final Showdown
+            try:
+                showdown_result = self.alliance_manager.resolve_final_showdown(
+                    self.users, rng=self.rng.stream('showdown', self.game_state['round_number']))
+
+                # Game over with Final Showdown results
+                self.game_state['phase'] = 'game_over'
+                self.broadcast('gameOver', {
+                    'winners': [showdown_result['winner']],
+                    'condition': 'Alliance Victory - Final Showdown',
+                    'description': showdown_result['description'],
+                    'finalShowdown': showdown_result,
+                    'finalRankings': showdown_result['final_rankings']
+                })
+                self.checkpoint()
+
+            except Exception as e:
+                print(f"[{self.room_id}] Error resolving Final Showdown: {e}")
+                self.broadcast('error', {'message': 'Final Showdown resolution failed'})
+
+    def send_master_plan(self, sid: str):
+        """Send player's Master Plan information"""
+        if sid not in self.users:
+            return
+
+        plan_info = self.master_plan_manager.get_player_plan_info(self.users[sid]['codename'])
+
+        if plan_info:
+            self.send(sid, 'masterPlanInfo', plan_info)
+        else:
+            self.send_error(sid, 'Master Plan not found')
+
+    def send_alliances(self, sid: str):
+        """Send alliance information to a player"""
+        if sid not in self.users:
+            return
+
+        codename = self.users[sid]['codename']
+        self.send(sid, 'allianceInfo', {
+            'playerAlliances': self.alliance_manager.get_player_alliances(codename),
+            'allAlliances': self.alliance_manager.get_alliance_summary()
+        })
+
+    @_deferred_while_resolving
+    def create_alliance(self, sid: str, data: Dict[str, Any]) -> Optional[str]:
+        """Handle alliance creation request"""
+        self.record('createAlliance', sid, data)
+        if sid not in self.users:
+            self.send_error(sid, 'Player not found')
+            return None
+
+        initiator = self.users[sid]['codename']
+        target = data.get('target')
+        alliance_type = data.get('type', 'non_aggression')
+
+        # Validate target
+        if not target or not self.users.has_codename(target):
+            self.send_error(sid, 'Target player not found')
+            return None
+
+        # Check if alliance can be formed
+        can_form, reason = self.alliance_manager.can_form_alliance(initiator, target)
+
+        if not can_form:
+            self.send_error(sid, reason)
+            return None
+
+        alliance_id = self.alliance_manager.create_alliance(
+            initiator, target, alliance_type, self.game_state['round_number']
+        )
+
+        self.broadcast('allianceCreated', {
+            'allianceId': alliance_id,
+            'members': [initiator, target],
+            'type': alliance_type,
+            'round': self.game_state['round_number']
+        })
+        return alliance_id
+
+    def summary(self) -> Dict[str, Any]:
+        """Public directory entry for this room"""
+        return {
+            'room': self.room_id,
+            'players': self.player_count(),
+            'maxPlayers': MAX_PLAYERS,
+            'phase': self.game_state['phase'],
+            'roundNumber': self.game_state['round_number']
+        }
+
+
+class RoomManager:
+    """Tracks every GameRoom hosted by this process and which room each socket belongs to"""
+
+    def __init__(self, emit: Optional[Callable[..., Any]] = None,
+                 scheduler: Optional[TimerWheel] = None, journal=None,
+                 resolver: Optional[ResolutionPool] = None,
+                 mailbox: Optional[Callable[[GameRoom], Any]] = None,
+                 owns: Optional[Callable[[str], bool]] = None):
+        self.emit = emit
+        self.scheduler = scheduler
+        self.journal = journal  # JournalStore, or None to keep games in memory only
+        self.resolver = resolver  # ResolutionPool, or None to resolve on the event loop
+        self.mailbox = mailbox  # room -> RoomActor, or None for direct calls
+        self.owns = owns or (lambda room_id: True)  # which rooms this worker hosts when sharded
+        self.rooms = {}      # room_id -> GameRoom
+        self.sid_rooms = {}  # sid -> room_id
+
+    def get_room(self, room_id: str) -> Optional[GameRoom]:
+        """Get an existing room by ID"""
+        return self.rooms.get(room_id)
+
+    def get_or_create(self, room_id: str) -> GameRoom:
+        """Get a room by ID, creating it on first use"""
+        room = self.rooms.get(room_id)
+        if room is None:
+            room = GameRoom(room_id, emit=self.emit, scheduler=self.scheduler,
+                            journal=self.journal.open(room_id) if self.journal else None,
+                            resolver=self.resolver)
+            self.add_room(room)
+        return room
+
+    def add_room(self, room: GameRoom):
+        """Host a room, giving it a mailbox when this manager uses them"""
+        if self.mailbox is not None:
+            room.mailbox = self.mailbox(room)
+        room.on_abandoned = self.discard_if_abandoned
+        self.rooms[room.room_id] = room
+
+    def recover(self) -> List[str]:
+        """
+        Rebuild in-flight games from the journal after a restart
+
+        Lobbies and finished games are not worth keeping and are dropped.
+
+        Returns:
+            IDs of the recovered rooms
+        """
+        if self.journal is None:
+            return []
+
+        recovered = []
+        for room_id in self.journal.room_ids():
+            # Another worker's room: leave its log for that worker
+            if not self.owns(room_id):
+                continue
+            snapshot, records, last_seq = self.journal.load(room_id)
+            try:
+                room = GameRoom.restore(room_id, snapshot, records)
+            except Exception as e:
+                print(f"Could not recover room {room_id}: {e}")
+                self.journal.discard(room_id)
+                continue
+
+            if room.game_state['phase'] in ('lobby', 'game_over'):
+                self.journal.discard(room_id)
+                continue
+
+            room.attach(emit=self.emit, scheduler=self.scheduler,
+                        journal=self.journal.open(room_id, last_seq), resolver=self.resolver)
+            self.add_room(room)
+            recovered.append(room_id)
+        return recovered
+
+    def room_for_sid(self, sid: str) -> Optional[GameRoom]:
+        """Get the room a socket has joined"""
+        room_id = self.sid_rooms.get(sid)
+        if room_id is None:
+            return None
+        return self.rooms.get(room_id)
+
+    def assign(self, sid: str, room_id: str):
+        """Record that a socket has joined a room"""
+        self.sid_rooms[sid] = room_id
+
+    def release(self, sid: str) -> Optional[GameRoom]:
+        """
+        Forget a socket's room membership, discarding the room if it is abandoned
+
+        Returns:
+            The room the socket belonged to, or None
+        """
+        room_id = self.sid_rooms.pop(sid, None)
+        if room_id is None:
+            return None
+
+        room = self.rooms.get(room_id)
+        self.discard_if_abandoned(room_id)
+        return room
+
+    def discard_if_abandoned(self, room_id: str):
+        """Drop a room once nobody is left to play in it"""
+        room = self.rooms.get(room_id)
+        if room is not None and room.is_abandoned():
+            room.cancel_planning_deadline()
+            room.flush_coalesced()
+            del self.rooms[room_id]
+            if self.journal is not None:
+                self.journal.discard(room_id)
+
+    def directory(self) -> List[Dict[str, Any]]:
+        """Summaries of every room hosted by this process"""
+        return [room.summary() for room in self.rooms.values()]
+
+    def coalescing_stats(self) -> Dict[str, Any]:
+        """Coalesced lobby and submission broadcasts per room, with totals"""
+        rooms = {room_id: room.coalescing_stats() for room_id, room in self.rooms.items()}
+        return {
+            'requested': sum(stats['requested'] for stats in rooms.values()),
+            'sent': sum(stats['sent'] for stats in rooms.values()),
+            'saved': sum(stats['saved'] for stats in rooms.values()),
+            'rooms': rooms
+        }
+
+    def catch_up_stats(self) -> Dict[str, Any]:
+        """Per-room event rings and how reconnecting clients were caught up, with totals"""
+        rooms = {room_id: room.events.stats() for room_id, room in self.rooms.items()}
+        return {
+            'replays': sum(stats['replays'] for stats in rooms.values()),
+            'replayedEvents': sum(stats['replayedEvents'] for stats in rooms.values()),
+            'evictedGaps': sum(stats['evictedGaps'] for stats in rooms.values()),
+            'rooms': rooms
+        }
+
+    def mailbox_stats(self) -> Dict[str, Any]:
+        """Per-room mailbox metrics, for rooms that have one"""
+        return {room_id: room.mailbox.stats() for room_id, room in self.rooms.items()
+                if room.mailbox is not None}
@@ -0,0 +1,234 @@
+#!/usr/bin/env python3
+"""
+Intel Store for James Bland: ACME Edition
+Intel card definitions, and each player's intel kept as counters per subject
+and card type plus a short log, so it stays the same size however long the
+game runs
+"""
+
+import sys
+from typing import Any, Dict, Iterable, Optional
+
+# Intel card definitions (scripts/generate_intel_deck.py builds the printed deck from these)
+INTEL_DEFINITIONS = [
+    {
+        "id": "IDENTITY_REVEAL",
+        "type": "identity",
+        "uses": 1,
+        "description": "Reveals the true identity of target player",
+        "copies": 8
+    },
+    {
+        "id": "NEXT_OFFENSE",
+        "type": "tactical",
+        "uses": 1,
+        "description": "Learn target's next planned offense",
+        "copies": 6
+    },
+    {
+        "id": "NEXT_DEFENSE",
+        "type": "tactical",
+        "uses": 1,
+        "description": "Learn target's next planned defense",
+        "copies": 6
+    },
+    {
+        "id": "GADGET_INVENTORY",
+        "type": "equipment",
+        "uses": 1,
+        "description": "Reveals all gadgets owned by target",
+        "copies": 5
+    },
+    {
+        "id": "LOCATION_INTEL",
+        "type": "surveillance",
+        "uses": 1,
+        "description": "Discover target's current safe house location",
+        "copies": 4
+    },
+    {
+        "id": "ALLIANCE_NETWORK",
+        "type": "political",
+        "uses": 1,
+        "description": "Reveals all of target's current alliances",
+        "copies": 4
+    },
+    {
+        "id": "MASTER_PLAN_HINT",
+        "type": "strategic",
+        "uses": 1,
+        "description": "Gain a clue about target's master plan objective",
+        "copies": 3
+    },
+    {
+        "id": "FULL_DOSSIER",
+        "type": "comprehensive",
+        "uses": 3,
+        "description": "Complete intelligence profile - reveals identity, gadgets, and next action",
+        "copies": 2
+    },
+    {
+        "id": "ASSET_CONTROL",
+        "type": "strategic",
+        "uses": 1,
+        "description": "Learn which strategic assets target controls",
+        "copies": 3
+    },
+    {
+        "id": "IP_RESERVES",
+        "type": "financial",
+        "uses": 1,
+        "description": "Discover target's exact IP count",
+        "copies": 5
+    },
+    {
+        "id": "COMMUNICATION_LOG",
+        "type": "surveillance",
+        "uses": 1,
+        "description": "Intercept target's recent communications",
+        "copies": 4
+    },
+    {
+        "id": "WEAKNESS_ANALYSIS",
+        "type": "tactical",
+        "uses": 1,
+        "description": "Reveals target's most vulnerable defense type",
+        "copies": 3
+    },
+    {
+        "id": "DOUBLE_AGENT",
+        "type": "infiltration",
+        "uses": 2,
+        "description": "Place a double agent - learn target's actions for 2 rounds",
+        "copies": 2
+    },
+    {
+        "id": "BLACKMAIL_MATERIAL",
+        "type": "leverage",
+        "uses": 1,
+        "description": "Compromising information that can force target cooperation",
+        "copies": 2
+    },
+    {
+        "id": "SAFE_HOUSE_NETWORK",
+        "type": "infrastructure",
+        "uses": 1,
+        "description": "Map of all safe houses in target's network",
+        "copies": 3
+    }
+]
+
+# Card ID -> definition; the IDs are interned so every store shares one copy of each
+INTEL_CARDS = {sys.intern(definition['id']): definition for definition in INTEL_DEFINITIONS}
+
+# Interaction matrix intel (intel_gained_attacker / intel_gained_defender) -> card ID.
+# 'attacker_*' entries are about the attacker and go to the defender, 'defender_*' the reverse.
+INTEL_SOURCES = {
+    'attacker_codename': 'IDENTITY_REVEAL',
+    'defender_fake_intel': 'IDENTITY_REVEAL',
+    'attacker_next_offense': 'NEXT_OFFENSE',
+    'defender_next_defense': 'NEXT_DEFENSE',
+    'defender_gadgets': 'GADGET_INVENTORY',
+    'attacker_equipment': 'GADGET_INVENTORY',
+    'attacker_full_equipment': 'GADGET_INVENTORY',
+    'attacker_location': 'LOCATION_INTEL',
+    'defender_location': 'LOCATION_INTEL',
+    'attacker_allies': 'ALLIANCE_NETWORK',
+    'defender_allies': 'ALLIANCE_NETWORK',
+    'defender_alliance_plans': 'ALLIANCE_NETWORK',
+    'attacker_master_plan_hint': 'MASTER_PLAN_HINT',
+    'defender_false_plans': 'MASTER_PLAN_HINT',
+    'attacker_full_dossier': 'FULL_DOSSIER',
+    'attacker_surveillance_methods': 'COMMUNICATION_LOG',
+    'attacker_surveillance_target': 'COMMUNICATION_LOG'
+}
+
+INTEL_LOG_SIZE = 16  # most recent gains kept in detail per player (0 keeps none)
+
+
+def new_intel() -> Dict[str, Any]:
+    """
+    An empty intel store (plain JSON-safe data, kept in player['intel'])
+
+    total:    cards gained in all
+    subjects: subject codename -> card ID -> cards gained about them
+    log:      the last INTEL_LOG_SIZE gains as [round, subject, card ID]
+    """
+    return {'total': 0, 'subjects': {}, 'log': []}
+
+
+def as_intel_store(intel: Any) -> Dict[str, Any]:
+    """
+    The store for a player's intel field
+
+    Older snapshots and callers hold a plain list of intel strings; those
+    become a store with the same total and no subjects (the list never said
+    whom each card was about).
+    """
+    if isinstance(intel, dict):
+        return intel
+    store = new_intel()
+    store['total'] = len(intel or ())
+    return store
+
+
+def add_intel(intel: Dict[str, Any], subject: str, sources: Iterable[str],
+              round_number: Optional[int] = None, log_size: int = INTEL_LOG_SIZE) -> int:
+    """
+    Count intel gained about `subject`
+
+    Args:
+        intel: Store to update (see new_intel)
+        subject: Codename the intel is about
+        sources: Interaction matrix intel entries, e.g. ['attacker_codename']
+        round_number: Round recorded in the log
+        log_size: Detail log bound
+
+    Returns:
+        Number of cards added
+    """
+    counts = None
+    added = 0
+    log = intel['log']
+    for source in sources:
+        card = INTEL_SOURCES[source]
+        if counts is None:
+            counts = intel['subjects'].setdefault(subject, {})
+        counts[card] = counts.get(card, 0) + 1
+        added += 1
+        if log_size:
+            log.append([round_number, subject, card])
+
+    intel['total'] += added
+    if len(log) > log_size:
+        del log[:len(log) - log_size]
+    return added
+
+
+def intel_count(intel: Any) -> int:
+    """Cards a player holds in all (a store, a legacy list or None)"""
+    if isinstance(intel, dict):
+        return intel['total']
+    return len(intel or ())
+
+
+def intel_about(intel: Any, subject: str, card: Optional[str] = None) -> int:
+    """Cards a player holds about `subject`, optionally of one card type"""
+    if not isinstance(intel, dict):
+        return 0
+    counts = intel['subjects'].get(subject, {})
+    if card is not None:
+        return counts.get(card, 0)
+    return sum(counts.values())
+
+
+def copy_intel(intel: Any) -> Any:
+    """Copy a store so edits to the copy never reach the original"""
+    if not isinstance(intel, dict):
+        return list(intel or ())
+    return {
+        'total': intel['total'],
+        'subjects': {subject: dict(counts) for subject, counts in intel['subjects'].items()},
+        'log': [list(entry) for entry in intel['log']]
+    }
+
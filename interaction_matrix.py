@@ -3,6 +3,9 @@ James Bland: ACME Edition - Interaction Matrix
 Defines all offense vs defense pairings and their outcomes
 """
 
+from functools import lru_cache
+from typing import NamedTuple, Optional, Tuple
+
 # Offense types
 OFFENSES = [
     'assassination', 'sabotage', 'exposure', 'surveillance', 'infiltration',
@@ -361,4 +364,128 @@ def get_available_defenses(player_count=6):
     if player_count == 2:
         defenses = [d for d in defenses if 'alliance' not in d]
     
-    return defenses 
\ No newline at end of file
+    return defenses
+
+# Compiled Interaction Matrix
+# A dense OFFENSES x DEFENSES table of immutable outcome records indexed by
+# small integer IDs, built once so resolution never copies or rebuilds dicts.
+
+OFFENSE_IDS = {offense: index for index, offense in enumerate(OFFENSES)}
+DEFENSE_IDS = {defense: index for index, defense in enumerate(DEFENSES)}
+
+class Outcome(NamedTuple):
+    """Immutable outcome of one offense vs defense pairing"""
+    offense_succeeds: bool
+    ip_change_attacker: int
+    ip_change_defender: int
+    status_change_attacker: Optional[str]
+    status_change_defender: Optional[str]
+    intel_gained_attacker: Tuple[str, ...]
+    intel_gained_defender: Tuple[str, ...]
+    audio_effect: Optional[str]
+    description: str
+    # IP spending only modifies pairings defined in the matrix, not defaults
+    ip_spend_applies: bool = True
+    
+    def attacker_ip_change(self, attacker_ip_spend=0):
+        """Attacker IP change including IP spent"""
+        if self.ip_spend_applies and attacker_ip_spend > 0:
+            return self.ip_change_attacker + attacker_ip_spend
+        return self.ip_change_attacker
+    
+    def defender_ip_change(self, defender_ip_spend=0):
+        """Defender IP change including IP spent"""
+        if self.ip_spend_applies and defender_ip_spend > 0:
+            return self.ip_change_defender + defender_ip_spend
+        return self.ip_change_defender
+    
+    def as_dict(self, attacker_ip_spend=0, defender_ip_spend=0):
+        """Expand to the dict format returned by get_interaction_outcome"""
+        return {
+            'offense_succeeds': self.offense_succeeds,
+            'ip_change_attacker': self.attacker_ip_change(attacker_ip_spend),
+            'ip_change_defender': self.defender_ip_change(defender_ip_spend),
+            'status_change_attacker': self.status_change_attacker,
+            'status_change_defender': self.status_change_defender,
+            'intel_gained_attacker': list(self.intel_gained_attacker) or None,
+            'intel_gained_defender': list(self.intel_gained_defender) or None,
+            'audio_effect': self.audio_effect,
+            'description': describe_outcome(self, attacker_ip_spend, defender_ip_spend)
+        }
+
+def _compile_outcome(outcome, ip_spend_applies=True):
+    """Convert a matrix outcome dict into an immutable Outcome record"""
+    return Outcome(
+        offense_succeeds=outcome['offense_succeeds'],
+        ip_change_attacker=outcome['ip_change_attacker'],
+        ip_change_defender=outcome['ip_change_defender'],
+        status_change_attacker=outcome['status_change_attacker'],
+        status_change_defender=outcome['status_change_defender'],
+        intel_gained_attacker=tuple(outcome['intel_gained_attacker'] or ()),
+        intel_gained_defender=tuple(outcome['intel_gained_defender'] or ()),
+        audio_effect=outcome.get('audio_effect'),
+        description=outcome['description'],
+        ip_spend_applies=ip_spend_applies
+    )
+
+def compile_matrix(matrix=None):
+    """
+    Compile an interaction matrix into a dense table of Outcome records
+    
+    Args:
+        matrix: offense -> defense -> outcome dict (defaults to INTERACTION_MATRIX);
+            pass a modified copy to evaluate balance changes
+    
+    Returns:
+        tuple: table[offense_id][defense_id] -> Outcome, with unspecified
+        pairings filled in from get_default_outcome
+    """
+    if matrix is None:
+        matrix = INTERACTION_MATRIX
+    
+    table = []
+    for offense in OFFENSES:
+        row = []
+        for defense in DEFENSES:
+            outcome = matrix.get(offense, {}).get(defense)
+            if outcome is None:
+                row.append(_compile_outcome(get_default_outcome(offense, defense), ip_spend_applies=False))
+            else:
+                row.append(_compile_outcome(outcome))
+        table.append(tuple(row))
+    return tuple(table)
+
+COMPILED_MATRIX = compile_matrix()
+
+# Names outside OFFENSES/DEFENSES come straight from clients, so only the most
+# recent few pairings stay cached ('default' fallbacks and the odd stale client)
+DEFAULT_OUTCOME_CACHE_SIZE = 64
+
+@lru_cache(maxsize=DEFAULT_OUTCOME_CACHE_SIZE)
+def _compiled_default_outcome(offense, defense):
+    """Outcome record for names outside OFFENSES/DEFENSES"""
+    return _compile_outcome(get_default_outcome(offense, defense), ip_spend_applies=False)
+
+def outcome_for(offense, defense, table=COMPILED_MATRIX):
+    """
+    Look up the compiled outcome of an offense vs defense interaction
+    
+    The returned record is shared and must not be modified; IP spending is
+    applied by the caller (see describe_outcome for the description suffix).
+    """
+    offense_id = OFFENSE_IDS.get(offense)
+    defense_id = DEFENSE_IDS.get(defense)
+    if offense_id is None or defense_id is None:
+        return _compiled_default_outcome(offense, defense)
+    return table[offense_id][defense_id]
+
+def describe_outcome(outcome, attacker_ip_spend=0, defender_ip_spend=0):
+    """Outcome description including any IP spending"""
+    description = outcome.description
+    if not outcome.ip_spend_applies:
+        return description
+    if attacker_ip_spend > 0:
+        description += f" (Attacker spent {attacker_ip_spend} IP)"
+    if defender_ip_spend > 0:
+        description += f" (Defender spent {defender_ip_spend} IP)"
+    return description
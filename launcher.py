@@ -0,0 +1,66 @@
+#!/usr/bin/env python3
+"""
+James Bland: ACME Edition - Multi-Worker Launcher
+Starts one server.py worker per core, each hosting its own share of the
+rooms, behind a local router on the public port
+"""
+
+import eventlet
+eventlet.monkey_patch()
+
+import argparse
+import os
+import signal
+import subprocess
+import sys
+import tempfile
+
+from sharding import Router
+
+
+def start_workers(workers, base_port, bus_dir):
+    """Start `workers` server.py processes on consecutive loopback ports"""
+    server = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'server.py')
+    processes = []
+    for index in range(workers):
+        env = dict(os.environ,
+                   JAMES_BLAND_WORKER=str(index),
+                   JAMES_BLAND_WORKERS=str(workers),
+                   JAMES_BLAND_PORT=str(base_port + index),
+                   JAMES_BLAND_BUS_DIR=bus_dir)
+        processes.append(subprocess.Popen([sys.executable, server], env=env))
+    return processes
+
+
+def main():
+    """Main entry point for the launcher"""
+    parser = argparse.ArgumentParser(description='Run several game server workers behind one port')
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1,
+                        help='Worker processes (default: CPU count)')
+    parser.add_argument('--port', type=int, default=5000, help='Public port (default: 5000)')
+    parser.add_argument('--worker-port', type=int, default=5101,
+                        help='First loopback port for workers (default: 5101)')
+    args = parser.parse_args()
+
+    bus_dir = tempfile.mkdtemp(prefix='james-bland-bus-')
+    processes = start_workers(args.workers, args.worker_port, bus_dir)
+    router = Router([('127.0.0.1', args.worker_port + index) for index in range(args.workers)])
+
+    print("James Bland: ACME Edition Server")
+    print(f"Routing 0.0.0.0:{args.port} to {args.workers} worker(s) on ports "
+          f"{args.worker_port}-{args.worker_port + args.workers - 1}")
+    print("Press Ctrl+C to stop the server")
+
+    try:
+        router.serve(eventlet.listen(('0.0.0.0', args.port)))
+    except KeyboardInterrupt:
+        print("\nServer stopped by user")
+    finally:
+        for process in processes:
+            process.send_signal(signal.SIGINT)
+        for process in processes:
+            process.wait()
+
+
+if __name__ == '__main__':
+    main()
@@ -7,6 +7,8 @@ Handles secret objectives, progress tracking, and completion detection
 import random
 from typing import Dict, List, Optional, Any
 
+from player_registry import PlayerRegistry, ACTIVE_STATUSES
+
 # Master Plan definitions
 MASTER_PLANS = [
     {
@@ -133,6 +135,12 @@ ALLIANCE_MASTER_PLANS = [
     }
 ]
 
+# Progress fields tracked as sets (stored as lists in snapshots)
+SET_PROGRESS_FIELDS = ('targets_hit', 'targets_this_round')
+
+# Turn result action types that can advance a Master Plan
+MASTER_PLAN_ACTIONS = ('assassination_success', 'exposure_success', 'sabotage_success')
+
 class MasterPlanManager:
     """Manages Master Plan assignment, progress tracking, and completion detection"""
     
@@ -141,17 +149,21 @@ class MasterPlanManager:
         self.player_progress = {}  # codename -> progress_data
         self.completed_plans = []  # list of completed plan results
         
-    def assign_master_plans(self, players: List[str], player_count: int) -> Dict[str, str]:
+    def assign_master_plans(self, players: List[str], player_count: int,
+                            rng: Optional[random.Random] = None) -> Dict[str, str]:
         """
         Assign Master Plans to all players at game start
         
         Args:
             players: List of player codenames
             player_count: Number of players in game
+            rng: The game's random stream (defaults to the global random module)
             
         Returns:
             Dictionary mapping codename to assigned plan_id
         """
+        if rng is None:
+            rng = random
         available_plans = MASTER_PLANS.copy()
         
         # Add alliance plans only for 6-player games
@@ -164,7 +176,7 @@ class MasterPlanManager:
                              if 'alliance' not in p.get('progress_required', {})]
         
         # Shuffle and assign unique plans
-        random.shuffle(available_plans)
+        rng.shuffle(available_plans)
         
         assignments = {}
         for i, codename in enumerate(players):
@@ -175,7 +187,7 @@ class MasterPlanManager:
                 self.player_progress[codename] = self._initialize_progress(plan)
             else:
                 # Fallback if more players than plans (shouldn't happen with current count)
-                fallback_plan = random.choice(MASTER_PLANS)
+                fallback_plan = rng.choice(MASTER_PLANS)
                 assignments[codename] = fallback_plan['id']
                 self.player_plans[codename] = fallback_plan['id']
                 self.player_progress[codename] = self._initialize_progress(fallback_plan)
@@ -215,6 +227,31 @@ class MasterPlanManager:
             
         return progress
     
+    def to_dict(self) -> Dict[str, Any]:
+        """JSON-safe copy of assignments and progress (for snapshots)"""
+        return {
+            'player_plans': dict(self.player_plans),
+            'player_progress': {
+                codename: {key: sorted(value) if isinstance(value, set) else value
+                           for key, value in progress.items()}
+                for codename, progress in self.player_progress.items()
+            },
+            'completed_plans': list(self.completed_plans)
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> 'MasterPlanManager':
+        """Rebuild a manager from to_dict() output"""
+        manager = cls()
+        manager.player_plans = dict(data.get('player_plans', {}))
+        manager.player_progress = {
+            codename: {key: set(value) if key in SET_PROGRESS_FIELDS else value
+                       for key, value in progress.items()}
+            for codename, progress in data.get('player_progress', {}).items()
+        }
+        manager.completed_plans = list(data.get('completed_plans', []))
+        return manager
+
     def update_progress(self, codename: str, action_type: str, action_data: Dict[str, Any], 
                        round_number: int, all_players: Dict[str, Any]) -> Optional[Dict[str, Any]]:
         """
@@ -225,7 +262,7 @@ class MasterPlanManager:
             action_type: Type of action performed
             action_data: Details about the action and its results
             round_number: Current round number
-            all_players: All player data for context
+            all_players: PlayerRegistry, or player data keyed by codename
             
         Returns:
             Completion result if plan was completed, None otherwise
@@ -292,13 +329,19 @@ class MasterPlanManager:
                 progress['targets_this_round'].add(target)
         
         # Check completion: exposed all active opponents this round
-        active_opponents = [p for p in all_players.keys() 
-                          if p != codename and all_players[p].get('status') in ['active', 'compromised', 'burned']]
+        if isinstance(all_players, PlayerRegistry):
+            opponent_count = all_players.count_with_status(*ACTIVE_STATUSES)
+            player = all_players.get_by_codename(codename)
+            if player and player.get('status') in ACTIVE_STATUSES:
+                opponent_count -= 1
+        else:
+            opponent_count = len([p for p in all_players.keys() 
+                                  if p != codename and all_players[p].get('status') in ACTIVE_STATUSES])
         
-        if progress['current_round_successes'] >= len(active_opponents) and len(active_opponents) > 0:
+        if progress['current_round_successes'] >= opponent_count and opponent_count > 0:
             progress['completed'] = True
             return self._create_completion_result(codename, 'expose_all', {
-                'targets_exposed': len(active_opponents),
+                'targets_exposed': opponent_count,
                 'round': round_number
             })
         
@@ -0,0 +1,179 @@
+#!/usr/bin/env python3
+"""
+Player Registry for James Bland: ACME Edition
+Indexes players by session ID, codename, resume token and status so lookups are O(1)
+"""
+
+from typing import Any, Dict, Iterator, List, Optional, Set
+
+from player_state import PlayerStatus, as_status
+
+# Players who can still act and be targeted
+ACTIVE_STATUSES = tuple(status.value for status in PlayerStatus if status.can_act)
+# Players who are out of play
+INACTIVE_STATUSES = tuple(status.value for status in PlayerStatus if not status.can_be_targeted)
+
+
+class PlayerRegistry:
+    """
+    Mapping of sid -> player data with codename and status indexes
+
+    Behaves like the plain `users` dict it replaces (indexing, iteration,
+    items/values/get), but keeps sid <-> codename maps, a case-folded codename
+    index for lobby uniqueness checks, a resume token index and a membership
+    set per status.
+    Status changes must go through set_status() to keep the indexes current;
+    `status_watcher` (e.g. a VictoryTracker), if set, is told about each one.
+    Players may be PlayerState records or plain dicts. Plain dicts are never
+    rewritten beyond the changes asked for (set_status() stores the plain
+    string); status_of() gives the PlayerStatus for either.
+    """
+
+    def __init__(self, players: Optional[Dict[str, Dict[str, Any]]] = None):
+        self._players = {}          # sid -> player data
+        self._sid_by_codename = {}  # codename -> sid
+        self._sid_by_folded = {}    # codename.casefold() -> sid
+        self._sid_by_token = {}     # resume token -> sid
+        self._by_status = {}        # status -> set of sids
+        self.status_watcher = None  # object with status_changed(sid, old, new)
+
+        if players:
+            for sid, player in players.items():
+                self.add(sid, player)
+
+    @classmethod
+    def wrap(cls, users) -> 'PlayerRegistry':
+        """Return `users` if it is already a registry, otherwise index it (O(N), shares the player dicts)"""
+        if isinstance(users, cls):
+            return users
+        return cls(users)
+
+    # Mapping protocol
+
+    def __getitem__(self, sid: str) -> Dict[str, Any]:
+        return self._players[sid]
+
+    def __contains__(self, sid: object) -> bool:
+        return sid in self._players
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._players)
+
+    def __len__(self) -> int:
+        return len(self._players)
+
+    def get(self, sid: str, default: Any = None) -> Any:
+        return self._players.get(sid, default)
+
+    def keys(self):
+        return self._players.keys()
+
+    def values(self):
+        return self._players.values()
+
+    def items(self):
+        return self._players.items()
+
+    # Membership
+
+    def add(self, sid: str, player: Dict[str, Any]):
+        """Register a player under a session ID"""
+        if sid in self._players:
+            self.remove(sid)
+
+        codename = player['codename']
+        status = as_status(player.get('status'))
+        self._players[sid] = player
+        self._sid_by_codename[codename] = sid
+        self._sid_by_folded[codename.casefold()] = sid
+        if player.get('resume_token'):
+            self._sid_by_token[player['resume_token']] = sid
+        self._by_status.setdefault(status, set()).add(sid)
+
+    def remove(self, sid: str) -> Optional[Dict[str, Any]]:
+        """Unregister a player, returning their data"""
+        player = self._players.pop(sid, None)
+        if player is None:
+            return None
+
+        codename = player['codename']
+        if self._sid_by_codename.get(codename) == sid:
+            del self._sid_by_codename[codename]
+        if self._sid_by_folded.get(codename.casefold()) == sid:
+            del self._sid_by_folded[codename.casefold()]
+        token = player.get('resume_token')
+        if token and self._sid_by_token.get(token) == sid:
+            del self._sid_by_token[token]
+        self._by_status.get(player.get('status'), set()).discard(sid)
+        return player
+
+    # Codename lookups
+
+    def sid_for(self, codename: str) -> Optional[str]:
+        """Get session ID by exact codename"""
+        return self._sid_by_codename.get(codename)
+
+    def get_by_codename(self, codename: str) -> Optional[Dict[str, Any]]:
+        """Get player data by exact codename"""
+        sid = self._sid_by_codename.get(codename)
+        return self._players[sid] if sid is not None else None
+
+    def has_codename(self, codename: str) -> bool:
+        """Check if a player with this exact codename is registered"""
+        return codename in self._sid_by_codename
+
+    def codename_taken(self, codename: str) -> bool:
+        """Case-insensitive codename check used for lobby uniqueness"""
+        return codename.casefold() in self._sid_by_folded
+
+    def sid_for_token(self, token: str) -> Optional[str]:
+        """Get the session ID currently holding a resume token"""
+        return self._sid_by_token.get(token)
+
+    def codename_of(self, sid: str) -> Optional[str]:
+        """Get codename by session ID"""
+        player = self._players.get(sid)
+        return player['codename'] if player is not None else None
+
+    # Status index
+
+    def set_status(self, sid: str, status: Any):
+        """Change a player's status and move them between status sets"""
+        player = self._players[sid]
+        old_status = as_status(player.get('status'))
+        status = as_status(status)
+        if old_status is status:
+            return
+
+        self._by_status.get(old_status, set()).discard(sid)
+        self._by_status.setdefault(status, set()).add(sid)
+        # PlayerState records keep the enum; plain dicts keep the wire string they started with
+        player['status'] = status.value if status is not None else None
+        if self.status_watcher is not None:
+            self.status_watcher.status_changed(sid, old_status, status)
+
+    def sids_with_status(self, *statuses: str) -> Set[str]:
+        """Session IDs of every player in any of the given statuses"""
+        if len(statuses) == 1:
+            return set(self._by_status.get(statuses[0], ()))
+
+        sids = set()
+        for status in statuses:
+            sids.update(self._by_status.get(status, ()))
+        return sids
+
+    def count_with_status(self, *statuses: str) -> int:
+        """Number of players in any of the given statuses"""
+        return sum(len(self._by_status.get(status, ())) for status in statuses)
+
+    def codenames_with_status(self, *statuses: str) -> List[str]:
+        """Codenames of every player in any of the given statuses"""
+        return [self._players[sid]['codename'] for sid in self.sids_with_status(*statuses)]
+
+    def status_of(self, sid: str) -> Optional[PlayerStatus]:
+        """A player's status as a PlayerStatus (with its can_act / can_be_targeted flags)"""
+        return as_status(self._players[sid].get('status'))
+
+    def is_out_of_play(self, sid: str) -> bool:
+        """Check if a player is captured or eliminated"""
+        return self._players[sid].get('status') in INACTIVE_STATUSES
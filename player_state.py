@@ -0,0 +1,170 @@
+#!/usr/bin/env python3
+"""
+Player State for James Bland: ACME Edition
+Compact per-player records with an enum-coded status that knows whether the
+player can still act or be targeted
+"""
+
+from collections.abc import MutableMapping
+from enum import Enum
+from typing import Any, Dict, Iterator, List, Optional
+
+from intel_store import new_intel
+
+
+class PlayerStatus(str, Enum):
+    """
+    A player's status
+
+    Members are the wire strings themselves ('active' == PlayerStatus.ACTIVE,
+    same hash, JSON-encoded as the string), so code and clients that compare
+    or index by string keep working. Each member carries precomputed
+    `can_act` (may submit actions) and `can_be_targeted` (still in play)
+    flags.
+    """
+
+    ACTIVE = 'active'
+    COMPROMISED = 'compromised'
+    BURNED = 'burned'
+    CAPTURED = 'captured'
+    ELIMINATED = 'eliminated'
+    EXPOSED = 'exposed'  # set by some interaction matrix outcomes
+
+    __str__ = str.__str__
+    __format__ = str.__format__
+
+
+for _status in PlayerStatus:
+    _status.can_act = _status in (PlayerStatus.ACTIVE, PlayerStatus.COMPROMISED, PlayerStatus.BURNED)
+    _status.can_be_targeted = _status not in (PlayerStatus.CAPTURED, PlayerStatus.ELIMINATED)
+del _status
+
+
+def as_status(status: Any) -> Optional[PlayerStatus]:
+    """The PlayerStatus for a status string (None stays None; unknown strings raise ValueError)"""
+    if status is None or status.__class__ is PlayerStatus:
+        return status
+    return PlayerStatus(status)
+
+
+# Fields every player record can hold, in wire order
+PLAYER_FIELDS = ('codename', 'status', 'ip', 'gadgets', 'intel', 'master_plan', 'alliances', 'disconnected',
+                 'resume_token')
+_SLOT_FIELDS = frozenset(PLAYER_FIELDS)
+
+
+class PlayerState(MutableMapping):
+    """
+    One player's data (the value type of GameRoom.users)
+
+    Slotted in place of the free-form dict each player used to be, and still
+    read and written like it (player['ip'] += 1, player.get('master_plan')),
+    so resolution code runs unchanged on either. A field that was never set
+    reads as missing, as it would in a dict without that key. Keys outside
+    PLAYER_FIELDS (e.g. from an older snapshot) are kept in `extra`.
+    to_dict() is the JSON view used for snapshots.
+    """
+
+    __slots__ = PLAYER_FIELDS + ('extra',)
+
+    def __init__(self, codename: str, status: Any = PlayerStatus.ACTIVE, ip: int = 0,
+                 gadgets: Optional[List[Any]] = None, intel: Optional[Dict[str, Any]] = None,
+                 master_plan: Any = None, alliances: Optional[List[Any]] = None, disconnected: bool = False,
+                 resume_token: Optional[str] = None):
+        self.codename = codename
+        self.status = as_status(status)
+        self.ip = ip
+        self.gadgets = gadgets if gadgets is not None else []
+        self.intel = intel if intel is not None else new_intel()
+        self.master_plan = master_plan
+        self.alliances = alliances if alliances is not None else []
+        self.disconnected = disconnected
+        self.resume_token = resume_token
+        self.extra = None  # other keys, created on first use
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> 'PlayerState':
+        """Build a player from dict data, setting only the keys it has (shares list and intel values)"""
+        player = cls.__new__(cls)
+        player.extra = None
+        for field, value in data.items():
+            player[field] = value
+        return player
+
+    def to_dict(self) -> Dict[str, Any]:
+        """JSON view: every field that is set, with the status as its plain string"""
+        data = {field: self[field] for field in self}
+        if 'status' in data and data['status'] is not None:
+            data['status'] = data['status'].value
+        return data
+
+    # Status flags
+
+    @property
+    def can_act(self) -> bool:
+        """Whether the player may submit actions"""
+        return self.status.can_act
+
+    @property
+    def can_be_targeted(self) -> bool:
+        """Whether the player is still in play"""
+        return self.status.can_be_targeted
+
+    # Mapping protocol
+
+    def __getitem__(self, field: str) -> Any:
+        if field in _SLOT_FIELDS:
+            try:
+                return getattr(self, field)
+            except AttributeError:
+                raise KeyError(field) from None
+        if self.extra is None:
+            raise KeyError(field)
+        return self.extra[field]
+
+    def __setitem__(self, field: str, value: Any):
+        if field == 'status':
+            self.status = as_status(value)
+        elif field in _SLOT_FIELDS:
+            setattr(self, field, value)
+        else:
+            if self.extra is None:
+                self.extra = {}
+            self.extra[field] = value
+
+    def __delitem__(self, field: str):
+        if field in _SLOT_FIELDS:
+            try:
+                delattr(self, field)
+            except AttributeError:
+                raise KeyError(field) from None
+        elif self.extra is None:
+            raise KeyError(field)
+        else:
+            del self.extra[field]
+
+    def __contains__(self, field: object) -> bool:
+        if field in _SLOT_FIELDS:
+            return hasattr(self, field)
+        return self.extra is not None and field in self.extra
+
+    def get(self, field: str, default: Any = None) -> Any:
+        if field in _SLOT_FIELDS:
+            return getattr(self, field, default)
+        if self.extra is None:
+            return default
+        return self.extra.get(field, default)
+
+    def __iter__(self) -> Iterator[str]:
+        for field in PLAYER_FIELDS:
+            if hasattr(self, field):
+                yield field
+        if self.extra:
+            yield from self.extra
+
+    def __len__(self) -> int:
+        return sum(1 for _ in self)
+
+    def __repr__(self) -> str:
+        return f'PlayerState({self.to_dict()!r})'
+
@@ -0,0 +1,266 @@
+#!/usr/bin/env python3
+"""
+Resolution Pool for James Bland: ACME Edition
+Runs round resolution off the eventlet loop in worker threads or processes,
+and measures how long the loop stalls, so one room resolving a turn does not
+freeze heartbeats and every other room on the server
+"""
+
+import os
+import pickle
+import subprocess
+import sys
+import threading
+import time
+from collections import deque
+from typing import Any, Callable, Dict, Optional
+
+MODES = ('inline', 'thread', 'process')
+
+# Smallest room the server hands to the pool. A process hand-off costs ~110-180 ms
+# round trip, while an inline resolve of a 6-seat table takes about 1 ms and one of
+# 100 players about 30 ms. scripts/benchmark_resolution_offload.py only shows the
+# process pool stalling the loop less than inline from about 200 players up, so
+# real tables (MAX_PLAYERS = 6) resolve in place.
+DEFAULT_OFFLOAD_MIN_PLAYERS = 200
+
+
+class ResolutionPool:
+    """
+    Where GameRooms run resolve_job()
+
+    inline:  on the calling green thread (blocks the loop; no hand-off cost)
+    thread:  an eventlet tpool OS thread; the hub keeps running between GIL switches
+    process: worker processes fed over pipes; no GIL contention at all
+
+    Jobs are plain data copied out of the room, so workers never share state
+    with the loop. submit() returns at once; the callback later runs on a
+    green thread of the loop with (result, error).
+    """
+
+    def __init__(self, mode: str = 'process', workers: Optional[int] = None,
+                 spawn: Optional[Callable[..., Any]] = None, min_players: int = 0):
+        if mode not in MODES:
+            raise ValueError(f"Unknown resolution mode {mode!r} (choose from {', '.join(MODES)})")
+        self.mode = mode
+        self.workers = workers
+        self.spawn = spawn
+        self.min_players = min_players  # smaller rooms resolve in place
+        self.processes = []  # WorkerProcess, idle ones only
+        self.slots = threading.BoundedSemaphore(workers or os.cpu_count() or 1)
+
+        # Metrics
+        self.jobs = 0
+        self.failures = 0
+        self.in_flight = 0
+        self.job_seconds = 0.0      # submit to callback, summed
+        self.max_job_seconds = 0.0
+
+    def should_offload(self, players: int) -> bool:
+        """Whether a room with `players` players should resolve through this pool"""
+        return self.mode != 'inline' and players >= self.min_players
+
+    def submit(self, function: Callable[[Any], Any], job: Any,
+               callback: Callable[[Any, Optional[BaseException]], Any]):
+        """Run function(job) off the loop, then callback(result, error) on it"""
+        self.jobs += 1
+        self.in_flight += 1
+        submitted = time.perf_counter()
+
+        def wait():
+            try:
+                result, error = self.execute(function, job), None
+            except Exception as e:
+                result, error = None, e
+                self.failures += 1
+            elapsed = time.perf_counter() - submitted
+            self.in_flight -= 1
+            self.job_seconds += elapsed
+            self.max_job_seconds = max(self.max_job_seconds, elapsed)
+            callback(result, error)
+
+        if self.mode == 'inline':
+            wait()
+        else:
+            (self.spawn or _eventlet_spawn)(wait)
+
+    def execute(self, function: Callable[[Any], Any], job: Any) -> Any:
+        """Run function(job) in this pool's mode, blocking only the calling green thread"""
+        if self.mode == 'inline':
+            return function(job)
+
+        if self.mode == 'thread':
+            from eventlet import tpool
+            return tpool.execute(function, job)
+
+        # One job per worker at a time; more jobs wait for a free worker
+        with self.slots:
+            worker = self.processes.pop() if self.processes else WorkerProcess()
+            try:
+                return worker.run(function, job)
+            except WorkerCrashed:
+                worker.close()
+                worker = None
+                raise
+            finally:
+                if worker is not None:
+                    self.processes.append(worker)
+
+    def close(self):
+        """Shut down worker processes"""
+        while self.processes:
+            self.processes.pop().close()
+
+    def stats(self) -> Dict[str, Any]:
+        """Hand-off metrics for /metrics/loop"""
+        return {
+            'mode': self.mode,
+            'minPlayers': self.min_players,
+            'jobs': self.jobs,
+            'failures': self.failures,
+            'inFlight': self.in_flight,
+            'meanJobSeconds': self.job_seconds / self.jobs if self.jobs else 0.0,
+            'maxJobSeconds': self.max_job_seconds
+        }
+
+
+class WorkerCrashed(RuntimeError):
+    """A resolution worker process exited mid-job"""
+
+
+class WorkerProcess:
+    """
+    One resolution worker: a fresh interpreter running worker_main()
+
+    Jobs and results are pickled, length-prefixed, over its stdin and stdout. Under monkey
+    patching those pipes are green, so waiting for a result only parks the
+    calling green thread. (multiprocessing's pools wait on locks and pipes
+    from helper threads, which deadlock against the eventlet hub.)
+    """
+
+    def __init__(self):
+        env = dict(os.environ, PYTHONPATH=os.pathsep.join(sys.path))
+        self.process = subprocess.Popen(
+            [sys.executable, '-c', 'import resolution_pool; resolution_pool.worker_main()'],
+            stdin=subprocess.PIPE, stdout=subprocess.PIPE, env=env)
+
+    def run(self, function: Callable[[Any], Any], job: Any) -> Any:
+        """Run function(job) in the worker; exceptions are re-raised here"""
+        try:
+            _write_message(self.process.stdin, (function, job))
+            ok, value = _read_message(self.process.stdout)
+        except (EOFError, OSError) as e:
+            raise WorkerCrashed(f'Resolution worker exited: {e}') from e
+        if not ok:
+            raise value
+        return value
+
+    def close(self):
+        """Ask the worker to exit and reap it"""
+        try:
+            self.process.stdin.close()
+        except OSError:
+            pass
+        self.process.wait()
+
+
+def worker_main():
+    """Worker process loop: read (function, job), write (ok, result or exception)"""
+    requests, replies = sys.stdin.buffer, sys.stdout.buffer
+    sys.stdout = sys.stderr  # stray prints from game code must not corrupt the reply pipe
+    while True:
+        try:
+            function, job = _read_message(requests)
+        except EOFError:
+            return
+        try:
+            reply = (True, function(job))
+        except Exception as e:
+            reply = (False, e)
+        _write_message(replies, reply)
+
+
+def _write_message(stream, message: Any):
+    data = pickle.dumps(message, protocol=pickle.HIGHEST_PROTOCOL)
+    stream.write(len(data).to_bytes(8, 'big') + data)
+    stream.flush()
+
+
+def _read_message(stream) -> Any:
+    size = int.from_bytes(_read_exactly(stream, 8), 'big')
+    return pickle.loads(_read_exactly(stream, size))
+
+
+def _read_exactly(stream, size: int) -> bytes:
+    # Green pipes return whatever has arrived so far, so keep reading
+    chunks = []
+    while size:
+        chunk = stream.read(size)
+        if not chunk:
+            raise EOFError('pipe closed mid-message')
+        chunks.append(chunk)
+        size -= len(chunk)
+    return b''.join(chunks)
+
+
+def _eventlet_spawn(function: Callable[[], Any]):
+    import eventlet
+    eventlet.spawn_n(function)
+
+
+class LoopMonitor:
+    """
+    Event loop stall meter
+
+    A green thread asks to sleep `interval` and records how much later than
+    that it wakes up. That lateness is time the hub could not run anything
+    else: heartbeats, other rooms' events, timers.
+    """
+
+    def __init__(self, interval: float = 0.01, history: int = 2048,
+                 clock: Callable[[], float] = time.perf_counter):
+        self.interval = interval
+        self.clock = clock
+        self.samples = deque(maxlen=history)  # recent lateness, seconds
+        self.running = False
+
+        # Metrics
+        self.wakeups = 0
+        self.stalled_seconds = 0.0
+        self.max_stall = 0.0
+
+    def record(self, lateness: float):
+        """Record one wakeup that came `lateness` seconds after it was due"""
+        lateness = max(0.0, lateness)
+        self.samples.append(lateness)
+        self.wakeups += 1
+        self.stalled_seconds += lateness
+        self.max_stall = max(self.max_stall, lateness)
+
+    def run(self, sleep: Callable[[float], Any]):
+        """Sampling loop for a background task (e.g. socketio.sleep)"""
+        self.running = True
+        while self.running:
+            start = self.clock()
+            sleep(self.interval)
+            self.record(self.clock() - start - self.interval)
+
+    def stop(self):
+        """Stop the run() loop after its current sample"""
+        self.running = False
+
+    def stats(self) -> Dict[str, Any]:
+        """Stall metrics for /metrics/loop"""
+        recent = sorted(self.samples)
+
+        def percentile(p):
+            return recent[min(len(recent) - 1, int(p * len(recent)))] if recent else 0.0
+
+        return {
+            'interval': self.interval,
+            'wakeups': self.wakeups,
+            'stalledSeconds': self.stalled_seconds,
+            'maxStall': self.max_stall,
+            'p50Stall': percentile(0.50),
+            'p99Stall': percentile(0.99)
+        }
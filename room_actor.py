@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+"""
+Room Actor for James Bland: ACME Edition
+Gives each GameRoom a mailbox drained by a single green thread, so socket
+handlers, deadline timers and resolution results only enqueue messages and
+a room's state is only ever touched by one green thread at a time
+"""
+
+import time
+from collections import deque
+from typing import Any, Callable, Dict, Optional
+
+
+class RoomActor:
+    """
+    Serializes every input to one GameRoom
+
+    tell() appends (method name, args) to the mailbox. A single drain loop
+    calls the room's methods in arrival order, and at most one runs per room.
+    When the mailbox goes from empty to non-empty the drain loop is started by
+    `spawn` (e.g. socketio.start_background_task), or with no `spawn` the
+    caller's own green thread becomes the room's actor until the mailbox is
+    empty; messages told meanwhile, even while it yields, just queue behind.
+    Draining in place saves a hop through the hub's run queue per burst.
+    """
+
+    def __init__(self, room, spawn: Optional[Callable[..., Any]] = None,
+                 sleep: Optional[Callable[[float], Any]] = None, slice_seconds: float = 0.005,
+                 clock: Callable[[], float] = time.perf_counter, history: int = 1024):
+        self.room = room
+        self.spawn = spawn
+        # After `slice_seconds` of handling, sleep(0) yields so one busy room cannot hog the hub
+        self.sleep = sleep
+        self.slice_seconds = slice_seconds
+        self.clock = clock
+        self.mailbox = deque()  # (method, args, reply, queued_at)
+        self.draining = False
+
+        # Metrics
+        self.received = 0
+        self.processed = 0
+        self.failures = 0
+        self.max_depth = 0
+        self.latency = deque(maxlen=history)  # recent enqueue-to-handled seconds
+
+    def tell(self, method: str, *args, reply: Optional[Callable[[Any], Any]] = None):
+        """Queue room.<method>(*args); reply(return value) runs after it, on the actor"""
+        self.mailbox.append((method, args, reply, self.clock()))
+        self.received += 1
+        self.max_depth = max(self.max_depth, len(self.mailbox))
+        if self.draining:
+            return
+
+        self.draining = True
+        if self.spawn is None:
+            self.drain()
+        else:
+            self.spawn(self.drain)
+
+    def drain(self):
+        """Handle queued messages in order until the mailbox is empty"""
+        slice_start = self.clock()
+        try:
+            while self.mailbox:
+                method, args, reply, queued_at = self.mailbox.popleft()
+                try:
+                    result = getattr(self.room, method)(*args)
+                    if reply is not None:
+                        reply(result)
+                except Exception as e:
+                    self.failures += 1
+                    print(f"[{self.room.room_id}] Error handling {method}: {e}")
+                self.processed += 1
+                now = self.clock()
+                self.latency.append(now - queued_at)
+                if self.sleep is not None and self.mailbox and now - slice_start >= self.slice_seconds:
+                    self.sleep(0)
+                    slice_start = self.clock()
+        finally:
+            self.draining = False
+
+    def stats(self) -> Dict[str, Any]:
+        """Mailbox counters and recent enqueue-to-handled latency"""
+        recent = sorted(self.latency)
+
+        def percentile(p):
+            return recent[min(len(recent) - 1, int(p * len(recent)))] if recent else 0.0
+
+        return {
+            'received': self.received,
+            'processed': self.processed,
+            'failures': self.failures,
+            'depth': len(self.mailbox),
+            'maxDepth': self.max_depth,
+            'p50Latency': percentile(0.50),
+            'p99Latency': percentile(0.99),
+            'maxLatency': recent[-1] if recent else 0.0
+        }
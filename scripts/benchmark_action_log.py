@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+"""
+Action Log Benchmark for James Bland: ACME Edition
+Measures the latency the write-ahead log adds to submitAction and how long
+crash recovery takes as games get longer
+"""
+
+import argparse
+import contextlib
+import io
+import os
+import random
+import sys
+import tempfile
+import time
+
+# Add parent directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from action_log import JournalStore
+from game_room import RoomManager
+from benchmark_rooms import random_action
+
+def percentile(values, fraction):
+    """Nearest-rank percentile of a list of numbers"""
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * fraction))] if ordered else 0.0
+
+def play(manager, room_id, players, rounds, rng, latencies):
+    """Play up to `rounds` rounds, timing each submitAction"""
+    room = manager.get_or_create(room_id)
+    for i in range(players):
+        room.join(f'{room_id}-sid{i}', f'Agent_{i}')
+    room.start_game(f'{room_id}-sid0')
+
+    for _ in range(rounds):
+        round_number = room.game_state['round_number']
+        for sid, user in list(room.users.items()):
+            if room.game_state['phase'] != 'planning':
+                break
+            if user['status'] in ['active', 'compromised', 'burned']:
+                action = random_action(room, sid, rng)
+                start = time.perf_counter()
+                room.submit_action(sid, action)
+                latencies.append(time.perf_counter() - start)
+        if room.game_state['phase'] != 'planning':
+            break
+        if room.game_state['round_number'] == round_number:
+            room.on_planning_deadline(round_number)
+
+    # Leave the final round half-submitted so recovery has inputs to replay
+    for sid in list(room.users)[:players // 2]:
+        if room.game_state['phase'] == 'planning' and sid not in room.game_state['submitted_actions']:
+            room.submit_action(sid, random_action(room, sid, rng))
+
+def run_benchmark(players, rounds, games, seed):
+    """Time submitAction with and without the log, then time recovery"""
+    rng = random.Random(seed)
+    random.seed(seed)
+    results = {}
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        memory_latencies = []
+        memory = RoomManager()
+        for game in range(games):
+            play(memory, f'room{game}', players, rounds, rng, memory_latencies)
+
+        with tempfile.TemporaryDirectory() as directory:
+            store = JournalStore(directory)
+            logged_latencies = []
+            logged = RoomManager(journal=store)
+            for game in range(games):
+                play(logged, f'room{game}', players, rounds, rng, logged_latencies)
+            store.sync_all()
+            store.close()
+
+            start = time.perf_counter()
+            recovered = RoomManager(journal=JournalStore(directory)).recover()
+            recovery_seconds = time.perf_counter() - start
+
+    results['memory_p50'] = percentile(memory_latencies, 0.5)
+    results['memory_p99'] = percentile(memory_latencies, 0.99)
+    results['logged_p50'] = percentile(logged_latencies, 0.5)
+    results['logged_p99'] = percentile(logged_latencies, 0.99)
+    results['recovered'] = len(recovered)
+    results['recovery_seconds'] = recovery_seconds
+    return results
+
+def main():
+    """Main entry point for the action log benchmark"""
+    parser = argparse.ArgumentParser(description='Benchmark write-ahead logging and recovery')
+    parser.add_argument('--players', type=int, default=6, help='Players per game (default: 6)')
+    parser.add_argument('--games', type=int, default=20, help='Concurrent games (default: 20)')
+    parser.add_argument('--rounds', type=int, nargs='+', default=[5, 20, 80],
+                        help='Game lengths in rounds to compare (default: 5 20 80)')
+    parser.add_argument('--seed', type=int, default=1, help='Random seed (default: 1)')
+    args = parser.parse_args()
+
+    print("=" * 60)
+    print("ACTION LOG BENCHMARK")
+    print("=" * 60)
+    print(f"{args.games} games x {args.players} players")
+    print(f"{'rounds':>6} {'submit p50/p99 (mem)':>22} {'submit p50/p99 (log)':>22} {'recovery':>10}")
+    for rounds in args.rounds:
+        r = run_benchmark(args.players, rounds, args.games, args.seed)
+        print(f"{rounds:>6} {r['memory_p50'] * 1e6:>9.1f}/{r['memory_p99'] * 1e6:<8.1f}us "
+              f"{r['logged_p50'] * 1e6:>9.1f}/{r['logged_p99'] * 1e6:<8.1f}us "
+              f"{r['recovery_seconds'] * 1000:>7.1f}ms ({r['recovered']} games)")
+    print("Submit latency excludes fsync, which is batched by JournalStore.run().")
+    print("=" * 60)
+
+if __name__ == "__main__":
+    main()
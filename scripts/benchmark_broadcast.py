@@ -0,0 +1,121 @@
+#!/usr/bin/env python3
+"""
+Broadcast Fan-out Benchmark for James Bland: ACME Edition
+Compares one emit per recipient against the encode-once Broadcaster for a
+room broadcast and for personalized views, in rooms of growing size
+"""
+
+import argparse
+import os
+import sys
+import time
+
+import socketio
+
+# Add parent directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from broadcast import Broadcaster, group_by_view
+
+class EncodeCounter:
+    """Engine.IO send stand-in that counts distinct packets (encodes) and writes"""
+
+    def __init__(self):
+        self.packets = {}  # id -> packet, holding each so ids are not reused
+        self.writes = 0
+
+    def __call__(self, eio_sid, packet):
+        self.packets[id(packet)] = packet
+        self.writes += 1
+
+def turn_result(players):
+    """A turnResult-sized payload for `players` players"""
+    return {
+        'round': 7,
+        'results': [{'codename': f'Agent_{i}', 'action_type': 'offense_success',
+                     'description': f'Agent_{i} exposed Agent_{(i + 1) % players}', 'ip_change': 2}
+                    for i in range(min(players, 60))],
+        'version': 12, 'baseVersion': 11, 'full': False,
+        'delta': {'players': {f'Agent_{i}': {'ip': 10 + i} for i in range(min(players, 60))}}
+    }
+
+def make_server(sockets):
+    """A Socket.IO server with `sockets` fake connections in room 'table'"""
+    server = socketio.Server(async_mode='threading')
+    sids = []
+    for i in range(sockets):
+        eio_sid = f'eio{i}'
+        sid = server.manager.connect(eio_sid, '/')
+        server.manager.enter_room(sid, '/', 'table', eio_sid)
+        sids.append(sid)
+    return server, sids
+
+def per_recipient(server, sids, event, payload_for):
+    """Baseline: one emit, and so one encode, per socket"""
+    for sid in sids:
+        server.emit(event, payload_for(sid), to=sid)
+
+def measure(sockets, views, iterations):
+    """Time both paths for a room broadcast and for `views` distinct personalized views"""
+    server, sids = make_server(sockets)
+    counter = EncodeCounter()
+    # Socket.IO's per-socket send path goes through engineio's send_packet too
+    server.eio.send_packet = counter
+    broadcaster = Broadcaster(server, send=counter)
+    payload = turn_result(sockets)
+    view_payloads = {key: dict(payload, view=key) for key in range(views)}
+    view_of = {sid: index % views for index, sid in enumerate(sids)}
+
+    timings = {}
+    start = time.perf_counter()
+    for _ in range(iterations):
+        per_recipient(server, sids, 'turnResult', lambda sid: payload)
+    timings['broadcast_naive'] = (time.perf_counter() - start) / iterations
+    naive_encodes = len(counter.packets) // iterations
+
+    counter.packets.clear()
+    start = time.perf_counter()
+    for _ in range(iterations):
+        broadcaster('turnResult', payload, to='table')
+    timings['broadcast_once'] = (time.perf_counter() - start) / iterations
+
+    start = time.perf_counter()
+    for _ in range(iterations):
+        per_recipient(server, sids, 'turnResult', lambda sid: view_payloads[view_of[sid]])
+    timings['views_naive'] = (time.perf_counter() - start) / iterations
+
+    start = time.perf_counter()
+    for _ in range(iterations):
+        groups = group_by_view(sids, view_of.__getitem__)
+        broadcaster.send_views('turnResult', [(view_payloads[key], members) for key, members in groups.items()])
+    timings['views_once'] = (time.perf_counter() - start) / iterations
+
+    stats = broadcaster.stats()
+    return timings, naive_encodes, stats
+
+def main():
+    """Main entry point for the broadcast benchmark"""
+    parser = argparse.ArgumentParser(description='Benchmark encode-once broadcasting')
+    parser.add_argument('--sizes', type=int, nargs='+', default=[6, 60, 600],
+                        help='Sockets per room, players plus spectators (default: 6 60 600)')
+    parser.add_argument('--views', type=int, default=3,
+                        help='Distinct personalized views per room (default: 3)')
+    parser.add_argument('--iterations', type=int, default=200, help='Broadcasts per size (default: 200)')
+    args = parser.parse_args()
+
+    print("=" * 60)
+    print("BROADCAST FAN-OUT BENCHMARK")
+    print("=" * 60)
+    for sockets in args.sizes:
+        timings, naive_encodes, stats = measure(sockets, min(args.views, sockets), args.iterations)
+        print(f"{sockets} sockets ({min(args.views, sockets)} views):")
+        print(f"  Room broadcast:  per-recipient {timings['broadcast_naive'] * 1e6:9.1f} us "
+              f"({naive_encodes} encodes), encode-once {timings['broadcast_once'] * 1e6:9.1f} us (1 encode)")
+        print(f"  Personal views:  per-recipient {timings['views_naive'] * 1e6:9.1f} us "
+              f"({sockets} encodes), grouped {timings['views_once'] * 1e6:9.1f} us "
+              f"({min(args.views, sockets)} encodes)")
+        print(f"  Recipients per encode: {stats['recipientsPerEncode']:.1f}")
+    print("=" * 60)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,83 @@
+#!/usr/bin/env python3
+"""
+Interaction Matrix Benchmark for James Bland: ACME Edition
+Compares the per-interaction cost of the dict-based get_interaction_outcome
+with the compiled, integer-indexed outcome table used by the resolver
+"""
+
+import argparse
+import os
+import random
+import sys
+import time
+
+# Add parent directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from interaction_matrix import (
+    OFFENSES, DEFENSES, get_interaction_outcome, outcome_for, describe_outcome
+)
+
+def make_interactions(count, seed):
+    """Random (offense, defense, ip_spend) triples covering every pairing"""
+    rng = random.Random(seed)
+    return [(rng.choice(OFFENSES), rng.choice(DEFENSES), rng.choice([0, 0, 0, 1, 2, 3]))
+            for _ in range(count)]
+
+def run_dict_lookup(interactions):
+    """Original path: copy the outcome dict and concatenate descriptions"""
+    total = 0
+    for offense, defense, spend in interactions:
+        outcome = get_interaction_outcome(offense, defense, spend, 0)
+        total += outcome['ip_change_attacker'] + outcome['ip_change_defender']
+        if outcome['offense_succeeds']:
+            total += 1
+        description = outcome['description']
+    return total
+
+def run_compiled_lookup(interactions):
+    """Compiled path: shared immutable records, IP spend applied arithmetically"""
+    total = 0
+    for offense, defense, spend in interactions:
+        outcome = outcome_for(offense, defense)
+        total += outcome.attacker_ip_change(spend) + outcome.ip_change_defender
+        if outcome.offense_succeeds:
+            total += 1
+        description = describe_outcome(outcome, spend)
+    return total
+
+def time_best(function, interactions, repeats):
+    """Best wall-clock time of several runs"""
+    best = float('inf')
+    for _ in range(repeats):
+        start = time.perf_counter()
+        function(interactions)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+def main():
+    """Main entry point for the interaction matrix benchmark"""
+    parser = argparse.ArgumentParser(description='Benchmark interaction outcome lookups')
+    parser.add_argument('--interactions', type=int, default=200000,
+                        help='Interactions per run (default: 200000)')
+    parser.add_argument('--repeats', type=int, default=5, help='Runs per variant (default: 5)')
+    parser.add_argument('--seed', type=int, default=1, help='Random seed (default: 1)')
+    args = parser.parse_args()
+
+    interactions = make_interactions(args.interactions, args.seed)
+    assert run_dict_lookup(interactions) == run_compiled_lookup(interactions)
+
+    dict_time = time_best(run_dict_lookup, interactions, args.repeats)
+    compiled_time = time_best(run_compiled_lookup, interactions, args.repeats)
+
+    print("=" * 60)
+    print("INTERACTION MATRIX BENCHMARK")
+    print("=" * 60)
+    print(f"Interactions per run: {args.interactions} (best of {args.repeats})")
+    print(f"Dict lookup + copy:   {dict_time / args.interactions * 1e9:8.1f} ns/interaction")
+    print(f"Compiled table:       {compiled_time / args.interactions * 1e9:8.1f} ns/interaction")
+    print(f"Speedup:              {dict_time / compiled_time:8.2f}x")
+    print("=" * 60)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+"""
+Reconnect Storm Benchmark for James Bland: ACME Edition
+Every player at a table drops and resumes at once; compares rebuilding the
+gameStateSnapshot per request against the per-version snapshot cache, for
+tables of growing size
+"""
+
+import argparse
+import contextlib
+import io
+import os
+import random
+import sys
+import time
+
+# Add parent directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import game_room
+from benchmark_rooms import EventCounter, make_room, play_round
+
+def prepare(players, rounds, seed):
+    """A table that has played `rounds` rounds, with each player's last state version"""
+    rng = random.Random(seed)
+    random.seed(seed)
+    with contextlib.redirect_stdout(io.StringIO()):
+        room = make_room('storm', players, EventCounter())
+        known_version = room.sync.version
+        for _ in range(rounds):
+            if room.game_state['phase'] != 'planning':
+                break
+            play_round(room, rng)
+    tokens = {sid: user['resume_token'] for sid, user in room.users.items()}
+    return room, tokens, known_version
+
+def storm(room, tokens, known_version, generation, cached):
+    """Drop and resume every player; returns seconds spent on the resumes"""
+    for sid in list(room.users):
+        room.leave(sid)
+
+    start = time.perf_counter()
+    for token in tokens.values():
+        if not cached:
+            # Before the cache: every request rebuilt the state view and diffed it whole
+            room.state_dirty = True
+            room.sync.public_cache.clear()
+        room.resume_session(f'storm-{generation}-{token}', token, known_version)
+    return time.perf_counter() - start
+
+def measure(players, rounds, storms, seed):
+    """Mean storm time without and with the cache, plus the cache's hit rate"""
+    timings = {}
+    for cached in (False, True):
+        room, tokens, known_version = prepare(players, rounds, seed)
+        elapsed = [storm(room, tokens, known_version, generation, cached) for generation in range(storms)]
+        timings[cached] = sum(elapsed) / storms
+    return timings, room.sync.stats()
+
+def main():
+    """Main entry point for the reconnect storm benchmark"""
+    parser = argparse.ArgumentParser(description='Benchmark gameStateSnapshot caching under reconnect storms')
+    parser.add_argument('--sizes', type=int, nargs='+', default=[6, 60, 600],
+                        help='Players per table (default: 6 60 600)')
+    parser.add_argument('--rounds', type=int, default=3, help='Rounds played before the storm (default: 3)')
+    parser.add_argument('--storms', type=int, default=5, help='Storms per size (default: 5)')
+    parser.add_argument('--seed', type=int, default=1, help='Random seed (default: 1)')
+    args = parser.parse_args()
+
+    game_room.MAX_PLAYERS = max(game_room.MAX_PLAYERS, *args.sizes)
+
+    print("=" * 60)
+    print("RECONNECT STORM BENCHMARK")
+    print("=" * 60)
+    for players in args.sizes:
+        timings, stats = measure(players, args.rounds, args.storms, args.seed)
+        speedup = timings[False] / timings[True] if timings[True] else float('inf')
+        print(f"{players} players:")
+        print(f"  Rebuild per request: {timings[False] * 1e3:9.2f} ms per storm "
+              f"({timings[False] / players * 1e6:7.1f} us per resume)")
+        print(f"  Cached snapshot:     {timings[True] * 1e3:9.2f} ms per storm "
+              f"({timings[True] / players * 1e6:7.1f} us per resume)")
+        print(f"  Speedup: {speedup:.1f}x, cache hit rate {stats['cacheHitRate']:.1%}")
+    print("=" * 60)
+
+if __name__ == "__main__":
+    main()
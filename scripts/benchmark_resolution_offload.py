@@ -0,0 +1,138 @@
+#!/usr/bin/env python3
+"""
+Resolution Offload Benchmark for James Bland: ACME Edition
+Plays large rooms concurrently on an eventlet hub and measures how long round
+resolution stalls the loop when it runs inline, in a tpool thread or in a
+process pool
+"""
+
+import eventlet
+eventlet.monkey_patch()
+
+import argparse
+import contextlib
+import io
+import os
+import random
+import sys
+import time
+
+# Add parent directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import game_room
+from benchmark_rooms import EventCounter, random_action
+from game_room import GameRoom
+from resolution_pool import ResolutionPool, LoopMonitor, MODES
+
+def make_room(room_id, players, emitter, resolver):
+    """Create a room with `players` seats, seat everyone and start the game"""
+    room = GameRoom(room_id, emit=emitter, resolver=resolver)
+    for i in range(players):
+        room.join(f'{room_id}-sid{i}', f'Agent_{i}')
+    room.start_game(f'{room_id}-sid0')
+    return room
+
+def play_round(room, rng):
+    """Submit every active player's action as a separate event, the last one resolving the round"""
+    round_number = room.game_state['round_number']
+    for sid, user in list(room.users.items()):
+        if room.game_state['phase'] != 'planning':
+            break
+        if user['status'] in ['active', 'compromised', 'burned']:
+            room.submit_action(sid, random_action(room, sid, rng))
+            # Each submission is its own socket event; the hub runs others in between
+            eventlet.sleep(0)
+
+    # Nobody left who can submit (e.g. everyone exposed): resolve as the deadline would
+    if room.game_state['phase'] == 'planning' and room.game_state['round_number'] == round_number:
+        room.start_resolution_phase()
+
+def play_room(room_id, players, rounds, emitter, resolver, rng):
+    """One table's clients: submit a round, wait for it to resolve, repeat"""
+    room = make_room(room_id, players, emitter, resolver)
+    for _ in range(rounds):
+        if room.game_state['phase'] != 'planning':
+            room = make_room(room_id, players, emitter, resolver)
+        play_round(room, rng)
+        while room.resolving:
+            eventlet.sleep(0.001)
+        # Give other rooms and the monitor a turn, as real clients would between rounds
+        eventlet.sleep(0)
+
+def run_benchmark(mode, rooms, players, rounds, workers, seed):
+    """Play `rounds` rounds in each room concurrently and report loop stalls"""
+    rng = random.Random(seed)
+    random.seed(seed)
+    emitter = EventCounter()
+    resolver = ResolutionPool(mode=mode, workers=workers)
+    monitor = LoopMonitor(interval=0.005)
+
+    if mode == 'process':
+        # Start the workers before measuring: spawning interpreters is a one-off cost
+        warmup = eventlet.GreenPool()
+        for _ in range(workers or os.cpu_count() or 1):
+            warmup.spawn(resolver.execute, abs, -1)
+        warmup.waitall()
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        watcher = eventlet.spawn(monitor.run, eventlet.sleep)
+        eventlet.sleep(0.05)
+
+        start = time.perf_counter()
+        pool = eventlet.GreenPool()
+        for i in range(rooms):
+            pool.spawn(play_room, f'room{i}', players, rounds, emitter, resolver, rng)
+        pool.waitall()
+        elapsed = time.perf_counter() - start
+
+        monitor.stop()
+        watcher.wait()
+    resolver.close()
+
+    rounds_resolved = sum(emitter.by_event.get(event, 0)
+                          for event in ('turnResult', 'gameOver', 'finalShowdownStarted'))
+    return {
+        'mode': mode,
+        'rounds_resolved': rounds_resolved,
+        'elapsed_seconds': elapsed,
+        'rounds_per_second': rounds_resolved / elapsed if elapsed else float('inf'),
+        'loop': monitor.stats(),
+        'resolution': resolver.stats()
+    }
+
+def main():
+    """Main entry point for the resolution offload benchmark"""
+    parser = argparse.ArgumentParser(description='Benchmark event loop stalls with and without offloaded resolution')
+    parser.add_argument('--rooms', type=int, default=8, help='Concurrent rooms (default: 8)')
+    parser.add_argument('--players', type=int, default=300, help='Players per room (default: 300)')
+    parser.add_argument('--rounds', type=int, default=10, help='Rounds per room (default: 10)')
+    parser.add_argument('--workers', type=int, default=None, help='Process pool size (default: CPU count)')
+    parser.add_argument('--modes', nargs='+', default=list(MODES), choices=MODES,
+                        help='Resolution modes to compare (default: all)')
+    parser.add_argument('--seed', type=int, default=1, help='Random seed (default: 1)')
+    args = parser.parse_args()
+
+    # Real tables seat at most six; lift the cap to make resolution expensive enough to see
+    game_room.MAX_PLAYERS = max(game_room.MAX_PLAYERS, args.players)
+
+    print("=" * 60)
+    print("RESOLUTION OFFLOAD BENCHMARK")
+    print("=" * 60)
+    print(f"Rooms: {args.rooms} x {args.players} players, {args.rounds} rounds each")
+    for mode in args.modes:
+        result = run_benchmark(mode, args.rooms, args.players, args.rounds, args.workers, args.seed)
+        loop = result['loop']
+        print("-" * 60)
+        print(f"Mode: {mode}")
+        print(f"  Rounds resolved: {result['rounds_resolved']} in {result['elapsed_seconds']:.2f}s "
+              f"({result['rounds_per_second']:.1f} rounds/s)")
+        print(f"  Loop stall: max {loop['maxStall'] * 1000:.1f} ms, p99 {loop['p99Stall'] * 1000:.1f} ms, "
+              f"p50 {loop['p50Stall'] * 1000:.2f} ms")
+        print(f"  Stalled: {loop['stalledSeconds']:.2f}s of {result['elapsed_seconds']:.2f}s "
+              f"({loop['wakeups']} wakeups)")
+        print(f"  Mean hand-off to result: {result['resolution']['meanJobSeconds'] * 1000:.1f} ms")
+    print("=" * 60)
+
+if __name__ == "__main__":
+    main()
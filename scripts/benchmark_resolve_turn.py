@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+"""
+Turn Resolution Benchmark for James Bland: ACME Edition
+Times resolve_turn at tables of growing size, with attacks spread across
+the table and piled onto a few Information Warfare broadcasters, and reports
+the cost per player so linear scaling shows as a flat column
+"""
+
+import argparse
+import copy
+import os
+import random
+import sys
+import time
+
+# Add parent directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from action_resolver import resolve_turn, STRATEGIC_ASSETS
+from player_registry import PlayerRegistry
+from player_state import PlayerState
+
+OFFENSES = ['assassination', 'surveillance', 'network_attack', 'sabotage', '']
+DEFENSES = ['safe_house', 'bodyguard_detail', 'underground', 'sweep_clear', 'counter_surveillance',
+            'information_warfare']
+
+def make_turn(players, seed, piled):
+    """
+    A table of active players and one action each
+
+    piled: everyone attacks one of three players, who all broadcast banners
+    (every attacker lands on a broadcaster); otherwise targets are random.
+    """
+    rng = random.Random(seed)
+    users = PlayerRegistry()
+    for i in range(players):
+        users.add(f'sid{i}', PlayerState(f'Agent_{i}', status='active', ip=10))
+    codenames = [user['codename'] for user in users.values()]
+    targets = codenames[:3]
+    submitted = {}
+    for sid, user in users.items():
+        codename = user['codename']
+        offense = rng.choice(OFFENSES[:-1]) if piled else rng.choice(OFFENSES)
+        pool = [c for c in (targets if piled else codenames) if c != codename] or targets
+        submitted[sid] = {
+            'offense': offense,
+            'defense': 'information_warfare' if piled and codename in targets else rng.choice(DEFENSES),
+            'target': rng.choice(pool) if offense else None,
+            'ip_spend': rng.randint(0, 2),
+            'banner_message': 'ACME RULES!'
+        }
+    return users, submitted
+
+def measure(players, seed, turns, piled):
+    """Mean seconds per resolve_turn call, each on a fresh copy of the table"""
+    users, submitted = make_turn(players, seed, piled)
+    tables = [copy.deepcopy(users) for _ in range(turns)]
+
+    start = time.perf_counter()
+    for table in tables:
+        resolve_turn(table, submitted, 1, dict.fromkeys(STRATEGIC_ASSETS), rng=random.Random(seed))
+    return (time.perf_counter() - start) / turns
+
+def main():
+    """Main entry point for the turn resolution benchmark"""
+    parser = argparse.ArgumentParser(description='Benchmark resolve_turn scaling')
+    parser.add_argument('--sizes', type=int, nargs='+', default=[6, 60, 600],
+                        help='Players per table (default: 6 60 600)')
+    parser.add_argument('--turns', type=int, default=50, help='Turns timed per size (default: 50)')
+    parser.add_argument('--seed', type=int, default=1, help='Random seed (default: 1)')
+    args = parser.parse_args()
+
+    print("=" * 60)
+    print("TURN RESOLUTION BENCHMARK")
+    print("=" * 60)
+    for piled in (False, True):
+        print("Piled onto 3 broadcasters:" if piled else "Spread targets:")
+        for players in args.sizes:
+            seconds = measure(players, args.seed, args.turns, piled)
+            print(f"  {players:5d} players: {seconds * 1e3:9.3f} ms per turn "
+                  f"({seconds * 1e6 / players:6.2f} us per player)")
+    print("=" * 60)
+
+if __name__ == "__main__":
+    main()
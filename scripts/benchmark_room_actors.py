@@ -0,0 +1,143 @@
+#!/usr/bin/env python3
+"""
+Room Actor Benchmark for James Bland: ACME Edition
+Delivers socket events to many rooms on an eventlet hub, either calling room
+methods straight from the handler (direct) or posting them to each room's
+mailbox (actor), and compares event throughput and tail latency
+"""
+
+import eventlet
+eventlet.monkey_patch()
+
+import argparse
+import contextlib
+import io
+import os
+import random
+import sys
+import time
+
+# Add parent directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmark_rooms import EventCounter, random_action
+from game_room import RoomManager
+from room_actor import RoomActor
+
+MODES = ('direct', 'actor')
+READ_EVENTS = ['send_game_state', 'send_alliances', 'send_master_plan', 'send_game_options']
+
+class LatencyLog:
+    """Arrival-to-handled time of every delivered event"""
+
+    def __init__(self):
+        self.delivered = 0
+        self.samples = []
+
+    def handled(self, arrived):
+        self.samples.append(time.perf_counter() - arrived)
+
+    def percentile(self, p):
+        ordered = sorted(self.samples)
+        return ordered[min(len(ordered) - 1, int(p * len(ordered)))] if ordered else 0.0
+
+def deliver(room, mode, latencies, method, *args):
+    """Hand one socket event to a fresh green thread, as python-socketio does per message"""
+    arrived = time.perf_counter()
+    latencies.delivered += 1
+
+    def handler():
+        if mode == 'direct':
+            getattr(room, method)(*args)
+            latencies.handled(arrived)
+        else:
+            room.post(method, *args, reply=lambda _: latencies.handled(arrived))
+
+    eventlet.spawn_n(handler)
+
+def play_room(manager, room_id, players, rounds, mode, latencies, rng, reads):
+    """One table's clients: each player reads some state and submits, every round"""
+    room = manager.get_or_create(room_id)
+    for i in range(players):
+        deliver(room, mode, latencies, 'join', f'{room_id}-sid{i}', f'Agent_{i}')
+    deliver(room, mode, latencies, 'start_game', f'{room_id}-sid0')
+    while room.game_state['phase'] != 'planning':
+        eventlet.sleep(0.001)
+
+    for _ in range(rounds):
+        if room.game_state['phase'] != 'planning':
+            break
+        round_number = room.game_state['round_number']
+        for sid, user in list(room.users.items()):
+            for _ in range(reads):
+                deliver(room, mode, latencies, rng.choice(READ_EVENTS), sid)
+            if user['status'] in ['active', 'compromised', 'burned']:
+                deliver(room, mode, latencies, 'submit_action', sid, random_action(room, sid, rng))
+            eventlet.sleep(0)
+
+        # Everyone exposed: nobody can submit, so resolve as the deadline would
+        if not room.active_player_count():
+            deliver(room, mode, latencies, 'on_planning_deadline', round_number)
+        while room.game_state['round_number'] == round_number and room.game_state['phase'] == 'planning':
+            eventlet.sleep(0.001)
+
+def run_benchmark(mode, rooms, players, rounds, reads, seed):
+    """Play every room concurrently and report event throughput and latency"""
+    rng = random.Random(seed)
+    random.seed(seed)
+    emitter = EventCounter()
+    latencies = LatencyLog()
+    mailbox = (lambda room: RoomActor(room, sleep=eventlet.sleep)) if mode == 'actor' else None
+    manager = RoomManager(emit=emitter, mailbox=mailbox)
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        start = time.perf_counter()
+        pool = eventlet.GreenPool(rooms)
+        for i in range(rooms):
+            pool.spawn(play_room, manager, f'room{i}', players, rounds, mode, latencies, rng, reads)
+        pool.waitall()
+        # Let the last queued events finish
+        while len(latencies.samples) < latencies.delivered:
+            eventlet.sleep(0.001)
+        elapsed = time.perf_counter() - start
+
+    events = len(latencies.samples)
+    return {
+        'mode': mode,
+        'events': events,
+        'elapsed_seconds': elapsed,
+        'events_per_second': events / elapsed if elapsed else float('inf'),
+        'p50_ms': latencies.percentile(0.50) * 1000,
+        'p99_ms': latencies.percentile(0.99) * 1000,
+        'max_ms': max(latencies.samples, default=0.0) * 1000
+    }
+
+def main():
+    """Main entry point for the room actor benchmark"""
+    parser = argparse.ArgumentParser(description='Benchmark direct room calls against per-room mailboxes')
+    parser.add_argument('--rooms', type=int, default=200, help='Concurrent rooms (default: 200)')
+    parser.add_argument('--players', type=int, default=6, help='Players per room (default: 6)')
+    parser.add_argument('--rounds', type=int, default=10, help='Rounds per room (default: 10)')
+    parser.add_argument('--reads', type=int, default=2, help='State requests per player per round (default: 2)')
+    parser.add_argument('--modes', nargs='+', default=list(MODES), choices=MODES,
+                        help='Delivery models to compare (default: both)')
+    parser.add_argument('--seed', type=int, default=1, help='Random seed (default: 1)')
+    args = parser.parse_args()
+
+    print("=" * 60)
+    print("ROOM ACTOR BENCHMARK")
+    print("=" * 60)
+    print(f"Rooms: {args.rooms} x {args.players} players, {args.rounds} rounds, "
+          f"{args.reads} reads per player per round")
+    for mode in args.modes:
+        result = run_benchmark(mode, args.rooms, args.players, args.rounds, args.reads, args.seed)
+        print("-" * 60)
+        print(f"Mode: {mode}")
+        print(f"  Events: {result['events']} in {result['elapsed_seconds']:.2f}s "
+              f"({result['events_per_second']:.0f} events/s)")
+        print(f"  Latency: p50 {result['p50_ms']:.2f} ms, p99 {result['p99_ms']:.2f} ms, "
+              f"max {result['max_ms']:.2f} ms")
+    print("=" * 60)
+
+if __name__ == "__main__":
+    main()
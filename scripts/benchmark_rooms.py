@@ -0,0 +1,136 @@
+#!/usr/bin/env python3
+"""
+Room Throughput Benchmark for James Bland: ACME Edition
+Plays many concurrent GameRooms headlessly (no sockets) to estimate how many
+tables one server process can host
+"""
+
+import argparse
+import contextlib
+import io
+import os
+import random
+import sys
+import time
+import tracemalloc
+
+# Add parent directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from game_room import GameRoom
+
+OFFENSES = ['assassination', 'surveillance', '']
+DEFENSES = ['safe_house', 'bodyguard_detail', 'underground', 'sweep_clear', 'counter_surveillance']
+
+class EventCounter:
+    """Emitter that only counts events"""
+
+    def __init__(self):
+        self.count = 0
+        self.by_event = {}
+
+    def __call__(self, event, data=None, to=None, **kwargs):
+        self.count += 1
+        self.by_event[event] = self.by_event.get(event, 0) + 1
+
+def make_room(room_id, players, emitter):
+    """Create a room, seat players and start the game"""
+    room = GameRoom(room_id, emit=emitter)
+    for i in range(players):
+        room.join(f'{room_id}-sid{i}', f'Agent_{i}')
+    room.start_game(f'{room_id}-sid0')
+    return room
+
+def random_action(room, sid, rng):
+    """Pick a random action for one player"""
+    codename = room.users[sid]['codename']
+    targets = [u['codename'] for u in room.users.values() if u['codename'] != codename]
+    return {
+        'offense': rng.choice(OFFENSES),
+        'defense': rng.choice(DEFENSES),
+        'target': rng.choice(targets),
+        'ip_spend': rng.randint(0, 2),
+        'banner_message': ''
+    }
+
+def play_round(room, rng):
+    """Submit an action for every active player, which resolves the round"""
+    round_number = room.game_state['round_number']
+    for sid, user in list(room.users.items()):
+        if room.game_state['phase'] != 'planning':
+            break
+        if user['status'] in ['active', 'compromised', 'burned']:
+            room.submit_action(sid, random_action(room, sid, rng))
+
+    # Nobody left who can submit (e.g. everyone exposed): resolve as the deadline would
+    if room.game_state['phase'] == 'planning' and room.game_state['round_number'] == round_number:
+        room.start_resolution_phase()
+
+def run_benchmark(rooms, players, rounds, round_seconds, seed):
+    """Play `rounds` rounds in each of `rooms` rooms and report throughput"""
+    rng = random.Random(seed)
+    random.seed(seed)
+    emitter = EventCounter()
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        tracemalloc.start()
+        baseline, _ = tracemalloc.get_traced_memory()
+        active_rooms = [make_room(f'room{i}', players, emitter) for i in range(rooms)]
+        allocated, _ = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+        restarted = 0
+        start = time.perf_counter()
+        for _ in range(rounds):
+            for index, room in enumerate(active_rooms):
+                if room.game_state['phase'] != 'planning':
+                    # Finished games are replaced with a fresh table
+                    active_rooms[index] = room = make_room(room.room_id, players, emitter)
+                    restarted += 1
+                play_round(room, rng)
+        elapsed = time.perf_counter() - start
+
+    rounds_resolved = sum(emitter.by_event.get(event, 0)
+                          for event in ('turnResult', 'gameOver', 'finalShowdownStarted'))
+    rounds_per_second = rounds_resolved / elapsed if elapsed else float('inf')
+    return {
+        'rooms': rooms,
+        'players_per_room': players,
+        'rounds_resolved': rounds_resolved,
+        'games_restarted': restarted,
+        'events_emitted': emitter.count,
+        'elapsed_seconds': elapsed,
+        'rounds_per_second': rounds_per_second,
+        'ms_per_round': 1000.0 / rounds_per_second if rounds_per_second else 0.0,
+        'bytes_per_room': (allocated - baseline) / rooms,
+        # Each table needs one resolution per planning window
+        'rooms_per_process': int(rounds_per_second * round_seconds)
+    }
+
+def main():
+    """Main entry point for the room benchmark"""
+    parser = argparse.ArgumentParser(description='Benchmark concurrent game rooms in one process')
+    parser.add_argument('--rooms', type=int, default=200, help='Concurrent rooms (default: 200)')
+    parser.add_argument('--players', type=int, default=6, help='Players per room (default: 6)')
+    parser.add_argument('--rounds', type=int, default=20, help='Rounds per room (default: 20)')
+    parser.add_argument('--round-seconds', type=int, default=90,
+                        help='Planning window used to convert throughput to rooms (default: 90)')
+    parser.add_argument('--seed', type=int, default=1, help='Random seed (default: 1)')
+    args = parser.parse_args()
+
+    result = run_benchmark(args.rooms, args.players, args.rounds, args.round_seconds, args.seed)
+
+    print("=" * 60)
+    print("ROOM THROUGHPUT BENCHMARK")
+    print("=" * 60)
+    print(f"Rooms: {result['rooms']} x {result['players_per_room']} players")
+    print(f"Rounds resolved: {result['rounds_resolved']} ({result['games_restarted']} games restarted)")
+    print(f"Events emitted: {result['events_emitted']}")
+    print(f"Throughput: {result['rounds_per_second']:.0f} rounds/s ({result['ms_per_round']:.3f} ms/round)")
+    print(f"Memory: {result['bytes_per_room'] / 1024:.1f} KiB per room")
+    print(f"Capacity: ~{result['rooms_per_process']} rooms per process at "
+          f"{args.round_seconds}s rounds (CPU-bound upper limit)")
+    print("=" * 60)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,109 @@
+#!/usr/bin/env python3
+"""
+Serializer Benchmark for James Bland: ACME Edition
+Compares JSON and MessagePack Socket.IO packets for turnResult and
+gameStateSnapshot payloads captured from headless games: bytes on the wire
+and encode/decode CPU time
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import os
+import random
+import sys
+import time
+
+from socketio import packet as sio_packet
+
+# Add parent directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from broadcast import msgpack_packet_class
+from benchmark_rooms import make_room, play_round
+
+class Capture:
+    """Emitter that keeps the last and the largest payload of each event"""
+
+    def __init__(self):
+        self.last = {}
+        self.largest = {}  # event -> (JSON size, payload)
+
+    def __call__(self, event, data=None, to=None, **kwargs):
+        self.last[event] = data
+        size = len(json.dumps(data))
+        if size > self.largest.get(event, (0, None))[0]:
+            self.largest[event] = (size, data)
+
+def capture_payloads(players, rounds, seed):
+    """Play a game and return representative payloads by name"""
+    rng = random.Random(seed)
+    random.seed(seed)
+    capture = Capture()
+    with contextlib.redirect_stdout(io.StringIO()):
+        room = make_room('bench', players, capture)
+        for _ in range(rounds):
+            if room.game_state['phase'] != 'planning':
+                break
+            play_round(room, rng)
+
+        sid = next(iter(room.users))
+        room.send_game_state(sid, max(1, room.sync.version - 1))
+        delta_snapshot = capture.last['gameStateSnapshot']
+        room.send_game_state(sid, 0)
+        full_snapshot = capture.last['gameStateSnapshot']
+
+    return {
+        'turnResult': capture.largest['turnResult'][1],
+        'gameStateSnapshot (delta)': delta_snapshot,
+        'gameStateSnapshot (full)': full_snapshot
+    }
+
+def measure(packet_class, event, payload, iterations):
+    """Encoded size plus mean encode and decode microseconds for one packet class"""
+    data = [event, payload]
+    start = time.perf_counter()
+    for _ in range(iterations):
+        encoded = packet_class(sio_packet.EVENT, namespace='/', data=data).encode()
+    encode_time = (time.perf_counter() - start) / iterations
+
+    start = time.perf_counter()
+    for _ in range(iterations):
+        packet_class(encoded_packet=encoded)
+    decode_time = (time.perf_counter() - start) / iterations
+
+    size = len(encoded.encode('utf-8') if isinstance(encoded, str) else encoded)
+    return size, encode_time * 1e6, decode_time * 1e6
+
+def main():
+    """Main entry point for the serializer benchmark"""
+    parser = argparse.ArgumentParser(description='Benchmark JSON against MessagePack packets')
+    parser.add_argument('--players', type=int, default=6, help='Players in the game (default: 6)')
+    parser.add_argument('--rounds', type=int, default=5, help='Rounds played before capturing (default: 5)')
+    parser.add_argument('--iterations', type=int, default=2000, help='Encodes per measurement (default: 2000)')
+    parser.add_argument('--seed', type=int, default=1, help='Random seed (default: 1)')
+    args = parser.parse_args()
+
+    serializers = {'json': sio_packet.Packet}
+    msgpack_packet = msgpack_packet_class()
+    if msgpack_packet is None:
+        print("msgpack is not installed (pip install msgpack): measuring JSON only")
+    else:
+        serializers['msgpack'] = msgpack_packet
+
+    payloads = capture_payloads(args.players, args.rounds, args.seed)
+
+    print("=" * 60)
+    print("SERIALIZER BENCHMARK")
+    print("=" * 60)
+    for name, payload in payloads.items():
+        event = name.split(' ')[0]
+        print(f"{name}:")
+        for serializer, packet_class in serializers.items():
+            size, encode_us, decode_us = measure(packet_class, event, payload, args.iterations)
+            print(f"  {serializer:8s} {size:6d} bytes   encode {encode_us:7.1f} us   decode {decode_us:7.1f} us")
+    print("=" * 60)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,69 @@
+#!/usr/bin/env python3
+"""
+Sharding Scaling Benchmark for James Bland: ACME Edition
+Splits a fixed set of rooms across 1..N shared-nothing worker processes,
+each playing its share exactly as a launcher.py worker would host it, and
+reports aggregate round throughput for each worker count
+"""
+
+import argparse
+import multiprocessing
+import os
+import sys
+import time
+
+# Add parent directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmark_rooms import run_benchmark
+from sharding import shard_for
+
+def run_worker(task):
+    """Play one worker's share of the rooms; returns rounds resolved"""
+    worker, workers, room_ids, players, rounds, seed = task
+    owned = [room_id for room_id in room_ids if shard_for(room_id, workers) == worker]
+    if not owned:
+        return 0
+    return run_benchmark(len(owned), players, rounds, 90, seed + worker)['rounds_resolved']
+
+def measure(workers, room_ids, players, rounds, seed):
+    """Wall-clock aggregate throughput with `workers` processes"""
+    tasks = [(worker, workers, room_ids, players, rounds, seed) for worker in range(workers)]
+    with multiprocessing.get_context('spawn').Pool(workers) as pool:
+        # Warm the pool so interpreter start-up is not counted
+        pool.map(abs, range(workers))
+        start = time.perf_counter()
+        resolved = sum(pool.map(run_worker, tasks))
+        elapsed = time.perf_counter() - start
+    return resolved, elapsed
+
+def main():
+    """Main entry point for the sharding benchmark"""
+    parser = argparse.ArgumentParser(description='Benchmark room throughput against worker count')
+    parser.add_argument('--rooms', type=int, default=400, help='Rooms across all workers (default: 400)')
+    parser.add_argument('--players', type=int, default=6, help='Players per room (default: 6)')
+    parser.add_argument('--rounds', type=int, default=20, help='Rounds per room (default: 20)')
+    parser.add_argument('--max-workers', type=int, default=os.cpu_count() or 1,
+                        help='Largest worker count to try (default: CPU count)')
+    parser.add_argument('--seed', type=int, default=1, help='Random seed (default: 1)')
+    args = parser.parse_args()
+
+    room_ids = [f'room{i}' for i in range(args.rooms)]
+    counts = sorted({1, 2, 4, 8, 16, 32, 64, args.max_workers} & set(range(1, args.max_workers + 1)))
+
+    print("=" * 60)
+    print("SHARDING SCALING BENCHMARK")
+    print("=" * 60)
+    print(f"Rooms: {args.rooms} x {args.players} players, {args.rounds} rounds each; "
+          f"{os.cpu_count()} CPU(s)")
+    baseline = None
+    for workers in counts:
+        resolved, elapsed = measure(workers, room_ids, args.players, args.rounds, args.seed)
+        throughput = resolved / elapsed if elapsed else float('inf')
+        baseline = baseline or throughput
+        print(f"  {workers:3d} worker(s): {throughput:8.0f} rounds/s "
+              f"({throughput / baseline:.2f}x, {throughput / workers:.0f} per worker)")
+    print("=" * 60)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,124 @@
+#!/usr/bin/env python3
+"""
+State Sync Benchmark for James Bland: ACME Edition
+Compares turnResult and gameStateSnapshot bytes with full state versus
+delta-encoded versioned state over headless games, and turnResult bytes per
+client with every player's full results versus the fog-of-war split
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import os
+import random
+import sys
+
+# Add parent directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from game_room import GameRoom
+from benchmark_rooms import play_round
+
+class ByteCounter:
+    """Emitter that sums the JSON size of each event's payload"""
+
+    def __init__(self):
+        self.bytes_by_event = {}
+        self.emits_by_event = {}
+        self.last = {}
+
+    def __call__(self, event, data=None, to=None, **kwargs):
+        size = len(json.dumps(data, default=list))
+        self.bytes_by_event[event] = self.bytes_by_event.get(event, 0) + size
+        self.emits_by_event[event] = self.emits_by_event.get(event, 0) + 1
+        self.last[event] = data
+
+def full_turn_result_bytes(room):
+    """Size the pre-delta turnResult fields (full player summaries and assets)"""
+    return len(json.dumps({
+        'players': room.get_player_summaries(),
+        'assets': room.game_state['assets']
+    }, default=list))
+
+def full_snapshot_bytes(room, sid):
+    """Size the pre-delta gameStateSnapshot fields (lobby players and the whole user dict)"""
+    return len(json.dumps({
+        'players': [{'codename': u['codename'], 'sid': s, 'status': u['status'], 'ip': u['ip']}
+                    for s, u in room.users.items()],
+        'userState': room.users[sid]
+    }, default=list))
+
+def run_benchmark(games, players, rounds, seed):
+    """Play games and compare full versus delta state bytes"""
+    rng = random.Random(seed)
+    random.seed(seed)
+    totals = {'full_turn': 0, 'delta_turn': 0, 'full_snapshot': 0, 'delta_snapshot': 0, 'turns': 0,
+              'all_results_client': 0, 'fog_client': 0}
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        for game in range(games):
+            counter = ByteCounter()
+            room = GameRoom(f'room{game}', emit=counter)
+            for i in range(players):
+                room.join(f'sid{i}', f'Agent_{i}')
+            room.start_game('sid0')
+
+            for _ in range(rounds):
+                if room.game_state['phase'] != 'planning':
+                    break
+                before = counter.bytes_by_event.get('turnResult', 0)
+                emits_before = counter.emits_by_event.get('turnResult', 0)
+                play_round(room, rng)
+                if counter.bytes_by_event.get('turnResult', 0) == before:
+                    continue
+                turn = counter.last['turnResult']
+
+                # Each client's turnResult: its own slice plus the public summary, versus
+                # the same payload carrying every player's full results
+                clients = counter.emits_by_event['turnResult'] - emits_before
+                totals['fog_client'] += (counter.bytes_by_event['turnResult'] - before) / clients
+                all_results = {key: value for key, value in turn.items() if key != 'yourResults'}
+                all_results['results'] = room.game_state['turn_results']
+                totals['all_results_client'] += len(json.dumps(all_results, default=list))
+                sync_fields = {key: turn[key] for key in ('version', 'baseVersion', 'full', 'delta', 'state')
+                               if key in turn}
+                totals['delta_turn'] += len(json.dumps(sync_fields, default=list))
+                totals['full_turn'] += full_turn_result_bytes(room)
+                totals['turns'] += 1
+
+                # A client that fell one round behind resyncs
+                totals['full_snapshot'] += full_snapshot_bytes(room, 'sid1')
+                room.send_game_state('sid1', max(1, room.sync.version - 1))
+                snapshot = counter.last['gameStateSnapshot']
+                totals['delta_snapshot'] += len(json.dumps(
+                    {key: snapshot[key] for key in ('version', 'baseVersion', 'full', 'delta', 'state')
+                     if key in snapshot}, default=list))
+    return totals
+
+def main():
+    """Main entry point for the state sync benchmark"""
+    parser = argparse.ArgumentParser(description='Benchmark delta-encoded state sync payloads')
+    parser.add_argument('--games', type=int, default=50, help='Games to play (default: 50)')
+    parser.add_argument('--players', type=int, default=6, help='Players per game (default: 6)')
+    parser.add_argument('--rounds', type=int, default=20, help='Maximum rounds per game (default: 20)')
+    parser.add_argument('--seed', type=int, default=1, help='Random seed (default: 1)')
+    args = parser.parse_args()
+
+    totals = run_benchmark(args.games, args.players, args.rounds, args.seed)
+    turns = max(1, totals['turns'])
+
+    print("=" * 60)
+    print("STATE SYNC BENCHMARK")
+    print("=" * 60)
+    print(f"Games: {args.games} x {args.players} players, {totals['turns']} turn results")
+    print(f"turnResult state, full:      {totals['full_turn'] / turns:8.0f} bytes/turn")
+    print(f"turnResult state, delta:     {totals['delta_turn'] / turns:8.0f} bytes/turn")
+    print(f"Resync snapshot, full:       {totals['full_snapshot'] / turns:8.0f} bytes")
+    print(f"Resync snapshot, delta:      {totals['delta_snapshot'] / turns:8.0f} bytes")
+    print(f"turnResult, all results:     {totals['all_results_client'] / turns:8.0f} bytes/client/turn")
+    print(f"turnResult, fog of war:      {totals['fog_client'] / turns:8.0f} bytes/client/turn")
+    print("=" * 60)
+
+if __name__ == "__main__":
+    main()
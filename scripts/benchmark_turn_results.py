@@ -0,0 +1,129 @@
+#!/usr/bin/env python3
+"""
+Turn Result Benchmark for James Bland: ACME Edition
+Resolves one turn at tables of growing size and measures what its results
+cost: memory held (tracemalloc), resolution time, and the time to find
+Master Plan results and serialize every player's turnResult
+"""
+
+import argparse
+import copy
+import json
+import os
+import random
+import sys
+import time
+import tracemalloc
+
+# Add parent directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from action_resolver import resolve_turn, STRATEGIC_ASSETS
+from intel_store import new_intel
+from master_plans import MASTER_PLAN_ACTIONS
+from player_registry import PlayerRegistry
+from state_sync import split_results
+
+OFFENSES = ['assassination', 'surveillance', 'network_attack', 'sabotage', '']
+DEFENSES = ['safe_house', 'bodyguard_detail', 'underground', 'sweep_clear', 'counter_surveillance',
+            'information_warfare']
+
+def make_turn(players, seed):
+    """A table of active players and one action each"""
+    rng = random.Random(seed)
+    users = PlayerRegistry()
+    for i in range(players):
+        users.add(f'sid{i}', {'codename': f'Agent_{i}', 'status': 'active', 'ip': 10,
+                              'gadgets': [], 'intel': new_intel(), 'alliances': []})
+    codenames = [user['codename'] for user in users.values()]
+    submitted = {}
+    for sid, user in users.items():
+        offense = rng.choice(OFFENSES)
+        submitted[sid] = {
+            'offense': offense,
+            'defense': rng.choice(DEFENSES),
+            'target': rng.choice([c for c in codenames if c != user['codename']]) if offense else None,
+            'ip_spend': rng.randint(0, 2),
+            'banner_message': 'ACME RULES!'
+        }
+    return users, submitted
+
+def resolve(users, submitted, seed):
+    """Resolve the turn on a copy of the table"""
+    assets = dict.fromkeys(STRATEGIC_ASSETS)
+    return resolve_turn(users, submitted, 1, assets, rng=random.Random(seed))
+
+def plan_results(results):
+    """Results that may advance a Master Plan"""
+    return results.of_type(*MASTER_PLAN_ACTIONS)
+
+def wire(results):
+    """Results in wire format"""
+    return results.wire()
+
+def send(results):
+    """Build and encode every player's turnResult, as apply_resolution does"""
+    public, private = split_results(wire(results))
+    encoded = json.dumps(public)
+    return len(encoded) + sum(len(json.dumps(own)) for own in private.values())
+
+def measure_memory(players, seed):
+    """Bytes and blocks the results of one turn hold, and peak bytes while resolving"""
+    users, submitted = make_turn(players, seed)
+    table = copy.deepcopy(users)
+    tracemalloc.start()
+    before = tracemalloc.take_snapshot()
+    tracemalloc.reset_peak()
+    results = resolve(table, submitted, seed)
+    _, peak = tracemalloc.get_traced_memory()
+    after = tracemalloc.take_snapshot()
+    tracemalloc.stop()
+
+    stats = after.compare_to(before, 'filename')
+    held = sum(stat.size_diff for stat in stats)
+    blocks = sum(stat.count_diff for stat in stats)
+    del results
+    return held, blocks, peak
+
+def measure_time(players, seed, turns):
+    """Mean seconds per turn to resolve, and to scan and serialize the results"""
+    users, submitted = make_turn(players, seed)
+    tables = [copy.deepcopy(users) for _ in range(turns)]
+
+    resolved = []
+    start = time.perf_counter()
+    for table in tables:
+        resolved.append(resolve(table, submitted, seed))
+    resolving = (time.perf_counter() - start) / turns
+
+    start = time.perf_counter()
+    for results in resolved:
+        plan_results(results)
+        send(results)
+    sending = (time.perf_counter() - start) / turns
+    return resolving, sending
+
+def main():
+    """Main entry point for the turn result benchmark"""
+    parser = argparse.ArgumentParser(description='Benchmark turn result records')
+    parser.add_argument('--sizes', type=int, nargs='+', default=[6, 60, 600],
+                        help='Players per table (default: 6 60 600)')
+    parser.add_argument('--turns', type=int, default=50, help='Turns timed per size (default: 50)')
+    parser.add_argument('--seed', type=int, default=1, help='Random seed (default: 1)')
+    args = parser.parse_args()
+
+    print("=" * 60)
+    print("TURN RESULT BENCHMARK")
+    print("=" * 60)
+    for players in args.sizes:
+        held, blocks, peak = measure_memory(players, args.seed)
+        resolving, sending = measure_time(players, args.seed, args.turns)
+        print(f"{players} players:")
+        print(f"  Results held:   {held / 1024:9.1f} KB in {blocks} blocks ({held / players:.0f} B per player)")
+        print(f"  Peak resolving: {peak / 1024:9.1f} KB")
+        print(f"  Resolve turn:   {resolving * 1e3:9.3f} ms")
+        print(f"  Scan and send:  {sending * 1e3:9.3f} ms")
+    print("=" * 60)
+
+if __name__ == "__main__":
+    main()
@@ -10,114 +10,11 @@ import random
 import sys
 from pathlib import Path
 
-# Default intel card definitions
-DEFAULT_INTEL_DEFINITIONS = [
-    {
-        "id": "IDENTITY_REVEAL",
-        "type": "identity",
-        "uses": 1,
-        "description": "Reveals the true identity of target player",
-        "copies": 8
-    },
-    {
-        "id": "NEXT_OFFENSE",
-        "type": "tactical",
-        "uses": 1,
-        "description": "Learn target's next planned offense",
-        "copies": 6
-    },
-    {
-        "id": "NEXT_DEFENSE", 
-        "type": "tactical",
-        "uses": 1,
-        "description": "Learn target's next planned defense",
-        "copies": 6
-    },
-    {
-        "id": "GADGET_INVENTORY",
-        "type": "equipment",
-        "uses": 1,
-        "description": "Reveals all gadgets owned by target",
-        "copies": 5
-    },
-    {
-        "id": "LOCATION_INTEL",
-        "type": "surveillance",
-        "uses": 1,
-        "description": "Discover target's current safe house location",
-        "copies": 4
-    },
-    {
-        "id": "ALLIANCE_NETWORK",
-        "type": "political",
-        "uses": 1,
-        "description": "Reveals all of target's current alliances",
-        "copies": 4
-    },
-    {
-        "id": "MASTER_PLAN_HINT",
-        "type": "strategic",
-        "uses": 1,
-        "description": "Gain a clue about target's master plan objective",
-        "copies": 3
-    },
-    {
-        "id": "FULL_DOSSIER",
-        "type": "comprehensive",
-        "uses": 3,
-        "description": "Complete intelligence profile - reveals identity, gadgets, and next action",
-        "copies": 2
-    },
-    {
-        "id": "ASSET_CONTROL",
-        "type": "strategic",
-        "uses": 1,
-        "description": "Learn which strategic assets target controls",
-        "copies": 3
-    },
-    {
-        "id": "IP_RESERVES",
-        "type": "financial",
-        "uses": 1,
-        "description": "Discover target's exact IP count",
-        "copies": 5
-    },
-    {
-        "id": "COMMUNICATION_LOG",
-        "type": "surveillance",
-        "uses": 1,
-        "description": "Intercept target's recent communications",
-        "copies": 4
-    },
-    {
-        "id": "WEAKNESS_ANALYSIS",
-        "type": "tactical",
-        "uses": 1,
-        "description": "Reveals target's most vulnerable defense type",
-        "copies": 3
-    },
-    {
-        "id": "DOUBLE_AGENT",
-        "type": "infiltration",
-        "uses": 2,
-        "description": "Place a double agent - learn target's actions for 2 rounds",
-        "copies": 2
-    },
-    {
-        "id": "BLACKMAIL_MATERIAL",
-        "type": "leverage",
-        "uses": 1,
-        "description": "Compromising information that can force target cooperation",
-        "copies": 2
-    },
-    {
-        "id": "SAFE_HOUSE_NETWORK",
-        "type": "infrastructure",
-        "uses": 1,
-        "description": "Map of all safe houses in target's network",
-        "copies": 3
-    }
-]
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+# Default intel card definitions (shared with the server's intel store)
+from intel_store import INTEL_DEFINITIONS as DEFAULT_INTEL_DEFINITIONS
 
 def load_intel_definitions():
     """Load intel definitions from file or use defaults"""
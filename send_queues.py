@@ -0,0 +1,165 @@
+#!/usr/bin/env python3
+"""
+Send Queues for James Bland: ACME Edition
+Bounds what the server buffers for each client: superseded progress updates
+are replaced while a socket is backed up, and a socket that stays over its
+limit is downgraded to snapshot-only and eventually disconnected
+"""
+
+import time
+from typing import Any, Callable, Dict, Iterable, List
+
+# Events where only the latest payload matters; a backed-up socket gets the newest one later
+REPLACEABLE_EVENTS = frozenset({'lobbyUpdate', 'playerSubmitted'})
+# Sent to a downgraded socket once it drains: the client then asks for what it missed
+RESYNC_EVENT = 'resyncRequired'
+
+REPLACE_BACKLOG = 8   # queued packets at which replaceable events are held back
+MAX_BACKLOG = 64      # queued packets at which a socket is downgraded to snapshot-only
+STALL_SECONDS = 30.0  # how long a downgraded socket may stay backed up before it is disconnected
+
+
+class SendQueues:
+    """
+    Per-socket backpressure in front of Engine.IO
+
+    Engine.IO queues every packet for a socket until its writer gets it onto
+    the wire, without limit, so a phone on weak Wi-Fi makes the server hold
+    everything sent to it. deliver() looks at that queue before each write:
+
+    - replaceable events are held once the backlog reaches `replace_at`,
+      one per event name, and a newer payload replaces the held one (held
+      events are written before the socket's next must-deliver event);
+    - any event that would take the backlog past `limit` downgrades the
+      socket to snapshot-only: nothing more is written to it, so its
+      buffered packets stay bounded.
+
+    pump() runs periodically. It writes held events to sockets that have
+    drained, tells downgraded sockets that drained to resync (RESYNC_EVENT),
+    and disconnects sockets that stayed backed up for `stall_seconds`. A
+    disconnected player can resume with their token.
+    """
+
+    def __init__(self, send: Callable[[str, Any], Any], backlog: Callable[[str], int],
+                 notify: Callable[[str], Any], disconnect: Callable[[str], Any],
+                 replace_at: int = REPLACE_BACKLOG, limit: int = MAX_BACKLOG,
+                 stall_seconds: float = STALL_SECONDS, replaceable: Iterable[str] = REPLACEABLE_EVENTS,
+                 clock: Callable[[], float] = time.monotonic):
+        self.send = send              # (eio sid, packet): write one packet to a socket
+        self.backlog = backlog        # eio sid -> packets queued for the socket
+        self.notify = notify          # sid: send RESYNC_EVENT to a recovered socket
+        self.disconnect = disconnect  # sid: drop a socket that never recovered
+        self.replace_at = replace_at
+        self.limit = limit
+        self.stall_seconds = stall_seconds
+        self.replaceable = frozenset(replaceable)
+        self.clock = clock
+
+        self.held = {}     # sid -> (eio sid, {event: packets}) replaceable events waiting
+        self.lagging = {}  # sid -> (eio sid, downgraded at) snapshot-only sockets
+
+        # Metrics
+        self.written = 0
+        self.replaced = 0
+        self.dropped = 0
+        self.downgrades = 0
+        self.recoveries = 0
+        self.disconnects = 0
+
+    def deliver(self, sid: str, eio_sid: str, event: str, packets: List[Any]) -> bool:
+        """
+        Write an event's packets to a socket, or hold or drop them under backpressure
+
+        Returns:
+            True if the packets were written now
+        """
+        if sid in self.lagging:
+            self.dropped += 1
+            return False
+
+        backlog = self.backlog(eio_sid)
+        if event in self.replaceable and backlog >= self.replace_at:
+            waiting = self.held.setdefault(sid, (eio_sid, {}))[1]
+            if event in waiting:
+                self.replaced += 1
+            waiting[event] = packets
+            return False
+
+        # Held updates go out ahead of the next must-deliver event, so clients see events in order
+        waiting = self.held.pop(sid, (eio_sid, {}))[1]
+        if backlog + sum(len(held) for held in waiting.values()) + len(packets) > self.limit:
+            self.downgrade(sid, eio_sid)
+            self.dropped += 1
+            return False
+
+        for held in waiting.values():
+            self.write(eio_sid, held)
+        self.write(eio_sid, packets)
+        return True
+
+    def write(self, eio_sid: str, packets: List[Any]):
+        """Write one event's packets to a socket"""
+        for packet in packets:
+            self.send(eio_sid, packet)
+        self.written += 1
+
+    def downgrade(self, sid: str, eio_sid: str):
+        """Stop writing to a socket until it drains; it will be told to resync"""
+        self.held.pop(sid, None)
+        self.lagging[sid] = (eio_sid, self.clock())
+        self.downgrades += 1
+
+    def forget(self, sid: str):
+        """Drop a disconnected socket's held events and lag state"""
+        self.held.pop(sid, None)
+        self.lagging.pop(sid, None)
+
+    def pump(self) -> int:
+        """
+        Flush held events to drained sockets, recover or disconnect downgraded ones
+
+        Returns:
+            Number of sockets written to
+        """
+        written = 0
+        for sid, (eio_sid, waiting) in list(self.held.items()):
+            if self.backlog(eio_sid) < self.replace_at:
+                del self.held[sid]
+                for packets in waiting.values():
+                    self.write(eio_sid, packets)
+                written += 1
+
+        now = self.clock()
+        for sid, (eio_sid, since) in list(self.lagging.items()):
+            if self.backlog(eio_sid) < self.replace_at:
+                del self.lagging[sid]
+                self.recoveries += 1
+                self.notify(sid)
+                written += 1
+            elif now - since >= self.stall_seconds:
+                del self.lagging[sid]
+                self.disconnects += 1
+                self.disconnect(sid)
+        return written
+
+    def run(self, sleep: Callable[[float], Any], interval: float = 0.25):
+        """Pump forever (run as a background task)"""
+        while True:
+            sleep(interval)
+            try:
+                self.pump()
+            except Exception as e:
+                print(f"Send queue pump error: {e}")
+
+    def stats(self) -> Dict[str, Any]:
+        """Held and downgraded sockets, and what backpressure saved"""
+        return {
+            'held': sum(len(waiting) for _, waiting in self.held.values()),
+            'lagging': len(self.lagging),
+            'written': self.written,
+            'replaced': self.replaced,
+            'dropped': self.dropped,
+            'downgrades': self.downgrades,
+            'recoveries': self.recoveries,
+            'disconnects': self.disconnects
+        }
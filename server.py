@@ -7,19 +7,21 @@ Flask + Flask-SocketIO server for LAN-only multiplayer espionage game
 import eventlet
 eventlet.monkey_patch()
 
-import json
-import random
+import os
 import socket
 import time
-from flask import Flask, render_template
+from flask import Flask, jsonify, render_template
 from flask_socketio import SocketIO, emit, join_room, leave_room
 from flask_cors import CORS
 
 # Import game logic modules
-from interaction_matrix import get_available_offenses, get_available_defenses
-from action_resolver import resolve_turn, check_victory_conditions, apply_round_end_effects
-from master_plans import master_plan_manager
-from alliance_victory import alliance_manager
+from game_room import RoomManager, normalize_room_id
+from timer_wheel import TimerWheel
+from action_log import JournalStore
+from resolution_pool import DEFAULT_OFFLOAD_MIN_PLAYERS, ResolutionPool, LoopMonitor
+from room_actor import RoomActor
+from sharding import DirectoryBus, shard_for
+from broadcast import Broadcaster
 
 # Initialize Flask app
 app = Flask(__name__)
@@ -35,24 +37,39 @@ socketio = SocketIO(app,
                    logger=True,
                    engineio_logger=True)
 
-# Global game state
-users = {}              # sid -> {codename, status, ip, gadgets, intel, etc}
+# Game rooms hosted by this process (one GameRoom per table)
 connections = {}        # sid -> connection info
-lobby_state = {
-    'players': [],      # list of {sid, codename, ready}
-    'host_sid': None,
-    'game_started': False
-}
-game_state = {
-    'round_number': 0,
-    'phase': 'lobby',   # 'lobby', 'planning', 'banner', 'resolution', 'game_over'
-    'timer_start': None,
-    'timer_duration': 90,  # seconds
-    'submitted_actions': {},  # sid -> action data
-    'banner_responses': {},   # sid -> banner choice data
-    'assets': {},        # strategic assets control
-    'turn_results': []   # latest turn results
-}
+# When launcher.py runs several workers, this one only hosts rooms that shard to it
+worker_index = int(os.environ.get('JAMES_BLAND_WORKER', '0'))
+worker_count = int(os.environ.get('JAMES_BLAND_WORKERS', '1'))
+# Planning deadlines for every room share one timer wheel driven by one green thread
+deadline_wheel = TimerWheel(tick=0.1)
+# Write-ahead log of every room's inputs, fsynced in batches, for crash recovery
+journal_dir = os.environ.get('JAMES_BLAND_JOURNAL_DIR',
+                             os.path.join(os.path.dirname(os.path.abspath(__file__)), 'data', 'journal'))
+journal_store = JournalStore(journal_dir)
+# Round resolution runs off the event loop (inline, thread or process) so one room cannot stall the rest;
+# rooms smaller than min_players resolve in place, where the hand-off would cost more than it saves
+resolution_pool = ResolutionPool(mode=os.environ.get('JAMES_BLAND_RESOLUTION', 'process'),
+                                 spawn=socketio.start_background_task,
+                                 min_players=int(os.environ.get('JAMES_BLAND_RESOLUTION_MIN_PLAYERS',
+                                                                DEFAULT_OFFLOAD_MIN_PLAYERS)))
+# Measures how late the hub wakes green threads, i.e. how long something held the loop
+loop_monitor = LoopMonitor()
+background_tasks = None
+# Room broadcasts are encoded once and the same packets written to every socket; clients that
+# ask for MessagePack get binary frames unless JAMES_BLAND_SERIALIZER=json. Writes to a backed-up
+# socket are bounded by its send queue (send_queues.py).
+broadcaster = Broadcaster(socketio.server,
+                          msgpack=os.environ.get('JAMES_BLAND_SERIALIZER', 'msgpack') == 'msgpack')
+# Each room's inputs go through its own mailbox, drained by one green thread at a time
+room_manager = RoomManager(emit=broadcaster, scheduler=deadline_wheel, journal=journal_store,
+                           resolver=resolution_pool,
+                           mailbox=lambda room: RoomActor(room, sleep=socketio.sleep),
+                           owns=lambda room_id: shard_for(room_id, worker_count) == worker_index)
+# Shares the room directory with the other workers (None when running alone)
+directory_bus = (DirectoryBus(os.environ['JAMES_BLAND_BUS_DIR'], worker_index, worker_count)
+                 if worker_count > 1 else None)
 
 def get_lan_ip():
     """Get the LAN IP address of this server"""
@@ -64,11 +81,78 @@ def get_lan_ip():
     except Exception:
         return "127.0.0.1"
 
+def current_room(sid):
+    """Get the room a socket belongs to, replying with an error if it has none"""
+    room = room_manager.room_for_sid(sid)
+    if room is None:
+        emit('error', {'message': 'Not in a game room'})
+    return room
+
+def ensure_background_tasks():
+    """Recover in-flight games and start the background tasks once the server is running"""
+    global background_tasks
+    if background_tasks is None:
+        recovered = room_manager.recover()
+        if recovered:
+            print(f"Recovered {len(recovered)} game(s) from {journal_dir}: {', '.join(recovered)}")
+        background_tasks = [
+            socketio.start_background_task(deadline_wheel.run, socketio.sleep),
+            socketio.start_background_task(journal_store.run, socketio.sleep),
+            socketio.start_background_task(loop_monitor.run, socketio.sleep),
+            socketio.start_background_task(broadcaster.queues.run, socketio.sleep)
+        ]
+        if directory_bus is not None:
+            background_tasks.append(
+                socketio.start_background_task(directory_bus.run, room_manager.directory, socketio.sleep))
+
 @app.route('/')
 def index():
     """Serve the main game page"""
     return render_template('index.html')
 
+@app.route('/rooms')
+def list_rooms():
+    """Directory of game rooms hosted by this server"""
+    rooms = room_manager.directory()
+    if directory_bus is not None:
+        rooms = directory_bus.rooms(rooms)
+    return jsonify({'rooms': rooms})
+
+@app.route('/metrics/deadlines')
+def deadline_metrics():
+    """Pending planning deadlines and how late fired ones ran"""
+    return jsonify(deadline_wheel.stats())
+
+@app.route('/metrics/loop')
+def loop_metrics():
+    """Event loop stall times and how resolution was handed off"""
+    return jsonify({'loop': loop_monitor.stats(), 'resolution': resolution_pool.stats()})
+
+@app.route('/metrics/mailboxes')
+def mailbox_metrics():
+    """Per-room mailbox depth and enqueue-to-handled latency"""
+    return jsonify(room_manager.mailbox_stats())
+
+@app.route('/metrics/broadcast')
+def broadcast_metrics():
+    """How many encodes room broadcasts cost against sockets written to"""
+    return jsonify(broadcaster.stats())
+
+@app.route('/metrics/coalescing')
+def coalescing_metrics():
+    """Lobby and submission progress broadcasts merged per room"""
+    return jsonify(room_manager.coalescing_stats())
+
+@app.route('/metrics/queues')
+def queue_metrics():
+    """Progress updates held or replaced for backed-up sockets, and sockets downgraded"""
+    return jsonify(broadcaster.queues.stats())
+
+@app.route('/metrics/catchup')
+def catch_up_metrics():
+    """Reconnecting clients caught up by event replay against evicted gaps"""
+    return jsonify(room_manager.catch_up_stats())
+
 # WebSocket Event Handlers
 
 @socketio.on('connect')
@@ -76,9 +160,12 @@ def handle_connect():
     """Handle new client connection"""
     from flask import request
     print(f"Client {request.sid} connected")
+    ensure_background_tasks()
     connections[request.sid] = {
         'connected_at': time.time(),
-        'ip_address': request.environ.get('REMOTE_ADDR')
+        'ip_address': request.environ.get('REMOTE_ADDR'),
+        # Clients that bundle a MessagePack decoder ask for it in the connection query
+        'serializer': broadcaster.negotiate(request.sid, request.args.get('serializer'))
     }
 
 @socketio.on('disconnect')
@@ -91,525 +178,172 @@ def handle_disconnect():
     # Remove from connections
     if sid in connections:
         del connections[sid]
+    broadcaster.forget(sid)
     
-    # Handle lobby disconnection
-    if not game_state['game_started']:
-        # Remove from lobby
-        lobby_state['players'] = [p for p in lobby_state['players'] if p['sid'] != sid]
-        
-        # Transfer host if needed
-        if lobby_state['host_sid'] == sid and lobby_state['players']:
-            lobby_state['host_sid'] = lobby_state['players'][0]['sid']
-            emit('hostTransferred', {'newHost': lobby_state['host_sid']}, broadcast=True)
-        
-        emit('lobbyUpdate', {
-            'players': lobby_state['players'],
-            'host': lobby_state['host_sid']
-        }, broadcast=True)
-    
-    # Handle in-game disconnection
-    else:
-        if sid in users:
-            # Auto-submit default actions if player was active
-            if users[sid].get('status') in ['active', 'compromised', 'burned']:
-                auto_submit_defaults(sid)
-            
-            # Mark as disconnected but keep in game
-            users[sid]['disconnected'] = True
+    room = room_manager.room_for_sid(sid)
+    if room is not None:
+        leave_room(room.room_id)
+        # Forget the socket once the room has processed its departure
+        room.post('leave', sid, reply=lambda _: room_manager.release(sid))
 
 @socketio.on('joinLobby')
 def handle_join_lobby(data):
-    """Handle player joining the lobby"""
+    """Handle player joining a room's lobby"""
     from flask import request
     sid = request.sid
-    codename = data.get('codename', '').strip()
-    
-    # Validate codename
-    if not codename or len(codename) > 16:
-        emit('error', {'message': 'Codename must be 1-16 characters'})
-        return
     
-    # Check if codename is already taken
-    if any(p['codename'].lower() == codename.lower() for p in lobby_state['players']):
-        emit('error', {'message': 'Codename already taken'})
+    # One room per socket
+    if room_manager.room_for_sid(sid) is not None:
+        emit('error', {'message': 'Already in a game room'})
         return
     
-    # Check if game already started
-    if game_state['game_started']:
-        emit('error', {'message': 'Game already in progress'})
+    room_id = normalize_room_id(data.get('room'))
+    if room_id is None:
+        emit('error', {'message': 'Room name must be 1-32 letters, digits, - or _'})
         return
-    
-    # Check player limit
-    if len(lobby_state['players']) >= 6:
-        emit('error', {'message': 'Lobby is full (6 players max)'})
+
+    # The router sends each room's connections to its worker; anything else connected without ?room=
+    if not room_manager.owns(room_id):
+        emit('error', {'message': 'This room is hosted elsewhere; open the game with ?room=' + room_id})
         return
     
-    # Add player to lobby
-    player_data = {
-        'sid': sid,
-        'codename': codename,
-        'ready': False
-    }
-    lobby_state['players'].append(player_data)
-    
-    # Set first player as host
-    if not lobby_state['host_sid']:
-        lobby_state['host_sid'] = sid
-    
-    # Initialize user data
-    users[sid] = {
-        'codename': codename,
-        'status': 'active',
-        'ip': 10,  # Starting IP
-        'gadgets': [],
-        'intel': [],
-        'master_plan': None,
-        'alliances': [],
-        'disconnected': False
-    }
-    
-    emit('lobbyJoined', {
-        'success': True,
-        'codename': codename,
-        'isHost': sid == lobby_state['host_sid']
-    })
+    room = room_manager.get_or_create(room_id)
     
-    # Broadcast lobby update
-    emit('lobbyUpdate', {
-        'players': lobby_state['players'],
-        'host': lobby_state['host_sid']
-    }, broadcast=True)
+    # Join the Socket.IO room first so the joiner receives the lobby broadcast, and claim
+    # the socket now so a second joinLobby is refused while this one waits in the mailbox
+    join_room(room.room_id)
+    room_manager.assign(sid, room.room_id)
 
-@socketio.on('startGame')
-def handle_start_game():
-    """Handle game start request (host only)"""
+    def joined(accepted):
+        if not accepted:
+            socketio.server.leave_room(sid, room.room_id)
+            room_manager.release(sid)
+
+    room.post('join', sid, data.get('codename', ''), reply=joined)
+
+@socketio.on('resumeSession')
+def handle_resume_session(data):
+    """Handle a reconnecting player presenting the resume token from lobbyJoined"""
     from flask import request
     sid = request.sid
-    
-    # Validate host
-    if sid != lobby_state['host_sid']:
-        emit('error', {'message': 'Only the host can start the game'})
+
+    if room_manager.room_for_sid(sid) is not None or not isinstance(data, dict):
+        emit('error', {'message': 'Already in a game room'})
         return
-    
-    # Validate minimum players
-    if len(lobby_state['players']) < 2:
-        emit('error', {'message': 'Need at least 2 players to start'})
+
+    room_id = normalize_room_id(data.get('room'))
+    room = room_manager.get_room(room_id) if room_id is not None else None
+    if room is None:
+        emit('sessionExpired', {'room': data.get('room')})
         return
-    
-    # Initialize game
-    initialize_game()
-    
-    emit('gameStarted', {
-        'players': [{'codename': users[p['sid']]['codename'], 'sid': p['sid']} 
-                   for p in lobby_state['players']],
-        'roundNumber': game_state['round_number']
-    }, broadcast=True)
-
-def initialize_game():
-    """Initialize game state for all players"""
-    game_state['game_started'] = True
-    game_state['phase'] = 'planning'
-    game_state['round_number'] = 1
-    game_state['timer_start'] = time.time()
-    game_state['submitted_actions'] = {}
-    game_state['banner_responses'] = {}
-    
-    # Initialize strategic assets
-    game_state['assets'] = {
-        'central_server': None,
-        'comm_tower': None, 
-        'data_vault': None,
-        'operations_center': None,
-        'safe_house_network': None
-    }
-    
-    # Assign Master Plans to all players
-    player_codenames = [users[p['sid']]['codename'] for p in lobby_state['players']]
-    player_count = len(player_codenames)
-    
-    master_plan_assignments = master_plan_manager.assign_master_plans(player_codenames, player_count)
-    
-    # Update user data with Master Plan assignments
-    for player_data in lobby_state['players']:
-        codename = users[player_data['sid']]['codename']
-        if codename in master_plan_assignments:
-            users[player_data['sid']]['master_plan'] = master_plan_assignments[codename]
-    
-    print(f"Game started with {len(lobby_state['players'])} players")
-    print(f"Master Plans assigned: {master_plan_assignments}")
+
+    join_room(room.room_id)
+    room_manager.assign(sid, room.room_id)
+
+    def resumed(old_sid):
+        if old_sid is None:
+            socketio.server.leave_room(sid, room.room_id)
+            room_manager.release(sid)
+        elif old_sid != sid:
+            # The seat moved; the old socket, if it is somehow still open, no longer plays
+            socketio.server.leave_room(old_sid, room.room_id)
+            room_manager.release(old_sid)
+
+    room.post('resume_session', sid, data.get('token'), data.get('version'), data.get('seq'), reply=resumed)
+
+@socketio.on('startGame')
+def handle_start_game():
+    """Handle game start request (host only)"""
+    from flask import request
+    room = current_room(request.sid)
+    if room:
+        room.post('start_game', request.sid)
 
 @socketio.on('submitAction')
 def handle_submit_action(data):
     """Handle player action submission during planning phase"""
     from flask import request
-    sid = request.sid
-    
-    # Validate game state
-    if game_state['phase'] != 'planning':
-        emit('error', {'message': 'Not in planning phase'})
-        return
-    
-    # Validate player
-    if sid not in users or users[sid].get('status') not in ['active', 'compromised', 'burned']:
-        emit('error', {'message': 'Cannot submit action in current status'})
-        return
-    
-    # Validate and store action
-    action = {
-        'offense': data.get('offense'),
-        'defense': data.get('defense'), 
-        'target': data.get('target'),
-        'ip_spend': max(0, min(data.get('ip_spend', 0), users[sid]['ip'])),
-        'banner_message': data.get('banner_message', '').strip()[:50] if data.get('banner_message') else ''
-    }
-    
-    game_state['submitted_actions'][sid] = action
-    
-    emit('actionSubmitted', {'success': True})
-    
-    # Broadcast submission status (without revealing actions)
-    submitted_count = len(game_state['submitted_actions'])
-    total_active = len([u for u in users.values() 
-                       if u.get('status') in ['active', 'compromised', 'burned']])
-    
-    emit('playerSubmitted', {
-        'submitted': submitted_count,
-        'total': total_active
-    }, broadcast=True)
-    
-    # Check if all players submitted
-    if submitted_count >= total_active:
-        start_resolution_phase()
-
-def auto_submit_defaults(sid):
-    """Auto-submit default actions for disconnected/timed-out players"""
-    if sid not in game_state['submitted_actions']:
-        game_state['submitted_actions'][sid] = {
-            'offense': 'surveillance',  # Safe default
-            'defense': 'safe_house',    # Defensive default
-            'target': None,
-            'ip_spend': 0,
-            'banner_message': ''
-        }
-
-def start_resolution_phase():
-    """Start the resolution phase after all actions submitted"""
-    game_state['phase'] = 'resolution'
-    
-    # Auto-submit defaults for any missing players
-    active_players = [sid for sid, user in users.items() 
-                     if user.get('status') in ['active', 'compromised', 'burned']]
-    
-    for sid in active_players:
-        if sid not in game_state['submitted_actions']:
-            auto_submit_defaults(sid)
-    
-    # Resolve the turn using action resolver
-    try:
-        turn_results = resolve_turn(users, game_state['submitted_actions'], 
-                                  game_state['round_number'], game_state['assets'])
-        game_state['turn_results'] = turn_results
-        
-        # Update Master Plan progress based on turn results
-        for result in turn_results:
-            if result['action_type'] in ['assassination_success', 'exposure_success', 'sabotage_success']:
-                codename = result['codename']
-                master_plan_completion = master_plan_manager.update_progress(
-                    codename, 
-                    result['action_type'], 
-                    result, 
-                    game_state['round_number'],
-                    {users[p['sid']]['codename']: users[p['sid']] for p in lobby_state['players']}
-                )
-                
-                # Handle Master Plan completion
-                if master_plan_completion:
-                    if master_plan_completion['reward_type'] == 'instant_win':
-                        # Immediate victory
-                        game_state['phase'] = 'game_over'
-                        emit('gameOver', {
-                            'winners': [master_plan_completion['codename']],
-                            'condition': 'Mission Completion',
-                            'description': f"{master_plan_completion['codename']} completed {master_plan_completion['plan_name']}!",
-                            'masterPlan': master_plan_completion,
-                            'finalResults': turn_results,
-                            'assets': game_state['assets']
-                        }, broadcast=True)
-                        return
-                    elif master_plan_completion['reward_type'] == 'ip_bonus':
-                        # Award IP bonus
-                        for p in lobby_state['players']:
-                            if users[p['sid']]['codename'] == codename:
-                                users[p['sid']]['ip'] += master_plan_completion['reward_value']
-                                break
-        
-        # Apply round end effects
-        apply_round_end_effects(users, game_state['assets'])
-        
-        # Process alliance round end effects
-        expired_alliances = alliance_manager.process_round_end()
-        
-        # Check victory conditions
-        victory = check_victory_conditions(users, game_state['assets'])
-        
-        # Check alliance victory conditions
-        if not victory:
-            alliance_victory = alliance_manager.check_alliance_victory(users, game_state['assets'])
-            if alliance_victory and alliance_victory.get('trigger_final_showdown'):
-                # Start Final Showdown
-                participants = alliance_victory['winners']
-                showdown_data = alliance_manager.start_final_showdown(participants)
-                
-                # Award +3 IP to each participant
-                for participant in participants:
-                    for p in lobby_state['players']:
-                        if users[p['sid']]['codename'] == participant:
-                            users[p['sid']]['ip'] += 3
-                            break
-                
-                # Notify clients of Final Showdown
-                emit('finalShowdownStarted', {
-                    'alliance_victory': alliance_victory,
-                    'showdown': showdown_data
-                }, broadcast=True)
-                
-                game_state['phase'] = 'final_showdown'
-                return
-        
-        if victory:
-            # Game over!
-            game_state['phase'] = 'game_over'
-            emit('gameOver', {
-                'winners': victory['winners'],
-                'condition': victory['condition'],
-                'description': victory['description'],
-                'finalResults': turn_results,
-                'assets': game_state['assets']
-            }, broadcast=True)
-            return
-        
-        # Broadcast turn results
-        emit('turnResult', {
-            'round': game_state['round_number'],
-            'results': turn_results,
-            'players': get_player_summaries(),
-            'assets': game_state['assets'],
-            'expired_alliances': expired_alliances
-        }, broadcast=True)
-        
-        # Advance to next round after a delay
-        advance_to_next_round()
-        
-    except Exception as e:
-        print(f"Error resolving turn: {e}")
-        emit('error', {'message': 'Turn resolution failed'}, broadcast=True)
-        advance_to_next_round()
-
-def get_player_summaries():
-    """Get summary data for all players"""
-    summaries = []
-    for sid, user in users.items():
-        summaries.append({
-            'codename': user['codename'],
-            'status': user['status'],
-            'ip': user['ip'],
-            'gadgets': user['gadgets'],
-            'intel_count': len(user.get('intel', [])),
-            'disconnected': user.get('disconnected', False)
-        })
-    return summaries
-
-def advance_to_next_round():
-    """Advance to the next planning round"""
-    game_state['round_number'] += 1
-    game_state['phase'] = 'planning'
-    game_state['timer_start'] = time.time()
-    game_state['submitted_actions'] = {}
-    game_state['banner_responses'] = {}
-    
-    emit('nextRound', {
-        'roundNumber': game_state['round_number']
-    }, broadcast=True)
+    room = current_room(request.sid)
+    if room:
+        room.post('submit_action', request.sid, data)
 
 @socketio.on('requestGameState')  
-def handle_request_game_state():
-    """Handle reconnection game state request"""
+def handle_request_game_state(data=None):
+    """Handle reconnection game state request (optionally with the client's state version)"""
     from flask import request
-    sid = request.sid
-    
-    if sid in users:
-        users[sid]['disconnected'] = False
-        
-        emit('gameStateSnapshot', {
-            'gameStarted': game_state['game_started'],
-            'phase': game_state['phase'], 
-            'roundNumber': game_state['round_number'],
-            'players': [{'codename': users[p['sid']]['codename'], 
-                        'sid': p['sid'],
-                        'status': users[p['sid']]['status'],
-                        'ip': users[p['sid']]['ip']} 
-                       for p in lobby_state['players'] if p['sid'] in users],
-            'userState': users[sid]
-        })
+    room = room_manager.room_for_sid(request.sid)
+    if room:
+        data = data if isinstance(data, dict) else {}
+        if data.get('seq') is not None:
+            # Resyncing after the send queue dropped events: replay them if the room still can
+            room.post('catch_up', request.sid, data.get('version'), data.get('seq'))
+        else:
+            room.post('send_game_state', request.sid, data.get('version'))
+
+@socketio.on('ackState')
+def handle_ack_state(data):
+    """Handle a client acknowledging the state version it has applied"""
+    from flask import request
+    room = room_manager.room_for_sid(request.sid)
+    if room and isinstance(data, dict):
+        room.post('acknowledge_state', request.sid, data.get('version'))
 
 @socketio.on('getGameOptions')
 def handle_get_game_options():
     """Send available offenses and defenses based on player count"""
     from flask import request
-    player_count = len(lobby_state['players'])
-    
-    emit('gameOptions', {
-        'offenses': get_available_offenses(player_count),
-        'defenses': get_available_defenses(player_count),
-        'targets': [p['codename'] for p in lobby_state['players'] 
-                   if p['sid'] != request.sid]
-    })
+    room = current_room(request.sid)
+    if room:
+        room.post('send_game_options', request.sid)
 
 @socketio.on('bannerChoice')
 def handle_banner_choice(data):
     """Handle banner choice during information warfare"""
     from flask import request
-    sid = request.sid
-    choice = data.get('choice')  # 'believe' or 'ignore'
-    banner_caster = data.get('caster')
-    
-    if sid not in users:
-        return
-    
-    game_state['banner_responses'][sid] = {
-        'choice': choice,
-        'caster': banner_caster,
-        'timestamp': time.time()
-    }
-    
-    # Check if all banner responses collected
-    # This is a simplified version - full implementation would track who needs to respond
-    emit('bannerResponseRecorded', {'success': True})
+    room = room_manager.room_for_sid(request.sid)
+    if room:
+        room.post('banner_choice', request.sid, data)
 
 @socketio.on('submitShowdownAction')
 def handle_submit_showdown_action(data):
     """Handle Final Showdown action submission"""
     from flask import request
-    sid = request.sid
-    
-    # Validate game state
-    if game_state['phase'] != 'final_showdown':
-        emit('error', {'message': 'Not in Final Showdown phase'})
-        return
-    
-    # Validate player
-    if sid not in users:
-        emit('error', {'message': 'Player not found'})
-        return
-    
-    codename = users[sid]['codename']
-    action = data.get('action')
-    
-    # Submit action to alliance manager
-    success = alliance_manager.submit_showdown_action(codename, action)
-    
-    if success:
-        emit('showdownActionSubmitted', {'success': True})
-        
-        # Check if both participants have submitted
-        if len(alliance_manager.showdown_actions) >= 2:
-            # Resolve Final Showdown
-            try:
-                showdown_result = alliance_manager.resolve_final_showdown(users)
-                
-                # Game over with Final Showdown results
-                game_state['phase'] = 'game_over'
-                emit('gameOver', {
-                    'winners': [showdown_result['winner']],
-                    'condition': 'Alliance Victory - Final Showdown',
-                    'description': showdown_result['description'],
-                    'finalShowdown': showdown_result,
-                    'finalRankings': showdown_result['final_rankings']
-                }, broadcast=True)
-                
-            except Exception as e:
-                print(f"Error resolving Final Showdown: {e}")
-                emit('error', {'message': 'Final Showdown resolution failed'}, broadcast=True)
-    else:
-        emit('error', {'message': 'Failed to submit showdown action'})
+    room = current_room(request.sid)
+    if room:
+        room.post('submit_showdown_action', request.sid, data)
 
 @socketio.on('getMasterPlan')
 def handle_get_master_plan():
     """Send player's Master Plan information"""
     from flask import request
-    sid = request.sid
-    
-    if sid in users:
-        codename = users[sid]['codename']
-        plan_info = master_plan_manager.get_player_plan_info(codename)
-        
-        if plan_info:
-            emit('masterPlanInfo', plan_info)
-        else:
-            emit('error', {'message': 'Master Plan not found'})
+    room = room_manager.room_for_sid(request.sid)
+    if room:
+        room.post('send_master_plan', request.sid)
 
 @socketio.on('getAlliances')
 def handle_get_alliances():
     """Send alliance information to client"""
     from flask import request
-    sid = request.sid
-    
-    if sid in users:
-        codename = users[sid]['codename']
-        player_alliances = alliance_manager.get_player_alliances(codename)
-        alliance_summary = alliance_manager.get_alliance_summary()
-        
-        emit('allianceInfo', {
-            'playerAlliances': player_alliances,
-            'allAlliances': alliance_summary
-        })
+    room = room_manager.room_for_sid(request.sid)
+    if room:
+        room.post('send_alliances', request.sid)
 
 @socketio.on('createAlliance')
 def handle_create_alliance(data):
     """Handle alliance creation request"""
     from flask import request
-    sid = request.sid
-    
-    if sid not in users:
-        emit('error', {'message': 'Player not found'})
-        return
-    
-    initiator = users[sid]['codename']
-    target = data.get('target')
-    alliance_type = data.get('type', 'non_aggression')
-    
-    # Validate target
-    target_found = False
-    for p in lobby_state['players']:
-        if users[p['sid']]['codename'] == target:
-            target_found = True
-            break
-    
-    if not target_found:
-        emit('error', {'message': 'Target player not found'})
-        return
-    
-    # Check if alliance can be formed
-    can_form, reason = alliance_manager.can_form_alliance(initiator, target)
-    
-    if not can_form:
-        emit('error', {'message': reason})
-        return
-    
-    # Create alliance
-    alliance_id = alliance_manager.create_alliance(
-        initiator, target, alliance_type, game_state['round_number']
-    )
-    
-    # Broadcast alliance creation
-    emit('allianceCreated', {
-        'allianceId': alliance_id,
-        'members': [initiator, target],
-        'type': alliance_type,
-        'round': game_state['round_number']
-    }, broadcast=True)
+    room = current_room(request.sid)
+    if room:
+        room.post('create_alliance', request.sid, data)
 
 if __name__ == '__main__':
+    if worker_count > 1:
+        # Started by launcher.py, which routes players to this worker
+        port = int(os.environ['JAMES_BLAND_PORT'])
+        print(f"Worker {worker_index + 1}/{worker_count} listening on 127.0.0.1:{port}")
+        socketio.run(app, host='127.0.0.1', port=port)
+        raise SystemExit(0)
+
     lan_ip = get_lan_ip()
     print(f"James Bland: ACME Edition Server")
     print(f"Server listening on 0.0.0.0:5000 (LAN IP: {lan_ip})")
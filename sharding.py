@@ -0,0 +1,276 @@
+#!/usr/bin/env python3
+"""
+Room Sharding for James Bland: ACME Edition
+Splits rooms across worker processes that share nothing: a stable room to
+worker mapping, a local router that pins each connection to the worker that
+owns its room, and a Unix-socket bus that shares the room directory
+"""
+
+import json
+import os
+import socket
+import time
+import zlib
+from typing import Any, Callable, Dict, List, Tuple
+from urllib.parse import parse_qs, urlsplit
+
+from game_room import normalize_room_id, DEFAULT_ROOM_ID
+
+MAX_REQUEST_HEAD = 16384  # bytes the router reads looking for the end of the HTTP headers
+BUS_MAX_DATAGRAM = 65507
+
+
+def shard_for(room_id: str, workers: int) -> int:
+    """Worker index that owns a room (the same in every process and across restarts)"""
+    if workers <= 1:
+        return 0
+    return zlib.crc32(room_id.encode('utf-8')) % workers
+
+
+def room_from_request(head: bytes) -> str:
+    """
+    Room an HTTP request is for
+
+    Taken from the `room` query parameter of the request line, else of the
+    Referer (so the page's scripts and images follow the page). Socket.IO
+    repeats the connection query on every polling request and on the
+    websocket upgrade, so a whole session lands on one worker. Requests with
+    no valid room go to the default room's worker.
+    """
+    lines = head.split(b'\r\n')
+    parts = lines[0].decode('latin-1').split(' ')
+    targets = [parts[1]] if len(parts) >= 2 else []
+    for line in lines[1:]:
+        name, _, value = line.decode('latin-1').partition(':')
+        if name.strip().lower() == 'referer':
+            targets.append(value.strip())
+
+    for target in targets:
+        rooms = parse_qs(urlsplit(target).query).get('room')
+        if rooms:
+            return normalize_room_id(rooms[0]) or DEFAULT_ROOM_ID
+    return DEFAULT_ROOM_ID
+
+
+def is_upgrade(head: bytes) -> bool:
+    """Whether a request head asks to switch protocols (the websocket handshake)"""
+    for line in head.partition(b'\r\n\r\n')[0].split(b'\r\n')[1:]:
+        name, _, value = line.partition(b':')
+        if name.strip().lower() == b'upgrade' and value.strip():
+            return True
+    return False
+
+
+def close_after_response(head: bytes) -> bytes:
+    """
+    A request head rewritten to `Connection: close`
+
+    The worker then closes the connection once it has answered, and sends
+    `Connection: close` on the response, so the client's next request comes
+    in on a new connection that the router routes afresh. A head cut off
+    before the end of its headers is returned unchanged.
+    """
+    header, separator, rest = head.partition(b'\r\n\r\n')
+    if not separator:
+        return head
+    lines = [line for line in header.split(b'\r\n')
+             if line.partition(b':')[0].strip().lower() not in (b'connection', b'keep-alive')]
+    lines.append(b'Connection: close')
+    return b'\r\n'.join(lines) + separator + rest
+
+
+def bus_path(directory: str, worker: int) -> str:
+    """Unix socket a worker receives directory updates on"""
+    return os.path.join(directory, f'worker-{worker}.sock')
+
+
+class DirectoryBus:
+    """
+    Cross-worker room directory over Unix datagram sockets
+
+    Every worker binds its own socket and periodically sends its room
+    summaries to every other worker's socket. There is no broker: a worker
+    that stops publishing simply ages out of everyone else's directory.
+    """
+
+    def __init__(self, directory: str, worker: int, workers: int, interval: float = 1.0,
+                 clock: Callable[[], float] = time.monotonic):
+        self.directory = directory
+        self.worker = worker
+        self.workers = workers
+        self.interval = interval
+        self.clock = clock
+        self.remote = {}  # worker -> (received_at, rooms)
+        self.running = False
+
+        # Metrics
+        self.published = 0
+        self.received = 0
+        self.send_errors = 0
+
+        os.makedirs(directory, exist_ok=True)
+        path = bus_path(directory, worker)
+        if os.path.exists(path):
+            os.unlink(path)
+        self.socket = socket.socket(socket.AF_UNIX, socket.SOCK_DGRAM)
+        self.socket.bind(path)
+        self.socket.setblocking(False)
+
+    def publish(self, rooms: List[Dict[str, Any]]):
+        """Send this worker's room summaries to every other worker"""
+        message = json.dumps({'worker': self.worker, 'rooms': rooms}).encode('utf-8')
+        if len(message) > BUS_MAX_DATAGRAM:
+            # Send as many rooms as fit rather than dropping the update
+            rooms = rooms[:max(1, len(rooms) * BUS_MAX_DATAGRAM // len(message))]
+            message = json.dumps({'worker': self.worker, 'rooms': rooms, 'truncated': True}).encode('utf-8')
+        for peer in range(self.workers):
+            if peer == self.worker:
+                continue
+            try:
+                self.socket.sendto(message, bus_path(self.directory, peer))
+            except OSError:
+                # Peer not up yet (or restarting): it gets the next update
+                self.send_errors += 1
+        self.published += 1
+
+    def poll(self) -> int:
+        """Read every pending update without blocking; returns how many were read"""
+        count = 0
+        while True:
+            try:
+                data = self.socket.recv(BUS_MAX_DATAGRAM)
+            except (BlockingIOError, InterruptedError):
+                return count
+            try:
+                message = json.loads(data)
+                self.remote[int(message['worker'])] = (self.clock(), message['rooms'])
+            except (ValueError, KeyError, TypeError):
+                continue
+            count += 1
+            self.received += 1
+
+    def rooms(self, local: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Room directory for the whole host: this worker's rooms plus fresh remote ones"""
+        stale_before = self.clock() - 3 * self.interval
+        merged = [dict(room, worker=self.worker) for room in local]
+        for worker, (received_at, rooms) in sorted(self.remote.items()):
+            if received_at >= stale_before:
+                merged.extend(dict(room, worker=worker) for room in rooms)
+        return merged
+
+    def run(self, local_rooms: Callable[[], List[Dict[str, Any]]], sleep: Callable[[float], Any]):
+        """Publish and receive loop for a background task (e.g. socketio.sleep)"""
+        self.running = True
+        while self.running:
+            self.poll()
+            self.publish(local_rooms())
+            sleep(self.interval)
+
+    def stop(self):
+        """Stop the run() loop after its current pass"""
+        self.running = False
+
+    def close(self):
+        """Close and remove this worker's socket"""
+        self.socket.close()
+        try:
+            os.unlink(bus_path(self.directory, self.worker))
+        except OSError:
+            pass
+
+    def stats(self) -> Dict[str, Any]:
+        """Bus counters"""
+        return {
+            'worker': self.worker,
+            'workers': self.workers,
+            'published': self.published,
+            'received': self.received,
+            'sendErrors': self.send_errors,
+            'peers': sorted(self.remote)
+        }
+
+
+class Router:
+    """
+    Local TCP router in front of the workers
+
+    Reads each new connection's HTTP request head, picks the worker that owns
+    the requested room and then splices bytes both ways. Each Socket.IO
+    request carries the room in its query, so no session table is needed.
+    Only websocket upgrades stay spliced for the life of the connection;
+    every other request is sent with `Connection: close`, since a keep-alive
+    connection would carry the next request (say /?room=B, or a poll for
+    another table) to the first request's worker unrouted.
+    Runs on eventlet green threads.
+    """
+
+    def __init__(self, backends: List[Tuple[str, int]]):
+        self.backends = backends
+
+        # Metrics
+        self.connections = [0] * len(backends)
+        self.failures = 0
+
+    def pick(self, head: bytes) -> int:
+        """Index of the backend for a request head"""
+        return shard_for(room_from_request(head), len(self.backends))
+
+    def serve(self, listener):
+        """Accept connections forever (listener from eventlet.listen)"""
+        import eventlet
+        while True:
+            client, _ = listener.accept()
+            eventlet.spawn_n(self.handle, client)
+
+    def handle(self, client):
+        """Route one client connection"""
+        import eventlet
+        head = b''
+        try:
+            while b'\r\n\r\n' not in head and len(head) < MAX_REQUEST_HEAD:
+                chunk = client.recv(4096)
+                if not chunk:
+                    client.close()
+                    return
+                head += chunk
+
+            index = self.pick(head)
+            if not is_upgrade(head):
+                head = close_after_response(head)
+            upstream = eventlet.connect(self.backends[index])
+        except OSError:
+            self.failures += 1
+            client.close()
+            return
+
+        self.connections[index] += 1
+        upstream.sendall(head)
+        replies = eventlet.spawn(_pipe, upstream, client)
+        _pipe(client, upstream)
+        # Close only once neither direction is reading: eventlet fails a socket
+        # closed under a waiting reader, and whichever socket reuses its descriptor
+        replies.wait()
+        client.close()
+        upstream.close()
+
+    def stats(self) -> Dict[str, Any]:
+        """Connections routed to each worker"""
+        return {'connections': list(self.connections), 'failures': self.failures}
+
+
+def _pipe(source, destination):
+    """Copy bytes until either side closes, then shut both down, which ends the other direction's pipe"""
+    try:
+        while True:
+            data = source.recv(65536)
+            if not data:
+                break
+            destination.sendall(data)
+    except OSError:
+        pass
+    finally:
+        for sock in (source, destination):
+            try:
+                sock.shutdown(socket.SHUT_RDWR)
+            except OSError:
+                pass
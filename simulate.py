@@ -0,0 +1,533 @@
+#!/usr/bin/env python3
+"""
+Monte Carlo Simulator for James Bland: ACME Edition
+Plays complete games headlessly (no Flask or Socket.IO) through the same
+resolver, Master Plan and alliance code as the server, across a process pool,
+to evaluate balance changes to the interaction matrix
+
+Usage:
+    python simulate.py --games 100000 --players 6 --policy random
+    python simulate.py --games 20000 --policy random,scripted --script aggressive.json
+    python simulate.py --games 20000 --matrix overrides.json --json results.json
+    python simulate.py --games 1000000 --engine batch --matrix overrides.json
+"""
+
+import argparse
+import copy
+import json
+import os
+import time
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Callable, Dict, List, Optional, Sequence
+
+from interaction_matrix import (INTERACTION_MATRIX, OFFENSES, DEFENSES, compile_matrix, get_default_outcome,
+                                get_available_offenses, get_available_defenses)
+from action_resolver import resolve_turn, check_victory_conditions, apply_round_end_effects, STRATEGIC_ASSETS
+from master_plans import MasterPlanManager, MASTER_PLAN_ACTIONS
+from alliance_victory import AllianceManager
+from player_registry import PlayerRegistry, ACTIVE_STATUSES
+from player_state import PlayerState
+from game_rng import GameRNG, derive_seed, new_seed
+
+DEFAULT_MAX_ROUNDS = 30
+GAMES_PER_TASK = 200
+GAMES_PER_BATCH = 2000
+
+# Action policies
+# A policy decides for one seat; it gets its own random stream so swapping
+# policies never shifts the draws the resolver makes for the same seed.
+
+class RandomPolicy:
+    """Uniformly random legal actions, with the occasional safe turn and alliance"""
+
+    def __init__(self, rng, safe_turn_chance: float = 0.15, alliance_chance: float = 0.05):
+        self.rng = rng
+        self.safe_turn_chance = safe_turn_chance
+        self.alliance_chance = alliance_chance
+
+    def choose_action(self, game: 'SimulatedGame', codename: str) -> Dict[str, Any]:
+        rng = self.rng
+        targets = game.opponents(codename)
+        if not targets or rng.random() < self.safe_turn_chance:
+            offense = ''
+        else:
+            offense = rng.choice(game.offenses)
+        ip = game.users.get_by_codename(codename)['ip']
+        return {
+            'offense': offense,
+            'defense': rng.choice(game.defenses),
+            'target': rng.choice(targets) if offense else None,
+            'ip_spend': rng.randint(0, max(0, min(2, ip))),
+            'banner_message': ''
+        }
+
+    def propose_alliance(self, game: 'SimulatedGame', codename: str) -> Optional[Dict[str, Any]]:
+        targets = game.opponents(codename)
+        if not targets or self.rng.random() >= self.alliance_chance:
+            return None
+        return {'target': self.rng.choice(targets),
+                'type': self.rng.choice(['non_aggression', 'coordinated_operation'])}
+
+    def showdown_action(self, game: 'SimulatedGame', codename: str) -> str:
+        return self.rng.choice(['assassination', 'sabotage'])
+
+
+class ScriptedPolicy(RandomPolicy):
+    """
+    Plays a fixed script of actions, one per round, repeating from the start
+
+    Each script entry is a partial action; missing fields are filled in
+    randomly. 'target' may be a codename or one of 'random', 'richest' and
+    'poorest' (chosen among active opponents). Example:
+
+        {"actions": [{"offense": "network_attack", "defense": "safe_house", "target": "richest"},
+                     {"offense": "", "defense": "underground"}],
+         "alliance": {"round": 2, "type": "non_aggression", "target": "poorest"},
+         "showdown": "assassination"}
+    """
+
+    def __init__(self, rng, script: Optional[Dict[str, Any]] = None):
+        super().__init__(rng, alliance_chance=0.0)
+        self.script = script or {'actions': [{'offense': '', 'defense': 'safe_house'}]}
+
+    def pick_target(self, game: 'SimulatedGame', codename: str, selector: Optional[str]) -> Optional[str]:
+        targets = game.opponents(codename)
+        if not targets:
+            return None
+        if selector in (None, 'random'):
+            return self.rng.choice(targets)
+        if selector in ('richest', 'poorest'):
+            by_ip = sorted(targets, key=lambda t: (game.users.get_by_codename(t)['ip'], t))
+            return by_ip[-1] if selector == 'richest' else by_ip[0]
+        return selector if selector in targets else self.rng.choice(targets)
+
+    def choose_action(self, game: 'SimulatedGame', codename: str) -> Dict[str, Any]:
+        actions = self.script.get('actions') or [{}]
+        step = actions[(game.round_number - 1) % len(actions)]
+        action = super().choose_action(game, codename)
+        action.update({key: value for key, value in step.items() if key != 'target'})
+        action['target'] = self.pick_target(game, codename, step.get('target')) if action['offense'] else None
+        return action
+
+    def propose_alliance(self, game: 'SimulatedGame', codename: str) -> Optional[Dict[str, Any]]:
+        alliance = self.script.get('alliance')
+        if not alliance or alliance.get('round', 1) != game.round_number:
+            return None
+        target = self.pick_target(game, codename, alliance.get('target'))
+        if target is None:
+            return None
+        return {'target': target, 'type': alliance.get('type', 'non_aggression')}
+
+    def showdown_action(self, game: 'SimulatedGame', codename: str) -> str:
+        return self.script.get('showdown') or super().showdown_action(game, codename)
+
+
+# Policy name -> factory(rng, script); register_policy() adds more
+POLICIES: Dict[str, Callable[..., Any]] = {
+    'random': lambda rng, script=None: RandomPolicy(rng),
+    'passive': lambda rng, script=None: ScriptedPolicy(rng, {'actions': [{'offense': ''}]}),
+    'scripted': lambda rng, script=None: ScriptedPolicy(rng, script),
+}
+
+
+def register_policy(name: str, factory: Callable[..., Any]):
+    """Make a policy available by name; factory(rng, script) returns an object with
+    choose_action, propose_alliance and showdown_action"""
+    POLICIES[name] = factory
+
+
+# Headless game
+
+class SimulatedGame:
+    """
+    One complete game with no sockets, timers or logging
+
+    Mirrors game_room.resolve_round: resolve the turn, update Master Plans,
+    apply round end effects and alliance expiry, then check individual and
+    alliance victory (playing out a Final Showdown when triggered). Every
+    draw comes from a GameRNG, so a seed reproduces the whole game.
+    """
+
+    def __init__(self, seed: int, players: int, policies: Sequence[str] = ('random',),
+                 script: Optional[Dict[str, Any]] = None, table=None,
+                 max_rounds: int = DEFAULT_MAX_ROUNDS):
+        self.rng = GameRNG(seed)
+        self.table = table
+        self.max_rounds = max_rounds
+        self.round_number = 1
+        self.assets = dict.fromkeys(STRATEGIC_ASSETS)
+        self.offenses = get_available_offenses(players)
+        self.defenses = get_available_defenses(players)
+
+        self.users = PlayerRegistry()
+        self.seats = {}  # codename -> (seat, policy name, policy)
+        for seat in range(players):
+            codename = f'Agent_{seat}'
+            self.users.add(f'sid{seat}', PlayerState(codename, status='active', ip=10))  # Starting IP
+            name = policies[seat % len(policies)]
+            self.seats[codename] = (seat, name, POLICIES[name](self.rng.stream('policy', seat), script))
+
+        self.master_plan_manager = MasterPlanManager()
+        self.alliance_manager = AllianceManager()
+        codenames = list(self.seats)
+        plans = self.master_plan_manager.assign_master_plans(
+            codenames, players, rng=self.rng.stream('master_plans'))
+        for codename, plan in plans.items():
+            self.users.get_by_codename(codename)['master_plan'] = plan
+
+        self.ip_totals = []  # total IP across all players after each round
+
+    def policy(self, codename: str):
+        return self.seats[codename][2]
+
+    def opponents(self, codename: str) -> List[str]:
+        """Opponents that can still be targeted, in seat order (status sets are unordered)"""
+        return [u['codename'] for u in self.users.values()
+                if u.can_act and u['codename'] != codename]
+
+    def play(self) -> Dict[str, Any]:
+        """Play to a victory or the round limit and summarize the game"""
+        victory = None
+        while victory is None and self.round_number <= self.max_rounds:
+            victory = self.play_round()
+            self.ip_totals.append(sum(u['ip'] for u in self.users.values()))
+            if victory is None:
+                self.round_number += 1
+
+        if victory is None:
+            rounds = self.max_rounds
+            victory = {'winners': [], 'condition': 'Round Limit'}
+        else:
+            rounds = self.round_number
+
+        return {
+            'rounds': rounds,
+            'condition': victory['condition'],
+            'winners': list(victory['winners']),
+            'winner_seats': [self.seats[w][0] for w in victory['winners'] if w in self.seats],
+            'winner_policies': [self.seats[w][1] for w in victory['winners'] if w in self.seats],
+            'players': len(self.users),
+            'ip_totals': self.ip_totals
+        }
+
+    def play_round(self) -> Optional[Dict[str, Any]]:
+        users = self.users
+        round_number = self.round_number
+        acting = sorted(users.sids_with_status(*ACTIVE_STATUSES))
+
+        # Planning: alliances first, then one action per seat that can act
+        for sid in acting:
+            codename = users[sid]['codename']
+            proposal = self.policy(codename).propose_alliance(self, codename)
+            if proposal:
+                can_form, _ = self.alliance_manager.can_form_alliance(codename, proposal['target'])
+                if can_form:
+                    self.alliance_manager.create_alliance(
+                        codename, proposal['target'], proposal['type'], round_number)
+
+        submitted = {sid: self.policy(users[sid]['codename']).choose_action(self, users[sid]['codename'])
+                     for sid in acting}
+
+        # Resolution
+        turn_results = resolve_turn(users, submitted, round_number, self.assets,
+                                    rng=self.rng.stream('resolution', round_number), table=self.table)
+
+        for result in turn_results.of_type(*MASTER_PLAN_ACTIONS):
+            codename = result['codename']
+            completion = self.master_plan_manager.update_progress(
+                codename, result['action_type'], result, round_number, users)
+            if completion:
+                if completion['reward_type'] == 'instant_win':
+                    return {'winners': [codename], 'condition': 'Mission Completion'}
+                elif completion['reward_type'] == 'ip_bonus':
+                    users.get_by_codename(codename)['ip'] += completion['reward_value']
+
+        apply_round_end_effects(users, self.assets, rng=self.rng.stream('round_end', round_number))
+        self.alliance_manager.process_round_end()
+
+        victory = check_victory_conditions(users, self.assets)
+        if victory:
+            return victory
+
+        alliance_victory = self.alliance_manager.check_alliance_victory(users, self.assets)
+        if alliance_victory and alliance_victory.get('trigger_final_showdown'):
+            return self.final_showdown(alliance_victory['winners'])
+        return None
+
+    def final_showdown(self, participants: List[str]) -> Dict[str, Any]:
+        manager = self.alliance_manager
+        manager.start_final_showdown(participants)
+        for participant in participants:
+            users_entry = self.users.get_by_codename(participant)
+            if users_entry:
+                users_entry['ip'] += 3
+            manager.submit_showdown_action(participant, self.policy(participant).showdown_action(self, participant))
+
+        result = manager.resolve_final_showdown(
+            self.users, rng=self.rng.stream('showdown', self.round_number))
+        return {'winners': [result['winner']], 'condition': 'Alliance Victory - Final Showdown'}
+
+
+def play_game(seed: int, players: int = 6, policies: Sequence[str] = ('random',),
+              script: Optional[Dict[str, Any]] = None, table=None,
+              max_rounds: int = DEFAULT_MAX_ROUNDS) -> Dict[str, Any]:
+    """Play one headless game and return its summary"""
+    return SimulatedGame(seed, players, policies, script, table, max_rounds).play()
+
+
+# Aggregation
+
+class Tally:
+    """
+    Running totals over many games
+
+    Only integer sums and counts are kept, so tallies from any split of the
+    games merge into exactly the same result regardless of worker count.
+    """
+
+    def __init__(self):
+        self.games = 0
+        self.rounds = 0
+        self.conditions = Counter()
+        self.lengths = Counter()
+        self.wins_by_seat = Counter()
+        self.wins_by_policy = Counter()
+        self.ip_sums = []    # round index -> total IP over games that reached it
+        self.ip_counts = []  # round index -> players in games that reached it
+
+    def add(self, summary: Dict[str, Any]):
+        self.games += 1
+        self.rounds += summary['rounds']
+        self.conditions[summary['condition']] += 1
+        self.lengths[summary['rounds']] += 1
+        self.wins_by_seat.update(summary['winner_seats'])
+        self.wins_by_policy.update(summary['winner_policies'])
+        for index, ip in enumerate(summary['ip_totals']):
+            if index == len(self.ip_sums):
+                self.ip_sums.append(0)
+                self.ip_counts.append(0)
+            self.ip_sums[index] += ip
+            self.ip_counts[index] += summary['players']
+
+    def merge(self, other: 'Tally'):
+        self.games += other.games
+        self.rounds += other.rounds
+        self.conditions.update(other.conditions)
+        self.lengths.update(other.lengths)
+        self.wins_by_seat.update(other.wins_by_seat)
+        self.wins_by_policy.update(other.wins_by_policy)
+        for index, (ip, count) in enumerate(zip(other.ip_sums, other.ip_counts)):
+            if index == len(self.ip_sums):
+                self.ip_sums.append(0)
+                self.ip_counts.append(0)
+            self.ip_sums[index] += ip
+            self.ip_counts[index] += count
+
+    def to_dict(self) -> Dict[str, Any]:
+        games = max(1, self.games)
+        return {
+            'games': self.games,
+            'mean_rounds': self.rounds / games,
+            'conditions': {c: n / games for c, n in self.conditions.most_common()},
+            'lengths': dict(sorted(self.lengths.items())),
+            'wins_by_seat': dict(sorted(self.wins_by_seat.items())),
+            'wins_by_policy': dict(self.wins_by_policy.most_common()),
+            'ip_curve': [round(ip / count, 3) for ip, count in zip(self.ip_sums, self.ip_counts)]
+        }
+
+
+# Process pool
+
+_worker_table = None
+
+
+def apply_matrix_overrides(overrides: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+    """INTERACTION_MATRIX copy with offense -> defense -> field overrides merged in"""
+    matrix = copy.deepcopy(INTERACTION_MATRIX)
+    for offense, defenses in (overrides or {}).items():
+        for defense, fields in defenses.items():
+            if offense not in OFFENSES or defense not in DEFENSES:
+                raise ValueError(f'Unknown pairing in overrides: {offense} vs {defense}')
+            # Pairings the matrix leaves unspecified start from the default outcome
+            outcome = matrix.setdefault(offense, {}).setdefault(defense, get_default_outcome(offense, defense))
+            outcome.update(fields)
+    return matrix
+
+
+def _init_worker(overrides: Optional[Dict[str, Any]]):
+    """Compile the (possibly modified) matrix once per worker process"""
+    global _worker_table
+    _worker_table = compile_matrix(apply_matrix_overrides(overrides)) if overrides else None
+
+
+def run_games(base_seed: int, start: int, count: int, players: int, policies: Sequence[str],
+              script: Optional[Dict[str, Any]], max_rounds: int) -> Tally:
+    """Play games start..start+count-1; game i is seeded with derive_seed(base_seed, 'game', i)"""
+    tally = Tally()
+    for index in range(start, start + count):
+        tally.add(play_game(derive_seed(base_seed, 'game', index), players, policies,
+                            script, _worker_table, max_rounds))
+    return tally
+
+
+def run_batch_games(base_seed: int, start: int, count: int, players: int, max_rounds: int) -> Tally:
+    """
+    Play games start..start+count-1 together with the vectorized batch resolver
+
+    Uses one NumPy stream per batch, seeded with derive_seed(base_seed, 'batch', start).
+    """
+    import numpy as np
+    from batch_resolver import (BatchState, compile_tables, random_actions, resolve_round,
+                                round_end_effects, check_victory, VICTORY_CONDITIONS, NO_VICTORY)
+
+    rng = np.random.default_rng(derive_seed(base_seed, 'batch', start))
+    tables = compile_tables(_worker_table)
+    state = BatchState.new(count, players)
+    game_ids = np.arange(count)
+    ip_totals = np.zeros((count, max_rounds), dtype=np.int64)
+    tally = Tally()
+
+    def add(game, rounds, condition, winner):
+        winners = [] if winner < 0 else [f'Agent_{winner}']
+        tally.add({'rounds': rounds, 'condition': condition, 'winners': winners,
+                   'winner_seats': [] if winner < 0 else [winner],
+                   'winner_policies': ['random'] * len(winners),
+                   'players': players, 'ip_totals': ip_totals[game, :rounds].tolist()})
+
+    for round_number in range(1, max_rounds + 1):
+        resolve_round(state, random_actions(state, rng), rng, tables)
+        round_end_effects(state, rng)
+        ip_totals[game_ids, round_number - 1] = state.ip.sum(axis=1)
+
+        conditions, winners = check_victory(state)
+        over = conditions != NO_VICTORY
+        for game, condition, winner in zip(game_ids[over].tolist(), conditions[over].tolist(),
+                                           winners[over].tolist()):
+            add(game, round_number, VICTORY_CONDITIONS[condition], winner)
+        if over.any():
+            state = state.select(~over)
+            game_ids = game_ids[~over]
+
+    for game in game_ids.tolist():
+        add(game, max_rounds, 'Round Limit', -1)
+    return tally
+
+
+def simulate(games: int, players: int = 6, policies: Sequence[str] = ('random',),
+             script: Optional[Dict[str, Any]] = None, seed: Optional[int] = None,
+             workers: Optional[int] = None, max_rounds: int = DEFAULT_MAX_ROUNDS,
+             matrix_overrides: Optional[Dict[str, Any]] = None, engine: str = 'scalar') -> Dict[str, Any]:
+    """
+    Play `games` seeded games and aggregate the results
+
+    The same seed and arguments give the same aggregate for any number of
+    workers. workers=1 plays in this process.
+
+    engine='batch' plays random policies in batches with the NumPy batch
+    resolver: far faster, but without alliances or Master Plans.
+
+    Returns:
+        Tally.to_dict() plus the seed, worker count and elapsed time
+    """
+    for name in policies:
+        if name not in POLICIES:
+            raise ValueError(f'Unknown policy {name!r} (choose from {", ".join(sorted(POLICIES))})')
+    if engine == 'batch':
+        if set(policies) != {'random'}:
+            raise ValueError('The batch engine only plays the random policy')
+        # Fixed batches: each is one seeded NumPy stream, whatever the worker count
+        chunk = GAMES_PER_BATCH
+        task = lambda start, count: (run_batch_games, seed, start, count, players, max_rounds)
+    elif engine == 'scalar':
+        chunk = GAMES_PER_TASK
+        task = lambda start, count: (run_games, seed, start, count, players, policies, script, max_rounds)
+    else:
+        raise ValueError(f'Unknown engine {engine!r}')
+    if seed is None:
+        seed = new_seed()
+    workers = workers or os.cpu_count() or 1
+    tasks = [task(start, min(chunk, games - start)) for start in range(0, games, chunk)]
+
+    start_time = time.perf_counter()
+    tally = Tally()
+    if workers == 1:
+        _init_worker(matrix_overrides)
+        try:
+            for function, *args in tasks:
+                tally.merge(function(*args))
+        finally:
+            _init_worker(None)
+    else:
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                                 initargs=(matrix_overrides,)) as pool:
+            futures = [pool.submit(*args) for args in tasks]
+            for future in futures:
+                tally.merge(future.result())
+    elapsed = time.perf_counter() - start_time
+
+    results = tally.to_dict()
+    results.update({'seed': seed, 'players': players, 'policies': list(policies),
+                    'engine': engine, 'workers': workers, 'seconds': elapsed})
+    return results
+
+
+def print_report(results: Dict[str, Any]):
+    """Human-readable summary of simulate() results"""
+    seconds = max(results['seconds'], 1e-9)
+    print("=" * 60)
+    print("MONTE CARLO SIMULATION")
+    print("=" * 60)
+    print(f"Games: {results['games']} x {results['players']} players, "
+          f"policies {','.join(results['policies'])}, {results['engine']} engine, seed {results['seed']}")
+    print(f"Throughput: {results['games'] / seconds:,.0f} games/s "
+          f"({results['games'] / seconds * 3600:,.0f} games/hour) on {results['workers']} workers")
+    print(f"Mean game length: {results['mean_rounds']:.2f} rounds")
+    print("\nWin conditions:")
+    for condition, share in results['conditions'].items():
+        print(f"  {condition:<36} {share:7.2%}")
+    print("\nWins by seat:    " + ", ".join(f"{s}: {n}" for s, n in results['wins_by_seat'].items()))
+    print("Wins by policy:  " + ", ".join(f"{p}: {n}" for p, n in results['wins_by_policy'].items()))
+    print("\nMean IP by round:")
+    print("  " + " ".join(f"{ip:.1f}" for ip in results['ip_curve']))
+    print("=" * 60)
+
+
+def main():
+    """Main entry point for the simulator"""
+    parser = argparse.ArgumentParser(description='Simulate complete games headlessly for balance testing')
+    parser.add_argument('--games', type=int, default=10000, help='Games to play (default: 10000)')
+    parser.add_argument('--players', type=int, default=6, help='Players per game (default: 6)')
+    parser.add_argument('--policy', default='random',
+                        help=f'Comma-separated policies assigned to seats in turn ({", ".join(sorted(POLICIES))})')
+    parser.add_argument('--script', help='JSON script for the scripted policy')
+    parser.add_argument('--matrix', help='JSON offense -> defense -> field overrides for INTERACTION_MATRIX')
+    parser.add_argument('--max-rounds', type=int, default=DEFAULT_MAX_ROUNDS,
+                        help=f'Round limit per game (default: {DEFAULT_MAX_ROUNDS})')
+    parser.add_argument('--engine', choices=['scalar', 'batch'], default='scalar',
+                        help='scalar: full rules and any policy; batch: vectorized random play '
+                             'without alliances or Master Plans (needs NumPy)')
+    parser.add_argument('--seed', type=int, help='Base seed (default: random, printed in the report)')
+    parser.add_argument('--workers', type=int, help='Worker processes (default: all cores)')
+    parser.add_argument('--json', help='Also write the results to this file')
+    args = parser.parse_args()
+
+    script = None
+    if args.script:
+        with open(args.script, encoding='utf-8') as f:
+            script = json.load(f)
+    overrides = None
+    if args.matrix:
+        with open(args.matrix, encoding='utf-8') as f:
+            overrides = json.load(f)
+
+    results = simulate(args.games, args.players, args.policy.split(','), script, args.seed,
+                       args.workers, args.max_rounds, overrides, args.engine)
+    print_report(results)
+
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump(results, f, indent=2)
+
+if __name__ == "__main__":
+    main()
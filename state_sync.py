@@ -0,0 +1,245 @@
+#!/usr/bin/env python3
+"""
+State Sync for James Bland: ACME Edition
+Versioned game state views and field-level deltas, so clients receive only
+what changed since the version they last acknowledged
+"""
+
+import copy
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Tuple
+
+# Delta markers (never valid game field names)
+APPEND = '$append'    # list grew: {'$append': [new items]}
+REMOVED = '$removed'  # keys that no longer exist: {'$removed': [keys]}
+
+# Turn result fields every player may see; the rest (defense choices, intel, IP) is the player's own.
+# Everyone's new IP and status already arrive in the public state delta.
+PUBLIC_RESULT_FIELDS = ('codename', 'action_type', 'target', 'attacker', 'offense', 'success', 'audio_effect')
+
+_UNCHANGED = object()
+
+
+def diff_state(old: Any, new: Any) -> Any:
+    """
+    Field-level delta that turns `old` into `new`
+
+    Dicts are diffed recursively and only changed keys are included, lists
+    that only grew are sent as their new tail, everything else is replaced.
+
+    Returns:
+        Delta, or None if nothing changed
+    """
+    delta = _diff(old, new)
+    return None if delta is _UNCHANGED else delta
+
+
+def _diff(old: Any, new: Any) -> Any:
+    if old == new:
+        return _UNCHANGED
+
+    if isinstance(old, dict) and isinstance(new, dict):
+        delta = {}
+        for key, value in new.items():
+            if key not in old:
+                delta[key] = value
+            else:
+                change = _diff(old[key], value)
+                if change is not _UNCHANGED:
+                    delta[key] = change
+        removed = [key for key in old if key not in new]
+        if removed:
+            delta[REMOVED] = removed
+        return delta
+
+    if isinstance(old, list) and isinstance(new, list) and len(new) > len(old) and new[:len(old)] == old:
+        return {APPEND: new[len(old):]}
+
+    return new
+
+
+def apply_delta(state: Any, delta: Any) -> Any:
+    """Apply a diff_state() delta, returning the new state (the client does the same in app.js)"""
+    if delta is None:
+        return state
+    return _apply(state, delta)
+
+
+def _apply(state: Any, delta: Any) -> Any:
+    if isinstance(delta, dict):
+        if APPEND in delta and isinstance(state, list):
+            return state + delta[APPEND]
+        if isinstance(state, dict):
+            result = dict(state)
+            for key in delta.get(REMOVED, ()):
+                result.pop(key, None)
+            for key, change in delta.items():
+                if key != REMOVED:
+                    result[key] = _apply(result.get(key), change)
+            return result
+
+    return delta
+
+
+def split_results(results: List[Dict[str, Any]]) -> Tuple[List[Dict[str, Any]], Dict[str, List[Dict[str, Any]]]]:
+    """
+    Fog of war for a round's turn results
+
+    Returns:
+        (public summary of every result, each codename's own full results)
+    """
+    public = []
+    private = {}
+    for result in results:
+        public.append({field: result[field] for field in PUBLIC_RESULT_FIELDS if field in result})
+        private.setdefault(result['codename'], []).append(result)
+    return public, private
+
+
+class StateSync:
+    """
+    Versioned views of one room's game state
+
+    Each commit() stores an immutable view under the next version number. The
+    last `history` views are kept so a delta can be computed from any version
+    a client still holds; older clients get a full snapshot instead.
+
+    A view has public sections shared by everyone and a 'private' section
+    keyed by codename; view_for() keeps only the requester's private slice.
+
+    The public part of a payload is the same for every client at the same base
+    version, so it is computed once per (current version, base version) and
+    cached until the next commit; only the requester's private slice is diffed
+    per request. A whole table reconnecting at once costs one public diff.
+    """
+
+    def __init__(self, history: int = 16):
+        self.history = history
+        self.version = 0
+        self.views = OrderedDict()  # version -> view
+        self.acked = {}             # sid -> last version the client acknowledged
+        self.public_cache = {}      # base version (None: full state) -> public part, for self.version
+
+        # Metrics
+        self.deltas_sent = 0
+        self.snapshots_sent = 0
+        self.cache_hits = 0
+        self.cache_misses = 0
+
+    def commit(self, view: Dict[str, Any]) -> int:
+        """
+        Record `view` as a new version unless it equals the current one
+
+        Returns:
+            The current version
+        """
+        if self.version and self.views.get(self.version) == view:
+            return self.version
+
+        self.version += 1
+        self.views[self.version] = copy.deepcopy(view)
+        while len(self.views) > self.history:
+            self.views.popitem(last=False)
+        self.public_cache.clear()
+        return self.version
+
+    def cached_public(self, base_version: Optional[int]) -> Any:
+        """
+        Public part of a payload for the current version, computed once per version
+
+        Returns:
+            The public delta from `base_version`, the full public state when
+            `base_version` is None, or None if `base_version` was evicted
+        """
+        if base_version in self.public_cache:
+            self.cache_hits += 1
+            return self.public_cache[base_version]
+
+        self.cache_misses += 1
+        current = self.public(self.views[self.version])
+        if base_version is None:
+            public = current
+        else:
+            base = self.views.get(base_version)
+            public = None if base is None else diff_state(self.public(base), current) or {}
+        self.public_cache[base_version] = public
+        return public
+
+    def public_delta(self, base_version: int) -> Optional[Dict[str, Any]]:
+        """Public delta from `base_version` to now, or None if that version was evicted"""
+        return self.cached_public(base_version)
+
+    def public_state(self) -> Dict[str, Any]:
+        """Full public state at the current version"""
+        return self.cached_public(None)
+
+    @staticmethod
+    def public(view: Dict[str, Any]) -> Dict[str, Any]:
+        """View without any player's private data"""
+        return {key: value for key, value in view.items() if key != 'private'}
+
+    def view_for(self, version: int, codename: Optional[str]) -> Optional[Dict[str, Any]]:
+        """A stored view with only `codename`'s private slice (as 'you')"""
+        view = self.views.get(version)
+        if view is None:
+            return None
+        personal = self.public(view)
+        personal['you'] = view.get('private', {}).get(codename)
+        return personal
+
+    def acknowledge(self, sid: str, version: int):
+        """Record the version a client has applied"""
+        if isinstance(version, int) and 0 < version <= self.version:
+            self.acked[sid] = max(version, self.acked.get(sid, 0))
+
+    def forget(self, sid: str):
+        """Drop a client's acknowledged version"""
+        self.acked.pop(sid, None)
+
+    def sync_payload(self, sid: str, codename: Optional[str],
+                     known_version: Optional[int] = None) -> Dict[str, Any]:
+        """
+        What a client needs to reach the current version
+
+        Uses the client's reported version if given, otherwise its last
+        acknowledged one. Returns a delta if that version is still retained,
+        otherwise the full current view. The public part comes from the
+        per-version cache; only the private slice is built per request.
+        """
+        if known_version is None:
+            known_version = self.acked.get(sid)
+        elif isinstance(known_version, int):
+            self.acknowledge(sid, known_version)
+
+        if self.version not in self.views:
+            return {'version': 0, 'full': True, 'state': {}}
+        you = self.views[self.version].get('private', {}).get(codename)
+
+        base = self.views.get(known_version) if isinstance(known_version, int) else None
+        if base is None:
+            self.snapshots_sent += 1
+            return {'version': self.version, 'full': True, 'state': dict(self.public_state(), you=you)}
+
+        self.deltas_sent += 1
+        delta = self.cached_public(known_version)
+        you_delta = diff_state(base.get('private', {}).get(codename), you)
+        if you_delta is not None:
+            delta = dict(delta, you=you_delta)
+        return {
+            'version': self.version,
+            'baseVersion': known_version,
+            'full': False,
+            'delta': delta
+        }
+
+    def stats(self) -> Dict[str, Any]:
+        """Payloads sent and how often their public part came from the cache"""
+        lookups = self.cache_hits + self.cache_misses
+        return {
+            'version': self.version,
+            'deltasSent': self.deltas_sent,
+            'snapshotsSent': self.snapshots_sent,
+            'cacheHits': self.cache_hits,
+            'cacheMisses': self.cache_misses,
+            'cacheHitRate': round(self.cache_hits / lookups, 3) if lookups else 0.0
+        }
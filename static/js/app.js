@@ -17,8 +17,12 @@ class JamesBlandClient {
             players: {},
             currentRound: 0,
             timer: 0,
+            planningDeadline: 0, // Local time (ms) the server's planning deadline ends
+            stateVersion: 0, // Last server state version applied
+            eventSeq: 0, // Sequence number of the last room event received
             isHost: false,
             myCodename: '',
+            room: new URLSearchParams(window.location.search).get('room') || '',
             turnSubmitted: false
         };
         
@@ -228,13 +232,33 @@ class JamesBlandClient {
      */
     connectToServer() {
         try {
-            this.socket = io();
+            // The room travels with every request so a multi-worker router can pin us to its worker
+            const query = { room: this.gameState.room };
+            const options = { query };
+            if (typeof JamesBlandParser !== 'undefined' && JamesBlandParser.available) {
+                // Ask for MessagePack game events; the parser still reads JSON if the server declines
+                query.serializer = 'msgpack';
+                options.parser = JamesBlandParser;
+            }
+            this.socket = io(options);
             
             this.socket.on('connect', () => {
                 this.isConnected = true;
                 this.reconnectAttempts = 0;
                 this.updateConnectionStatus(true);
                 console.log('Connected to server');
+                
+                // Reclaim our seat after a dropped connection, a reload or a server restart
+                const token = this.loadResumeToken();
+                if (token) {
+                    this.socket.emit('resumeSession', {
+                        room: this.gameState.room,
+                        token,
+                        version: this.gameState.stateVersion,
+                        // Lets the server replay just the events we missed (none after a reload)
+                        seq: this.gameState.eventSeq || undefined
+                    });
+                }
             });
             
             this.socket.on('disconnect', () => {
@@ -263,8 +287,18 @@ class JamesBlandClient {
      * Set up WebSocket event handlers for game events
      */
     setupGameEventHandlers() {
+        // Room events carry a sequence number; remember the last one for catch-up
+        this.socket.onAny((event, data) => this.trackEventSeq(data));
+        this.socket.on('missedEvents', (data) => this.handleMissedEvents(data));
+        
         // Lobby events
         this.socket.on('lobbyJoined', (data) => this.handleLobbyJoined(data));
+        this.socket.on('sessionExpired', () => this.handleSessionExpired());
+        // The server stopped sending to us while our connection was backed up
+        this.socket.on('resyncRequired', () => this.socket.emit('requestGameState', {
+            version: this.gameState.stateVersion,
+            seq: this.gameState.eventSeq || undefined
+        }));
         this.socket.on('lobbyUpdate', (data) => this.handleLobbyUpdate(data));
         this.socket.on('gameStarted', (data) => this.handleGameStarted(data));
         
@@ -272,6 +306,8 @@ class JamesBlandClient {
         this.socket.on('playerSubmitted', (data) => this.handlePlayerSubmitted(data));
         this.socket.on('turnResult', (data) => this.handleTurnResult(data));
         this.socket.on('gameStateSnapshot', (data) => this.handleGameStateSnapshot(data));
+        this.socket.on('nextRound', (data) => this.handleNextRound(data));
+        this.socket.on('planningDeadline', (data) => this.handlePlanningDeadline(data));
         this.socket.on('gameOver', (data) => this.handleGameOver(data));
         
         // Banner events
@@ -345,7 +381,7 @@ class JamesBlandClient {
             return;
         }
         
-        this.socket.emit('joinLobby', { codename });
+        this.socket.emit('joinLobby', { codename, room: this.gameState.room });
         this.elements.joinBtn.disabled = true;
         this.showLobbyStatus('Joining lobby...', 'info');
     }
@@ -368,6 +404,8 @@ class JamesBlandClient {
         if (data.success) {
             this.gameState.myCodename = data.codename;
             this.gameState.isHost = data.isHost;
+            this.gameState.room = data.room || this.gameState.room;
+            this.saveResumeToken(data.resumeToken);
             this.showLobbyStatus(`Welcome, Agent ${data.codename}!`, 'success');
             this.elements.codenameInput.disabled = true;
         } else {
@@ -376,6 +414,67 @@ class JamesBlandClient {
         }
     }
     
+    /**
+     * Handle a resume token the server no longer knows (room finished or gone)
+     */
+    handleSessionExpired() {
+        this.saveResumeToken(null);
+        this.gameState.gameStarted = false;
+        this.gameState.myCodename = '';
+        this.gameState.stateVersion = 0;
+        this.gameState.eventSeq = 0;
+        this.elements.codenameInput.disabled = false;
+        this.elements.joinBtn.disabled = false;
+        this.showLobby();
+        this.showLobbyStatus('Your session has ended. Join again to play.', 'error');
+    }
+    
+    /**
+     * Remember the sequence number of the latest room event
+     */
+    trackEventSeq(data) {
+        if (data && typeof data.seq === 'number' && data.seq > this.gameState.eventSeq) {
+            this.gameState.eventSeq = data.seq;
+        }
+    }
+    
+    /**
+     * Replay the room events missed while disconnected through their usual handlers
+     */
+    handleMissedEvents(data) {
+        (data.events || []).forEach(entry => {
+            this.socket.listeners(entry.event).forEach(listener => listener(entry.data));
+            this.trackEventSeq(entry.data);
+        });
+    }
+    
+    /**
+     * Resume tokens live per tab and per room, so a reload keeps the seat
+     */
+    resumeTokenKey() {
+        return `jamesBland.resumeToken.${this.gameState.room}`;
+    }
+    
+    loadResumeToken() {
+        try {
+            return window.sessionStorage.getItem(this.resumeTokenKey());
+        } catch (error) {
+            return null;
+        }
+    }
+    
+    saveResumeToken(token) {
+        try {
+            if (token) {
+                window.sessionStorage.setItem(this.resumeTokenKey(), token);
+            } else {
+                window.sessionStorage.removeItem(this.resumeTokenKey());
+            }
+        } catch (error) {
+            // Storage disabled: resuming only works while this page stays open
+        }
+    }
+    
     /**
      * Handle lobby updates
      */
@@ -393,6 +492,8 @@ class JamesBlandClient {
         this.gameState.gameStarted = true;
         this.gameState.players = data.players || [];
         this.gameState.roundNumber = data.roundNumber || 1;
+        this.setPlanningDeadline(data.timerDuration);
+        this.applyStateSync({ full: true, version: data.version, state: data.state });
         
         this.showGame();
         this.startPlanningPhase();
@@ -531,7 +632,34 @@ class JamesBlandClient {
         this.populateActionDropdowns();
         this.updateIPSlider();
         this.showPlanningUI();
-        this.startTimer(90); // 90 second planning phase
+        // The server owns the deadline; count down whatever is left of it
+        this.startTimer(Math.max(0, Math.ceil((this.gameState.planningDeadline - Date.now()) / 1000)));
+    }
+    
+    /**
+     * Record when the server's planning deadline ends
+     */
+    setPlanningDeadline(seconds) {
+        this.gameState.planningDeadline = Date.now() + (typeof seconds === 'number' ? seconds : 90) * 1000;
+    }
+    
+    /**
+     * Handle the server opening the next planning phase
+     */
+    handleNextRound(data) {
+        this.gameState.roundNumber = data.roundNumber;
+        this.setPlanningDeadline(data.timerDuration);
+        // Results stay on screen until the player continues
+    }
+    
+    /**
+     * Handle the server's planning deadline firing
+     */
+    handlePlanningDeadline(data) {
+        if (data.autoSubmitted && data.autoSubmitted.includes(this.gameState.myCodename)) {
+            this.gameState.turnSubmitted = true;
+            this.showLobbyStatus('Time expired - default actions submitted', 'info');
+        }
     }
     
     /**
@@ -844,28 +972,11 @@ class JamesBlandClient {
      */
     handleTimerExpired() {
         if (this.gameState.phase === 'planning' && !this.gameState.turnSubmitted) {
-            // Auto-submit with defaults
-            this.autoSubmitDefaults();
+            // The server submits defaults when its deadline fires
+            this.showLobbyStatus('Time expired - waiting for the server to resolve the round', 'info');
         }
     }
     
-    /**
-     * Auto-submit default actions when timer expires
-     */
-    autoSubmitDefaults() {
-        const defaultTurn = {
-            offense: 'surveillance',
-            defense: 'safeHouse',
-            target: null,
-            ipSpend: 0,
-            bannerMessage: ''
-        };
-        
-        this.socket.emit('submitAction', defaultTurn);
-        this.gameState.turnSubmitted = true;
-        this.showLobbyStatus('Time expired - default actions submitted', 'info');
-    }
-    
     /**
      * Handle player submission notification
      */
@@ -880,16 +991,20 @@ class JamesBlandClient {
      */
     handleTurnResult(data) {
         this.gameState.phase = 'resolution';
-        this.gameState.players = data.players;
+        this.applyStateSync(data);
         this.gameState.currentRound = data.round;
         
         this.stopAudio('suspense');
         this.updateHUD();
-        this.displayTurnResults(data.results);
+
+        // Our own full results, then the public summary of everyone else's
+        const results = (data.yourResults || []).concat(
+            data.results.filter(result => result.codename !== this.gameState.myCodename));
+        this.displayTurnResults(results);
         this.showResolutionUI();
-        
+
         // Play appropriate sound effects based on results
-        this.playResultSounds(data.results);
+        this.playResultSounds(results);
     }
     
     /**
@@ -968,11 +1083,65 @@ class JamesBlandClient {
         this.gameState.phase = 'waitingForResolution';
     }
     
+    /**
+     * Apply a versioned state update (full state or delta from baseVersion)
+     */
+    applyStateSync(data) {
+        if (!data || !data.version) {
+            return false;
+        }
+        
+        if (data.full) {
+            this.syncState = data.state || {};
+        } else if (data.baseVersion === this.gameState.stateVersion) {
+            this.syncState = this.applyDelta(this.syncState || {}, data.delta);
+        } else {
+            // Missed an update: ask for what changed since the version we hold
+            this.socket.emit('requestGameState', { version: this.gameState.stateVersion });
+            return false;
+        }
+        
+        this.gameState.stateVersion = data.version;
+        this.gameState.players = this.syncState.players || {};
+        this.gameState.assets = this.syncState.assets || {};
+        if (this.syncState.you) {
+            this.gameState.userState = this.syncState.you;
+        }
+        this.socket.emit('ackState', { version: data.version });
+        return true;
+    }
+    
+    /**
+     * Apply a field-level delta (mirrors state_sync.apply_delta on the server)
+     */
+    applyDelta(state, delta) {
+        const isObject = (value) => value !== null && typeof value === 'object' && !Array.isArray(value);
+        
+        if (isObject(delta)) {
+            if ('$append' in delta && Array.isArray(state)) {
+                return state.concat(delta['$append']);
+            }
+            if (isObject(state)) {
+                const result = { ...state };
+                (delta['$removed'] || []).forEach(key => delete result[key]);
+                Object.keys(delta).forEach(key => {
+                    if (key !== '$removed') {
+                        result[key] = this.applyDelta(result[key], delta[key]);
+                    }
+                });
+                return result;
+            }
+        }
+        return delta;
+    }
+    
     /**
      * Handle game state snapshot (for reconnection)
      */
     handleGameStateSnapshot(data) {
-        this.gameState = { ...this.gameState, ...data };
+        const { full, version, baseVersion, state, delta, ...snapshot } = data;
+        this.gameState = { ...this.gameState, ...snapshot };
+        this.applyStateSync(data);
         
         if (data.phase === 'lobby') {
             this.showLobby();
@@ -980,10 +1149,8 @@ class JamesBlandClient {
             this.showGame();
             
             if (data.phase === 'planning') {
+                this.setPlanningDeadline(data.timeRemaining);
                 this.startPlanningPhase();
-                if (data.timeRemaining) {
-                    this.startTimer(data.timeRemaining);
-                }
             } else if (data.phase === 'resolution') {
                 this.showResolutionUI();
             }
@@ -0,0 +1,109 @@
+/**
+ * JAMES BLAND: ACME EDITION - SOCKET.IO PARSER
+ * Reads MessagePack binary frames and JSON text frames on one connection
+ */
+
+/**
+ * The server sends MessagePack (python-socketio's msgpack packet format) for
+ * game events once a client asks for it with ?serializer=msgpack, but some
+ * packets (connect, errors from handlers) stay JSON text. This parser decodes
+ * both by frame type and always sends JSON text, which every server accepts.
+ * Needs the MessagePack global from @msgpack/msgpack.
+ */
+const JamesBlandParser = (() => {
+    const BINARY_EVENT = 5;
+    const BINARY_ACK = 6;
+
+    /**
+     * Encode a packet as Socket.IO JSON text
+     */
+    class Encoder {
+        encode(packet) {
+            let encoded = String(packet.type);
+            if (packet.nsp && packet.nsp !== '/') {
+                encoded += packet.nsp + ',';
+            }
+            if (packet.id !== undefined && packet.id !== null) {
+                encoded += packet.id;
+            }
+            if (packet.data !== undefined) {
+                encoded += JSON.stringify(packet.data);
+            }
+            return [encoded];
+        }
+    }
+
+    /**
+     * Decode a Socket.IO JSON text frame
+     */
+    function decodeText(text) {
+        const packet = { type: Number(text.charAt(0)), nsp: '/' };
+        let i = 1;
+
+        if (packet.type === BINARY_EVENT || packet.type === BINARY_ACK) {
+            throw new Error('Binary attachments are not supported');
+        }
+
+        if (text.charAt(i) === '/') {
+            const end = text.indexOf(',', i);
+            packet.nsp = text.substring(i, end === -1 ? text.length : end);
+            i = end === -1 ? text.length : end + 1;
+        }
+
+        let id = '';
+        while (i < text.length && text.charAt(i) >= '0' && text.charAt(i) <= '9') {
+            id += text.charAt(i++);
+        }
+        if (id) {
+            packet.id = Number(id);
+        }
+
+        if (i < text.length) {
+            packet.data = JSON.parse(text.substring(i));
+        }
+        return packet;
+    }
+
+    /**
+     * Decode a MessagePack binary frame ({type, nsp, data, id})
+     */
+    function decodeBinary(buffer) {
+        const packet = MessagePack.decode(new Uint8Array(buffer));
+        packet.nsp = packet.nsp || '/';
+        return packet;
+    }
+
+    class Decoder {
+        constructor() {
+            this.listeners = [];
+        }
+
+        on(event, listener) {
+            if (event === 'decoded') {
+                this.listeners.push(listener);
+            }
+            return this;
+        }
+
+        off(event, listener) {
+            this.listeners = listener ? this.listeners.filter(fn => fn !== listener) : [];
+            return this;
+        }
+
+        add(chunk) {
+            const packet = typeof chunk === 'string' ? decodeText(chunk) : decodeBinary(chunk);
+            this.listeners.slice().forEach(listener => listener(packet));
+        }
+
+        destroy() {
+            this.listeners = [];
+        }
+    }
+
+    return {
+        Encoder,
+        Decoder,
+        // False when the MessagePack script did not load: connect with the default JSON parser
+        available: typeof MessagePack !== 'undefined'
+    };
+})();
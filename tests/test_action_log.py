@@ -0,0 +1,240 @@
+"""
+Test suite for the write-ahead action log and crash recovery
+Validates log records, snapshots, torn writes and rebuilding in-flight rooms
+"""
+
+import json
+import os
+
+import pytest
+import sys
+
+# Add parent directory to path to import modules
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from action_log import ActionLog, JournalStore
+from game_room import RoomManager, SNAPSHOT_EVERY_RECORDS
+
+SAFE_TURN = {
+    'offense': '',
+    'defense': 'underground',
+    'target': None,
+    'ip_spend': 0,
+    'banner_message': ''
+}
+
+class RecordingEmitter:
+    """Collects emitted events instead of sending them over Socket.IO"""
+
+    def __init__(self):
+        self.events = []
+
+    def __call__(self, event, data=None, to=None, **kwargs):
+        self.events.append((event, data, to))
+
+    def named(self, event):
+        return [e for e in self.events if e[0] == event]
+
+def comparable(room):
+    """Room snapshot without fields that legitimately change across a restart"""
+    state = json.loads(json.dumps(room.to_snapshot(), default=list))
+    state['game_state'].pop('timer_start')
+    for response in state['game_state']['banner_responses'].values():
+        response.pop('timestamp')
+    for _, player in state['users']:
+        player.pop('disconnected')
+    return state
+
+class TestActionLog:
+
+    def test_append_and_read(self, tmp_path):
+        """Test that appended records are read back in order"""
+        log = ActionLog(str(tmp_path), 'table1')
+        log.append('join', 'sid1', {'codename': 'Agent_A'})
+        log.append('startGame', 'sid1')
+        log.close()
+
+        state, records, last_seq = ActionLog.read(str(tmp_path), 'table1')
+
+        assert state is None
+        assert [r['type'] for r in records] == ['join', 'startGame']
+        assert records[0]['data'] == {'codename': 'Agent_A'}
+        assert last_seq == 2
+
+    def test_snapshot_truncates_log(self, tmp_path):
+        """Test that a snapshot covers everything logged before it"""
+        log = ActionLog(str(tmp_path), 'table1')
+        log.append('join', 'sid1', {'codename': 'Agent_A'})
+        log.write_snapshot({'round': 3})
+        log.append('leave', 'sid1')
+        log.close()
+
+        state, records, last_seq = ActionLog.read(str(tmp_path), 'table1')
+
+        assert state == {'round': 3}
+        assert [r['type'] for r in records] == ['leave']
+        assert last_seq == 2
+
+    def test_queued_snapshot_written_on_flush(self, tmp_path):
+        """Test that a queued snapshot waits for the flush pass and keeps records logged after it"""
+        store = JournalStore(str(tmp_path))
+        log = store.open('table1')
+        log.append('join', 'sid1', {'codename': 'Agent_A'})
+        log.queue_snapshot({'round': 3})
+        log.append('leave', 'sid1')
+
+        assert not os.path.exists(log.snapshot_path)
+        assert len(store.load('table1')[1]) == 2
+
+        store.sync_all()
+        log.append('join', 'sid2', {'codename': 'Agent_B'})
+        log.close()
+
+        state, records, last_seq = store.load('table1')
+
+        assert state == {'round': 3}
+        assert [r['type'] for r in records] == ['leave', 'join']
+        assert last_seq == 3
+        assert store.snapshots == 1
+
+    def test_torn_tail_ignored(self, tmp_path):
+        """Test that a half-written final record is dropped"""
+        log = ActionLog(str(tmp_path), 'table1')
+        log.append('join', 'sid1', {'codename': 'Agent_A'})
+        log.close()
+        with open(log.wal_path, 'a') as f:
+            f.write('{"seq": 2, "type": "joi')
+
+        _, records, _ = ActionLog.read(str(tmp_path), 'table1')
+
+        assert len(records) == 1
+
+    def test_batched_fsync(self, tmp_path):
+        """Test that sync_all only fsyncs logs with new records"""
+        store = JournalStore(str(tmp_path))
+        store.open('a').append('join', 'sid1', {'codename': 'Agent_A'})
+        store.open('b')
+
+        assert store.sync_all() == 1
+        assert store.sync_all() == 0
+        assert store.room_ids() == ['a', 'b']
+
+class TestCrashRecovery:
+
+    def setup_method(self):
+        """Set up an emitter for the live room before each test"""
+        self.emitter = RecordingEmitter()
+
+    def start_game(self, tmp_path):
+        self.store = JournalStore(str(tmp_path))
+        self.manager = RoomManager(emit=self.emitter, journal=self.store)
+        room = self.manager.get_or_create('table1')
+        for i, codename in enumerate(['Agent_A', 'Agent_B', 'Agent_C']):
+            room.join(f'sid{i}', codename)
+        room.start_game('sid0')
+        return room
+
+    def crash_and_recover(self, tmp_path):
+        """Simulate a restart: a fresh manager reading the same directory"""
+        manager = RoomManager(emit=RecordingEmitter(), journal=JournalStore(str(tmp_path)))
+        assert manager.recover() == ['table1']
+        return manager.get_room('table1')
+
+    def test_recover_mid_round(self, tmp_path):
+        """Test rebuilding game state, Master Plans and alliances from the log"""
+        room = self.start_game(tmp_path)
+        for sid in ('sid0', 'sid1', 'sid2'):
+            room.submit_action(sid, SAFE_TURN)
+        room.create_alliance('sid0', {'target': 'Agent_B', 'type': 'non_aggression'})
+        room.submit_action('sid1', SAFE_TURN)
+
+        recovered = self.crash_and_recover(tmp_path)
+
+        assert comparable(recovered) == comparable(room)
+        assert recovered.game_state['round_number'] == 2
+        assert list(recovered.game_state['submitted_actions']) == ['sid1']
+        assert recovered.master_plan_manager.player_plans == room.master_plan_manager.player_plans
+        assert recovered.alliance_manager.get_alliance_summary() == \
+            room.alliance_manager.get_alliance_summary()
+        assert all(u['disconnected'] for u in recovered.users.values())
+
+    def test_player_resumes_seat(self, tmp_path):
+        """Test that a player presenting their resume token after a restart gets their seat back"""
+        room = self.start_game(tmp_path)
+        room.submit_action('sid1', SAFE_TURN)
+        token = room.users['sid1']['resume_token']
+
+        recovered = self.crash_and_recover(tmp_path)
+        emitter = RecordingEmitter()
+        recovered.emit = emitter
+
+        assert recovered.resume_session('new-sid', token) == 'sid1'
+
+        assert recovered.users.sid_for('Agent_B') == 'new-sid'
+        assert 'new-sid' in recovered.game_state['submitted_actions']
+        assert emitter.named('lobbyJoined')[0][1]['resumed'] is True
+        assert emitter.named('gameStateSnapshot')[0][2] == 'new-sid'
+
+    def test_codename_does_not_claim_seat(self, tmp_path):
+        """Test that rejoining with a codename alone cannot take over a disconnected seat"""
+        self.start_game(tmp_path)
+
+        recovered = self.crash_and_recover(tmp_path)
+        recovered.emit = RecordingEmitter()
+
+        assert not recovered.join('new-sid', 'Agent_B')
+        assert recovered.users.sid_for('Agent_B') == 'sid1'
+
+    def test_resume_survives_second_restart(self, tmp_path):
+        """Test that a resume is logged, so the seat stays with the new socket across restarts"""
+        room = self.start_game(tmp_path)
+        token = room.users['sid1']['resume_token']
+
+        recovered = self.crash_and_recover(tmp_path)
+        recovered.resume_session('new-sid', token)
+        recovered.journal.close()
+
+        again = self.crash_and_recover(tmp_path)
+        assert again.users.sid_for_token(token) == 'new-sid'
+
+    def test_event_sequence_survives_restart(self, tmp_path):
+        """Test that recovery keeps numbering events but sends returning players a snapshot"""
+        room = self.start_game(tmp_path)
+        room.submit_action('sid0', SAFE_TURN)
+        token = room.users['sid1']['resume_token']
+        seq = room.events.seq
+
+        recovered = self.crash_and_recover(tmp_path)
+        emitter = RecordingEmitter()
+        recovered.emit = emitter
+        recovered.resume_session('new-sid', token, None, seq - 1)
+
+        assert recovered.events.seq == seq
+        assert not emitter.named('missedEvents')
+        assert emitter.named('gameStateSnapshot')[0][1]['full'] is True
+
+    def test_log_stays_bounded(self, tmp_path):
+        """Test that periodic snapshots keep the replay length bounded"""
+        room = self.start_game(tmp_path)
+        for _ in range(SNAPSHOT_EVERY_RECORDS * 2):
+            room.banner_choice('sid0', {'choice': 'ignore', 'caster': 'Agent_B'})
+            self.store.sync_all()  # the flush loop's pass, which writes queued snapshots
+
+        _, records, _ = self.store.load('table1')
+
+        assert len(records) <= SNAPSHOT_EVERY_RECORDS
+        assert comparable(self.crash_and_recover(tmp_path)) == comparable(room)
+
+    def test_lobby_rooms_not_recovered(self, tmp_path):
+        """Test that rooms which never started are dropped on recovery"""
+        store = JournalStore(str(tmp_path))
+        manager = RoomManager(journal=store)
+        manager.get_or_create('lobby1').join('sid0', 'Agent_A')
+
+        fresh = RoomManager(journal=JournalStore(str(tmp_path)))
+
+        assert fresh.recover() == []
+        assert not os.listdir(str(tmp_path))
+
+if __name__ == '__main__':
+    pytest.main([__file__, '-v'])
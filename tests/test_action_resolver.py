@@ -15,8 +15,14 @@ from action_resolver import (
     clamp_ip,
     check_victory_conditions,
     apply_round_end_effects,
-    get_sid_by_codename
+    get_sid_by_codename,
+    index_attacks_by_target,
+    handle_banner_phase
 )
+from interaction_matrix import outcome_for
+from player_registry import PlayerRegistry
+from intel_store import intel_count
+from victory_tracker import VictoryTracker
 
 class TestActionResolver:
     
@@ -261,5 +267,76 @@ class TestActionResolver:
         assert self.users['sid1']['ip'] == 0
         assert len(self.users['sid1']['gadgets']) == 1
 
+    def test_index_attacks_by_target(self):
+        """Test that attacks are grouped by target in first-attack order, skipping safe turns and unknown targets"""
+        actions_by_codename = {
+            'Agent_A': {'offense': 'assassination', 'target': 'Agent_C'},
+            'Agent_B': {'offense': '', 'target': 'Agent_C'},
+            'Agent_C': {'offense': 'sabotage', 'target': 'Agent_A'},
+            'Agent_D': {'offense': 'surveillance', 'target': 'Agent_C'},
+            'Agent_E': {'offense': 'surveillance', 'target': 'Nobody'}
+        }
+        users = PlayerRegistry({f'sid{i}': {'codename': codename, 'status': 'active', 'ip': 10}
+                                for i, codename in enumerate(actions_by_codename)})
+        
+        attacks = index_attacks_by_target(users, actions_by_codename)
+        
+        assert list(attacks) == ['Agent_C', 'Agent_A']
+        assert [codename for codename, _ in attacks['Agent_C']] == ['Agent_A', 'Agent_D']
+    
+    def test_banner_affects_attackers_of_broadcaster(self):
+        """Test that an ACME banner distracts exactly the players attacking the broadcaster"""
+        actions_by_codename = {
+            'Agent_A': {'offense': 'assassination', 'defense': 'safe_house', 'target': 'Agent_B'},
+            'Agent_B': {'offense': '', 'defense': 'information_warfare', 'banner_message': 'ACME RULES!'},
+            'Agent_C': {'offense': 'surveillance', 'defense': 'underground', 'target': 'Agent_B'}
+        }
+        results = []
+        
+        effects = handle_banner_phase(self.users, actions_by_codename, results)
+        
+        assert effects == {'Agent_A': -1, 'Agent_C': -1}
+        assert [r['action_type'] for r in results] == ['banner']
+        assert 'affected 2 attackers' in results[0]['description']
+    
+    def test_one_defense_result_per_target(self):
+        """Test that a target gets one defense result, against the attacker who spent the most IP"""
+        submitted_actions = {
+            'sid1': {'offense': 'surveillance', 'defense': 'underground', 'target': 'Agent_B', 'ip_spend': 1},
+            'sid2': {'offense': '', 'defense': 'safe_house', 'target': None, 'ip_spend': 0},
+            'sid3': {'offense': 'assassination', 'defense': 'underground', 'target': 'Agent_B', 'ip_spend': 2}
+        }
+        
+        results = resolve_turn(self.users, submitted_actions, 1)
+        
+        defense_results = [r for r in results if r['action_type'] == 'defense']
+        assert len(defense_results) == 1
+        assert defense_results[0]['attacker'] == 'Agent_C'
+    
+    def test_self_target_keeps_defender_ip_change(self):
+        """Test that a spy attacking themselves ends with the defender's IP change, as before"""
+        submitted_actions = {
+            'sid1': {'offense': 'assassination', 'defense': 'safe_house', 'target': 'Agent_A', 'ip_spend': 0}
+        }
+        outcome = outcome_for('assassination', 'safe_house')
+        
+        resolve_turn(self.users, submitted_actions, 1)
+        
+        assert self.users['sid1']['ip'] == clamp_ip(10 + outcome.ip_change_defender)
+
+    def test_resolve_without_tracker_leaves_registry_watcher(self):
+        """Test that resolve_turn() builds no tracker of its own and leaves the registry's watcher alone"""
+        users = PlayerRegistry(self.users)
+        tracker = VictoryTracker(users, self.assets)
+        submitted_actions = {
+            'sid1': {'offense': 'surveillance', 'defense': 'safe_house', 'target': 'Agent_B', 'ip_spend': 0},
+            'sid2': {'offense': '', 'defense': 'counter_surveillance', 'target': None, 'ip_spend': 0}
+        }
+        
+        resolve_turn(users, submitted_actions, 1, self.assets)
+        
+        assert users.status_watcher is tracker
+        assert intel_count(self.users['sid2']['intel']) == 1
+
 if __name__ == '__main__':
     pytest.main([__file__, '-v']) 
\ No newline at end of file
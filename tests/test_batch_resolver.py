@@ -0,0 +1,166 @@
+"""
+Test suite for the vectorized batch resolver
+Differential tests against resolve_turn, apply_round_end_effects and check_victory_conditions
+"""
+
+import copy
+import random
+
+import pytest
+import sys
+import os
+
+# Add parent directory to path to import modules
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+np = pytest.importorskip('numpy')
+
+from batch_resolver import (BatchState, BatchActions, resolve_round, round_end_effects, check_victory,
+                            compile_tables, random_actions, STATUS_CODES, STATUS_NAMES, VICTORY_CONDITIONS,
+                            NO_PLAYER)
+from action_resolver import resolve_turn, apply_round_end_effects, check_victory_conditions, STRATEGIC_ASSETS
+from interaction_matrix import INTERACTION_MATRIX, OFFENSES, DEFENSES, compile_matrix
+from player_registry import PlayerRegistry
+from intel_store import intel_count
+from simulate import simulate
+
+class ConstantRNG:
+    """Same draw every time, for both resolvers: makes random branches comparable"""
+
+    def __init__(self, value):
+        self.value = value
+
+    def random(self, size=None):
+        return self.value if size is None else np.full(size, self.value)
+
+    def choice(self, seq):
+        return seq[int(self.value * len(seq))]
+
+def random_game(rng, players):
+    """Mid-game users, assets and submitted actions covering every resolver branch"""
+    codenames = rng.sample(['Agent_%s' % c for c in 'ABCDEFGHJK'], players)
+    users = PlayerRegistry()
+    for i, codename in enumerate(codenames):
+        users.add(f'sid{i}', {
+            'codename': codename,
+            'status': rng.choice(STATUS_NAMES),
+            'ip': rng.choice([rng.randint(-10, 50), rng.randint(-10, 3), rng.randint(45, 55)]),
+            'gadgets': ['gadget'] * rng.choice([0, 0, 1, 3]),
+            'intel': ['card'] * rng.randint(0, 12),
+            'alliances': []
+        })
+    assets = {name: rng.choice([None, None] + codenames) for name in STRATEGIC_ASSETS}
+
+    submitted = {}
+    for sid in users:
+        if rng.random() < 0.1:
+            continue
+        offense = rng.choice(OFFENSES + ['network_attack'] * 3 + [''])
+        # Pile attacks onto a couple of targets so attack order matters
+        targets = codenames[:2] if rng.random() < 0.6 else codenames + [None]
+        submitted[sid] = {
+            'offense': offense,
+            'defense': rng.choice(DEFENSES + ['information_warfare'] * 3),
+            'target': rng.choice(targets) if offense else None,
+            'ip_spend': rng.choice([0, 0, 1, 2, 3]),
+            'banner_message': rng.choice(['', 'ACME RULES!', 'acme forever', 'hello'])
+        }
+    return users, assets, submitted
+
+def scalar_state(users, assets):
+    return ([(u['ip'], u['status'], intel_count(u['intel']), len(u['gadgets'])) for u in users.values()],
+            [assets[name] for name in STRATEGIC_ASSETS])
+
+def batch_state(state, game, users):
+    codenames = [u['codename'] for u in users.values()]
+    players = [(int(state.ip[game, p]), STATUS_NAMES[state.status[game, p]],
+                int(state.intel[game, p]), int(state.gadgets[game, p])) for p in range(len(codenames))]
+    return players, [None if owner == NO_PLAYER else codenames[owner] for owner in state.assets[game]]
+
+class TestDifferential:
+
+    @pytest.mark.parametrize('players', [2, 3, 6])
+    @pytest.mark.parametrize('draw', [0.2, 0.45, 0.75])
+    def test_matches_scalar_resolver(self, players, draw):
+        """Test that a batch round leaves every game exactly as the scalar resolver does"""
+        rng = random.Random(players * 100 + int(draw * 100))
+        games = [random_game(rng, players) for _ in range(300)]
+
+        state = BatchState.from_games([(users, assets) for users, assets, _ in games])
+        actions = BatchActions.from_submitted([(users, submitted) for users, _, submitted in games])
+        resolve_round(state, actions, ConstantRNG(draw))
+        round_end_effects(state, ConstantRNG(draw))
+        conditions, winners = check_victory(state)
+
+        for index, (users, assets, submitted) in enumerate(games):
+            users, assets = copy.deepcopy(users), dict(assets)
+            resolve_turn(users, submitted, 1, assets, rng=ConstantRNG(draw))
+            apply_round_end_effects(users, assets, rng=ConstantRNG(draw))
+            victory = check_victory_conditions(users, assets)
+
+            assert batch_state(state, index, users) == scalar_state(users, assets), f'game {index}'
+            codenames = [u['codename'] for u in users.values()]
+            expected = (victory['condition'], victory['winners']) if victory else (None, [])
+            winner = [] if winners[index] == NO_PLAYER else [codenames[winners[index]]]
+            assert (VICTORY_CONDITIONS[conditions[index]], winner) == expected, f'game {index}'
+
+    def test_modified_matrix(self):
+        """Test that compiled balance changes reach both resolvers the same way"""
+        matrix = copy.deepcopy(INTERACTION_MATRIX)
+        for defenses in matrix.values():
+            for outcome in defenses.values():
+                outcome['ip_change_attacker'] += 3
+        # Network attacks always land, so asset captures depend on attack order
+        matrix['network_attack'] = {defense: dict(matrix['assassination']['underground'],
+                                                  status_change_defender=None)
+                                    for defense in DEFENSES}
+        table = compile_matrix(matrix)
+        rng = random.Random(11)
+        games = [random_game(rng, 6) for _ in range(300)]
+
+        state = BatchState.from_games([(users, assets) for users, assets, _ in games])
+        actions = BatchActions.from_submitted([(users, submitted) for users, _, submitted in games])
+        resolve_round(state, actions, ConstantRNG(0.6), compile_tables(table))
+
+        for index, (users, assets, submitted) in enumerate(games):
+            users, assets = copy.deepcopy(users), dict(assets)
+            resolve_turn(users, submitted, 1, assets, rng=ConstantRNG(0.6), table=table)
+            assert batch_state(state, index, users) == scalar_state(users, assets)
+
+class TestBatchPlay:
+
+    def test_random_actions_are_legal(self):
+        """Test that vectorized random actions only come from players who can act"""
+        rng = np.random.default_rng(3)
+        state = BatchState.new(500, 4)
+        state.status[:, 0] = STATUS_CODES['captured']
+
+        actions = random_actions(state, rng)
+
+        assert (actions.offense[:, 0] == -2).all()
+        attacking = actions.offense >= 0
+        assert (actions.target[attacking] != 0).all()
+        assert (actions.target[attacking] != np.nonzero(attacking)[1]).all()
+        assert (actions.ip_spend <= 2).all()
+
+    def test_batch_engine_aggregate(self):
+        """Test that batch simulation is seeded and independent of the worker count"""
+        single = simulate(300, players=4, seed=5, workers=1, max_rounds=12, engine='batch')
+        pooled = simulate(300, players=4, seed=5, workers=2, max_rounds=12, engine='batch')
+
+        assert single['games'] == 300
+        for key in ('mean_rounds', 'conditions', 'lengths', 'wins_by_seat', 'ip_curve'):
+            assert single[key] == pooled[key]
+        assert len(single['ip_curve']) == 12
+
+    def test_select_keeps_games(self):
+        """Test that selecting games keeps each game's arrays together"""
+        state = BatchState.new(4, 3)
+        state.ip[2] = [1, 2, 3]
+
+        subset = state.select(np.array([False, False, True, True]))
+
+        assert subset.ip.tolist() == [[1, 2, 3], [10, 10, 10]]
+
+if __name__ == '__main__':
+    pytest.main([__file__, '-v'])
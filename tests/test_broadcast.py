@@ -0,0 +1,212 @@
+"""
+Test suite for the encode-once broadcast path
+Validates that room broadcasts and personalized views are serialized once per
+distinct payload, reach the right sockets, and are counted
+"""
+
+import json
+
+import pytest
+import socketio
+import sys
+import os
+
+# Add parent directory to path to import modules
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from broadcast import Broadcaster, group_by_view
+from game_room import GameRoom
+
+class PacketRecorder:
+    """Stands in for engineio's send_packet, recording what each socket was written"""
+
+    def __init__(self):
+        self.sent = []  # (eio_sid, packet)
+
+    def __call__(self, eio_sid, packet):
+        self.sent.append((eio_sid, packet))
+
+    def events_for(self, eio_sid):
+        """Decoded [event, data] pairs written to one socket"""
+        return [json.loads(packet.encode()[2:]) for sid, packet in self.sent if sid == eio_sid]
+
+class RecordingEmitter:
+    """Captures emits from a GameRoom"""
+
+    def __init__(self):
+        self.events = []
+
+    def __call__(self, event, data=None, to=None, **kwargs):
+        self.events.append((event, data, to))
+
+def connect(server, count, room=None):
+    """Connect `count` fake sockets, optionally putting them in a room; returns their eio sids"""
+    eio_sids = []
+    for i in range(count):
+        eio_sid = f'eio-{room}-{i}'
+        sid = server.manager.connect(eio_sid, '/')
+        if room is not None:
+            server.manager.enter_room(sid, '/', room, eio_sid)
+        eio_sids.append(eio_sid)
+    return eio_sids
+
+class TestBroadcaster:
+
+    def setup_method(self):
+        """Set up a Socket.IO server whose packets are recorded instead of sent"""
+        self.server = socketio.Server(async_mode='threading')
+        self.recorder = PacketRecorder()
+        self.broadcaster = Broadcaster(self.server, send=self.recorder)
+
+    def test_room_broadcast_encodes_once(self):
+        """Test that a room broadcast is encoded once and the same packet goes to every socket"""
+        eio_sids = connect(self.server, 50, room='alpha')
+        connect(self.server, 3, room='beta')
+
+        self.broadcaster('turnResult', {'round': 2}, to='alpha')
+
+        assert self.broadcaster.encodes == 1
+        assert len(self.recorder.sent) == 50
+        assert {sid for sid, _ in self.recorder.sent} == set(eio_sids)
+        assert len({id(packet) for _, packet in self.recorder.sent}) == 1
+        assert self.recorder.events_for(eio_sids[0]) == [['turnResult', {'round': 2}]]
+
+    def test_single_socket_emit(self):
+        """Test that emitting to a sid only reaches that socket"""
+        eio_sids = connect(self.server, 3, room='alpha')
+        sid = self.server.manager.sid_from_eio_sid(eio_sids[1], '/')
+
+        self.broadcaster('actionSubmitted', {'success': True}, to=sid)
+
+        assert [eio_sid for eio_sid, _ in self.recorder.sent] == [eio_sids[1]]
+
+    def test_views_encode_once_per_distinct_view(self):
+        """Test that sockets sharing a view share one encode"""
+        eio_sids = connect(self.server, 30)
+        sids = [self.server.manager.sid_from_eio_sid(eio_sid, '/') for eio_sid in eio_sids]
+        groups = group_by_view(sids, lambda sid: sids.index(sid) % 3)
+
+        delivered = self.broadcaster.send_views('view', [({'view': key}, members)
+                                                         for key, members in groups.items()])
+
+        assert delivered == 30
+        assert self.broadcaster.encodes == 3
+        assert self.recorder.events_for(eio_sids[4]) == [['view', {'view': 1}]]
+
+    def test_empty_targets_are_not_encoded(self):
+        """Test that nothing is encoded for a room with no sockets"""
+        connect(self.server, 2, room='alpha')
+
+        assert self.broadcaster('lobbyUpdate', {}, to='nobody') is None
+        assert self.broadcaster.encodes == 0
+
+    def test_skip_sid(self):
+        """Test that skip_sid is honoured"""
+        eio_sids = connect(self.server, 3, room='alpha')
+        skipped = self.server.manager.sid_from_eio_sid(eio_sids[0], '/')
+
+        self.broadcaster('playerSubmitted', {}, to='alpha', skip_sid=skipped)
+
+        assert eio_sids[0] not in {sid for sid, _ in self.recorder.sent}
+        assert len(self.recorder.sent) == 2
+
+    def test_stats(self):
+        """Test that encodes saved reflect recipients beyond the first per view"""
+        connect(self.server, 10, room='alpha')
+
+        self.broadcaster('lobbyUpdate', {}, to='alpha')
+        self.broadcaster('lobbyUpdate', {}, to='alpha')
+        stats = self.broadcaster.stats()
+
+        assert stats['broadcasts'] == 2
+        assert stats['deliveries'] == 20
+        assert stats['encodesSaved'] == 18
+        assert stats['encodesPerBroadcast'] == 1.0
+        assert stats['recipientsPerEncode'] == 10.0
+
+class TestSerializerNegotiation:
+
+    def setup_method(self):
+        """Set up a broadcaster with one JSON and one MessagePack socket in a room"""
+        self.msgpack = pytest.importorskip('msgpack')
+        self.server = socketio.Server(async_mode='threading')
+        self.recorder = PacketRecorder()
+        self.broadcaster = Broadcaster(self.server, send=self.recorder)
+        self.eio_sids = connect(self.server, 2, room='alpha')
+        self.sids = [self.server.manager.sid_from_eio_sid(eio_sid, '/') for eio_sid in self.eio_sids]
+
+    def test_negotiated_socket_gets_msgpack(self):
+        """Test that a MessagePack socket gets binary frames and a JSON socket gets text"""
+        assert self.broadcaster.negotiate(self.sids[1], 'msgpack') == 'msgpack'
+
+        self.broadcaster('turnResult', {'round': 2, 'results': [{'codename': 'A'}]}, to='alpha')
+
+        sent = dict(self.recorder.sent)
+        assert not sent[self.eio_sids[0]].binary
+        assert sent[self.eio_sids[1]].binary
+        decoded = self.msgpack.loads(sent[self.eio_sids[1]].data)
+        assert decoded['type'] == 2 and decoded['nsp'] == '/'
+        assert decoded['data'] == ['turnResult', {'round': 2, 'results': [{'codename': 'A'}]}]
+        assert self.broadcaster.stats()['encodesBySerializer'] == {'json': 1, 'msgpack': 1}
+
+    def test_old_clients_fall_back_to_json(self):
+        """Test that clients asking for nothing, or for an unknown serializer, stay on JSON"""
+        assert self.broadcaster.negotiate(self.sids[0], None) == 'json'
+        assert self.broadcaster.negotiate(self.sids[1], 'cbor') == 'json'
+
+        self.broadcaster('lobbyUpdate', {}, to='alpha')
+
+        assert not any(packet.binary for _, packet in self.recorder.sent)
+        assert self.broadcaster.encodes == 1
+
+    def test_msgpack_disabled(self):
+        """Test that a server with MessagePack turned off declines it"""
+        broadcaster = Broadcaster(self.server, send=self.recorder, msgpack=False)
+
+        assert broadcaster.negotiate(self.sids[0], 'msgpack') == 'json'
+
+    def test_binary_packet_per_socket(self):
+        """Test that sockets share the encoded bytes but not the binary packet wrapper"""
+        for sid in self.sids:
+            self.broadcaster.negotiate(sid, 'msgpack')
+
+        self.broadcaster('lobbyUpdate', {}, to='alpha')
+
+        first, second = (packet for _, packet in self.recorder.sent)
+        assert first is not second and first.data is second.data
+        assert self.broadcaster.encodes == 1
+
+    def test_forget(self):
+        """Test that a disconnected socket's serializer is dropped"""
+        self.broadcaster.negotiate(self.sids[1], 'msgpack')
+        self.broadcaster.forget(self.sids[1])
+
+        assert self.broadcaster.stats()['msgpackSockets'] == 0
+
+class TestGameRoomViews:
+
+    def test_send_views_falls_back_to_per_socket_emits(self):
+        """Test that a plain emitter gets one emit per socket in each view"""
+        emitter = RecordingEmitter()
+        room = GameRoom('alpha', emit=emitter)
+
+        room.send_views('view', [({'a': 1}, ['s1', 's2']), ({'b': 2}, ['s3'])])
+
+        assert emitter.events == [('view', {'a': 1, 'seq': 1}, 's1'), ('view', {'a': 1, 'seq': 1}, 's2'),
+                                  ('view', {'b': 2, 'seq': 1}, 's3')]
+
+    def test_send_views_uses_broadcaster(self):
+        """Test that a Broadcaster emitter encodes each view once"""
+        server = socketio.Server(async_mode='threading')
+        recorder = PacketRecorder()
+        broadcaster = Broadcaster(server, send=recorder)
+        sids = [server.manager.sid_from_eio_sid(eio_sid, '/') for eio_sid in connect(server, 4)]
+        room = GameRoom('alpha', emit=broadcaster)
+
+        room.send_views('view', [({'a': 1}, sids[:3]), ({'b': 2}, sids[3:])])
+
+        assert broadcaster.encodes == 2
+        assert len(recorder.sent) == 4
+
+if __name__ == '__main__':
+    pytest.main([__file__, '-v'])
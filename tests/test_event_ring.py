@@ -0,0 +1,87 @@
+"""
+Test suite for the per-room event ring
+Validates sequencing, gap replay per codename and fallback once a gap is evicted
+"""
+
+import pytest
+import sys
+import os
+
+# Add parent directory to path to import modules
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from event_ring import EventRing
+
+class TestEventRing:
+
+    def test_sequence_numbers_are_contiguous(self):
+        """Test that each appended event gets the next sequence number"""
+        ring = EventRing()
+
+        assert [ring.append('nextRound', {'round': n}) for n in range(3)] == [1, 2, 3]
+        assert ring.seq == 3
+        assert ring.oldest() == 1
+
+    def test_since_returns_only_the_gap(self):
+        """Test that a client gets the events after the last one it saw, oldest first"""
+        ring = EventRing()
+        for n in range(5):
+            ring.append('nextRound', {'round': n})
+
+        missed = ring.since(3)
+
+        assert missed == [{'seq': 4, 'event': 'nextRound', 'data': {'round': 3}},
+                          {'seq': 5, 'event': 'nextRound', 'data': {'round': 4}}]
+        assert ring.since(5) == []
+
+    def test_personalized_events_replay_per_codename(self):
+        """Test that a personalized event replays the recipient's own payload, and skips others"""
+        ring = EventRing()
+        ring.append('turnResult', views={'Agent_A': {'yours': 'a'}, 'Agent_B': {'yours': 'b'}})
+        ring.append('nextRound', {'round': 2})
+
+        assert ring.since(0, 'Agent_B')[0]['data'] == {'yours': 'b'}
+        assert [entry['event'] for entry in ring.since(0, 'Agent_C')] == ['nextRound']
+
+    def test_evicted_gap_needs_snapshot(self):
+        """Test that a gap older than the ring holds returns None"""
+        ring = EventRing(capacity=4)
+        for n in range(10):
+            ring.append('nextRound', {'round': n})
+
+        assert ring.oldest() == 7
+        assert ring.since(5) is None
+        assert len(ring.since(6)) == 4
+        assert ring.stats()['evictedGaps'] == 1
+
+    def test_unknown_sequence_numbers(self):
+        """Test that sequence numbers the ring never issued are not trusted"""
+        ring = EventRing()
+        ring.append('nextRound', {})
+
+        assert ring.since(7) is None
+        assert ring.since(-1) is None
+        assert ring.since('1') is None
+
+    def test_resumes_numbering(self):
+        """Test that a restored ring continues from a saved sequence number with nothing to replay"""
+        ring = EventRing(seq=40)
+
+        assert ring.since(38) is None
+        assert ring.since(40) == []
+        assert ring.append('nextRound', {}) == 41
+
+    def test_stats(self):
+        """Test replay counters"""
+        ring = EventRing()
+        for n in range(3):
+            ring.append('nextRound', {'round': n})
+        ring.since(1)
+
+        stats = ring.stats()
+        assert stats['replays'] == 1
+        assert stats['replayedEvents'] == 2
+        assert stats['held'] == 3
+
+if __name__ == '__main__':
+    pytest.main([__file__, '-v'])
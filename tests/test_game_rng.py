@@ -0,0 +1,135 @@
+"""
+Test suite for per-game seeded RNG streams
+Validates stream derivation, isolation from the global random module and
+exact replay of whole games from their inputs and seed
+"""
+
+import json
+import random
+
+import pytest
+import sys
+import os
+
+# Add parent directory to path to import modules
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from game_rng import GameRNG, derive_seed
+from game_room import GameRoom
+from master_plans import MasterPlanManager
+
+class ListJournal:
+    """Journal that keeps records in memory and never snapshots"""
+
+    def __init__(self):
+        self.records = []
+        self.records_since_snapshot = 0
+
+    def append(self, kind, sid=None, data=None):
+        record = {'seq': len(self.records) + 1, 'type': kind}
+        if sid is not None:
+            record['sid'] = sid
+        if data is not None:
+            record['data'] = json.loads(json.dumps(data))
+        self.records.append(record)
+
+    def queue_snapshot(self, state):
+        pass
+
+def play_game(room, rounds, seed):
+    """Join four players and play random rounds through the room's public methods"""
+    choices = random.Random(seed)
+    for i in range(4):
+        room.join(f'sid{i}', f'Agent_{i}')
+    room.start_game('sid0')
+
+    for _ in range(rounds):
+        if room.game_state['phase'] != 'planning':
+            break
+        round_number = room.game_state['round_number']
+        for sid in list(room.users):
+            if room.game_state['phase'] != 'planning':
+                break
+            codename = room.users[sid]['codename']
+            room.submit_action(sid, {
+                'offense': choices.choice(['assassination', 'surveillance', 'sabotage', '']),
+                'defense': choices.choice(['safe_house', 'underground', 'bodyguard_detail']),
+                'target': choices.choice([c for c in ('Agent_0', 'Agent_1', 'Agent_2', 'Agent_3')
+                                          if c != codename]),
+                'ip_spend': choices.randint(0, 2),
+                'banner_message': ''
+            })
+        if room.game_state['phase'] == 'planning' and room.game_state['round_number'] == round_number:
+            room.on_planning_deadline(round_number)
+
+def game_state(room):
+    # Resume tokens are random by design, so two identical games never share them
+    return json.loads(json.dumps({
+        'users': [(sid, {field: value for field, value in user.items() if field != 'resume_token'})
+                  for sid, user in room.users.items()],
+        'assets': room.game_state['assets'],
+        'round': room.game_state['round_number'],
+        'phase': room.game_state['phase'],
+        'plans': room.master_plan_manager.player_plans
+    }, default=list))
+
+class TestGameRNG:
+
+    def test_streams_are_reproducible(self):
+        """Test that a stream depends only on the seed, name and key"""
+        a = GameRNG(42).stream('resolution', 3)
+        b = GameRNG(42).stream('resolution', 3)
+
+        assert [a.random() for _ in range(5)] == [b.random() for _ in range(5)]
+        assert derive_seed(42, 'resolution', 3) != derive_seed(42, 'resolution', 4)
+        assert derive_seed(42, 'resolution', 3) != derive_seed(43, 'resolution', 3)
+
+    def test_new_games_get_distinct_seeds(self):
+        """Test that unseeded games do not share a seed"""
+        assert GameRNG().seed != GameRNG().seed
+
+    def test_master_plans_follow_stream(self):
+        """Test that plan assignment is fixed by the stream it is given"""
+        players = ['A', 'B', 'C', 'D']
+        first = MasterPlanManager().assign_master_plans(players, 4, rng=GameRNG(7).stream('master_plans'))
+        second = MasterPlanManager().assign_master_plans(players, 4, rng=GameRNG(7).stream('master_plans'))
+
+        assert first == second
+
+class TestDeterministicGames:
+
+    def test_same_seed_same_game(self):
+        """Test that two rooms with the same seed and inputs end in the same state"""
+        first, second = GameRoom('a', seed=99), GameRoom('b', seed=99)
+        play_game(first, 15, seed=1)
+        play_game(second, 15, seed=1)
+
+        assert game_state(first) == game_state(second)
+
+    def test_global_random_untouched(self):
+        """Test that a game never draws from the shared global random module"""
+        random.seed(5)
+        expected = random.getstate()
+
+        play_game(GameRoom('a', seed=3), 10, seed=2)
+
+        assert random.getstate() == expected
+
+    def test_replay_from_inputs_alone(self):
+        """Test that replaying the logged inputs without any snapshot reproduces the game"""
+        journal = ListJournal()
+        room = GameRoom('a', journal=journal)
+        play_game(room, 15, seed=4)
+
+        replayed = GameRoom.restore('a', None, journal.records)
+
+        assert replayed.seed == room.seed
+        original = game_state(room)
+        restored = game_state(replayed)
+        for state in (original, restored):
+            for _, user in state['users']:
+                user.pop('disconnected')
+        assert restored == original
+
+if __name__ == '__main__':
+    pytest.main([__file__, '-v'])
@@ -0,0 +1,360 @@
+"""
+Test suite for game rooms
+Validates per-room lobby and game state, room-scoped broadcasts, coalesced
+progress broadcasts and room bookkeeping
+"""
+
+import pytest
+import sys
+import os
+
+# Add parent directory to path to import modules
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from game_room import GameRoom, RoomManager, normalize_room_id, DEFAULT_ROOM_ID, COALESCE_SECONDS
+from timer_wheel import TimerWheel
+
+SAFE_TURN = {
+    'offense': '',
+    'defense': 'underground',
+    'target': None,
+    'ip_spend': 0,
+    'banner_message': ''
+}
+
+class FakeClock:
+    """Manually advanced monotonic clock"""
+
+    def __init__(self, now=1000.0):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+class RecordingEmitter:
+    """Collects emitted events instead of sending them over Socket.IO"""
+
+    def __init__(self):
+        self.events = []
+
+    def __call__(self, event, data=None, to=None, **kwargs):
+        self.events.append((event, data, to))
+
+    def named(self, event):
+        return [e for e in self.events if e[0] == event]
+
+class TestGameRoom:
+
+    def setup_method(self):
+        """Set up a room with a recording emitter before each test"""
+        self.emitter = RecordingEmitter()
+        self.room = GameRoom('table1', emit=self.emitter)
+
+    def test_join_lobby(self):
+        """Test joining a room's lobby"""
+        assert self.room.join('sid1', 'Agent_A')
+        assert self.room.lobby_state['host_sid'] == 'sid1'
+        assert self.room.users['sid1']['ip'] == 10
+
+        joined = self.emitter.named('lobbyJoined')[0]
+        assert joined[2] == 'sid1'
+        assert joined[1]['room'] == 'table1'
+
+        lobby_update = self.emitter.named('lobbyUpdate')[0]
+        assert lobby_update[2] == 'table1'  # Scoped to the room, not broadcast
+
+    def test_duplicate_codename_rejected(self):
+        """Test that codenames are unique within a room (case-insensitive)"""
+        self.room.join('sid1', 'Agent_A')
+        assert not self.room.join('sid2', 'agent_a')
+
+        error = self.emitter.named('error')[0]
+        assert error[2] == 'sid2'
+        assert 'taken' in error[1]['message']
+
+    def test_lobby_full(self):
+        """Test the six player limit"""
+        for i in range(6):
+            assert self.room.join(f'sid{i}', f'Agent_{i}')
+        assert not self.room.join('sid6', 'Agent_6')
+
+    def test_start_game_host_only(self):
+        """Test that only the host may start the game"""
+        self.room.join('sid1', 'Agent_A')
+        self.room.join('sid2', 'Agent_B')
+
+        assert not self.room.start_game('sid2')
+        assert self.room.start_game('sid1')
+        assert self.room.game_state['phase'] == 'planning'
+        assert self.room.game_state['round_number'] == 1
+        assert self.room.users['sid1']['master_plan'] is not None
+
+    def test_full_round_resolves_when_all_submit(self):
+        """Test that the round resolves once every active player has submitted"""
+        self.room.join('sid1', 'Agent_A')
+        self.room.join('sid2', 'Agent_B')
+        self.room.start_game('sid1')
+
+        self.room.submit_action('sid1', SAFE_TURN)
+        assert self.room.game_state['round_number'] == 1
+        self.room.submit_action('sid2', SAFE_TURN)
+
+        turn_results = self.emitter.named('turnResult')
+        assert sorted(event[2] for event in turn_results) == ['sid1', 'sid2']  # One per player's socket
+        assert len(turn_results[0][1]['results']) == 2
+        assert self.room.game_state['round_number'] == 2
+        assert self.room.game_state['submitted_actions'] == {}
+
+    def test_lobby_disconnect_transfers_host(self):
+        """Test host transfer when the host leaves the lobby"""
+        self.room.join('sid1', 'Agent_A')
+        self.room.join('sid2', 'Agent_B')
+
+        self.room.leave('sid1')
+
+        assert self.room.lobby_state['host_sid'] == 'sid2'
+        assert 'sid1' not in self.room.users
+        assert self.emitter.named('hostTransferred')[0][2] == 'table1'
+
+    def test_in_game_disconnect_keeps_player(self):
+        """Test that disconnecting mid-game keeps the player seated"""
+        self.room.join('sid1', 'Agent_A')
+        self.room.join('sid2', 'Agent_B')
+        self.room.start_game('sid1')
+
+        self.room.leave('sid2')
+
+        assert self.room.users['sid2']['disconnected']
+        # Their turn stays open for a resume; the planning deadline covers them otherwise
+        assert 'sid2' not in self.room.game_state['submitted_actions']
+
+class TestResumeSession:
+
+    def setup_method(self):
+        """Set up a started two-player game where the second player has dropped"""
+        self.emitter = RecordingEmitter()
+        self.room = GameRoom('table1', emit=self.emitter)
+        self.room.join('sid1', 'Agent_A')
+        self.room.join('sid2', 'Agent_B')
+        self.room.start_game('sid1')
+        self.token = self.emitter.named('lobbyJoined')[1][1]['resumeToken']
+        self.room.leave('sid2')
+        self.emitter.events.clear()
+
+    def test_tokens_are_issued_per_player(self):
+        """Test that each player gets a distinct token, indexed by the registry"""
+        tokens = {user['resume_token'] for user in self.room.users.values()}
+        assert len(tokens) == 2
+        assert self.room.users.sid_for_token(self.token) == 'sid2'
+
+    def test_resume_moves_seat(self):
+        """Test that the token moves the seat, pending turn and all, to the new socket"""
+        self.room.submit_action('sid1', SAFE_TURN)
+
+        assert self.room.resume_session('sid3', self.token) == 'sid2'
+
+        assert 'sid2' not in self.room.users
+        assert self.room.users['sid3']['codename'] == 'Agent_B'
+        assert not self.room.users['sid3']['disconnected']
+        assert self.room.users.sid_for_token(self.token) == 'sid3'
+        joined = self.emitter.named('lobbyJoined')[0]
+        assert joined[1]['resumed'] and joined[1]['resumeToken'] == self.token
+        assert joined[2] == 'sid3'
+        assert self.emitter.named('gameStateSnapshot')[0][2] == 'sid3'
+
+        # The resumed player can still play the round
+        assert self.room.submit_action('sid3', SAFE_TURN) is not False
+        assert self.room.game_state['round_number'] == 2
+
+    def test_resume_sends_delta_from_known_version(self):
+        """Test that a client reporting its version gets a delta rather than a full state"""
+        self.room.resume_session('sid3', self.token, self.room.sync.version)
+
+        snapshot = self.emitter.named('gameStateSnapshot')[0][1]
+        assert snapshot['full'] is False
+
+    def test_resume_replays_missed_events(self):
+        """Test that a player who missed a round gets just the missed events, then a state delta"""
+        last_seq = self.room.events.seq
+        self.room.submit_action('sid1', SAFE_TURN)
+        self.room.on_planning_deadline(self.room.game_state['round_number'])
+        self.emitter.events.clear()
+
+        self.room.resume_session('sid3', self.token, self.room.broadcast_version, last_seq)
+
+        missed = self.emitter.named('missedEvents')[0]
+        assert missed[2] == 'sid3'
+        events = [entry['event'] for entry in missed[1]['events']]
+        assert events[:2] == ['planningDeadline', 'turnResult']
+        assert [entry['seq'] for entry in missed[1]['events']] == list(range(last_seq + 1, self.room.events.seq + 1))
+        turn_result = missed[1]['events'][1]['data']
+        assert 'yourResults' in turn_result
+        snapshot = self.emitter.named('gameStateSnapshot')[0][1]
+        assert snapshot['full'] is False
+
+    def test_resume_after_evicted_gap_sends_snapshot(self):
+        """Test that a gap the ring no longer holds falls back to a state snapshot"""
+        self.room.events.entries.clear()
+
+        self.room.resume_session('sid3', self.token, None, 1)
+
+        assert not self.emitter.named('missedEvents')
+        assert self.emitter.named('gameStateSnapshot')[0][1]['full'] is True
+
+    def test_reconnects_do_not_create_state_versions(self):
+        """Test that dropping and resuming leaves the versioned state, and its cache, alone"""
+        self.room.send_game_state('sid1')
+        version = self.room.sync.version
+
+        self.room.resume_session('sid3', self.token, version)
+        self.room.leave('sid1')
+        self.room.send_game_state('sid3', version)
+
+        assert self.room.sync.version == version
+        assert self.emitter.named('gameStateSnapshot')[-1][1]['delta'] == {}
+
+    def test_unknown_token_expires(self):
+        """Test that a stale or forged token gets sessionExpired and no seat"""
+        assert self.room.resume_session('sid3', 'not-a-token') is None
+        assert self.room.resume_session('sid4', None) is None
+
+        assert [e[2] for e in self.emitter.named('sessionExpired')] == ['sid3', 'sid4']
+        assert 'sid3' not in self.room.users
+        assert self.room.users['sid2']['disconnected']
+
+    def test_token_not_in_state_views(self):
+        """Test that resume tokens never enter the versioned state sent to clients"""
+        assert 'resume_token' not in self.room.state_view()['private']['Agent_B']
+
+class TestRoomIsolation:
+
+    def test_rooms_do_not_share_state(self):
+        """Test that two rooms keep separate lobbies, games and managers"""
+        emitter = RecordingEmitter()
+        manager = RoomManager(emit=emitter)
+        room_a = manager.get_or_create('a')
+        room_b = manager.get_or_create('b')
+
+        room_a.join('sid1', 'Agent_A')
+        room_a.join('sid2', 'Agent_B')
+        room_b.join('sid3', 'Agent_A')  # Same codename is fine in another room
+
+        room_a.start_game('sid1')
+
+        assert room_a.game_state['phase'] == 'planning'
+        assert room_b.game_state['phase'] == 'lobby'
+        assert room_a.master_plan_manager is not room_b.master_plan_manager
+        assert room_a.alliance_manager is not room_b.alliance_manager
+        assert all(to != 'b' for event, _, to in emitter.events if event == 'gameStarted')
+
+class TestCoalescedBroadcasts:
+
+    def setup_method(self):
+        """Set up a room on a fake-clock timer wheel before each test"""
+        self.clock = FakeClock()
+        self.wheel = TimerWheel(tick=0.05, clock=self.clock)
+        self.emitter = RecordingEmitter()
+        self.room = GameRoom('table1', emit=self.emitter, scheduler=self.wheel)
+
+    def close_window(self):
+        self.clock.now += COALESCE_SECONDS + 0.1
+        self.wheel.advance()
+
+    def test_join_burst_sends_one_lobby_update(self):
+        """Test that joins within the window produce one lobbyUpdate with the latest lobby"""
+        for i in range(5):
+            self.room.join(f'sid{i}', f'Agent_{i}')
+        assert self.emitter.named('lobbyUpdate') == []
+
+        self.close_window()
+
+        updates = self.emitter.named('lobbyUpdate')
+        assert len(updates) == 1
+        assert len(updates[0][1]['players']) == 5
+        assert updates[0][2] == 'table1'
+        assert self.room.coalescing_stats() == {'requested': 5, 'sent': 1, 'saved': 4, 'pending': 0}
+
+    def test_unchanged_lobby_not_resent(self):
+        """Test that a window ending with the lobby clients already have sends nothing"""
+        self.room.join('sid1', 'Agent_A')
+        self.close_window()
+        self.room.join('sid2', 'Agent_B')
+        self.room.leave('sid2')
+        self.close_window()
+
+        assert len(self.emitter.named('lobbyUpdate')) == 1
+
+    def test_resubmission_not_broadcast(self):
+        """Test that changing an already submitted action does not rebroadcast progress"""
+        for i in range(3):
+            self.room.join(f'sid{i}', f'Agent_{i}')
+        self.room.start_game('sid0')
+
+        self.room.submit_action('sid1', SAFE_TURN)
+        self.close_window()
+        self.room.submit_action('sid1', dict(SAFE_TURN, defense='safe_house'))
+        self.close_window()
+
+        submitted = self.emitter.named('playerSubmitted')
+        assert [event[1] for event in submitted] == [{'round': 1, 'submitted': 1, 'total': 3}]
+
+    def test_pending_flushed_before_other_broadcasts(self):
+        """Test that a pending lobbyUpdate goes out before gameStarted"""
+        self.room.join('sid1', 'Agent_A')
+        self.room.join('sid2', 'Agent_B')
+        self.room.start_game('sid1')
+
+        names = [event[0] for event in self.emitter.events]
+        assert names.index('lobbyUpdate') < names.index('gameStarted')
+        assert self.wheel.pending == 1  # Only the planning deadline is left
+
+    def test_last_second_submissions_before_turn_result(self):
+        """Test that the final submission's progress precedes the turn results"""
+        self.room.join('sid1', 'Agent_A')
+        self.room.join('sid2', 'Agent_B')
+        self.room.start_game('sid1')
+
+        self.room.submit_action('sid1', SAFE_TURN)
+        self.room.submit_action('sid2', SAFE_TURN)
+
+        names = [event[0] for event in self.emitter.events]
+        assert names.count('playerSubmitted') == 1
+        assert names.index('playerSubmitted') < names.index('turnResult')
+        assert self.emitter.named('playerSubmitted')[0][1]['submitted'] == 2
+
+class TestRoomManager:
+
+    def test_normalize_room_id(self):
+        """Test room ID normalization and validation"""
+        assert normalize_room_id(None) == DEFAULT_ROOM_ID
+        assert normalize_room_id('  ') == DEFAULT_ROOM_ID
+        assert normalize_room_id('Table-7') == 'table-7'
+        assert normalize_room_id('bad room!') is None
+        assert normalize_room_id('x' * 33) is None
+
+    def test_sid_assignment_and_release(self):
+        """Test tracking which room each socket belongs to"""
+        manager = RoomManager()
+        room = manager.get_or_create('table1')
+        room.join('sid1', 'Agent_A')
+        manager.assign('sid1', 'table1')
+
+        assert manager.room_for_sid('sid1') is room
+
+        room.leave('sid1')
+        assert manager.release('sid1') is room
+        assert manager.room_for_sid('sid1') is None
+        assert manager.get_room('table1') is None  # Empty lobby discarded
+
+    def test_directory(self):
+        """Test the room directory summary"""
+        manager = RoomManager()
+        manager.get_or_create('table1').join('sid1', 'Agent_A')
+        manager.get_or_create('table2')
+
+        directory = {entry['room']: entry for entry in manager.directory()}
+        assert directory['table1']['players'] == 1
+        assert directory['table2']['phase'] == 'lobby'
+
+if __name__ == '__main__':
+    pytest.main([__file__, '-v'])
@@ -0,0 +1,108 @@
+"""
+Test suite for the per-player intel store
+Validates the card mapping from the interaction matrix, per-subject counting,
+the bounded detail log and that a store stays the same size over long games
+"""
+
+import json
+
+import pytest
+import sys
+import os
+
+# Add parent directory to path to import modules
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from intel_store import (INTEL_CARDS, INTEL_SOURCES, INTEL_LOG_SIZE, new_intel, as_intel_store, add_intel,
+                         intel_count, intel_about, copy_intel)
+from interaction_matrix import COMPILED_MATRIX
+from action_resolver import resolve_turn
+from player_registry import PlayerRegistry
+
+class TestIntelStore:
+
+    def test_matrix_intel_maps_to_deck_cards(self):
+        """Test that every intel entry the matrix can award is one of the deck's card types"""
+        sources = {source for row in COMPILED_MATRIX for outcome in row
+                   for source in outcome.intel_gained_attacker + outcome.intel_gained_defender}
+
+        assert sources <= set(INTEL_SOURCES)
+        assert set(INTEL_SOURCES.values()) <= set(INTEL_CARDS)
+
+    def test_counts_per_subject_and_card(self):
+        """Test that gains are counted by subject and card type"""
+        intel = new_intel()
+
+        assert add_intel(intel, 'Agent_B', ['attacker_codename'], 1) == 1
+        add_intel(intel, 'Agent_B', ['defender_location', 'defender_next_defense'], 2)
+        add_intel(intel, 'Agent_C', ['attacker_codename'], 2)
+
+        assert intel_count(intel) == 4
+        assert intel_about(intel, 'Agent_B') == 3
+        assert intel_about(intel, 'Agent_B', 'IDENTITY_REVEAL') == 1
+        assert intel_about(intel, 'Agent_C', 'LOCATION_INTEL') == 0
+        assert intel['log'][-1] == [2, 'Agent_C', 'IDENTITY_REVEAL']
+
+    def test_stays_bounded_over_long_games(self):
+        """Test that a store's size stops growing once every subject and card type has been seen"""
+        intel = new_intel()
+        sizes = []
+        for gain in range(2000):
+            add_intel(intel, f'Agent_{gain % 5}', ['attacker_codename', 'defender_gadgets'], 1)
+            sizes.append(len(json.dumps(intel)))
+
+        assert intel_count(intel) == 4000
+        assert len(intel['log']) == INTEL_LOG_SIZE
+        # Only digits grow: ten counters go from two to three, the total from three to four
+        assert sizes[-1] - sizes[200] <= 11
+
+    def test_log_can_be_disabled(self):
+        """Test that a zero log size keeps only the counters"""
+        intel = new_intel()
+
+        add_intel(intel, 'Agent_B', ['attacker_codename'] * 3, 1, log_size=0)
+
+        assert intel['log'] == []
+        assert intel_about(intel, 'Agent_B') == 3
+
+    def test_legacy_lists(self):
+        """Test that intel lists from older snapshots keep their count"""
+        intel = as_intel_store(['attacker_codename', 'defender_gadgets'])
+
+        assert intel_count(['a', 'b', 'c']) == 3
+        assert intel_count(None) == 0
+        assert intel_count(intel) == 2
+        assert intel['subjects'] == {}
+
+    def test_copy_is_independent(self):
+        """Test that editing a copied store leaves the original alone"""
+        intel = new_intel()
+        add_intel(intel, 'Agent_B', ['attacker_codename'], 1)
+
+        copied = copy_intel(intel)
+        add_intel(copied, 'Agent_B', ['attacker_codename'], 2)
+
+        assert intel_about(intel, 'Agent_B') == 1
+        assert len(intel['log']) == 1
+        assert copied['total'] == 2
+
+    def test_resolve_turn_records_subjects(self):
+        """Test that resolution credits intel to whoever it is about"""
+        users = PlayerRegistry({
+            'sid1': {'codename': 'Agent_A', 'status': 'active', 'ip': 10, 'intel': new_intel()},
+            'sid2': {'codename': 'Agent_B', 'status': 'active', 'ip': 10, 'intel': new_intel()}
+        })
+        # Counter-surveillance reveals the surveilling attacker's equipment to the defender
+        submitted = {
+            'sid1': {'offense': 'surveillance', 'defense': 'safe_house', 'target': 'Agent_B'},
+            'sid2': {'offense': '', 'defense': 'counter_surveillance'}
+        }
+
+        resolve_turn(users, submitted, 3, {})
+
+        assert intel_about(users['sid2']['intel'], 'Agent_A', 'GADGET_INVENTORY') == 1
+        assert users['sid2']['intel']['log'] == [[3, 'Agent_A', 'GADGET_INVENTORY']]
+        assert intel_count(users['sid1']['intel']) == 0
+
+if __name__ == '__main__':
+    pytest.main([__file__, '-v'])
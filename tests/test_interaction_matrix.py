@@ -17,7 +17,15 @@ from interaction_matrix import (
     get_available_defenses,
     OFFENSES,
     DEFENSES,
-    INTERACTION_MATRIX
+    INTERACTION_MATRIX,
+    COMPILED_MATRIX,
+    OFFENSE_IDS,
+    DEFENSE_IDS,
+    compile_matrix,
+    outcome_for,
+    describe_outcome,
+    DEFAULT_OUTCOME_CACHE_SIZE,
+    _compiled_default_outcome
 )
 
 class TestInteractionMatrix:
@@ -70,6 +78,14 @@ class TestInteractionMatrix:
         assert outcome['status_change_defender'] is None
         assert 'Defense holds' in outcome['description']
     
+    def test_unknown_names_do_not_grow_cache(self):
+        """Test that client-supplied unknown names keep the default outcome cache bounded"""
+        for i in range(DEFAULT_OUTCOME_CACHE_SIZE * 4):
+            outcome = outcome_for(f'made_up_{i}', 'safe_house')
+            assert 'Defense holds' in outcome.description
+        
+        assert _compiled_default_outcome.cache_info().currsize <= DEFAULT_OUTCOME_CACHE_SIZE
+    
     def test_available_offenses_full_game(self):
         """Test that all offenses are available in 6-player game"""
         offenses = get_available_offenses(6)
@@ -156,5 +172,61 @@ class TestInteractionMatrix:
                 assert outcome['status_change_defender'] in valid_statuses, \
                     f"Invalid defender status change in {offense} vs {defense}"
 
+class TestCompiledMatrix:
+    
+    def test_dense_table_shape(self):
+        """Test that every offense x defense pairing has a compiled outcome"""
+        assert len(COMPILED_MATRIX) == len(OFFENSES)
+        for row in COMPILED_MATRIX:
+            assert len(row) == len(DEFENSES)
+        assert OFFENSE_IDS['assassination'] == OFFENSES.index('assassination')
+        assert DEFENSE_IDS['information_warfare'] == DEFENSES.index('information_warfare')
+    
+    def test_compiled_matches_dict_lookup(self):
+        """Test that compiled outcomes reproduce get_interaction_outcome exactly"""
+        for offense in OFFENSES + ['unknown_offense']:
+            for defense in DEFENSES + ['default']:
+                for attacker_spend, defender_spend in [(0, 0), (3, 2)]:
+                    compiled = outcome_for(offense, defense).as_dict(attacker_spend, defender_spend)
+                    expected = get_interaction_outcome(offense, defense, attacker_spend, defender_spend)
+                    assert compiled == expected, f"Mismatch for {offense} vs {defense}"
+    
+    def test_outcomes_are_immutable_and_shared(self):
+        """Test that lookups return the same immutable record"""
+        outcome = outcome_for('assassination', 'safe_house')
+        
+        assert outcome is outcome_for('assassination', 'safe_house')
+        assert outcome is COMPILED_MATRIX[OFFENSE_IDS['assassination']][DEFENSE_IDS['safe_house']]
+        with pytest.raises(AttributeError):
+            outcome.ip_change_attacker = 5
+        assert isinstance(outcome.intel_gained_defender, tuple)
+    
+    def test_ip_spend_without_copying(self):
+        """Test IP spend modifiers applied on top of the shared record"""
+        outcome = outcome_for('assassination', 'safe_house')
+        
+        assert outcome.attacker_ip_change(3) == outcome.ip_change_attacker + 3
+        assert outcome.defender_ip_change(2) == outcome.ip_change_defender + 2
+        assert '3 IP' in describe_outcome(outcome, 3)
+        assert outcome.ip_change_attacker == -1  # Shared record untouched
+    
+    def test_default_pairings_ignore_ip_spend(self):
+        """Test that unspecified pairings keep the default outcome regardless of spend"""
+        outcome = outcome_for('sabotage', 'safe_house')
+        
+        assert not outcome.ip_spend_applies
+        assert outcome.attacker_ip_change(4) == 0
+        assert describe_outcome(outcome, 4) == outcome.description
+    
+    def test_compile_modified_matrix(self):
+        """Test compiling a balance variant of the matrix"""
+        variant = {'sabotage': {'safe_house': dict(INTERACTION_MATRIX['assassination']['safe_house'])}}
+        table = compile_matrix(variant)
+        
+        outcome = outcome_for('sabotage', 'safe_house', table)
+        assert outcome.ip_change_attacker == -1
+        assert outcome.ip_spend_applies
+        assert not outcome_for('assassination', 'safe_house', table).ip_spend_applies
+
 if __name__ == '__main__':
     pytest.main([__file__, '-v']) 
\ No newline at end of file
@@ -0,0 +1,169 @@
+"""
+Test suite for the player registry
+Validates sid/codename indexes, lobby uniqueness checks and status sets
+"""
+
+import pytest
+import sys
+import os
+
+# Add parent directory to path to import modules
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from player_registry import PlayerRegistry, ACTIVE_STATUSES, INACTIVE_STATUSES
+from action_resolver import resolve_turn, apply_round_end_effects, get_sid_by_codename
+from alliance_victory import AllianceManager
+from master_plans import MasterPlanManager
+
+def make_player(codename, status='active', ip=10):
+    return {
+        'codename': codename,
+        'status': status,
+        'ip': ip,
+        'gadgets': [],
+        'intel': [],
+        'alliances': []
+    }
+
+class TestPlayerRegistry:
+
+    def setup_method(self):
+        """Set up a registry with three players before each test"""
+        self.registry = PlayerRegistry({
+            'sid1': make_player('Agent_A'),
+            'sid2': make_player('Agent_B'),
+            'sid3': make_player('Agent_C', status='captured')
+        })
+
+    def test_mapping_protocol(self):
+        """Test that the registry behaves like the users dict"""
+        assert len(self.registry) == 3
+        assert 'sid1' in self.registry
+        assert self.registry['sid2']['codename'] == 'Agent_B'
+        assert self.registry.get('missing') is None
+        assert list(self.registry) == ['sid1', 'sid2', 'sid3']
+        assert [u['codename'] for u in self.registry.values()] == ['Agent_A', 'Agent_B', 'Agent_C']
+
+    def test_codename_lookups(self):
+        """Test sid <-> codename maps"""
+        assert self.registry.sid_for('Agent_A') == 'sid1'
+        assert self.registry.sid_for('agent_a') is None  # Exact match only
+        assert self.registry.get_by_codename('Agent_B') is self.registry['sid2']
+        assert self.registry.codename_of('sid3') == 'Agent_C'
+        assert get_sid_by_codename(self.registry, 'Agent_C') == 'sid3'
+
+    def test_case_folded_uniqueness(self):
+        """Test case-insensitive codename check for the lobby"""
+        assert self.registry.codename_taken('AGENT_a')
+        assert not self.registry.codename_taken('Agent_D')
+
+    def test_remove_clears_indexes(self):
+        """Test that removing a player clears every index"""
+        self.registry.remove('sid1')
+
+        assert 'sid1' not in self.registry
+        assert self.registry.sid_for('Agent_A') is None
+        assert not self.registry.codename_taken('agent_a')
+        assert 'sid1' not in self.registry.sids_with_status('active')
+
+    def test_resume_token_index(self):
+        """Test that a resume token follows its player to a new sid and goes with them"""
+        self.registry.add('sid4', dict(make_player('Agent_D'), resume_token='tok'))
+        assert self.registry.sid_for_token('tok') == 'sid4'
+
+        self.registry.add('sid5', self.registry.remove('sid4'))
+        assert self.registry.sid_for_token('tok') == 'sid5'
+
+        self.registry.remove('sid5')
+        assert self.registry.sid_for_token('tok') is None
+
+    def test_status_sets(self):
+        """Test per-status membership sets"""
+        assert self.registry.sids_with_status('active') == {'sid1', 'sid2'}
+        assert self.registry.count_with_status(*INACTIVE_STATUSES) == 1
+
+        self.registry.set_status('sid2', 'burned')
+
+        assert self.registry['sid2']['status'] == 'burned'
+        assert self.registry.sids_with_status('active') == {'sid1'}
+        assert self.registry.count_with_status(*ACTIVE_STATUSES) == 2
+        assert self.registry.is_out_of_play('sid3')
+
+    def test_wrap_shares_player_dicts(self):
+        """Test that wrapping a plain dict indexes the same player objects"""
+        users = {'sid1': make_player('Agent_A')}
+        registry = PlayerRegistry.wrap(users)
+
+        registry.set_status('sid1', 'compromised')
+
+        assert users['sid1']['status'] == 'compromised'
+        assert PlayerRegistry.wrap(registry) is registry
+
+class TestRegistryIntegration:
+
+    def test_resolver_keeps_status_sets_current(self):
+        """Test that status changes made by the resolver update the registry"""
+        registry = PlayerRegistry({
+            'sid1': make_player('Agent_A'),
+            'sid2': make_player('Agent_B')
+        })
+        submitted_actions = {
+            'sid1': {'offense': 'assassination', 'defense': 'safe_house',
+                     'target': 'Agent_B', 'ip_spend': 0, 'banner_message': ''},
+            'sid2': {'offense': '', 'defense': 'underground',
+                     'target': None, 'ip_spend': 0, 'banner_message': ''}
+        }
+
+        resolve_turn(registry, submitted_actions, 1, {})
+
+        # Assassination vs underground compromises the defender
+        assert registry['sid2']['status'] == 'compromised'
+        assert registry.sids_with_status('compromised') == {'sid2'}
+
+    def test_round_end_uses_registry(self):
+        """Test asset yields and status transitions through the registry"""
+        registry = PlayerRegistry({
+            'sid1': make_player('Agent_A', status='compromised', ip=20),
+            'sid2': make_player('Agent_B')
+        })
+
+        apply_round_end_effects(registry, {'central_server': 'Agent_A'})
+
+        assert registry['sid1']['status'] == 'active'
+        assert registry.sids_with_status('active') == {'sid1', 'sid2'}
+
+    def test_alliance_elimination_with_registry(self):
+        """Test coordinated elimination against a sid-keyed registry"""
+        registry = PlayerRegistry({
+            'sid1': make_player('Agent_A'),
+            'sid2': make_player('Agent_B'),
+            'sid3': make_player('Agent_C', status='eliminated')
+        })
+        manager = AllianceManager()
+        manager.create_alliance('Agent_A', 'Agent_B', 'coordinated_operation', 1)
+
+        victory = manager.check_alliance_victory(registry, {})
+
+        assert victory is not None
+        assert victory['condition'] == 'Coordinated Elimination'
+
+    def test_expose_all_with_registry(self):
+        """Test Expose All opponent count against a sid-keyed registry"""
+        registry = PlayerRegistry({
+            'sid1': make_player('Agent_A'),
+            'sid2': make_player('Agent_B'),
+            'sid3': make_player('Agent_C', status='captured')
+        })
+        manager = MasterPlanManager()
+        manager.player_plans['Agent_A'] = 'expose_all'
+        manager.player_progress['Agent_A'] = manager._initialize_progress(
+            manager._get_plan_by_id('expose_all'))
+
+        result = manager.update_progress('Agent_A', 'exposure_success',
+                                         {'target': 'Agent_B'}, 1, registry)
+
+        assert result is not None
+        assert result['completion_details']['targets_exposed'] == 1
+
+if __name__ == '__main__':
+    pytest.main([__file__, '-v'])
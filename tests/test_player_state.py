@@ -0,0 +1,136 @@
+"""
+Test suite for player state records
+Validates the enum-coded status and its flags, dict-style access, the JSON
+view, and that registries read statuses without rewriting plain dict players
+"""
+
+import copy
+import json
+import pickle
+
+import pytest
+import sys
+import os
+
+# Add parent directory to path to import modules
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from player_state import PlayerState, PlayerStatus, PLAYER_FIELDS, as_status
+from player_registry import PlayerRegistry, ACTIVE_STATUSES, INACTIVE_STATUSES
+from interaction_matrix import STATUSES
+from intel_store import intel_count
+
+class TestPlayerStatus:
+
+    def test_members_are_the_wire_strings(self):
+        """Test that statuses compare, hash, format and encode as their strings"""
+        assert PlayerStatus.CAPTURED == 'captured'
+        assert {'captured': 1}[PlayerStatus.CAPTURED] == 1
+        assert f'{PlayerStatus.BURNED}' == 'burned'
+        assert json.dumps({'status': PlayerStatus.ACTIVE}) == '{"status": "active"}'
+        assert as_status('exposed') is PlayerStatus.EXPOSED
+        assert as_status(None) is None
+        with pytest.raises(ValueError):
+            as_status('vanished')
+
+    def test_flags_match_status_groups(self):
+        """Test that can_act and can_be_targeted agree with the registry's status groups"""
+        for status in STATUSES:
+            assert as_status(status).can_act == (status in ACTIVE_STATUSES)
+            assert as_status(status).can_be_targeted == (status not in INACTIVE_STATUSES)
+        assert not PlayerStatus.EXPOSED.can_act
+        assert PlayerStatus.EXPOSED.can_be_targeted
+
+class TestPlayerState:
+
+    def test_reads_and_writes_like_a_dict(self):
+        """Test dict-style access to fields, status coercion and extra keys"""
+        player = PlayerState('Agent_A', ip=10)
+
+        player['ip'] += 2
+        player['status'] = 'captured'
+        player['notes'] = 'extra'
+
+        assert player.ip == 12
+        assert player['status'] is PlayerStatus.CAPTURED
+        assert not player.can_act and not player.can_be_targeted
+        assert player.get('notes') == 'extra'
+        assert list(player) == list(PLAYER_FIELDS) + ['notes']
+        assert intel_count(player['intel']) == 0
+
+    def test_unset_fields_read_as_missing(self):
+        """Test that from_dict() only sets the keys it is given"""
+        player = PlayerState.from_dict({'codename': 'Agent_B', 'status': 'burned', 'ip': 3})
+
+        assert 'master_plan' not in player
+        assert player.get('gadgets', 'none') == 'none'
+        assert len(player) == 3
+        with pytest.raises(KeyError):
+            player['alliances']
+        assert player == {'codename': 'Agent_B', 'status': 'burned', 'ip': 3}
+
+    def test_json_view_round_trips(self):
+        """Test that to_dict() is plain JSON that rebuilds an equal player"""
+        player = PlayerState('Agent_C', status='compromised', ip=7, resume_token='token')
+
+        data = json.loads(json.dumps(player.to_dict()))
+
+        assert data['status'] == 'compromised' and type(data['status']) is str
+        assert PlayerState.from_dict(data) == player
+
+    def test_pickle_and_copy(self):
+        """Test that players pickle for worker processes and deep copy independently"""
+        player = PlayerState('Agent_D', ip=4)
+        player['gadgets'].append('jetpack')
+
+        restored = pickle.loads(pickle.dumps(player))
+        copied = copy.deepcopy(player)
+        copied['gadgets'].append('laser')
+
+        assert restored == player
+        assert restored['status'] is PlayerStatus.ACTIVE
+        assert player['gadgets'] == ['jetpack']
+
+class TestRegistryStatuses:
+
+    def test_plain_dict_statuses_stay_strings(self):
+        """Test that a registry indexes plain dict players without rewriting their status"""
+        players = {'sid1': {'codename': 'Agent_A', 'status': 'burned', 'ip': 1}}
+        users = PlayerRegistry(players)
+
+        assert type(players['sid1']['status']) is str
+        assert users.status_of('sid1') is PlayerStatus.BURNED
+
+        users.set_status('sid1', PlayerStatus.CAPTURED)
+
+        assert type(players['sid1']['status']) is str and players['sid1']['status'] == 'captured'
+        assert not users.status_of('sid1').can_be_targeted
+        assert users.is_out_of_play('sid1')
+        assert users.sids_with_status('captured') == {'sid1'}
+
+    def test_player_state_statuses_are_enums(self):
+        """Test that PlayerState records normalize statuses when built and when set"""
+        users = PlayerRegistry({'sid1': PlayerState.from_dict({'codename': 'Agent_A', 'status': 'burned'})})
+
+        assert users['sid1']['status'] is PlayerStatus.BURNED
+        users.set_status('sid1', 'captured')
+        assert users['sid1']['status'] is PlayerStatus.CAPTURED
+
+    def test_repeated_status_is_not_a_change(self):
+        """Test that setting the same status by string does not notify the watcher"""
+        changes = []
+
+        class Watcher:
+            def status_changed(self, sid, old, new):
+                changes.append((old, new))
+
+        users = PlayerRegistry({'sid1': PlayerState('Agent_A')})
+        users.status_watcher = Watcher()
+
+        users.set_status('sid1', 'active')
+        users.set_status('sid1', 'eliminated')
+
+        assert changes == [('active', 'eliminated')]
+
+if __name__ == '__main__':
+    pytest.main([__file__, '-v'])
@@ -0,0 +1,310 @@
+"""
+Test suite for off-loop round resolution
+Validates the resolution pool, deferral of room inputs while a round resolves,
+offloaded results matching in-place resolution, and the loop stall meter
+"""
+
+import json
+import pickle
+import random
+
+import pytest
+import sys
+import os
+
+# Add parent directory to path to import modules
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from game_room import GameRoom, RoomManager, MAX_PLAYERS, SNAPSHOT_EVERY_RECORDS, resolve_job
+from resolution_pool import DEFAULT_OFFLOAD_MIN_PLAYERS, ResolutionPool, LoopMonitor
+
+SAFE_TURN = {
+    'offense': '',
+    'defense': 'underground',
+    'target': None,
+    'ip_spend': 0,
+    'banner_message': ''
+}
+
+class RecordingEmitter:
+    """Collects emitted events instead of sending them over Socket.IO"""
+
+    def __init__(self):
+        self.events = []
+
+    def __call__(self, event, data=None, to=None, **kwargs):
+        self.events.append((event, data, to))
+
+    def named(self, event):
+        return [e for e in self.events if e[0] == event]
+
+class ListJournal:
+    """Journal that keeps records, and the phase of each snapshot, in memory"""
+
+    def __init__(self):
+        self.records = []
+        self.records_since_snapshot = 0
+        self.snapshot_phases = []
+
+    def append(self, kind, sid=None, data=None):
+        self.records.append({'seq': len(self.records) + 1, 'type': kind, 'sid': sid})
+
+    def queue_snapshot(self, state):
+        self.snapshot_phases.append(state['game_state']['phase'])
+        self.records_since_snapshot = 0
+
+class HeldPool(ResolutionPool):
+    """Offloads every room but holds each job until release() is called"""
+
+    def __init__(self):
+        super().__init__(mode='thread')
+        self.held = []
+
+    def submit(self, function, job, callback):
+        self.held.append((function, pickle.loads(pickle.dumps(job)), callback))
+
+    def release(self):
+        function, job, callback = self.held.pop(0)
+        callback(function(job), None)
+
+class ImmediatePool(ResolutionPool):
+    """Offloads every room and resolves a pickled copy of the job at once, like a process pool"""
+
+    def __init__(self):
+        super().__init__(mode='process', spawn=lambda wait: wait())
+
+    def execute(self, function, job):
+        return pickle.loads(pickle.dumps(function(pickle.loads(pickle.dumps(job)))))
+
+def start_room(room, players=3):
+    for i in range(players):
+        room.join(f'sid{i}', f'Agent_{i}')
+    room.start_game('sid0')
+
+def play_game(room, rounds, seed):
+    """Play random rounds, alliances included, through the room's public methods"""
+    choices = random.Random(seed)
+    start_room(room, 4)
+    codenames = ['Agent_0', 'Agent_1', 'Agent_2', 'Agent_3']
+
+    for _ in range(rounds):
+        if room.game_state['phase'] != 'planning':
+            break
+        if choices.random() < 0.2:
+            room.create_alliance('sid0', {'target': choices.choice(codenames[1:])})
+        for sid in list(room.users):
+            if room.game_state['phase'] != 'planning':
+                break
+            codename = room.users[sid]['codename']
+            room.submit_action(sid, {
+                'offense': choices.choice(['assassination', 'surveillance', 'sabotage', '']),
+                'defense': choices.choice(['safe_house', 'underground', 'bodyguard_detail']),
+                'target': choices.choice([c for c in codenames if c != codename]),
+                'ip_spend': choices.randint(0, 2),
+                'banner_message': ''
+            })
+
+def game_state(room):
+    # Resume tokens are random by design, so two identical games never share them
+    return json.loads(json.dumps({
+        'users': [(sid, {field: value for field, value in user.items() if field != 'resume_token'})
+                  for sid, user in room.users.items()],
+        'assets': room.game_state['assets'],
+        'round': room.game_state['round_number'],
+        'phase': room.game_state['phase'],
+        'plans': room.master_plan_manager.to_dict(),
+        'alliances': room.alliance_manager.to_dict()
+    }))
+
+class TestResolutionPool:
+
+    def test_unknown_mode_rejected(self):
+        """Test that a misspelled mode fails at startup"""
+        with pytest.raises(ValueError):
+            ResolutionPool(mode='threads')
+
+    def test_should_offload(self):
+        """Test that inline pools and small rooms resolve in place"""
+        assert not ResolutionPool(mode='inline').should_offload(6)
+        assert ResolutionPool(mode='thread').should_offload(2)
+        assert not ResolutionPool(mode='process', min_players=4).should_offload(3)
+        assert ResolutionPool(mode='process', min_players=4).should_offload(4)
+
+    def test_default_threshold_keeps_real_tables_inline(self):
+        """Test that the server's default threshold does not offload a full table"""
+        pool = ResolutionPool(mode='process', min_players=DEFAULT_OFFLOAD_MIN_PLAYERS)
+        assert not pool.should_offload(MAX_PLAYERS)
+
+    def test_inline_submit_reports_errors(self):
+        """Test that results and exceptions both reach the callback and the metrics"""
+        pool = ResolutionPool(mode='inline')
+        outcomes = []
+
+        pool.submit(sum, [1, 2], lambda result, error: outcomes.append((result, error)))
+        pool.submit(sum, None, lambda result, error: outcomes.append((result, error)))
+
+        assert outcomes[0] == (3, None)
+        assert outcomes[1][0] is None and isinstance(outcomes[1][1], TypeError)
+        stats = pool.stats()
+        assert (stats['jobs'], stats['failures'], stats['inFlight']) == (2, 1, 0)
+
+    def test_process_pool_runs_resolve_job(self):
+        """Test that a real worker process resolves a room's round and reports errors"""
+        room = GameRoom('table1', seed=5)
+        start_room(room)
+        for sid in room.users:
+            room.game_state['submitted_actions'][sid] = dict(SAFE_TURN)
+        job = room.resolution_job()
+
+        pool = ResolutionPool(mode='process', workers=1)
+        try:
+            result = pool.execute(resolve_job, job)
+            with pytest.raises(TypeError):
+                pool.execute(abs, 'not a number')
+            assert len(pool.processes) == 1  # reused after a failed job
+        finally:
+            pool.close()
+
+        assert result == resolve_job(room.resolution_job())
+        assert all(player['ip'] == 11 for player in result['players'].values())
+
+class TestOffloadedRooms:
+
+    def setup_method(self):
+        """Set up a three player room that holds its resolutions"""
+        self.emitter = RecordingEmitter()
+        self.pool = HeldPool()
+        self.journal = ListJournal()
+        self.room = GameRoom('table1', emit=self.emitter, journal=self.journal, seed=3, resolver=self.pool)
+        start_room(self.room)
+
+    def submit_all(self):
+        for sid in list(self.room.users):
+            self.room.submit_action(sid, dict(SAFE_TURN))
+
+    def test_inputs_wait_for_resolution(self):
+        """Test that inputs received while resolving run afterwards, in order"""
+        self.submit_all()
+        assert self.room.resolving and len(self.pool.held) == 1
+        sent = len(self.emitter.events)
+
+        self.room.create_alliance('sid0', {'target': 'Agent_1'})
+        self.room.send_game_state('sid2')
+        assert len(self.emitter.events) == sent
+        assert [r['type'] for r in self.journal.records][-1] == 'submitAction'
+
+        self.pool.release()
+
+        names = [event[0] for event in self.emitter.events[sent:]]
+        assert names.index('turnResult') < names.index('allianceCreated') < names.index('gameStateSnapshot')
+        assert not self.room.resolving and not self.room.deferred
+        assert [r['type'] for r in self.journal.records][-1] == 'createAlliance'
+
+    def test_deferred_submission_counts_for_next_round(self):
+        """Test that an action sent during resolution lands in the next planning round"""
+        self.submit_all()
+        self.room.submit_action('sid0', dict(SAFE_TURN))
+
+        self.pool.release()
+
+        assert self.room.game_state['round_number'] == 2
+        assert list(self.room.game_state['submitted_actions']) == ['sid0']
+
+    def test_reconnect_during_resolution(self):
+        """Test that a player who reconnects mid-resolution keeps their resolved state"""
+        self.submit_all()
+        self.room.rebind_sid('sid1', 'sid1b')
+
+        self.pool.release()
+
+        assert self.room.users['sid1b']['ip'] == 11
+        assert self.room.users.sids_with_status('active') == {'sid0', 'sid1b', 'sid2'}
+
+    def test_no_checkpoint_while_resolving(self):
+        """Test that a resume logged mid-resolution does not snapshot the half-resolved round"""
+        self.submit_all()
+        self.journal.snapshot_phases.clear()
+        self.journal.records_since_snapshot = SNAPSHOT_EVERY_RECORDS
+
+        assert self.room.resume_session('sid1b', self.room.users['sid1']['resume_token']) == 'sid1'
+        assert self.journal.records[-1]['type'] == 'resume'
+        assert self.journal.snapshot_phases == []
+
+        self.pool.release()
+
+        assert self.journal.snapshot_phases == ['planning']
+
+    def test_resolution_error_advances(self):
+        """Test that a failed offloaded resolution is reported and the game moves on"""
+        self.submit_all()
+        self.pool.held.pop()
+
+        self.room.on_resolved(None, RuntimeError('worker died'))
+
+        assert self.emitter.named('error')[-1][1]['message'] == 'Turn resolution failed'
+        assert self.room.game_state['round_number'] == 2
+
+    def test_last_leave_during_final_round_discards_room(self):
+        """Test that a game won while everyone disconnects is dropped once their deferred leaves run"""
+        manager = RoomManager(resolver=self.pool)
+        manager.add_room(self.room)
+        for sid in self.room.users:
+            manager.assign(sid, 'table1')
+        self.submit_all()
+        function, job, callback = self.pool.held[0]
+        victory = {'winners': ['Agent_0'], 'condition': 'Test', 'description': 'Agent_0 wins'}
+        self.pool.held[0] = (lambda job: dict(function(job), victory=victory), job, callback)
+
+        # The server releases each socket as soon as its leave is queued
+        for sid in list(self.room.users):
+            self.room.post('leave', sid, reply=lambda _, sid=sid: manager.release(sid))
+        assert manager.get_room('table1') is self.room
+
+        self.pool.release()
+
+        assert self.room.game_state['phase'] == 'game_over'
+        assert manager.get_room('table1') is None
+
+    @pytest.mark.parametrize('seed', [1, 2, 3])
+    def test_offloaded_matches_inline(self, seed):
+        """Test that resolving a copy in a worker leaves the room exactly as resolving in place"""
+        inline, offloaded = GameRoom('a', seed=seed), GameRoom('b', seed=seed, resolver=ImmediatePool())
+
+        play_game(inline, 20, seed)
+        play_game(offloaded, 20, seed)
+
+        assert game_state(offloaded) == game_state(inline)
+
+class TestLoopMonitor:
+
+    def test_stall_stats(self):
+        """Test that lateness past the requested interval is recorded as stall"""
+        now = [0.0]
+        stalls = [0.0, 0.0, 0.25, 0.0, 0.05]
+        monitor = LoopMonitor(interval=0.01, clock=lambda: now[0])
+
+        def sleep(seconds):
+            now[0] += seconds + stalls[monitor.wakeups]
+            if monitor.wakeups == len(stalls) - 1:
+                monitor.stop()
+
+        monitor.run(sleep)
+
+        stats = monitor.stats()
+        assert stats['wakeups'] == 5
+        assert stats['maxStall'] == pytest.approx(0.25)
+        assert stats['stalledSeconds'] == pytest.approx(0.30)
+        assert stats['p50Stall'] == pytest.approx(0.0)
+        assert stats['p99Stall'] == pytest.approx(0.25)
+
+    def test_history_is_bounded(self):
+        """Test that percentiles only cover recent wakeups"""
+        monitor = LoopMonitor(history=4)
+        for lateness in [1.0] + [0.0] * 4:
+            monitor.record(lateness)
+
+        assert monitor.stats()['p99Stall'] == 0.0
+        assert monitor.stats()['maxStall'] == 1.0
+
+if __name__ == '__main__':
+    pytest.main([__file__, '-v'])
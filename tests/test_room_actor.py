@@ -0,0 +1,209 @@
+"""
+Test suite for room actors
+Validates mailbox ordering, one drain loop per room, error isolation, and that
+socket inputs, deadlines and resolution results all reach a room through its mailbox
+"""
+
+import pytest
+import sys
+import os
+
+# Add parent directory to path to import modules
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from room_actor import RoomActor
+from game_room import GameRoom, RoomManager, DEADLINE_GRACE_SECONDS
+from resolution_pool import ResolutionPool
+from timer_wheel import TimerWheel
+
+SAFE_TURN = {
+    'offense': '',
+    'defense': 'underground',
+    'target': None,
+    'ip_spend': 0,
+    'banner_message': ''
+}
+
+class RecordingEmitter:
+    """Collects emitted events instead of sending them over Socket.IO"""
+
+    def __init__(self):
+        self.events = []
+
+    def __call__(self, event, data=None, to=None, **kwargs):
+        self.events.append((event, data, to))
+
+    def named(self, event):
+        return [e for e in self.events if e[0] == event]
+
+class FakeClock:
+    """Manually advanced monotonic clock"""
+
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+class Spawner:
+    """Collects spawned drain loops so tests decide when the actor runs"""
+
+    def __init__(self):
+        self.tasks = []
+
+    def __call__(self, function):
+        self.tasks.append(function)
+
+    def run(self):
+        while self.tasks:
+            self.tasks.pop(0)()
+
+class CallLog:
+    """Stand-in room that records calls and can post to itself"""
+
+    room_id = 'log'
+
+    def __init__(self):
+        self.calls = []
+        self.actor = None
+
+    def note(self, value):
+        self.calls.append(value)
+        return value * 2
+
+    def note_and_post(self, value):
+        self.calls.append(value)
+        self.actor.tell('note', value + 1)
+
+    def fail(self):
+        raise RuntimeError('boom')
+
+class TestRoomActor:
+
+    def test_synchronous_drain_and_reply(self):
+        """Test that without a spawner messages run at once and replies get the result"""
+        room = CallLog()
+        actor = RoomActor(room)
+        replies = []
+
+        actor.tell('note', 1, reply=replies.append)
+        actor.tell('note', 2)
+
+        assert room.calls == [1, 2]
+        assert replies == [2]
+
+    def test_reentrant_tell_is_queued(self):
+        """Test that a message posted while handling another runs after it, not inside it"""
+        room = CallLog()
+        room.actor = actor = RoomActor(room)
+
+        actor.tell('note_and_post', 10)
+        assert room.calls == [10, 11]
+
+    def test_one_drain_loop_per_room(self):
+        """Test that a burst of messages starts a single drain loop that handles them in order"""
+        room = CallLog()
+        spawner = Spawner()
+        actor = RoomActor(room, spawn=spawner)
+
+        for value in range(5):
+            actor.tell('note', value)
+
+        assert len(spawner.tasks) == 1 and room.calls == []
+        assert actor.stats()['depth'] == 5
+        spawner.run()
+        assert room.calls == [0, 1, 2, 3, 4]
+
+        actor.tell('note', 5)
+        assert len(spawner.tasks) == 1
+
+    def test_failure_does_not_stop_mailbox(self):
+        """Test that one failing message is counted and later messages still run"""
+        room = CallLog()
+        actor = RoomActor(room)
+
+        actor.tell('fail')
+        actor.tell('note', 3)
+
+        assert room.calls == [3]
+        assert actor.stats()['failures'] == 1
+        assert actor.stats()['processed'] == 2
+
+    def test_latency_stats(self):
+        """Test that latency covers the time a message waits in the mailbox"""
+        clock = FakeClock()
+        spawner = Spawner()
+        actor = RoomActor(CallLog(), spawn=spawner, clock=clock)
+
+        actor.tell('note', 1)
+        clock.now += 0.5
+        spawner.run()
+
+        stats = actor.stats()
+        assert stats['maxLatency'] == pytest.approx(0.5)
+        assert stats['maxDepth'] == 1
+
+class TestRoomMailboxes:
+
+    def setup_method(self):
+        """Set up a manager whose rooms get mailboxes drained only when the test says so"""
+        self.emitter = RecordingEmitter()
+        self.spawner = Spawner()
+        self.clock = FakeClock()
+        self.wheel = TimerWheel(tick=0.1, clock=self.clock)
+        self.manager = RoomManager(emit=self.emitter, scheduler=self.wheel,
+                                   mailbox=lambda room: RoomActor(room, spawn=self.spawner))
+        self.room = self.manager.get_or_create('table1')
+        self.room.post('join', 'sid1', 'Agent_A')
+        self.room.post('join', 'sid2', 'Agent_B')
+        self.room.post('start_game', 'sid1')
+        self.spawner.run()
+
+    def test_inputs_wait_for_the_actor(self):
+        """Test that posted inputs change nothing until the room's actor drains them"""
+        assert self.room.game_state['phase'] == 'planning'
+        self.room.post('submit_action', 'sid1', dict(SAFE_TURN))
+        self.room.post('submit_action', 'sid2', dict(SAFE_TURN))
+
+        assert self.room.game_state['submitted_actions'] == {}
+        self.spawner.run()
+        assert self.emitter.named('turnResult')
+        assert self.room.game_state['round_number'] == 2
+
+    def test_deadline_goes_through_mailbox(self):
+        """Test that a fired planning deadline is queued behind earlier inputs"""
+        self.room.post('submit_action', 'sid1', dict(SAFE_TURN))
+        self.clock.now += self.room.game_state['timer_duration'] + DEADLINE_GRACE_SECONDS + 0.2
+        self.wheel.advance()
+
+        assert not self.emitter.named('planningDeadline')
+        self.spawner.run()
+        deadline = self.emitter.named('planningDeadline')[0]
+        assert deadline[1] == {'roundNumber': 1, 'autoSubmitted': ['Agent_B'], 'seq': 2}
+
+    def test_resolution_result_goes_through_mailbox(self):
+        """Test that an offloaded resolution is applied by the room's actor"""
+        callbacks = []
+        pool = ResolutionPool(mode='thread')
+        pool.submit = lambda function, job, callback: callbacks.append((function, job, callback))
+        self.room.resolver = pool
+        self.room.post('submit_action', 'sid1', dict(SAFE_TURN))
+        self.room.post('submit_action', 'sid2', dict(SAFE_TURN))
+        self.spawner.run()
+
+        function, job, callback = callbacks.pop()
+        callback(function(job), None)
+        assert self.room.resolving and not self.emitter.named('turnResult')
+        self.spawner.run()
+        assert not self.room.resolving
+        assert self.room.game_state['round_number'] == 2
+
+    def test_mailbox_stats(self):
+        """Test that the manager reports every room's mailbox"""
+        stats = self.manager.mailbox_stats()
+
+        assert stats['table1']['processed'] == 3
+        assert stats['table1']['depth'] == 0
+
+if __name__ == '__main__':
+    pytest.main([__file__, '-v'])
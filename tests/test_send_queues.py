@@ -0,0 +1,168 @@
+"""
+Test suite for per-socket send queues
+Validates that superseded progress updates are replaced for backed-up sockets,
+that sockets over their limit are downgraded and told to resync, and that
+stalled sockets are disconnected
+"""
+
+import pytest
+import socketio
+import sys
+import os
+
+# Add parent directory to path to import modules
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from send_queues import SendQueues, RESYNC_EVENT, REPLACE_BACKLOG, MAX_BACKLOG
+from broadcast import Broadcaster
+
+class FakeClock:
+    """Manually advanced monotonic clock"""
+
+    def __init__(self, now=1000.0):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+class FakeSockets:
+    """Engine.IO sockets whose queued packet count the test controls"""
+
+    def __init__(self):
+        self.sent = []     # (eio_sid, packet)
+        self.depth = {}    # eio_sid -> packets still queued
+        self.notified = []
+        self.disconnected = []
+
+    def send(self, eio_sid, packet):
+        self.sent.append((eio_sid, packet))
+        self.depth[eio_sid] = self.depth.get(eio_sid, 0) + 1
+
+    def backlog(self, eio_sid):
+        return self.depth.get(eio_sid, 0)
+
+    def packets_for(self, eio_sid):
+        return [packet for sid, packet in self.sent if sid == eio_sid]
+
+class TestSendQueues:
+
+    def setup_method(self):
+        """Set up queues over fake sockets before each test"""
+        self.sockets = FakeSockets()
+        self.clock = FakeClock()
+        self.queues = SendQueues(self.sockets.send, self.sockets.backlog,
+                                 notify=self.sockets.notified.append,
+                                 disconnect=self.sockets.disconnected.append,
+                                 stall_seconds=30, clock=self.clock)
+
+    def test_healthy_socket_gets_everything(self):
+        """Test that a draining socket is written every event at once"""
+        for n in range(5):
+            assert self.queues.deliver('s1', 'e1', 'playerSubmitted', [f'p{n}'])
+            self.sockets.depth['e1'] = 0
+
+        assert self.sockets.packets_for('e1') == ['p0', 'p1', 'p2', 'p3', 'p4']
+
+    def test_replaceable_updates_keep_only_the_latest(self):
+        """Test that a backed-up socket holds one progress update per event, the newest"""
+        self.sockets.depth['e1'] = REPLACE_BACKLOG
+
+        for n in range(10):
+            assert not self.queues.deliver('s1', 'e1', 'playerSubmitted', [f'p{n}'])
+        self.queues.deliver('s1', 'e1', 'lobbyUpdate', ['lobby'])
+
+        assert self.sockets.packets_for('e1') == []
+        assert self.queues.stats()['held'] == 2
+        assert self.queues.replaced == 9
+
+        self.sockets.depth['e1'] = 0
+        assert self.queues.pump() == 1
+        assert self.sockets.packets_for('e1') == ['p9', 'lobby']
+
+    def test_held_updates_precede_must_deliver_events(self):
+        """Test that held updates are written before the next must-deliver event"""
+        self.sockets.depth['e1'] = REPLACE_BACKLOG
+        self.queues.deliver('s1', 'e1', 'playerSubmitted', ['progress'])
+
+        assert self.queues.deliver('s1', 'e1', 'turnResult', ['result'])
+
+        assert self.sockets.packets_for('e1') == ['progress', 'result']
+        assert self.queues.stats()['held'] == 0
+
+    def test_over_limit_downgrades_to_snapshot_only(self):
+        """Test that a socket past its limit is written nothing more, then told to resync"""
+        self.sockets.depth['e1'] = MAX_BACKLOG
+
+        assert not self.queues.deliver('s1', 'e1', 'turnResult', ['result'])
+        assert not self.queues.deliver('s1', 'e1', 'nextRound', ['round'])
+
+        assert self.sockets.packets_for('e1') == []
+        assert self.queues.stats()['lagging'] == 1
+        assert self.queues.dropped == 2
+
+        self.queues.pump()
+        assert self.sockets.notified == []
+
+        self.sockets.depth['e1'] = 0
+        self.queues.pump()
+        assert self.sockets.notified == ['s1']
+        assert self.queues.deliver('s1', 'e1', 'nextRound', ['round'])
+
+    def test_stalled_socket_disconnected(self):
+        """Test that a socket that never drains is disconnected after the stall timeout"""
+        self.sockets.depth['e1'] = MAX_BACKLOG
+        self.queues.deliver('s1', 'e1', 'turnResult', ['result'])
+
+        self.clock.now += 29
+        self.queues.pump()
+        assert self.sockets.disconnected == []
+
+        self.clock.now += 1
+        self.queues.pump()
+        assert self.sockets.disconnected == ['s1']
+        assert self.queues.stats()['lagging'] == 0
+
+    def test_buffered_packets_stay_bounded(self):
+        """Test that a stalled socket never has more than the limit written to it"""
+        for n in range(1000):
+            self.queues.deliver('s1', 'e1', 'turnResult' if n % 3 else 'playerSubmitted', [n])
+
+        assert len(self.sockets.packets_for('e1')) <= MAX_BACKLOG
+        assert self.queues.stats()['held'] <= 1
+
+    def test_forget(self):
+        """Test that a disconnected socket's queue state is dropped"""
+        self.sockets.depth['e1'] = MAX_BACKLOG
+        self.queues.deliver('s1', 'e1', 'turnResult', ['result'])
+
+        self.queues.forget('s1')
+
+        assert self.queues.stats()['lagging'] == 0
+
+class TestBroadcasterBackpressure:
+
+    def test_resync_goes_to_recovered_socket(self):
+        """Test that a downgraded socket skips broadcasts and gets resyncRequired once it drains"""
+        server = socketio.Server(async_mode='threading')
+        sockets = FakeSockets()
+        broadcaster = Broadcaster(server, send=sockets.send)
+        broadcaster.queues.backlog = sockets.backlog
+        eio_sids = []
+        for i in range(2):
+            eio_sid = f'eio{i}'
+            sid = server.manager.connect(eio_sid, '/')
+            server.manager.enter_room(sid, '/', 'alpha', eio_sid)
+            eio_sids.append(eio_sid)
+        sockets.depth['eio1'] = MAX_BACKLOG
+
+        assert broadcaster('turnResult', {'round': 2}, to='alpha') is None
+        assert len(sockets.packets_for('eio0')) == 1
+        assert sockets.packets_for('eio1') == []
+        assert broadcaster.deliveries == 1
+
+        sockets.depth['eio1'] = 0
+        broadcaster.queues.pump()
+        assert RESYNC_EVENT in sockets.packets_for('eio1')[0].encode()
+
+if __name__ == '__main__':
+    pytest.main([__file__, '-v'])
@@ -0,0 +1,188 @@
+"""
+Test suite for room sharding
+Validates the room to worker mapping, request routing, the Unix-socket
+directory bus and per-worker journal recovery
+"""
+
+import tempfile
+
+import eventlet
+from eventlet import wsgi
+
+import pytest
+import sys
+import os
+
+# Add parent directory to path to import modules
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sharding import shard_for, room_from_request, is_upgrade, close_after_response, DirectoryBus, Router
+from game_room import RoomManager, DEFAULT_ROOM_ID
+from action_log import JournalStore
+
+class FakeClock:
+    """Manually advanced monotonic clock"""
+
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+class TestShardMapping:
+
+    def test_stable_and_in_range(self):
+        """Test that a room always maps to the same worker within range"""
+        for room_id in ('main', 'alpha', 'table-7'):
+            assert shard_for(room_id, 4) == shard_for(room_id, 4)
+            assert 0 <= shard_for(room_id, 4) < 4
+        assert shard_for('anything', 1) == 0
+
+    def test_rooms_spread_over_workers(self):
+        """Test that many rooms use every worker"""
+        counts = [0] * 4
+        for i in range(400):
+            counts[shard_for(f'room{i}', 4)] += 1
+
+        assert min(counts) > 60
+
+    def test_room_from_request(self):
+        """Test that the room comes from the request query, then the Referer"""
+        polling = b'GET /socket.io/?EIO=4&transport=polling&room=Alpha HTTP/1.1\r\nHost: x\r\n\r\n'
+        asset = b'GET /static/js/app.js HTTP/1.1\r\nReferer: http://10.0.0.2:5000/?room=beta\r\n\r\n'
+
+        assert room_from_request(polling) == 'alpha'
+        assert room_from_request(asset) == 'beta'
+        assert room_from_request(b'GET / HTTP/1.1\r\n\r\n') == DEFAULT_ROOM_ID
+        assert room_from_request(b'GET /?room=no%20spaces HTTP/1.1\r\n\r\n') == DEFAULT_ROOM_ID
+
+    def test_router_pins_room_to_owner(self):
+        """Test that every request for a room is routed to the worker that owns it"""
+        router = Router([('127.0.0.1', 5101 + i) for i in range(3)])
+        owner = shard_for('gamma', 3)
+
+        assert router.pick(b'GET /?room=gamma HTTP/1.1\r\n\r\n') == owner
+        assert router.pick(b'POST /socket.io/?EIO=4&transport=polling&room=gamma&sid=x HTTP/1.1\r\n\r\n') == owner
+
+    def test_only_upgrades_stay_open(self):
+        """Test that plain requests are sent with Connection: close and websocket handshakes untouched"""
+        polling = b'GET /socket.io/?room=a HTTP/1.1\r\nConnection: keep-alive\r\nKeep-Alive: 5\r\n\r\nbody'
+        upgrade = b'GET /socket.io/?room=a HTTP/1.1\r\nConnection: Upgrade\r\nUpgrade: websocket\r\n\r\n'
+
+        assert close_after_response(polling) == b'GET /socket.io/?room=a HTTP/1.1\r\nConnection: close\r\n\r\nbody'
+        assert not is_upgrade(polling)
+        assert is_upgrade(upgrade)
+        assert close_after_response(b'GET / HTTP/1.1\r\nHost: x') == b'GET / HTTP/1.1\r\nHost: x'
+
+class TestRouterConnections:
+
+    def setup_method(self):
+        """Start two HTTP workers that name themselves, and a router in front of them"""
+        self.threads = []
+        backends = []
+        for worker in range(2):
+            listener = eventlet.listen(('127.0.0.1', 0))
+            backends.append(listener.getsockname())
+
+            def app(environ, start_response, worker=worker):
+                start_response('200 OK', [('Content-Type', 'text/plain')])
+                return [f'worker {worker}'.encode()]
+
+            self.threads.append(eventlet.spawn(wsgi.server, listener, app, log_output=False))
+        self.router = Router(backends)
+        listener = eventlet.listen(('127.0.0.1', 0))
+        self.address = listener.getsockname()
+        self.threads.append(eventlet.spawn(self.router.serve, listener))
+
+    def teardown_method(self):
+        for thread in self.threads:
+            thread.kill()
+
+    def exchange(self, requests):
+        """Send requests on one connection and read until the router closes it"""
+        client = eventlet.connect(self.address)
+        client.sendall(requests)
+        received = b''
+        with eventlet.Timeout(5):
+            while True:
+                chunk = client.recv(65536)
+                if not chunk:
+                    break
+                received += chunk
+        client.close()
+        return received
+
+    def test_keep_alive_request_for_another_room_is_rerouted(self):
+        """Test that a second request for another room on one connection never reaches the first room's worker"""
+        rooms = {shard_for(room_id, 2): room_id for room_id in ('alpha', 'beta', 'gamma', 'delta')}
+        request = 'GET /?room={} HTTP/1.1\r\nHost: x\r\nConnection: keep-alive\r\n\r\n'
+
+        first = self.exchange((request.format(rooms[0]) + request.format(rooms[1])).encode())
+
+        assert first.count(b'HTTP/1.1 200') == 1
+        assert first.endswith(b'worker 0') and b'Connection: close' in first
+
+        # The client sends its unanswered request again, on a new connection
+        assert self.exchange(request.format(rooms[1]).encode()).endswith(b'worker 1')
+        assert self.router.stats()['connections'] == [1, 1]
+
+class TestDirectoryBus:
+
+    def setup_method(self):
+        """Set up two workers' buses in a temporary directory"""
+        self.directory = tempfile.mkdtemp(prefix='bus-')
+        self.clock = FakeClock()
+        self.buses = [DirectoryBus(self.directory, worker, 2, clock=self.clock) for worker in range(2)]
+
+    def teardown_method(self):
+        for bus in self.buses:
+            bus.close()
+
+    def test_directory_merges_workers(self):
+        """Test that each worker's directory includes the other worker's rooms"""
+        self.buses[1].publish([{'room': 'beta', 'players': 3}])
+
+        assert self.buses[0].poll() == 1
+        rooms = self.buses[0].rooms([{'room': 'alpha', 'players': 2}])
+        assert rooms == [{'room': 'alpha', 'players': 2, 'worker': 0},
+                         {'room': 'beta', 'players': 3, 'worker': 1}]
+
+    def test_silent_worker_ages_out(self):
+        """Test that a worker that stops publishing drops out of the directory"""
+        self.buses[1].publish([{'room': 'beta'}])
+        self.buses[0].poll()
+
+        self.clock.now += 10
+        assert self.buses[0].rooms([]) == []
+
+    def test_missing_peer_is_counted(self):
+        """Test that publishing to a worker that is not up yet does not fail"""
+        self.buses[1].close()
+
+        self.buses[0].publish([])
+        assert self.buses[0].stats()['sendErrors'] == 1
+
+class TestShardedRecovery:
+
+    def test_recover_only_owned_rooms(self):
+        """Test that a worker recovers its own rooms and leaves other workers' logs alone"""
+        journal = JournalStore(tempfile.mkdtemp(prefix='journal-'))
+        writer = RoomManager(journal=journal)
+        for room_id in ('alpha', 'beta', 'gamma', 'delta'):
+            room = writer.get_or_create(room_id)
+            room.join(f'{room_id}-1', 'Agent_A')
+            room.join(f'{room_id}-2', 'Agent_B')
+            room.start_game(f'{room_id}-1')
+        journal.sync_all()
+
+        recovered = []
+        for worker in range(2):
+            manager = RoomManager(journal=JournalStore(journal.directory),
+                                  owns=lambda room_id, worker=worker: shard_for(room_id, 2) == worker)
+            recovered.append(set(manager.recover()))
+
+        assert recovered[0] | recovered[1] == {'alpha', 'beta', 'gamma', 'delta'}
+        assert not recovered[0] & recovered[1]
+
+if __name__ == '__main__':
+    pytest.main([__file__, '-v'])
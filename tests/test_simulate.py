@@ -0,0 +1,105 @@
+"""
+Test suite for the headless Monte Carlo simulator
+Validates seeded reproducibility, policies, aggregation across workers and matrix overrides
+"""
+
+import pytest
+import sys
+import os
+
+# Add parent directory to path to import modules
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from simulate import (play_game, simulate, apply_matrix_overrides, register_policy, POLICIES,
+                      SimulatedGame, ScriptedPolicy, Tally)
+from interaction_matrix import INTERACTION_MATRIX, compile_matrix
+
+class TestSimulatedGame:
+
+    def test_same_seed_same_game(self):
+        """Test that a seed reproduces a whole game"""
+        assert play_game(42, players=4) == play_game(42, players=4)
+        assert play_game(42, players=4) != play_game(43, players=4)
+
+    def test_game_reaches_an_end(self):
+        """Test that every game ends in a victory or at the round limit"""
+        for seed in range(20):
+            summary = play_game(seed, players=3, max_rounds=10)
+
+            assert 1 <= summary['rounds'] <= 10
+            assert len(summary['ip_totals']) == summary['rounds']
+            if summary['condition'] == 'Round Limit':
+                assert summary['rounds'] == 10 and summary['winners'] == []
+
+    def test_scripted_policy_follows_script(self):
+        """Test that scripted seats play their scripted actions in order"""
+        script = {'actions': [{'offense': 'surveillance', 'defense': 'safe_house', 'target': 'richest'},
+                              {'offense': '', 'defense': 'underground'}]}
+        game = SimulatedGame(1, 3, policies=['scripted'], script=script)
+        policy = game.policy('Agent_0')
+        game.users.get_by_codename('Agent_2')['ip'] = 20
+
+        first = policy.choose_action(game, 'Agent_0')
+        game.round_number = 2
+        second = policy.choose_action(game, 'Agent_0')
+
+        assert (first['offense'], first['defense'], first['target']) == ('surveillance', 'safe_house', 'Agent_2')
+        assert (second['offense'], second['target']) == ('', None)
+
+    def test_passive_table_never_attacks(self):
+        """Test that an all-passive table only takes safe turns"""
+        summary = play_game(5, players=4, policies=['passive'], max_rounds=5)
+
+        assert summary['condition'] == 'Round Limit'
+        # +1 IP per player per safe turn
+        assert summary['ip_totals'] == [4 * (10 + r) for r in range(1, 6)]
+
+    def test_registered_policy(self):
+        """Test that a registered policy can be assigned to seats by name"""
+        register_policy('always_safe', lambda rng, script=None: ScriptedPolicy(rng))
+        try:
+            summary = play_game(3, players=2, policies=['always_safe'], max_rounds=3)
+        finally:
+            POLICIES.pop('always_safe')
+
+        assert summary['winners'] == []
+
+class TestSimulate:
+
+    def test_aggregate_independent_of_workers(self):
+        """Test that one worker and a process pool give the same aggregate"""
+        single = simulate(40, players=4, seed=9, workers=1, max_rounds=15)
+        pooled = simulate(40, players=4, seed=9, workers=2, max_rounds=15)
+
+        for key in ('games', 'mean_rounds', 'conditions', 'lengths', 'wins_by_seat', 'ip_curve'):
+            assert single[key] == pooled[key]
+
+    def test_tally_merge(self):
+        """Test that merging split tallies equals tallying all games at once"""
+        summaries = [play_game(seed, players=3, max_rounds=8) for seed in range(10)]
+        whole, left, right = Tally(), Tally(), Tally()
+        for index, summary in enumerate(summaries):
+            whole.add(summary)
+            (left if index < 4 else right).add(summary)
+        left.merge(right)
+
+        assert left.to_dict() == whole.to_dict()
+
+    def test_unknown_policy_rejected(self):
+        """Test that a misspelled policy fails before any game is played"""
+        with pytest.raises(ValueError):
+            simulate(1, policies=['randon'], workers=1)
+
+    def test_matrix_overrides(self):
+        """Test that overrides change the compiled outcome without touching INTERACTION_MATRIX"""
+        overrides = {'assassination': {'underground': {'ip_change_attacker': 9}}}
+
+        table = compile_matrix(apply_matrix_overrides(overrides))
+
+        assert table[0][3].ip_change_attacker == 9
+        assert INTERACTION_MATRIX['assassination']['underground']['ip_change_attacker'] == 2
+        with pytest.raises(ValueError):
+            apply_matrix_overrides({'assassination': {'no_such_defense': {}}})
+
+if __name__ == '__main__':
+    pytest.main([__file__, '-v'])
@@ -0,0 +1,273 @@
+"""
+Test suite for versioned state sync
+Validates field-level deltas, version history and delta-encoded room emits
+"""
+
+import copy
+import random
+
+import pytest
+import sys
+import os
+
+# Add parent directory to path to import modules
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from state_sync import StateSync, diff_state, apply_delta, split_results, APPEND, REMOVED
+from game_room import GameRoom
+
+class RecordingEmitter:
+    """Collects emitted events instead of sending them over Socket.IO"""
+
+    def __init__(self):
+        self.events = []
+
+    def __call__(self, event, data=None, to=None, **kwargs):
+        self.events.append((event, data, to))
+
+    def named(self, event):
+        return [e for e in self.events if e[0] == event]
+
+class TestDiff:
+
+    def test_only_changed_fields(self):
+        """Test that unchanged fields are left out of the delta"""
+        old = {'players': {'A': {'ip': 5, 'status': 'active'}, 'B': {'ip': 3, 'status': 'active'}}}
+        new = {'players': {'A': {'ip': 7, 'status': 'active'}, 'B': {'ip': 3, 'status': 'active'}}}
+
+        assert diff_state(old, new) == {'players': {'A': {'ip': 7}}}
+        assert diff_state(old, copy.deepcopy(old)) is None
+
+    def test_list_growth_sends_tail(self):
+        """Test that an append-only list sends just the new items"""
+        delta = diff_state({'intel': ['a', 'b']}, {'intel': ['a', 'b', 'c']})
+
+        assert delta == {'intel': {APPEND: ['c']}}
+        assert apply_delta({'intel': ['a', 'b']}, delta) == {'intel': ['a', 'b', 'c']}
+
+    def test_removed_keys_and_none_values(self):
+        """Test key removal and fields changing to None"""
+        old = {'assets': {'x': 'Agent_A'}, 'gone': 1}
+        new = {'assets': {'x': None}}
+
+        delta = diff_state(old, new)
+
+        assert delta == {'assets': {'x': None}, REMOVED: ['gone']}
+        assert apply_delta(old, delta) == new
+
+    def test_random_round_trip(self):
+        """Test apply_delta(old, diff_state(old, new)) == new on random states"""
+        rng = random.Random(7)
+
+        def random_state(depth=0):
+            state = {}
+            for key in rng.sample('abcdef', rng.randint(0, 5)):
+                kind = rng.random()
+                if kind < 0.3 and depth < 2:
+                    state[key] = random_state(depth + 1)
+                elif kind < 0.5:
+                    state[key] = [rng.randint(0, 3) for _ in range(rng.randint(0, 4))]
+                elif kind < 0.6:
+                    state[key] = None
+                else:
+                    state[key] = rng.randint(0, 3)
+            return state
+
+        for _ in range(500):
+            old, new = random_state(), random_state()
+            assert apply_delta(old, diff_state(old, new)) == new
+
+class TestStateSync:
+
+    def setup_method(self):
+        """Set up a sync with a short history before each test"""
+        self.sync = StateSync(history=3)
+
+    def commit(self, ip, intel):
+        return self.sync.commit({
+            'players': {'A': {'ip': ip}},
+            'private': {'A': {'intel': intel}, 'B': {'intel': ['secret']}}
+        })
+
+    def test_unchanged_state_keeps_version(self):
+        """Test that committing an identical view does not bump the version"""
+        assert self.commit(1, []) == 1
+        assert self.commit(1, []) == 1
+        assert self.commit(2, []) == 2
+
+    def test_delta_from_acknowledged_version(self):
+        """Test that a client gets only what changed since its ack, with its own private data"""
+        self.commit(1, ['x'])
+        self.sync.acknowledge('sid1', 1)
+        self.commit(2, ['x', 'y'])
+
+        payload = self.sync.sync_payload('sid1', 'A')
+
+        assert payload['full'] is False
+        assert payload['baseVersion'] == 1
+        assert payload['delta'] == {'players': {'A': {'ip': 2}}, 'you': {'intel': {APPEND: ['y']}}}
+        assert 'secret' not in str(payload)
+
+    def test_full_snapshot_when_too_old(self):
+        """Test fallback to a full snapshot once the client's version is evicted"""
+        self.commit(1, [])
+        self.sync.acknowledge('sid1', 1)
+        for ip in range(2, 6):
+            self.commit(ip, [])
+
+        payload = self.sync.sync_payload('sid1', 'A')
+
+        assert payload['full'] is True
+        assert payload['state']['players'] == {'A': {'ip': 5}}
+        assert self.sync.snapshots_sent == 1
+
+    def test_public_part_cached_per_version(self):
+        """Test that clients at the same base share one public diff, each with their own slice"""
+        self.commit(1, ['x'])
+        self.commit(2, ['x', 'y'])
+
+        payload_a = self.sync.sync_payload('sid1', 'A', 1)
+        payload_b = self.sync.sync_payload('sid2', 'B', 1)
+
+        assert self.sync.cache_misses == 1 and self.sync.cache_hits == 1
+        assert payload_a['delta'] == {'players': {'A': {'ip': 2}}, 'you': {'intel': {APPEND: ['y']}}}
+        assert payload_b['delta'] == {'players': {'A': {'ip': 2}}}
+        assert 'you' not in self.sync.public_cache[1]
+
+    def test_cache_invalidated_by_commit(self):
+        """Test that a new version drops cached public parts"""
+        self.commit(1, [])
+        self.commit(2, [])
+        assert self.sync.sync_payload('sid1', 'A', 1)['delta'] == {'players': {'A': {'ip': 2}}}
+
+        self.commit(3, [])
+
+        assert self.sync.public_cache == {}
+        assert self.sync.sync_payload('sid1', 'A', 1)['delta'] == {'players': {'A': {'ip': 3}}}
+
+    def test_cached_payloads_match_uncached_diff(self):
+        """Test that cached payloads equal diffing each client's whole view"""
+        rng = random.Random(4)
+        for _ in range(3):
+            self.commit(rng.randint(0, 3), ['x'] * rng.randint(0, 2))
+        current = self.sync.version
+
+        for codename in ('A', 'B', 'C'):
+            for base in list(self.sync.views):
+                payload = self.sync.sync_payload('sid', codename, base)
+                expected = diff_state(self.sync.view_for(base, codename),
+                                      self.sync.view_for(current, codename)) or {}
+                assert payload['delta'] == expected
+
+class TestFogOfWar:
+
+    def test_split_results(self):
+        """Test that the public summary hides defenses and intel, and each player gets their own results"""
+        results = [
+            {'codename': 'A', 'action_type': 'attack', 'target': 'B', 'offense': 'exposure',
+             'defense': 'underground', 'success': False, 'ip_delta': -1, 'intel_gained': ['x']},
+            {'codename': 'B', 'action_type': 'defense', 'attacker': 'A', 'offense': 'exposure',
+             'defense': 'underground', 'success': True, 'ip_delta': 1, 'intel_gained': ['y']}
+        ]
+
+        public, private = split_results(results)
+
+        assert public[0] == {'codename': 'A', 'action_type': 'attack', 'target': 'B',
+                             'offense': 'exposure', 'success': False}
+        assert all('defense' not in r and 'intel_gained' not in r and 'ip_delta' not in r for r in public)
+        assert private == {'A': [results[0]], 'B': [results[1]]}
+
+class TestRoomStateSync:
+
+    def setup_method(self):
+        """Set up a started two-player room before each test"""
+        self.emitter = RecordingEmitter()
+        self.room = GameRoom('table1', emit=self.emitter)
+        self.room.join('sid1', 'Agent_A')
+        self.room.join('sid2', 'Agent_B')
+        self.room.start_game('sid1')
+
+    def play_round(self):
+        for sid in ('sid1', 'sid2'):
+            self.room.submit_action(sid, {
+                'offense': '', 'defense': 'underground', 'target': None,
+                'ip_spend': 0, 'banner_message': ''
+            })
+
+    def test_game_started_carries_base_state(self):
+        """Test that gameStarted gives every client version 1 of the public state"""
+        started = self.emitter.named('gameStarted')[0][1]
+
+        assert started['version'] == 1
+        assert set(started['state']['players']) == {'Agent_A', 'Agent_B'}
+        assert 'private' not in started['state']
+
+    def test_turn_result_is_a_delta(self):
+        """Test that turnResult carries a delta instead of full players and assets"""
+        started = self.emitter.named('gameStarted')[0][1]
+        self.play_round()
+
+        result = self.emitter.named('turnResult')[0][1]
+
+        assert 'players' not in result and 'assets' not in result
+        assert result['baseVersion'] == started['version']
+        state = apply_delta(started['state'], result['delta'])
+        assert state == StateSync.public(self.room.sync.views[result['version']])
+
+    def test_snapshot_from_reported_version(self):
+        """Test that requestGameState with a known version gets a delta"""
+        started = self.emitter.named('gameStarted')[0][1]
+        self.play_round()
+
+        self.room.send_game_state('sid1', started['version'])
+
+        snapshot = self.emitter.named('gameStateSnapshot')[0][1]
+        assert snapshot['full'] is False
+        assert 'userState' not in snapshot
+        base = self.room.sync.view_for(started['version'], 'Agent_A')
+        assert apply_delta(base, snapshot['delta']) == \
+            self.room.sync.view_for(snapshot['version'], 'Agent_A')
+
+    def test_snapshot_without_version_is_full(self):
+        """Test that a client with no known version gets the full state with its private data"""
+        self.room.send_game_state('sid2')
+
+        snapshot = self.emitter.named('gameStateSnapshot')[0][1]
+        assert snapshot['full'] is True
+        assert snapshot['state']['you']['codename'] == 'Agent_B'
+
+    def test_reconnect_storm_reuses_snapshot(self):
+        """Test that a table re-requesting state neither rebuilds the state view nor re-diffs it"""
+        started = self.emitter.named('gameStarted')[0][1]
+        self.play_round()
+        for sid in ('sid1', 'sid2'):
+            self.room.send_game_state(sid, started['version'])
+        version = self.room.sync.version
+        calls = []
+        state_view = self.room.state_view
+        self.room.state_view = lambda: calls.append(1) or state_view()
+        misses = self.room.sync.cache_misses
+
+        for _ in range(5):
+            for sid in ('sid1', 'sid2'):
+                self.room.send_game_state(sid, started['version'])
+
+        assert calls == []
+        assert self.room.sync.version == version
+        assert self.room.sync.cache_misses == misses
+
+    def test_turn_result_private_slice(self):
+        """Test that each socket only receives its own player's full results"""
+        self.play_round()
+
+        by_sid = {event[2]: event[1] for event in self.emitter.named('turnResult')}
+
+        assert set(by_sid) == {'sid1', 'sid2'}
+        assert [r['codename'] for r in by_sid['sid1']['yourResults']] == ['Agent_A']
+        assert [r['codename'] for r in by_sid['sid2']['yourResults']] == ['Agent_B']
+        assert 'intel_gained' in by_sid['sid1']['yourResults'][0]
+        assert by_sid['sid1']['results'] == by_sid['sid2']['results']
+        assert all('intel_gained' not in r for r in by_sid['sid1']['results'])
+
+if __name__ == '__main__':
+    pytest.main([__file__, '-v'])
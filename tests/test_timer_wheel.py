@@ -0,0 +1,187 @@
+"""
+Test suite for the timer wheel and server-authoritative planning deadlines
+Validates scheduling, cancellation, stall catch-up, lateness reporting and
+room deadlines driven from a fake clock
+"""
+
+import pytest
+import sys
+import os
+
+# Add parent directory to path to import modules
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from timer_wheel import TimerWheel
+from game_room import GameRoom, DEADLINE_GRACE_SECONDS
+
+class FakeClock:
+    """Manually advanced monotonic clock"""
+
+    def __init__(self, now=1000.0):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+class RecordingEmitter:
+    """Collects emitted events instead of sending them over Socket.IO"""
+
+    def __init__(self):
+        self.events = []
+
+    def __call__(self, event, data=None, to=None, **kwargs):
+        self.events.append((event, data, to))
+
+    def named(self, event):
+        return [e for e in self.events if e[0] == event]
+
+class TestTimerWheel:
+
+    def setup_method(self):
+        """Set up a wheel on a fake clock before each test"""
+        self.clock = FakeClock()
+        self.wheel = TimerWheel(tick=0.1, slots=16, clock=self.clock)
+        self.fired = []
+
+    def test_fires_after_deadline(self):
+        """Test that a timer fires once its deadline passes, not before"""
+        self.wheel.schedule(1.0, self.fired.append, 'a')
+
+        self.clock.now += 0.95
+        self.wheel.advance()
+        assert self.fired == []
+
+        self.clock.now += 0.2
+        self.wheel.advance()
+        assert self.fired == ['a']
+        assert self.wheel.pending == 0
+
+    def test_cancel(self):
+        """Test that cancelled timers never fire"""
+        timer = self.wheel.schedule(0.5, self.fired.append, 'a')
+
+        assert self.wheel.cancel(timer)
+        assert not self.wheel.cancel(timer)
+
+        self.clock.now += 1.0
+        self.wheel.advance()
+        assert self.fired == []
+        assert self.wheel.stats()['cancelled'] == 1
+
+    def test_deadlines_beyond_one_revolution(self):
+        """Test timers further out than slots * tick wait for their own lap"""
+        self.wheel.schedule(0.5, self.fired.append, 'near')
+        self.wheel.schedule(5.0, self.fired.append, 'far')  # Wheel spans 1.6s
+
+        for _ in range(20):
+            self.clock.now += 0.1
+            self.wheel.advance()
+        assert self.fired == ['near']
+
+        for _ in range(40):
+            self.clock.now += 0.1
+            self.wheel.advance()
+        assert self.fired == ['near', 'far']
+
+    def test_stall_fires_in_deadline_order_and_reports_lateness(self):
+        """Test catch-up after the driver was blocked for several revolutions"""
+        self.wheel.schedule(0.3, self.fired.append, 'second')
+        self.wheel.schedule(0.2, self.fired.append, 'first')
+
+        self.clock.now += 10.0
+        self.wheel.advance()
+
+        assert self.fired == ['first', 'second']
+        stats = self.wheel.stats()
+        assert stats['fired'] == 2
+        assert stats['max_lateness'] == pytest.approx(9.8)
+
+    def test_failing_callback_is_counted(self):
+        """Test that one failing callback does not stop the others"""
+        def explode():
+            raise RuntimeError('boom')
+
+        self.wheel.schedule(0.1, explode)
+        self.wheel.schedule(0.1, self.fired.append, 'ok')
+
+        self.clock.now += 0.5
+        self.wheel.advance()
+
+        assert self.fired == ['ok']
+        assert self.wheel.stats()['errors'] == 1
+
+class TestPlanningDeadline:
+
+    def setup_method(self):
+        """Set up a started two-player room on a fake-clock wheel before each test"""
+        self.clock = FakeClock()
+        self.wheel = TimerWheel(tick=0.1, clock=self.clock)
+        self.emitter = RecordingEmitter()
+        self.room = GameRoom('table1', emit=self.emitter, scheduler=self.wheel)
+        self.room.join('sid1', 'Agent_A')
+        self.room.join('sid2', 'Agent_B')
+        self.room.start_game('sid1')
+
+    def expire(self):
+        self.clock.now += self.room.game_state['timer_duration'] + DEADLINE_GRACE_SECONDS + 0.2
+        self.wheel.advance()
+
+    def test_deadline_armed_at_start(self):
+        """Test that starting the game schedules the round 1 deadline"""
+        assert self.room.planning_deadline is not None
+        assert self.wheel.pending == 1
+        assert self.emitter.named('gameStarted')[0][1]['timerDuration'] == 90
+
+    def test_deadline_auto_submits_and_resolves(self):
+        """Test that an expired deadline submits defaults and resolves the round"""
+        self.room.submit_action('sid1', {
+            'offense': '', 'defense': 'underground', 'target': None,
+            'ip_spend': 0, 'banner_message': ''
+        })
+
+        self.expire()
+
+        deadline = self.emitter.named('planningDeadline')[0]
+        assert deadline[1] == {'roundNumber': 1, 'autoSubmitted': ['Agent_B'], 'seq': 2}
+        assert self.emitter.named('turnResult')
+        assert self.room.game_state['round_number'] == 2
+        assert len(self.room.deadline_lateness) == 1
+
+        # The next round got its own deadline
+        assert self.wheel.pending == 1
+        assert self.emitter.named('nextRound')[0][1]['timerDuration'] == 90
+
+    def test_all_submitted_cancels_deadline(self):
+        """Test that resolving early cancels the pending deadline"""
+        first_deadline = self.room.planning_deadline
+        for sid in ('sid1', 'sid2'):
+            self.room.submit_action(sid, {
+                'offense': '', 'defense': 'underground', 'target': None,
+                'ip_spend': 0, 'banner_message': ''
+            })
+
+        assert first_deadline.cancelled
+        assert self.room.game_state['round_number'] == 2
+
+        # Only the round 2 deadline fires; it does not resolve round 2 twice
+        self.expire()
+        assert len(self.emitter.named('planningDeadline')) == 1
+        assert self.emitter.named('planningDeadline')[0][1]['roundNumber'] == 2
+
+    def test_stale_deadline_ignored(self):
+        """Test that a deadline for an earlier round does nothing"""
+        self.room.game_state['round_number'] = 5
+        self.room.on_planning_deadline(1)
+
+        assert not self.emitter.named('planningDeadline')
+        assert self.room.game_state['phase'] == 'planning'
+
+    def test_snapshot_reports_time_remaining(self):
+        """Test that reconnecting clients get the server's remaining time"""
+        self.room.send_game_state('sid1')
+
+        snapshot = self.emitter.named('gameStateSnapshot')[0][1]
+        assert 0 < snapshot['timeRemaining'] <= 90
+
+if __name__ == '__main__':
+    pytest.main([__file__, '-v'])
@@ -0,0 +1,123 @@
+"""
+Test suite for turn result records
+Validates dict-style field access, the wire format, the player and action
+type indexes, and that results survive pickling and copying for workers
+"""
+
+import copy
+import pickle
+import random
+
+import pytest
+import sys
+import os
+
+# Add parent directory to path to import modules
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from turn_results import TurnResult, TurnResults, UNSET
+from action_resolver import resolve_turn
+from master_plans import MASTER_PLAN_ACTIONS
+from player_registry import PlayerRegistry
+from intel_store import new_intel
+
+def sample_results():
+    """An attack, its defense and a safe turn"""
+    return TurnResults([
+        TurnResult.for_attack('Agent_A', 'Agent_B', 'assassination', 'safe_house', True, 1, 11, 'active',
+                              ['defender_location'], 'gunshot', 'Hit'),
+        TurnResult.for_defense('Agent_B', 'Agent_A', 'assassination', 'safe_house', False, -1, 9, 'captured',
+                               [], 'Captured'),
+        TurnResult.simple('Agent_C', 'safe', ip_delta=0, new_ip=10, new_status='active', description='Safe')
+    ])
+
+class TestTurnResult:
+
+    def test_reads_like_a_dict(self):
+        """Test that fields read by name, and fields a result lacks read as missing"""
+        attack, defense, safe = sample_results()
+
+        assert attack['target'] == 'Agent_B'
+        assert attack.ip_delta == 1
+        assert defense.get('attacker') == 'Agent_A'
+        assert 'target' not in defense
+        assert safe.get('target', 'none') == 'none'
+        assert safe.target is UNSET
+        with pytest.raises(KeyError):
+            safe['offense']
+
+    def test_wire_format_omits_unset_fields(self):
+        """Test that to_dict() holds exactly the fields the result has"""
+        attack, defense, safe = sample_results()
+
+        assert 'attacker' not in attack.to_dict()
+        assert set(defense.to_dict()) == set(defense.keys())
+        assert safe.to_dict() == {'codename': 'Agent_C', 'action_type': 'safe', 'ip_delta': 0, 'new_ip': 10,
+                                  'new_status': 'active', 'intel_gained': (), 'description': 'Safe'}
+        assert attack == attack.to_dict()
+        assert attack != safe.to_dict()
+
+    def test_pickle_and_copy(self):
+        """Test that results pickle for worker processes and copy with UNSET intact"""
+        results = sample_results()
+
+        restored = pickle.loads(pickle.dumps(results))
+        copied = copy.deepcopy(results)
+
+        assert restored == results
+        assert copied == results
+        assert restored[2].target is UNSET
+        assert copied[2].target is UNSET
+
+class TestTurnResults:
+
+    def test_indexes_keep_resolution_order(self):
+        """Test that for_player() and of_type() return results in resolution order"""
+        results = sample_results()
+        results.append(TurnResult.simple('Agent_A', 'banner', ip_delta=1, new_ip=12, new_status='active',
+                                         description='Banner'))
+
+        assert [r['action_type'] for r in results.for_player('Agent_A')] == ['attack', 'banner']
+        assert [r['codename'] for r in results.of_type('banner', 'attack')] == ['Agent_A', 'Agent_A']
+        assert results.of_type('sabotage_success') == []
+        assert results.for_player('Agent_Z') == []
+
+    def test_wire_built_once(self):
+        """Test that wire() reuses its dicts until a result is added"""
+        results = sample_results()
+
+        wire = results.wire()
+        assert results.wire() is wire
+        assert wire == [result.to_dict() for result in results]
+
+        results.append(TurnResult.simple('Agent_D', 'safe', ip_delta=0, new_ip=10, new_status='active',
+                                         description='Safe'))
+        assert len(results.wire()) == 4
+
+    @pytest.mark.parametrize('seed', range(10))
+    def test_of_type_matches_scan(self, seed):
+        """Test that the action type index finds what a full scan of a resolved turn finds"""
+        rng = random.Random(seed)
+        users = PlayerRegistry({
+            f'sid{i}': {'codename': f'Agent_{i}', 'status': 'active', 'ip': 10, 'intel': new_intel(),
+                        'gadgets': []}
+            for i in range(8)
+        })
+        submitted = {
+            sid: {'offense': rng.choice(['assassination', 'surveillance', 'sabotage', '']),
+                  'defense': rng.choice(['safe_house', 'bodyguard_detail', 'underground']),
+                  'target': f'Agent_{rng.randrange(8)}', 'banner_message': 'ACME RULES!'}
+            for sid in users
+        }
+
+        results = resolve_turn(users, submitted, 1, {}, rng=rng)
+
+        for action_types in (MASTER_PLAN_ACTIONS, ('attack', 'defense')):
+            scanned = [result for result in results if result['action_type'] in action_types]
+            assert results.of_type(*action_types) == scanned
+        for user in users.values():
+            assert results.for_player(user['codename']) == [
+                result for result in results if result['codename'] == user['codename']]
+
+if __name__ == '__main__':
+    pytest.main([__file__, '-v'])
@@ -0,0 +1,134 @@
+"""
+Test suite for the incremental victory tracker
+Differential tests against check_victory_conditions after random status
+changes, asset captures and intel gains, and after whole resolved rounds
+"""
+
+import random
+
+import pytest
+import sys
+import os
+
+# Add parent directory to path to import modules
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from victory_tracker import VictoryTracker
+from action_resolver import resolve_turn, apply_round_end_effects, check_victory_conditions, STRATEGIC_ASSETS
+from interaction_matrix import OFFENSES, DEFENSES, STATUSES
+from player_registry import PlayerRegistry
+from intel_store import intel_count
+
+def random_table(rng, players):
+    """Mid-game users and assets, with statuses and intel spread around the victory thresholds"""
+    codenames = [f'Agent_{i}' for i in range(players)]
+    users = PlayerRegistry()
+    for i, codename in enumerate(codenames):
+        users.add(f'sid{i}', {
+            'codename': codename,
+            'status': rng.choice(STATUSES),
+            'ip': rng.randint(-10, 50),
+            'gadgets': [],
+            'intel': ['card'] * rng.randint(0, 2 * players),
+            'alliances': []
+        })
+    assets = {name: rng.choice([None, None] + codenames) for name in STRATEGIC_ASSETS}
+    return users, assets
+
+def random_actions(rng, users):
+    """Submitted actions for most players, piled onto a few targets"""
+    codenames = [user['codename'] for user in users.values()]
+    submitted = {}
+    for sid in users:
+        if rng.random() < 0.1:
+            continue
+        offense = rng.choice(OFFENSES + ['network_attack'] * 3 + [''])
+        submitted[sid] = {
+            'offense': offense,
+            'defense': rng.choice(DEFENSES),
+            'target': rng.choice(codenames[:3]) if offense else None,
+            'ip_spend': rng.choice([0, 1, 2])
+        }
+    return submitted
+
+class TestDifferential:
+
+    @pytest.mark.parametrize('seed', range(40))
+    def test_random_mutations(self, seed):
+        """Test that the tracker agrees with the full scan after every single mutation"""
+        rng = random.Random(seed)
+        users, assets = random_table(rng, rng.randint(1, 12))
+        tracker = VictoryTracker(users, assets)
+        sids = list(users)
+        codenames = [users[sid]['codename'] for sid in sids]
+
+        assert tracker.check() == check_victory_conditions(users, assets)
+        for _ in range(60):
+            kind = rng.random()
+            if kind < 0.45:
+                users.set_status(rng.choice(sids), rng.choice(STATUSES))
+            elif kind < 0.7:
+                tracker.capture(rng.choice(STRATEGIC_ASSETS), rng.choice(codenames + [None]))
+            else:
+                tracker.gain_intel(rng.choice(sids), rng.choice(codenames), ['attacker_codename'] * rng.randint(0, 2))
+            assert tracker.check() == check_victory_conditions(users, assets)
+
+    @pytest.mark.parametrize('seed', range(30))
+    def test_resolved_rounds(self, seed):
+        """Test that the tracker agrees with the full scan after resolve_turn and round end effects"""
+        rng = random.Random(seed)
+        users, assets = random_table(rng, rng.randint(2, 10))
+
+        for round_number in range(1, 4):
+            tracker = VictoryTracker(users, assets)
+            resolve_turn(users, random_actions(rng, users), round_number, assets, rng=rng, tracker=tracker)
+            assert tracker.check() == check_victory_conditions(users, assets)
+            apply_round_end_effects(users, assets, rng=rng)
+            assert tracker.check() == check_victory_conditions(users, assets)
+
+class TestVictoryTracker:
+
+    def setup_method(self):
+        """Set up three active players before each test"""
+        self.users = PlayerRegistry({
+            f'sid{i}': {'codename': f'Agent_{i}', 'status': 'active', 'ip': 5, 'intel': [], 'gadgets': []}
+            for i in range(3)
+        })
+        self.assets = {name: None for name in STRATEGIC_ASSETS}
+        self.tracker = VictoryTracker(self.users, self.assets)
+
+    def test_registry_reports_status_changes(self):
+        """Test that set_status() keeps the tracker's active count current"""
+        assert self.tracker.active_count() == 3
+        assert self.tracker.check() is None
+
+        self.users.set_status('sid0', 'captured')
+        self.users.set_status('sid1', 'eliminated')
+
+        assert self.users.status_watcher is self.tracker
+        assert self.tracker.check()['winners'] == ['Agent_2']
+
+    def test_network_control_follows_captures(self):
+        """Test that losing an asset drops a spy below Network Control"""
+        for asset in STRATEGIC_ASSETS[:3]:
+            self.tracker.capture(asset, 'Agent_1')
+        assert self.tracker.check()['condition'] == 'Network Control'
+
+        self.tracker.capture(STRATEGIC_ASSETS[0], 'Agent_2')
+
+        assert self.tracker.check() is None
+        assert self.assets[STRATEGIC_ASSETS[0]] == 'Agent_2'
+
+    def test_intel_leader_leaving_play(self):
+        """Test that the most intel among active spies is recounted when its holder leaves play"""
+        self.tracker.gain_intel('sid0', 'Agent_2', ['attacker_codename'] * 5)
+        self.tracker.gain_intel('sid1', 'Agent_2', ['defender_gadgets'] * 4)
+        assert self.tracker.most_active_intel() == 5
+
+        self.users.set_status('sid0', 'captured')
+        assert self.tracker.most_active_intel() == 4
+        assert intel_count(self.users['sid1']['intel']) == 4
+        assert self.tracker.check()['winners'] == ['Agent_1']
+
+if __name__ == '__main__':
+    pytest.main([__file__, '-v'])
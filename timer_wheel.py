@@ -0,0 +1,163 @@
+#!/usr/bin/env python3
+"""
+Timer Wheel for James Bland: ACME Edition
+A hashed timing wheel that drives every room's deadlines from one green thread,
+with O(1) schedule/cancel and lateness reporting for fired timers
+"""
+
+import time
+from collections import deque
+from typing import Any, Callable, Dict, List, Optional
+
+
+class Timer:
+    """A scheduled callback; keep the handle to cancel it"""
+
+    __slots__ = ('deadline', 'tick', 'callback', 'args', 'cancelled', 'fired_at')
+
+    def __init__(self, deadline: float, tick: int, callback: Callable[..., Any], args: tuple):
+        self.deadline = deadline
+        self.tick = tick
+        self.callback = callback
+        self.args = args
+        self.cancelled = False
+        self.fired_at = None
+
+    @property
+    def lateness(self) -> Optional[float]:
+        """Seconds between the deadline and when the callback actually ran"""
+        if self.fired_at is None:
+            return None
+        return self.fired_at - self.deadline
+
+    def remaining(self, now: Optional[float] = None) -> float:
+        """Seconds left until the deadline"""
+        return max(0.0, self.deadline - (time.monotonic() if now is None else now))
+
+
+class TimerWheel:
+    """
+    Hashed timing wheel
+
+    Timers are hashed into `slots` buckets by their deadline tick. Each call to
+    advance() visits only the buckets for the ticks that have elapsed, so the
+    cost of keeping thousands of room deadlines is independent of how many are
+    pending and needs no greenlet or sleep per room.
+    """
+
+    def __init__(self, tick: float = 0.1, slots: int = 512,
+                 clock: Callable[[], float] = time.monotonic, history: int = 1024):
+        self.tick_seconds = tick
+        self.slots = slots
+        self.clock = clock
+        self.buckets = [set() for _ in range(slots)]
+        self.current_tick = self._tick_for(clock())
+        self.pending = 0
+        self.running = False
+
+        # Lateness reporting
+        self.fired = 0
+        self.cancelled = 0
+        self.errors = 0
+        self.max_lateness = 0.0
+        self.total_lateness = 0.0
+        self.recent_lateness = deque(maxlen=history)
+
+    def _tick_for(self, when: float) -> int:
+        return int(when / self.tick_seconds)
+
+    def schedule(self, delay: float, callback: Callable[..., Any], *args) -> Timer:
+        """Run callback(*args) after `delay` seconds"""
+        return self.schedule_at(self.clock() + max(0.0, delay), callback, *args)
+
+    def schedule_at(self, deadline: float, callback: Callable[..., Any], *args) -> Timer:
+        """Run callback(*args) once the clock passes `deadline`"""
+        # Round up so a timer never fires before its deadline
+        tick = max(self._tick_for(deadline) + 1, self.current_tick + 1)
+        timer = Timer(deadline, tick, callback, args)
+        self.buckets[tick % self.slots].add(timer)
+        self.pending += 1
+        return timer
+
+    def cancel(self, timer: Optional[Timer]) -> bool:
+        """Cancel a pending timer; returns False if it already fired or was cancelled"""
+        if timer is None or timer.cancelled or timer.fired_at is not None:
+            return False
+
+        timer.cancelled = True
+        self.buckets[timer.tick % self.slots].discard(timer)
+        self.pending -= 1
+        self.cancelled += 1
+        return True
+
+    def advance(self, now: Optional[float] = None) -> List[Timer]:
+        """
+        Fire every timer whose deadline tick has passed
+
+        Returns:
+            List of timers fired by this call
+        """
+        if now is None:
+            now = self.clock()
+        target_tick = self._tick_for(now)
+        if target_tick <= self.current_tick:
+            return []
+
+        # After a long stall every bucket only needs to be visited once
+        first_tick = max(self.current_tick + 1, target_tick - self.slots + 1)
+        due = []
+        for tick in range(first_tick, target_tick + 1):
+            bucket = self.buckets[tick % self.slots]
+            if not bucket:
+                continue
+            ready = [timer for timer in bucket if timer.tick <= target_tick]
+            for timer in ready:
+                bucket.discard(timer)
+            due.extend(ready)
+        self.current_tick = target_tick
+
+        due.sort(key=lambda timer: timer.deadline)
+        for timer in due:
+            self.pending -= 1
+            timer.fired_at = self.clock()
+            self._record_lateness(timer.lateness)
+            try:
+                timer.callback(*timer.args)
+            except Exception as e:
+                self.errors += 1
+                print(f"Timer callback failed: {e}")
+        return due
+
+    def _record_lateness(self, lateness: float):
+        self.fired += 1
+        self.total_lateness += lateness
+        self.max_lateness = max(self.max_lateness, lateness)
+        self.recent_lateness.append(lateness)
+
+    def run(self, sleep: Callable[[float], Any]):
+        """Drive the wheel forever from a single green thread (e.g. socketio.sleep)"""
+        self.running = True
+        while self.running:
+            self.advance()
+            # Wake at the next tick boundary rather than a full tick from now
+            next_tick_at = (self.current_tick + 1) * self.tick_seconds
+            sleep(max(0.0, next_tick_at - self.clock()))
+
+    def stop(self):
+        """Stop the run() loop after its current tick"""
+        self.running = False
+
+    def stats(self) -> Dict[str, Any]:
+        """Deadline counters and how late fired timers ran"""
+        recent = sorted(self.recent_lateness)
+        p99 = recent[min(len(recent) - 1, int(len(recent) * 0.99))] if recent else 0.0
+        return {
+            'pending': self.pending,
+            'fired': self.fired,
+            'cancelled': self.cancelled,
+            'errors': self.errors,
+            'tick_seconds': self.tick_seconds,
+            'mean_lateness': self.total_lateness / self.fired if self.fired else 0.0,
+            'p99_lateness': p99,
+            'max_lateness': self.max_lateness
+        }
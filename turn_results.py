@@ -0,0 +1,219 @@
+#!/usr/bin/env python3
+"""
+Turn Results for James Bland: ACME Edition
+Compact per-player result records for one resolved turn, indexed by player
+and action type, serialized to the wire format once when they are sent
+"""
+
+from itertools import repeat
+from typing import Any, Dict, Iterable, Iterator, List
+
+# Every field a result can carry, in wire order
+RESULT_FIELDS = ('codename', 'action_type', 'target', 'attacker', 'offense', 'defense', 'success',
+                 'ip_delta', 'new_ip', 'new_status', 'intel_gained', 'audio_effect', 'description')
+_FIELD_INDEX = {field: index for index, field in enumerate(RESULT_FIELDS)}
+
+
+class _Unset:
+    """Marks a field a result does not have (a safe turn has no target); omitted on the wire"""
+
+    __slots__ = ()
+
+    def __reduce__(self):
+        return 'UNSET'  # pickles and copies as this module's singleton
+
+    def __repr__(self) -> str:
+        return 'UNSET'
+
+
+UNSET = _Unset()
+
+_new = tuple.__new__
+
+
+class TurnResult(tuple):
+    """
+    One player's result for a turn (safe turn, attack, defense, banner, failed attack)
+
+    A tuple of RESULT_FIELDS in place of a dict per result: one allocation,
+    no per-instance key table. Build one with for_attack(), for_defense() or
+    simple(). Reads by field name work like the dict it replaces
+    (result['ip_delta'], result.get('target'), 'target' in result), so
+    Master Plans and tests can use either; fields the result does not have
+    are UNSET and read as missing.
+    """
+
+    __slots__ = ()
+
+    @classmethod
+    def for_attack(cls, codename: str, target: str, offense: str, defense: str, success: bool, ip_delta: int,
+                   new_ip: int, new_status: str, intel_gained: Iterable[str], audio_effect: Any,
+                   description: str) -> 'TurnResult':
+        """An attacker's result"""
+        return _new(cls, (codename, 'attack', target, UNSET, offense, defense, success,
+                          ip_delta, new_ip, new_status, intel_gained, audio_effect, description))
+
+    @classmethod
+    def for_defense(cls, codename: str, attacker: str, offense: str, defense: str, success: bool, ip_delta: int,
+                    new_ip: int, new_status: str, intel_gained: Iterable[str], description: str) -> 'TurnResult':
+        """A defender's result against their first attacker"""
+        return _new(cls, (codename, 'defense', UNSET, attacker, offense, defense, success,
+                          ip_delta, new_ip, new_status, intel_gained, UNSET, description))
+
+    @classmethod
+    def simple(cls, codename: str, action_type: str, ip_delta: int, new_ip: int, new_status: str,
+               description: str) -> 'TurnResult':
+        """A result with no opponent: safe turn, banner, failed attack"""
+        return _new(cls, (codename, action_type, UNSET, UNSET, UNSET, UNSET, UNSET,
+                          ip_delta, new_ip, new_status, (), UNSET, description))
+
+    # Field access
+
+    def __getitem__(self, field: Any) -> Any:
+        if field.__class__ is not str:
+            return tuple.__getitem__(self, field)
+        index = _FIELD_INDEX.get(field)
+        if index is not None:
+            value = tuple.__getitem__(self, index)
+            if value is not UNSET:
+                return value
+        raise KeyError(field)
+
+    def __contains__(self, field: object) -> bool:
+        index = _FIELD_INDEX.get(field)
+        return index is not None and tuple.__getitem__(self, index) is not UNSET
+
+    def get(self, field: str, default: Any = None) -> Any:
+        index = _FIELD_INDEX.get(field)
+        if index is None:
+            return default
+        value = tuple.__getitem__(self, index)
+        return default if value is UNSET else value
+
+    def keys(self) -> List[str]:
+        return [field for field, value in zip(RESULT_FIELDS, self) if value is not UNSET]
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Wire format: the fields this result has"""
+        # The factories fix which fields are set, so the shape picks the keys without testing each value
+        codename, action_type, target, attacker, offense, defense, success, ip_delta, new_ip, new_status, \
+            intel_gained, audio_effect, description = self
+        if target is not UNSET:
+            return {'codename': codename, 'action_type': action_type, 'target': target, 'offense': offense,
+                    'defense': defense, 'success': success, 'ip_delta': ip_delta, 'new_ip': new_ip,
+                    'new_status': new_status, 'intel_gained': intel_gained, 'audio_effect': audio_effect,
+                    'description': description}
+        if attacker is not UNSET:
+            return {'codename': codename, 'action_type': action_type, 'attacker': attacker, 'offense': offense,
+                    'defense': defense, 'success': success, 'ip_delta': ip_delta, 'new_ip': new_ip,
+                    'new_status': new_status, 'intel_gained': intel_gained, 'description': description}
+        return {'codename': codename, 'action_type': action_type, 'ip_delta': ip_delta, 'new_ip': new_ip,
+                'new_status': new_status, 'intel_gained': intel_gained, 'description': description}
+
+    def __eq__(self, other: object) -> bool:
+        if isinstance(other, dict):
+            return self.to_dict() == other
+        return tuple.__eq__(self, other)
+
+    def __ne__(self, other: object) -> bool:
+        equal = self.__eq__(other)
+        return equal if equal is NotImplemented else not equal
+
+    __hash__ = tuple.__hash__
+
+    def __repr__(self) -> str:
+        return f'TurnResult({self.to_dict()!r})'
+
+
+def _field_property(index: int) -> property:
+    # tuple.__getitem__ directly: an itemgetter would go through the str-aware __getitem__ above
+    item = tuple.__getitem__
+    return property(lambda self: item(self, index), doc=f'{RESULT_FIELDS[index]} (UNSET if the result has none)')
+
+
+for _index, _field in enumerate(RESULT_FIELDS):
+    setattr(TurnResult, _field, _field_property(_index))
+del _index, _field
+
+
+class TurnResults:
+    """
+    A turn's results in resolution order, indexed by player and action type
+
+    The indexes hold positions and are built on first use, so for_player()
+    and of_type() return results in resolution order without scanning the
+    turn again. wire() builds the dicts sent to clients once and reuses them
+    for every event that carries them. Only the records are pickled (for
+    worker processes).
+    """
+
+    __slots__ = ('records', '_by_player', '_by_type', '_wire')
+
+    def __init__(self, records: Iterable[TurnResult] = ()):
+        self.records = list(records)  # TurnResult in resolution order
+        self._by_player = None        # codename -> positions in records
+        self._by_type = None          # action_type -> positions in records
+        self._wire = None             # wire() output
+
+    def append(self, result: TurnResult):
+        """Add the next result"""
+        self.records.append(result)
+        self._by_player = self._by_type = self._wire = None
+
+    def __iter__(self) -> Iterator[TurnResult]:
+        return iter(self.records)
+
+    def __len__(self) -> int:
+        return len(self.records)
+
+    def __getitem__(self, index: int) -> TurnResult:
+        return self.records[index]
+
+    def _index(self, field: int) -> Dict[Any, List[int]]:
+        index = {}
+        for position, value in enumerate(map(tuple.__getitem__, self.records, repeat(field))):
+            positions = index.get(value)
+            if positions is None:
+                index[value] = [position]
+            else:
+                positions.append(position)
+        return index
+
+    def for_player(self, codename: str) -> List[TurnResult]:
+        """A player's own results"""
+        if self._by_player is None:
+            self._by_player = self._index(_FIELD_INDEX['codename'])
+        records = self.records
+        return [records[position] for position in self._by_player.get(codename, ())]
+
+    def of_type(self, *action_types: str) -> List[TurnResult]:
+        """Results of any of the given action types, in resolution order"""
+        if self._by_type is None:
+            self._by_type = self._index(_FIELD_INDEX['action_type'])
+        positions = []
+        for action_type in action_types:
+            positions.extend(self._by_type.get(action_type, ()))
+        if len(action_types) > 1:
+            positions.sort()
+        records = self.records
+        return [records[position] for position in positions]
+
+    def wire(self) -> List[Dict[str, Any]]:
+        """Every result in wire format, built on first use"""
+        if self._wire is None:
+            self._wire = [record.to_dict() for record in self.records]
+        return self._wire
+
+    def __eq__(self, other: object) -> bool:
+        if isinstance(other, (TurnResults, list)):
+            return self.records == list(other)
+        return NotImplemented
+
+    def __getstate__(self) -> List[TurnResult]:
+        return self.records
+
+    def __setstate__(self, records: List[TurnResult]):
+        self.__init__(records)
+
+    def __repr__(self) -> str:
+        return f'TurnResults({self.records!r})'
@@ -0,0 +1,154 @@
+#!/usr/bin/env python3
+"""
+Victory Tracker for James Bland: ACME Edition
+Keeps the counts behind Last Spy Standing, Network Control and Intelligence
+Supremacy up to date as statuses, assets and intel change, so the end of
+round victory check is a few lookups
+"""
+
+from typing import Any, Dict, Iterable, Optional
+
+from player_registry import PlayerRegistry, INACTIVE_STATUSES
+from intel_store import add_intel, as_intel_store, intel_count
+
+NETWORK_CONTROL_ASSETS = 3   # strategic assets one spy must hold for Network Control
+INTEL_PER_RIVAL = 3          # intel cards per other active spy for Intelligence Supremacy
+
+
+class VictoryTracker:
+    """
+    Running victory counts for one registry and asset map
+
+    Built once (O(N)) and then told about every mutation: status changes
+    arrive from the registry's set_status(), and captures and intel gains go
+    through capture() and gain_intel(). The active count comes from the
+    registry's status sets, assets are counted per controller, and the most
+    intel held by any active spy is kept, so check() answers in O(1) unless
+    someone has actually won. It returns exactly what
+    action_resolver.check_victory_conditions() would.
+
+    A registry reports to one tracker at a time: the latest one built for it.
+    """
+
+    def __init__(self, users: PlayerRegistry, assets: Dict[str, Optional[str]]):
+        self.users = users
+        self.assets = assets
+        self.asset_counts = {}         # codename -> strategic assets held
+        self.network_controllers = set()  # codenames holding NETWORK_CONTROL_ASSETS or more
+        self.intel_counts = {}         # sid -> intel cards held
+        self.max_active_intel = None   # most intel held by an active spy; None until recomputed
+
+        for controller in assets.values():
+            if controller:
+                self._count_asset(controller, 1)
+        for sid, player in users.items():
+            self.intel_counts[sid] = intel_count(player.get('intel'))
+        users.status_watcher = self
+
+    # Mutations
+
+    def capture(self, asset: str, codename: Optional[str]):
+        """Give a strategic asset to `codename` (None releases it)"""
+        previous = self.assets.get(asset)
+        if previous == codename:
+            return
+        if previous:
+            self._count_asset(previous, -1)
+        self.assets[asset] = codename
+        if codename:
+            self._count_asset(codename, 1)
+
+    def gain_intel(self, sid: str, subject: str, sources: Iterable[str], round_number: Optional[int] = None):
+        """Add intel about `subject` to a player's store (see intel_store.add_intel)"""
+        if not sources:
+            return
+        player = self.users[sid]
+        player['intel'] = intel = as_intel_store(player.get('intel'))
+        count = self.intel_counts.get(sid, 0) + add_intel(intel, subject, sources, round_number)
+        self.intel_counts[sid] = count
+        if self.max_active_intel is not None and not self.users.is_out_of_play(sid):
+            self.max_active_intel = max(self.max_active_intel, count)
+
+    def status_changed(self, sid: str, old_status: Optional[str], status: str):
+        """Called by the registry when a player's status changes"""
+        was_active = old_status not in INACTIVE_STATUSES
+        is_active = status not in INACTIVE_STATUSES
+        if was_active == is_active or self.max_active_intel is None:
+            return
+        count = self.intel_counts.get(sid, 0)
+        if is_active:
+            self.max_active_intel = max(self.max_active_intel, count)
+        elif count >= self.max_active_intel:
+            # The leader may have left play: recount on the next check
+            self.max_active_intel = None
+
+    def _count_asset(self, codename: str, change: int):
+        count = self.asset_counts.get(codename, 0) + change
+        self.asset_counts[codename] = count
+        if count >= NETWORK_CONTROL_ASSETS:
+            self.network_controllers.add(codename)
+        else:
+            self.network_controllers.discard(codename)
+
+    # Queries
+
+    def active_count(self) -> int:
+        """Spies still in play"""
+        return len(self.users) - self.users.count_with_status(*INACTIVE_STATUSES)
+
+    def most_active_intel(self) -> int:
+        """Most intel held by an active spy"""
+        if self.max_active_intel is None:
+            self.max_active_intel = max((count for sid, count in self.intel_counts.items()
+                                         if sid in self.users and not self.users.is_out_of_play(sid)),
+                                        default=0)
+        return self.max_active_intel
+
+    def check(self) -> Optional[Dict[str, Any]]:
+        """
+        Check Last Spy Standing, Network Control and Intelligence Supremacy
+
+        Returns:
+            dict or None: Victory result with winners and condition, or None if no victory
+        """
+        active = self.active_count()
+
+        # Last Spy Standing
+        if active <= 1:
+            if active == 1:
+                winner = next(player['codename'] for player in self.users.values()
+                              if player['status'] not in INACTIVE_STATUSES)
+                return {
+                    'winners': [winner],
+                    'condition': 'Last Spy Standing',
+                    'description': f"{winner} is the last spy standing!"
+                }
+            return {
+                'winners': [],
+                'condition': 'Mutual Elimination',
+                'description': 'All spies have been eliminated - no winner!'
+            }
+
+        # Network Control: the first controller in asset order, as the full scan finds them
+        if self.network_controllers:
+            for controller in self.assets.values():
+                if controller in self.network_controllers:
+                    count = self.asset_counts[controller]
+                    return {
+                        'winners': [controller],
+                        'condition': 'Network Control',
+                        'description': f"{controller} controls {count} strategic assets and wins by Network Control!"
+                    }
+
+        # Intelligence Supremacy: first active spy in seating order with enough intel
+        needed = (active - 1) * INTEL_PER_RIVAL
+        if self.most_active_intel() >= needed:
+            for sid, player in self.users.items():
+                if player['status'] not in INACTIVE_STATUSES and self.intel_counts.get(sid, 0) >= needed:
+                    return {
+                        'winners': [player['codename']],
+                        'condition': 'Intelligence Supremacy',
+                        'description': f"{player['codename']} has gathered comprehensive intelligence and wins by Intelligence Supremacy!"
+                    }
+
+        return None